@@ -0,0 +1,36 @@
+"""
+Rough benchmark comparing a serial external sort against an external sort with
+chunks sorted by a pool of worker processes. Run from the repository root.
+
+"""
+
+import sys
+sys.path.insert(0, './src')
+import time
+import multiprocessing
+from datetime import datetime
+from petl import dummytable, sort, nrows, convert
+
+
+n = 200000
+buffersize = 20000
+workers = max(2, multiprocessing.cpu_count())
+
+# sort on a compound key including datetimes, so sorting dominates the run time
+t = convert(dummytable(n), 'foo', lambda v: datetime(2000, 1, 1 + v % 28, v % 24))
+# materialise the source so both runs read the same rows at the same speed
+t = [tuple(row) for row in t]
+
+print 'rows: %s, buffersize: %s, workers: %s' % (n, buffersize, workers)
+
+before = time.time()
+nrows(sort(t, key=('foo', 'baz'), buffersize=buffersize))
+serial = time.time() - before
+print 'serial:   %.2fs' % serial
+
+before = time.time()
+nrows(sort(t, key=('foo', 'baz'), buffersize=buffersize, workers=workers))
+parallel = time.time() - before
+print 'parallel: %.2fs' % parallel
+
+print 'speedup:  %.2fx' % (serial / parallel)
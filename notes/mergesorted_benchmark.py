@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+# Notes comparing the heap-based merge used by heapqmergesorted with the
+# shortlist merge (shortlistmergesorted) for reverse merges, as the number of
+# sorted runs (k) grows. N.B., heapqmergesorted itself uses the shortlist merge
+# for reverse merges of up to petl.util.shortlistmaxiterables runs, where that
+# is quicker. Run with the petl source directory on the path, e.g.:
+#
+#     PYTHONPATH=src python notes/mergesorted_benchmark.py
+
+from __future__ import absolute_import, print_function, division
+
+import random
+import time
+from operator import itemgetter
+
+from petl.util import heapqmergesorted, shortlistmergesorted, _heapmerge
+
+
+def runs(k, n):
+    # k runs of rows in descending key order, n rows in total
+    rows = [(random.random(), i) for i in xrange(n)]
+    return [sorted(rows[i::k], reverse=True) for i in range(k)]
+
+
+def timeit(f, repeat=1):
+    best = None
+    for _ in range(repeat):
+        before = time.time()
+        f()
+        elapsed = time.time() - before
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+n = 100000
+getkey = itemgetter(0)
+print('%6s %12s %12s' % ('k', 'shortlist', 'heap'))
+for k in (2, 10, 50, 100, 500, 1000):
+    rs = runs(k, n)
+    expect = sorted(sum(rs, []), key=getkey, reverse=True)
+    assert list(heapqmergesorted(getkey, *rs, reverse=True)) == expect
+    ts = timeit(lambda: list(shortlistmergesorted(getkey, True, *rs)))
+    th = timeit(lambda: list(_heapmerge(getkey, True, rs)))
+    print('%6s %11.3fs %11.3fs' % (k, ts, th))
@@ -19,7 +19,10 @@ from petl.util import header, fieldnames, data, records, rowcount, look, see, \
     shortlistmergesorted, progress, clock, isordered, rowgroupby, nrows, \
     nthword, lookstr, listoflists, tupleoftuples, listoftuples, tupleoflists, \
     lol, tot, tol, lot, iternamedtuples, namedtuples, iterrecords, dicts, \
-    iterdicts, dictlookup, dictlookupone, cache, empty, numparser, coalesce
+    iterdicts, dictlookup, dictlookupone, cache, empty, numparser, coalesce, \
+    sortorder
+
+from petl.columnar import ColumnarTable, columnar, vectorised
 
 from petl.io import *
 
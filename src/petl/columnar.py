@@ -0,0 +1,499 @@
+"""
+Columnar tables, holding the values for each field in a NumPy array.
+
+"""
+
+
+from __future__ import absolute_import, print_function, division
+
+
+import operator
+import warnings
+from itertools import izip
+
+
+from petl.util import RandomAccessRowContainer, asindices
+
+
+def _numpy():
+    # NumPy is an optional dependency, only required for columnar tables, so
+    # is imported when a columnar table is used rather than with petl
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('numpy is required for columnar tables')
+    return numpy
+
+
+def columnar(table, dtypes=None, missing=None):
+    """
+    Load a table into a :class:`ColumnarTable`, where the values for each
+    field are held in a NumPy array. E.g.::
+
+        >>> from petl import columnar, selectgt, look
+        >>> table1 = [['foo', 'bar', 'baz'],
+        ...           ['A', 1, 2.7],
+        ...           ['B', 2, 3.4],
+        ...           ['C', 3, 7.8]]
+        >>> table2 = columnar(table1)
+        >>> table2.column('bar')
+        array([1, 2, 3])
+        >>> look(selectgt(table2, 'baz', 3))
+        +-------+-------+-------+
+        | 'foo' | 'bar' | 'baz' |
+        +=======+=======+=======+
+        | 'B'   | 2     | 3.4   |
+        +-------+-------+-------+
+        | 'C'   | 3     | 7.8   |
+        +-------+-------+-------+
+
+    The `dtypes` argument can map field names to NumPy dtypes, in which case
+    the values are converted, e.g., to parse values read from a CSV file::
+
+        >>> from petl import fromcsv
+        >>> table3 = columnar(fromcsv('example.csv'), dtypes={'bar': int})
+
+    Otherwise the dtype of each field is inferred from its values. Fields
+    where all values are of type :class:`bool`, :class:`int` or
+    :class:`float` get the corresponding native dtype, all other fields are
+    held in arrays of Python objects. Short rows are padded with `missing`.
+
+    A columnar table is a row container like any other, but the functions
+    :func:`selecteq`, :func:`selectne`, :func:`selectlt`, :func:`selectle`,
+    :func:`selectgt`, :func:`selectge`, the `selectrange*` functions,
+    :func:`convert`, :func:`cut`, :func:`sort`, :func:`aggregate` and
+    :func:`stats` use vectorised implementations when given a columnar table,
+    returning another columnar table where the result is a table. Where an
+    operation can't be vectorised, e.g., because a conversion is an arbitrary
+    Python function, these functions fall back to iterating over rows.
+
+    .. versionadded:: 0.26
+
+    """
+
+    _numpy()
+    if dtypes is None:
+        dtypes = dict()
+    it = iter(table)
+    fields = tuple(it.next())
+    cols = [list() for _ in fields]
+    for row in it:
+        for i, col in enumerate(cols):
+            col.append(row[i] if i < len(row) else missing)
+    arrays = [toarray(col, dtypes.get(f)) for f, col in zip(fields, cols)]
+    return ColumnarTable(fields, arrays)
+
+
+_nativetypes = {bool: 'bool',
+                int: 'int64',
+                long: 'int64',
+                float: 'float64'}
+
+
+def toarray(values, dtype=None):
+    """
+    Convert a sequence of values to a NumPy array, inferring the dtype as
+    described for :func:`columnar` if `dtype` is None.
+
+    .. versionadded:: 0.26
+
+    """
+
+    np = _numpy()
+    if dtype is not None:
+        return np.array(values, dtype=object).astype(dtype)
+    types = set(type(v) for v in values)
+    if types and types <= set([int, long]):
+        a = np.array(values)
+        if a.dtype.kind == 'i':
+            return a
+        types = set([object])  # out of range for a native integer dtype
+    if len(types) == 1:
+        t = types.pop()
+        if t in _nativetypes:
+            return np.array(values, dtype=_nativetypes[t])
+    a = np.empty(len(values), dtype=object)
+    a[:] = values  # N.B., avoids numpy creating 2D arrays from sequences
+    return a
+
+
+class ColumnarTable(RandomAccessRowContainer):
+    """
+    A table held in memory as one NumPy array per field, see
+    :func:`columnar`. The `arrays` may be given as arrays or sequences, which
+    are converted via :func:`toarray`. E.g., to build a columnar table from
+    the output of :func:`columns`::
+
+        >>> from petl import columns, ColumnarTable
+        >>> cols = columns(table1)
+        >>> table2 = ColumnarTable(['foo', 'bar'], [cols['foo'], cols['bar']])
+
+    .. versionadded:: 0.26
+
+    """
+
+    def __init__(self, fields, arrays):
+        np = _numpy()
+        self.fields = tuple(fields)
+        self.arrays = [a if isinstance(a, np.ndarray) else toarray(a)
+                       for a in arrays]
+        assert len(self.fields) == len(self.arrays), \
+            'one array must be given for each field'
+        assert len(set(len(a) for a in self.arrays)) <= 1, \
+            'arrays must all have the same length'
+
+    def __iter__(self):
+        yield self.fields
+        for row in izip(*[a.tolist() for a in self.arrays]):
+            yield row
+
+    def _header(self):
+        return self.fields
+
+    def _datalen(self):
+        return self.nrows()
+
+    def _iterdata(self, start, stop, step):
+        return izip(*[a[start:stop:step].tolist() for a in self.arrays])
+
+    def nrows(self):
+        if self.arrays:
+            return len(self.arrays[0])
+        return 0
+
+    def column(self, field):
+        """Return the array of values for the given field name or index."""
+        return self.arrays[asindices(self.fields, field)[0]]
+
+    def take(self, indices):
+        """
+        Return a columnar table with the rows selected by an array of row
+        indices or a boolean mask.
+
+        """
+
+        return ColumnarTable(self.fields, [a[indices] for a in self.arrays])
+
+    def cut(self, spec):
+        """Return a columnar table with the given fields only."""
+        indices = asindices(self.fields, spec)
+        return ColumnarTable([self.fields[i] for i in indices],
+                             [self.arrays[i] for i in indices])
+
+    # vectorised implementations of transformations, see petl.util._dispatch
+
+    def _transform_cut(self, spec):
+        return columnarcut(self, spec)
+
+    def _transform_selectop(self, field, value, op, complement):
+        return columnarselectop(self, field, value, op, complement=complement)
+
+    def _transform_selectrange(self, field, minv, maxv, minop, maxop,
+                               complement):
+        return columnarselectrange(self, field, minv, maxv, minop, maxop,
+                                   complement=complement)
+
+    def _transform_convert(self, converters):
+        return columnarconvert(self, converters)
+
+    def _transform_sort(self, key, reverse):
+        return columnarsort(self, key=key, reverse=reverse)
+
+    def _transform_groupby(self, key, specs, header):
+        result = columnargroupby(self, key, specs)
+        if result is None:
+            return None
+        keys, values = result
+        return ColumnarTable(header, keys + values)
+
+    def _transform_stats(self, field):
+        return columnarstats(self, field)
+
+
+# vectorised implementations of petl functions, N.B., each of these returns
+# None if the operation can't be vectorised, in which case the caller should
+# fall back to iterating over rows
+
+_comparisons = set([operator.eq, operator.ne, operator.lt, operator.le,
+                    operator.gt, operator.ge])
+
+
+def _compare(a, op, value):
+    np = _numpy()
+    if isinstance(value, (list, tuple, set, frozenset, dict, np.ndarray)):
+        return None  # would be broadcast
+    with warnings.catch_warnings():
+        # numpy warns and returns a scalar when values are not comparable
+        warnings.simplefilter('ignore')
+        try:
+            mask = op(a, value)
+        except (TypeError, ValueError):
+            return None
+    if (not isinstance(mask, np.ndarray) or mask.dtype != bool
+            or mask.shape != a.shape):
+        return None
+    return mask
+
+
+def _select(table, mask, complement):
+    if complement:
+        mask = ~mask
+    return table.take(mask)
+
+
+def columnarselectop(table, field, value, op, complement=False):
+    """
+    Vectorised implementation of :func:`selectop`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    if op not in _comparisons:
+        return None
+    mask = _compare(table.column(field), op, value)
+    if mask is None:
+        return None
+    return _select(table, mask, complement)
+
+
+def columnarselectrange(table, field, minv, maxv, minop, maxop,
+                        complement=False):
+    """
+    Vectorised implementation of the `selectrange*` functions, selecting rows
+    where ``minop(minv, v)`` and ``maxop(v, maxv)``.
+
+    .. versionadded:: 0.26
+
+    """
+
+    a = table.column(field)
+    lower = _compare(a, _reflected[minop], minv)
+    upper = _compare(a, maxop, maxv)
+    if lower is None or upper is None:
+        return None
+    return _select(table, lower & upper, complement)
+
+
+_reflected = {operator.lt: operator.gt,
+              operator.le: operator.ge}
+
+
+class _Vectorised(object):
+
+    def __init__(self, f):
+        self.f = f
+
+    def __call__(self, v):
+        return self.f(v)
+
+
+def vectorised(f):
+    """
+    Mark a conversion function as one which can be applied to a whole NumPy
+    array at once, e.g.::
+
+        >>> from petl import convert, vectorised
+        >>> table3 = convert(table2, 'bar', vectorised(lambda v: v * 2))
+
+    When converting a columnar table, `f` is called once with the array of
+    values for the field, otherwise it is called with each value.
+
+    .. versionadded:: 0.26
+
+    """
+
+    return _Vectorised(f)
+
+
+def _convertarray(a, c):
+    np = _numpy()
+    if isinstance(c, _Vectorised):
+        return c.f(a)
+    elif isinstance(c, np.ufunc):
+        return c(a)
+    elif c is int and a.dtype.kind in 'biu':
+        return a.astype(np.int64)
+    elif c is float and a.dtype.kind in 'biuf':
+        return a.astype(np.float64)
+    elif c is bool and a.dtype.kind in 'biuf':
+        return a.astype(bool)
+    return None
+
+
+def columnarconvert(table, converters):
+    """
+    Vectorised implementation of :func:`convert`, given a dictionary mapping
+    fields to conversion functions.
+
+    .. versionadded:: 0.26
+
+    """
+
+    np = _numpy()
+    arrays = list(table.arrays)
+    for field, c in converters.items():
+        i = asindices(table.fields, field)[0]
+        a = arrays[i]
+        try:
+            converted = _convertarray(a, c)
+        except Exception:
+            # let the row-wise implementation deal with errors
+            return None
+        if (not isinstance(converted, np.ndarray)
+                or converted.shape != a.shape):
+            return None
+        arrays[i] = converted
+    return ColumnarTable(table.fields, arrays)
+
+
+def columnarcut(table, spec):
+    """
+    Vectorised implementation of :func:`cut`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    return table.cut(spec)
+
+
+def _sortable(a):
+    # object arrays can only be sorted directly if all values are of one type,
+    # otherwise leave it to petl's own rules for comparing mixed types, and
+    # the values nested inside tuples and lists
+    if a.dtype.kind != 'O':
+        return True
+    types = set(type(v) for v in a)
+    return len(types) <= 1 and not types & set([tuple, list])
+
+
+def _argsort(arrays, reverse=False):
+    # stable sort on multiple arrays, the first being the most significant
+    if not all(_sortable(a) for a in arrays):
+        return None
+    np = _numpy()
+    n = len(arrays[0]) if arrays else 0
+    order = np.arange(n)
+    if reverse:
+        # N.B., sorting reversed rows then reversing the result keeps equal
+        # rows in their original order, as for sorted(..., reverse=True)
+        order = order[::-1]
+    for a in reversed(arrays):
+        order = order[np.argsort(a[order], kind='mergesort')]
+    if reverse:
+        order = order[::-1]
+    return order
+
+
+def columnarsort(table, key=None, reverse=False):
+    """
+    Vectorised implementation of :func:`sort`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    if callable(key):
+        return None
+    if key is None:
+        indices = range(len(table.fields))
+    else:
+        indices = asindices(table.fields, key)
+    try:
+        order = _argsort([table.arrays[i] for i in indices], reverse)
+    except TypeError:
+        return None
+    if order is None:
+        return None
+    return table.take(order)
+
+
+def columnargroupby(table, key, aggregations):
+    """
+    Vectorised grouping and aggregation, where `aggregations` is a list of
+    ``(field, name)`` pairs and `name` is one of 'count', 'sum', 'min', 'max'
+    or 'mean' (`field` is ignored for 'count'). Returns the list of arrays of
+    distinct keys, in key order, and the list of arrays of results.
+
+    .. versionadded:: 0.26
+
+    """
+
+    np = _numpy()
+    keyarrays = [table.arrays[i] for i in asindices(table.fields, key)]
+    values = list()
+    for field, name in aggregations:
+        if name == 'count':
+            values.append(None)
+            continue
+        a = table.column(field)
+        if a.dtype.kind not in 'biuf':
+            return None
+        if a.dtype.kind == 'b' and name in ('sum', 'mean'):
+            a = a.astype(np.int64)  # as for the built-in sum
+        values.append(a)
+    try:
+        order = _argsort(keyarrays)
+    except TypeError:
+        return None
+    if order is None:
+        return None
+
+    n = len(order)
+    keyarrays = [a[order] for a in keyarrays]
+    if n == 0:
+        starts = np.arange(0)
+    else:
+        changed = np.zeros(n - 1, dtype=bool)
+        for a in keyarrays:
+            changed |= a[1:] != a[:-1]
+        starts = np.concatenate(([0], np.nonzero(changed)[0] + 1))
+    counts = np.diff(np.append(starts, n))
+
+    results = list()
+    for (field, name), a in zip(aggregations, values):
+        if name == 'count':
+            results.append(counts)
+        elif n == 0:
+            results.append(a[:0])
+        else:
+            a = a[order]
+            if name == 'sum':
+                results.append(np.add.reduceat(a, starts))
+            elif name == 'min':
+                results.append(np.minimum.reduceat(a, starts))
+            elif name == 'max':
+                results.append(np.maximum.reduceat(a, starts))
+            elif name == 'mean':
+                results.append(np.add.reduceat(a, starts) / counts)
+            else:
+                raise ValueError('unknown aggregation: %r' % name)
+    return [a[starts] for a in keyarrays], results
+
+
+def columnarstats(table, field):
+    """
+    Vectorised implementation of :func:`stats`, for numeric fields.
+
+    .. versionadded:: 0.26
+
+    """
+
+    np = _numpy()
+    a = table.column(field)
+    if a.dtype.kind not in 'biuf':
+        return None
+    output = {'min': None,
+              'max': None,
+              'sum': None,
+              'mean': None,
+              'count': len(a),
+              'errors': 0}
+    if len(a):
+        a = a.astype(np.float64)
+        output['min'] = float(a.min())
+        output['max'] = float(a.max())
+        output['sum'] = float(a.sum())
+        output['mean'] = output['sum'] / output['count']
+    return output
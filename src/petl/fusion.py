@@ -0,0 +1,244 @@
+"""
+Fusion of chains of row-local views into a single pass.
+
+Views which transform each row independently of every other row, e.g., the
+views returned by :func:`cut`, :func:`select`, :func:`convert`,
+:func:`rename` and :func:`addfield`, subclass :class:`FusibleView`. When such
+a view is iterated over and its source is also a fusible view (and so on),
+the whole chain is planned against the header of the innermost source and
+compiled into one generator, so each source row passes through a single
+function which builds at most one output tuple, rather than through one
+generator per view each building a new tuple. While planning:
+
+* field names and indices are resolved once, against the header of the
+  innermost source;
+* conversions are deferred until their value is first needed, so selections
+  on other fields are evaluated before conversions (predicate pushdown), and
+  conversions of fields which are subsequently cut away are never made
+  (projection pushdown);
+* only the output row is built as a tuple, unless a selection or a
+  calculated field needs a whole intermediate row.
+
+Rows which are shorter or longer than the header of the innermost source are
+handled by the views' own implementations, i.e., from the first such row
+onwards the chain is evaluated view by view as if it hadn't been fused.
+
+Note that a consequence of the pushdowns is that converters aren't called on
+values in rows which are subsequently selected out or fields which are cut
+away, so any errors those calls would have raised (with `failonerror=True`)
+or side effects they would have had don't happen.
+
+Fusion can be disabled by setting `petl.fusion.fuseviews` to `False`.
+
+.. versionadded:: 0.26
+
+"""
+
+
+from __future__ import absolute_import, print_function, division
+
+
+from itertools import chain
+
+
+from petl.util import RowContainer, HybridRow
+
+
+import logging
+logger = logging.getLogger(__name__)
+debug = logger.debug
+
+
+fuseviews = True
+
+
+class FusibleView(RowContainer):
+    """
+    Base class for views which transform each row independently of every
+    other row. Subclasses implement :meth:`_iterfrom`, which iterates over
+    the view with the given table in place of its source, and :meth:`_fuse`,
+    which adds the view to a :class:`FusionPlan`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    def __iter__(self):
+        views = fusiblechain(self)
+        if len(views) > 1:
+            return iterfused(views)
+        return self._iterfrom(self._fusionsource())
+
+    def _fusible(self):
+        # may be overridden where only some configurations can be fused
+        return True
+
+    def _fusionsource(self):
+        return self.source
+
+    def _iterfrom(self, source):
+        raise NotImplementedError
+
+    def _fuse(self, plan):
+        raise NotImplementedError
+
+
+def fusiblechain(view):
+    """
+    Return the chain of fusible views ending with `view`, innermost first.
+
+    .. versionadded:: 0.26
+
+    """
+
+    views = list()
+    if not fuseviews:
+        return views
+    while isinstance(view, FusibleView) and view._fusible():
+        views.append(view)
+        view = view._fusionsource()
+    views.reverse()
+    return views
+
+
+class _Converted(object):
+    # a value computed by applying a converter to another value, emitted into
+    # the compiled code only when first referenced
+
+    def __init__(self, inner, converter, failonerror, errorvalue):
+        self.inner = inner
+        self.converter = converter
+        self.failonerror = failonerror
+        self.errorvalue = errorvalue
+        self.code = None
+
+
+class FusionPlan(object):
+    """
+    Accumulates the code of the body of a loop over rows, where the current
+    row is held in the local variable ``row``. The current header is held in
+    `flds`, and `cols` holds one item per field of the current header giving
+    the value of the field in the current row, either as a code string or as
+    a deferred conversion.
+
+    .. versionadded:: 0.26
+
+    """
+
+    def __init__(self, flds):
+        self.flds = tuple(flds)
+        self.cols = ['row[%d]' % i for i in range(len(flds))]
+        self.lines = list()
+        self.namespace = dict()
+        self._count = 0
+
+    def _name(self, prefix):
+        self._count += 1
+        return '%s%d' % (prefix, self._count)
+
+    def constant(self, value):
+        """Return the name of a variable holding `value`."""
+        name = self._name('c')
+        self.namespace[name] = value
+        return name
+
+    def emit(self, line):
+        self.lines.append(line)
+
+    def convert(self, col, converter, failonerror=False, errorvalue=None):
+        """Return a deferred conversion of the value `col`."""
+        return _Converted(col, converter, failonerror, errorvalue)
+
+    def ref(self, col):
+        """Return code giving the value `col`, emitting any conversions."""
+        if isinstance(col, basestring):
+            return col
+        if col.code is None:
+            inner = self.ref(col.inner)
+            name = self._name('v')
+            f = self.constant(col.converter)
+            if col.failonerror:
+                self.emit('%s = %s(%s)' % (name, f, inner))
+            else:
+                # N.B., deliberately catch everything, as the views do
+                self.emit('try:')
+                self.emit('    %s = %s(%s)' % (name, f, inner))
+                self.emit('except:')
+                self.emit('    %s = %s' % (name, self.constant(col.errorvalue)))
+            col.code = name
+        return col.code
+
+    def assign(self, code):
+        """Emit an assignment of `code` to a new variable, and return it."""
+        name = self._name('v')
+        self.emit('%s = %s' % (name, code))
+        return name
+
+    def rowcode(self, cols=None):
+        """Return code building a tuple of the given (or current) values."""
+        if cols is None:
+            cols = self.cols
+        return '(%s)' % ''.join('%s, ' % self.ref(c) for c in cols)
+
+    def hybridrow(self, missing=None):
+        """Return a variable holding the current row as a hybrid row."""
+        return self.assign('%s(%s, %s, %s)' % (self.constant(HybridRow),
+                                               self.rowcode(),
+                                               self.constant(self.flds),
+                                               self.constant(missing)))
+
+    def where(self, condition):
+        """Skip the current row unless `condition` is true."""
+        self.emit('if not (%s):' % condition)
+        self.emit('    continue')
+
+    def compile(self):
+        # N.B., building the output row may emit conversions
+        outrow = self.rowcode()
+        # pass constants as default arguments, so they are looked up as local
+        # variables
+        lines = ['def fused(it, n, fallback%s):'
+                 % ''.join(', %s=%s' % (k, k) for k in sorted(self.namespace)),
+                 '    for row in it:',
+                 '        if len(row) != n:',
+                 '            for outrow in fallback(row):',
+                 '                yield outrow',
+                 '            return']
+        lines.extend('        ' + line for line in self.lines)
+        lines.append('        yield %s' % outrow)
+        source = '\n'.join(lines) + '\n'
+        debug('compiled fused views:\n%s', source)
+        namespace = dict(self.namespace)
+        exec compile(source, '<fused views>', 'exec') in namespace
+        return namespace['fused']
+
+
+def iterfused(views):
+    """
+    Iterate over the last of a chain of fusible views (innermost first, see
+    :func:`fusiblechain`) in a single pass.
+
+    .. versionadded:: 0.26
+
+    """
+
+    it = iter(views[0]._fusionsource())
+    flds = it.next()
+    plan = FusionPlan(flds)
+    for view in views:
+        view._fuse(plan)
+    fused = plan.compile()
+
+    def fallback(row):
+        # evaluate the views one by one from this row onwards
+        debug('row length differs from header, falling back to unfused views')
+        source = chain([flds, row], it)
+        for view in views:
+            source = view._iterfrom(source)
+        rows = iter(source)
+        rows.next()  # header
+        return rows
+
+    yield plan.flds
+    for row in fused(it, len(flds), fallback):
+        yield row
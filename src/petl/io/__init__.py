@@ -24,4 +24,6 @@ from petl.io.json import fromjson, tojson, tojsonarrays, fromdicts
 
 from petl.io.sqlite3 import fromsqlite3, tosqlite3, appendsqlite3
 
-from petl.io.db import fromdb, todb, appenddb
\ No newline at end of file
+from petl.io.db import fromdb, todb, appenddb
+from petl.io.rowstore import torowstore, fromrowstore
+from petl.io.cachestore import fingerprint, FingerprintError
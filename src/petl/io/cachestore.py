@@ -0,0 +1,332 @@
+"""
+A persistent, content-addressed cache of tables, held in a directory (the
+store) of row store files (see :mod:`petl.io.rowstore`), each named after a
+fingerprint of the table it holds.
+
+The fingerprint of a table is a digest of the whole chain of views making up
+the table: the class and arguments of each view, the code (and closure and
+referenced globals) of any functions passed as arguments, and for tables read
+from files, the absolute path, modification time and size of each file. So
+if a source file changes, or a different transformation is applied, the
+fingerprint changes and the stored entry is not used.
+
+When the store grows beyond its size limit, the least recently used entries
+are removed.
+
+.. versionadded:: 0.26
+
+"""
+
+
+from __future__ import absolute_import, print_function, division
+
+
+__author__ = 'Alistair Miles <alimanfoo@googlemail.com>'
+
+
+# standard library dependencies
+import os
+import types
+import hashlib
+import inspect
+from tempfile import NamedTemporaryFile
+
+
+# internal dependencies
+from petl.util import RandomAccessRowContainer, sortorder
+from petl.io.rowstore import RowStoreWriter, RowStoreView
+from petl.io.sources import StdinSource, URLSource, PopenSource
+
+
+import logging
+logger = logging.getLogger(__name__)
+warning = logger.warning
+info = logger.info
+debug = logger.debug
+
+
+defaultstoresize = 2**30
+suffix = '.rows'
+
+
+class FingerprintError(Exception):
+    """
+    Raised when a fingerprint can't be computed for a table, e.g., because it
+    reads from standard input or a URL, or has an argument whose only identity
+    is its address in memory.
+
+    .. versionadded:: 0.26
+
+    """
+    pass
+
+
+# sources whose content can change without any change to their arguments
+_unfingerprintable = (StdinSource, URLSource, PopenSource)
+
+_primitives = (types.NoneType, bool, int, long, float, complex, str, unicode)
+
+
+def fingerprint(table):
+    """
+    Return a hex digest identifying the given table, including the chain of
+    views it is made of and the files it is read from, see
+    :mod:`petl.io.cachestore`. Raises :class:`FingerprintError` if the table
+    can't be identified. E.g.::
+
+        >>> from petl import fingerprint, cut
+        >>> table = [['foo', 'bar'], ['a', 1]]
+        >>> fingerprint(cut(table, 'foo')) == fingerprint(cut(table, 'foo'))
+        True
+        >>> fingerprint(cut(table, 'foo')) == fingerprint(cut(table, 'bar'))
+        False
+
+    Views may define a ``_fingerprint()`` method returning the values which
+    identify them, and a ``_transientattrs`` class attribute naming instance
+    attributes (e.g., caches) which should be ignored.
+
+    .. versionadded:: 0.26
+
+    """
+
+    h = hashlib.sha1()
+    _update(h, table, set())
+    return h.hexdigest()
+
+
+def _digest(obj, seen):
+    h = hashlib.sha1()
+    _update(h, obj, seen)
+    return h.digest()
+
+
+def _update(h, obj, seen):
+    t = type(obj)
+    h.update(t.__name__)
+    h.update('\x00')
+
+    if isinstance(obj, _primitives):
+        h.update(repr(obj))
+        return
+
+    if id(obj) in seen:
+        h.update('<cycle>')
+        return
+    seen.add(id(obj))
+    try:
+        _updatecompound(h, obj, seen)
+    finally:
+        seen.discard(id(obj))
+
+
+def _updatecompound(h, obj, seen):
+
+    if isinstance(obj, _unfingerprintable):
+        raise FingerprintError('cannot fingerprint %r' % obj)
+
+    elif isinstance(obj, (tuple, list)):
+        h.update(str(len(obj)))
+        for item in obj:
+            _update(h, item, seen)
+
+    elif isinstance(obj, dict):
+        items = sorted((_digest(k, seen), v) for k, v in obj.iteritems())
+        for k, v in items:
+            h.update(k)
+            _update(h, v, seen)
+
+    elif isinstance(obj, (set, frozenset)):
+        for d in sorted(_digest(item, seen) for item in obj):
+            h.update(d)
+
+    elif hasattr(obj, '_fingerprint') and not inspect.isclass(obj):
+        h.update(_classname(type(obj)))
+        _update(h, obj._fingerprint(), seen)
+
+    elif isinstance(obj, types.FunctionType):
+        h.update(_classname(obj))
+        _update(h, obj.func_code, seen)
+        _update(h, obj.func_defaults, seen)
+        if obj.func_closure:
+            _update(h, [c.cell_contents for c in obj.func_closure], seen)
+        # global variables referred to by the function
+        g = obj.func_globals
+        _update(h, dict((n, g[n]) for n in obj.func_code.co_names if n in g),
+                seen)
+
+    elif isinstance(obj, types.CodeType):
+        h.update(obj.co_code)
+        _update(h, obj.co_consts, seen)
+        _update(h, obj.co_names, seen)
+        _update(h, obj.co_varnames, seen)
+
+    elif isinstance(obj, types.ModuleType):
+        h.update(obj.__name__)
+
+    elif isinstance(obj, types.MethodType):
+        _update(h, obj.im_func, seen)
+        _update(h, obj.im_self, seen)
+
+    elif isinstance(obj, types.BuiltinFunctionType):
+        h.update(_classname(obj))
+        self = getattr(obj, '__self__', None)
+        if self is not None and not isinstance(self, types.ModuleType):
+            _update(h, self, seen)
+
+    elif inspect.isclass(obj) or inspect.ismethoddescriptor(obj):
+        h.update(_classname(obj))
+
+    elif hasattr(obj, '__dict__'):
+        h.update(_classname(type(obj)))
+        transient = getattr(obj, '_transientattrs', ())
+        _update(h, dict((k, v) for k, v in obj.__dict__.iteritems()
+                        if k not in transient), seen)
+        filename = getattr(obj, 'filename', None)
+        if isinstance(filename, basestring):
+            # identify the content of a file by its modification time and size
+            _update(h, _filestat(filename), seen)
+
+    else:
+        r = repr(obj)
+        if ' at 0x' in r:
+            raise FingerprintError('cannot fingerprint %s' % r)
+        h.update(r)
+
+
+def _classname(obj):
+    module = getattr(obj, '__module__', None)
+    if module is None:
+        objclass = getattr(obj, '__objclass__', None)
+        if objclass is not None:
+            module = _classname(objclass)
+    return '%s.%s' % (module, getattr(obj, '__name__', '?'))
+
+
+def _filestat(filename):
+    filename = os.path.abspath(filename)
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return filename, None, None
+    return filename, st.st_mtime, st.st_size
+
+
+class CacheStoreContainer(RandomAccessRowContainer):
+    """
+    Wrap a table with a cache held in the persistent store directory `store`.
+    If the store holds an entry for the table's fingerprint (or for `key`, if
+    given), rows are served from it, otherwise the entry is written during the
+    first complete iteration over the table. See also :func:`petl.util.cache`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    _transientattrs = ('_store',)
+
+    def __init__(self, inner, store, storesize=None, key=None):
+        self._inner = inner
+        self._dir = store
+        if storesize is None:
+            self._storesize = defaultstoresize
+        else:
+            self._storesize = storesize
+        self._key = key
+        self._store = None
+
+    def clearcache(self):
+        self._store = None
+
+    def _hasrandomaccess(self):
+        return self._store is not None and self._store._hasrandomaccess()
+
+    def _header(self):
+        return self._store._header()
+
+    def _datalen(self):
+        return self._store._datalen()
+
+    def _iterdata(self, start, stop, step):
+        return self._store._iterdata(start, stop, step)
+
+    def _sortorder(self):
+        return sortorder(self._inner)
+
+    def _entry(self):
+        if self._key is None:
+            digest = fingerprint(self._inner)
+        else:
+            digest = hashlib.sha1(repr(self._key)).hexdigest()
+        return os.path.join(self._dir, digest + suffix)
+
+    def __iter__(self):
+        filename = self._entry()
+        if os.path.exists(filename):
+            debug('serving from cache store entry %r', filename)
+            try:
+                # mark as recently used
+                os.utime(filename, None)
+            except OSError:
+                pass
+            self._store = RowStoreView(filename)
+            return iter(self._store)
+        return self._iterandstore(filename)
+
+    def _iterandstore(self, filename):
+        if not os.path.isdir(self._dir):
+            os.makedirs(self._dir)
+        # write to a temporary file which is renamed once complete, so other
+        # readers never see a partial entry
+        f = NamedTemporaryFile(dir=self._dir, suffix='.tmp', delete=False)
+        complete = False
+        try:
+            writer = RowStoreWriter(f)
+            for row in self._inner:
+                writer.write(row)
+                yield row
+            writer.finish()
+            f.close()
+            os.rename(f.name, filename)
+            complete = True
+        finally:
+            if not complete:
+                f.close()
+                os.remove(f.name)
+        debug('cache store entry is complete: %r', filename)
+        self._store = RowStoreView(filename)
+        evict(self._dir, self._storesize, keep=filename)
+
+
+def evict(store, storesize=None, keep=None):
+    """
+    Remove the least recently used entries from the cache store directory
+    `store` until the entries total no more than `storesize` bytes, sparing
+    the entry `keep` if given.
+
+    .. versionadded:: 0.26
+
+    """
+
+    if storesize is None:
+        storesize = defaultstoresize
+    entries = list()
+    for name in os.listdir(store):
+        if name.endswith(suffix):
+            path = os.path.join(store, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue  # removed by another process
+            entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= storesize:
+            break
+        if path == keep:
+            continue
+        debug('evicting cache store entry %r', path)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
@@ -8,10 +8,11 @@ __author__ = 'Alistair Miles <alimanfoo@googlemail.com>'
 import csv
 import codecs
 import cStringIO
+from itertools import izip
 
 
 # internal dependencies
-from petl.util import RowContainer, data
+from petl.util import RowContainer, data, iterparallel
 from petl.io.sources import read_source_from_arg, write_source_from_arg
 
 
@@ -53,24 +54,240 @@ def fromcsv(source=None, dialect=csv.excel, **kwargs):
 
     Supports transparent reading from URLs, ``.gz`` and ``.bz2`` files.
 
+    .. versionchanged:: 0.26
+
+    The `types` and `workers` keyword arguments can be given to speed up
+    reading large files. If `types` is a dictionary mapping field names or
+    indices to conversion functions, e.g., ``{'bar': int, 'baz': float}``,
+    values are converted a whole column at a time as each block of the file
+    is parsed. If `types` is True, each field is converted to :class:`int` or
+    :class:`float` where all non-empty values in the first block of the file
+    can be, and left as strings otherwise. Values which can't be converted are
+    also left as strings.
+
+    If `workers` is greater than 1, the file is read in blocks of `blocksize`
+    bytes (by default `petl.io.csv.defaultblocksize`, 1Mb), which are split at
+    the end of the last complete record and handed to a pool of `workers`
+    processes to be parsed and converted, see
+    :func:`petl.util.iterparallel`. Rows are output in the order of the file,
+    and no more than twice as many blocks as workers are read ahead of them.
+    N.B., records are assumed to end with a newline which is not within a
+    quoted value, if the dialect uses an escape character the file is parsed
+    in the main process.
+
     """
 
     source = read_source_from_arg(source)
     return CSVView(source=source, dialect=dialect, **kwargs)
 
 
+defaultblocksize = 2**20
+
+
 class CSVView(RowContainer):
 
-    def __init__(self, source=None, dialect=csv.excel, **kwargs):
+    def __init__(self, source=None, dialect=csv.excel, types=None,
+                 workers=None, blocksize=None, **kwargs):
         self.source = source
         self.dialect = dialect
+        self.types = types
+        self.workers = workers
+        self.blocksize = blocksize
         self.kwargs = kwargs
 
     def __iter__(self):
-        with self.source.open_('rb') as f:
-            reader = csv.reader(f, dialect=self.dialect, **self.kwargs)
-            for row in reader:
-                yield tuple(row)
+        if self.types is None and (self.workers is None or self.workers <= 1):
+            return itercsv(self.source, self.dialect, self.kwargs)
+        return itercsvblocks(self.source, self.dialect, self.types,
+                             self.workers, self.blocksize, self.kwargs)
+
+
+def itercsv(source, dialect, kwargs):
+    with source.open_('rb') as f:
+        reader = csv.reader(f, dialect=dialect, **kwargs)
+        for row in reader:
+            yield tuple(row)
+
+
+def itercsvblocks(source, dialect, types, workers, blocksize, kwargs):
+    if blocksize is None:
+        blocksize = defaultblocksize
+
+    # find out how records can be split
+    resolved = csv.reader([], dialect=dialect, **kwargs).dialect
+    if resolved.escapechar is not None:
+        workers = None  # can't split safely, see below
+    if resolved.quoting == csv.QUOTE_NONE:
+        quotechar = None
+    else:
+        quotechar = resolved.quotechar
+
+    def parse(block):
+        return [tuple(row) for row in
+                csv.reader(cStringIO.StringIO(block), dialect=dialect,
+                           **kwargs)]
+
+    with source.open_('rb') as f:
+        if workers is None or workers <= 1:
+            # let the reader deal with splitting records, but still convert
+            # values in bulk
+            reader = csv.reader(f, dialect=dialect, **kwargs)
+            blocks = iterrowblocks(reader, 10000)
+            parse = lambda rows: [tuple(row) for row in rows]
+        else:
+            blocks = iterrecordblocks(f, blocksize, quotechar)
+
+        # parse the first block in the main process, to get the header and
+        # infer types
+        try:
+            rows = parse(blocks.next())
+        except StopIteration:
+            return
+        if not rows:
+            return
+        flds = rows[0]
+        yield flds
+        converters = _csvconverters(flds, types, rows[1:])
+        for row in convertcolumns(rows[1:], converters):
+            yield row
+
+        if workers is None or workers <= 1:
+            for block in blocks:
+                for row in convertcolumns(parse(block), converters):
+                    yield row
+        else:
+            parseblocks = lambda blocks: [row for block in blocks for row in
+                                          convertcolumns(parse(block),
+                                                         converters)]
+            # N.B., no more than twice as many blocks as workers are read
+            # ahead of the rows output
+            for row in iterparallel(parseblocks, blocks, workers, 1,
+                                    maxpending=2 * workers):
+                yield row
+
+
+def iterrowblocks(reader, size):
+    block = list()
+    for row in reader:
+        block.append(row)
+        if len(block) >= size:
+            yield block
+            block = list()
+    if block:
+        yield block
+
+
+def iterrecordblocks(f, blocksize, quotechar):
+    """
+    Read blocks of around `blocksize` bytes from the file `f`, each ending at
+    the end of a record, i.e., at a newline which is not within a value quoted
+    by `quotechar`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    pending = ''
+    while True:
+        data = f.read(blocksize)
+        if not data:
+            if pending:
+                yield pending
+            return
+        data = pending + data
+        end = _recordend(data, quotechar)
+        if end < 0:
+            pending = data  # no complete record yet, read some more
+        else:
+            yield data[:end]
+            pending = data[end:]
+
+
+def _recordend(data, quotechar):
+    # find the end of the last complete record in data, which is just after a
+    # newline preceded by an even number of quote characters (N.B., escaped
+    # quotes are doubled so don't change the parity)
+    nl = data.rfind('\n')
+    if nl < 0 or quotechar is None:
+        return nl + 1 if nl >= 0 else -1
+    nquotes = data.count(quotechar, 0, nl)
+    while nquotes % 2:
+        prev = data.rfind('\n', 0, nl)
+        if prev < 0:
+            return -1
+        nquotes -= data.count(quotechar, prev, nl)
+        nl = prev
+    return nl + 1
+
+
+def _csvconverters(flds, types, sample):
+    # list of conversion functions by column index
+    if types is None:
+        return None
+    converters = [None] * len(flds)
+    if types is True:
+        for i, values in enumerate(izip(*sample)):
+            converters[i] = _infertype(values)
+    else:
+        for k, conv in types.items():
+            i = k if isinstance(k, int) else list(flds).index(k)
+            converters[i] = conv
+    return converters
+
+
+def _infertype(values):
+    values = [v for v in values if v != '']
+    if not values:
+        return None
+    for t in (int, float):
+        try:
+            map(t, values)
+        except (ValueError, TypeError):
+            continue
+        else:
+            return t
+    return None
+
+
+def convertcolumns(rows, converters):
+    """
+    Convert values in a list of `rows`, where `converters` is a list of
+    conversion functions, one per column (or None for no conversion). Values
+    are converted a column at a time where rows are all the same length.
+    Values which can't be converted are returned as-is.
+
+    .. versionadded:: 0.26
+
+    """
+
+    if not converters or not any(converters) or not rows:
+        return rows
+    n = len(converters)
+    if all(len(row) == n for row in rows):
+        columns = zip(*rows)
+        for i, conv in enumerate(converters):
+            if conv is not None:
+                columns[i] = _convertcolumn(conv, columns[i])
+        return zip(*columns)
+    else:
+        return [tuple(v if i >= n or converters[i] is None
+                      else _convertvalue(converters[i], v)
+                      for i, v in enumerate(row))
+                for row in rows]
+
+
+def _convertcolumn(conv, values):
+    try:
+        return map(conv, values)
+    except (ValueError, TypeError):
+        return [_convertvalue(conv, v) for v in values]
+
+
+def _convertvalue(conv, v):
+    try:
+        return conv(v)
+    except (ValueError, TypeError):
+        return v
 
 
 def tocsv(table, source=None, dialect=csv.excel, write_header=True, **kwargs):
@@ -6,10 +6,17 @@ __author__ = 'Alistair Miles <alimanfoo@googlemail.com>'
 
 # standard library dependencies
 import logging
+import os
+import sys
+import sqlite3
+import threading
+import Queue
+import itertools
+from itertools import chain
 
 
 # internal dependencies
-from petl.util import RowContainer
+from petl.util import RowContainer, iterbatches
 
 
 logger = logging.getLogger(__name__)
@@ -90,6 +97,42 @@ def fromdb(dbo, query, *args, **kwargs):
         * http://initd.org/psycopg/docs/usage.html#server-side-cursors
         * http://mysql-python.sourceforge.net/MySQLdb.html#using-and-extending
 
+    .. versionchanged:: 0.26
+
+    If the `arraysize` keyword argument is given, rows are fetched from the
+    cursor or result set in batches of `arraysize` rows via `fetchmany()`,
+    rather than by iterating over the cursor, and the cursor's `arraysize`
+    (and `itersize` for :mod:`psycopg2`) attribute is set accordingly. The
+    default is given by `petl.io.db.defaultarraysize` (`None`).
+
+    If the `cursorname` keyword argument is given, `dbo` must be a
+    connection, and each iteration over the table uses a new named cursor,
+    obtained by calling ``dbo.cursor(name)`` with a unique name beginning
+    with `cursorname`. With :mod:`psycopg2` this gives a server-side cursor,
+    e.g.::
+
+        >>> table = fromdb(connection, 'select * from test',
+        ...                cursorname='petl', arraysize=10000)
+
+    Combined with `arraysize` this fetches `arraysize` rows per round trip to
+    the server, so memory usage at the client is bounded by the size of one
+    batch.
+
+    If `petl.io.pushdown.enabled` is set to `True`, `dbo` is a connection or
+    a cursor with a `connection` attribute, and the query has no parameters
+    or a single sequence of parameters, :func:`cut` (by field name),
+    :func:`head`, :func:`selecteq` and the other simple comparison
+    selections, :func:`selectin`, :func:`selectnotin`, :func:`sort` (by field
+    names) and :func:`aggregate` (with counts, sums, minima, maxima or means)
+    applied directly to the table are rewritten into the SQL query, so only
+    the rows and columns needed are fetched from the database. Nulls are
+    treated like `None`, i.e., they compare less than any other value, but
+    otherwise these follow the database's semantics, e.g., for comparisons of
+    values of different types or the collation of strings, so it should only
+    be enabled if these match python's and the database accepts the SQL
+    generated, see :mod:`petl.io.pushdown`. By default the query is never
+    changed.
+
     """
 
     return DbView(dbo, query, *args, **kwargs)
@@ -119,23 +162,108 @@ def _is_sqlalchemy_connection(dbo):
     return _hasmethod(dbo, 'execute') and _hasprop(dbo, 'connection')
 
 
-class DbView(RowContainer):
+defaultarraysize = None
+
+
+def _dbofingerprint(dbo):
+    # values identifying the database for petl.io.cachestore
+    if isinstance(dbo, sqlite3.Connection):
+        for _, name, filename in dbo.execute('PRAGMA database_list'):
+            if name == 'main' and filename:
+                st = os.stat(filename)
+                return filename, st.st_mtime, st.st_size
+        # an in-memory database can't be identified
+        return dbo
+    # N.B., other databases are identified only by the type of connection,
+    # i.e., the query alone identifies the data
+    return '%s.%s' % (type(dbo).__module__, type(dbo).__name__)
+
+
+class PushdownMixin(object):
+    """
+    Transformations of a table extracted from a database rewritten into its
+    query, where possible, see :mod:`petl.io.pushdown` and
+    :func:`petl.util._dispatch`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    # N.B., petl.io.pushdown is imported in each method to avoid a circular
+    # import
+
+    def _transform_cut(self, spec):
+        from petl.io.pushdown import sqlcut
+        return sqlcut(self, spec)
+
+    def _transform_head(self, n):
+        from petl.io.pushdown import sqlhead
+        return sqlhead(self, n)
+
+    def _transform_selectop(self, field, value, op, complement):
+        from petl.io.pushdown import sqlselectop
+        return sqlselectop(self, field, value, op, complement=complement)
+
+    def _transform_selectrange(self, field, minv, maxv, minop, maxop,
+                               complement):
+        from petl.io.pushdown import sqlselectrange
+        return sqlselectrange(self, field, minv, maxv, minop, maxop,
+                              complement=complement)
+
+    def _transform_selectin(self, field, values, complement):
+        from petl.io.pushdown import sqlselectin
+        return sqlselectin(self, field, values, complement=complement)
+
+    def _transform_sort(self, key, reverse):
+        from petl.io.pushdown import sqlsort
+        return sqlsort(self, key, reverse=reverse)
+
+    def _transform_groupby(self, key, specs, header):
+        from petl.io.pushdown import sqlgroupby
+        return sqlgroupby(self, key, specs, header)
+
+
+class DbView(RowContainer, PushdownMixin):
+
+    _transientattrs = ('_cursorcounter',)
 
     def __init__(self, dbo, query, *args, **kwargs):
         self.dbo = dbo
         self.query = query
+        self.arraysize = kwargs.pop('arraysize', defaultarraysize)
+        self.cursorname = kwargs.pop('cursorname', None)
+        # N.B., the name of an open cursor must be unique within a
+        # connection, so number the cursors in case the table is iterated
+        # more than once at a time
+        self._cursorcounter = itertools.count()
         self.args = args
         self.kwargs = kwargs
 
+    def _fingerprint(self):
+        return (_dbofingerprint(self.dbo), self.query, self.args, self.kwargs,
+                self.cursorname)
+
     def __iter__(self):
 
+        dbo = self.dbo
+
+        if self.cursorname is not None:
+            # named cursors are server-side cursors for some drivers
+            if not _is_dbapi_connection(dbo):
+                raise ValueError('a DB-API 2.0 connection is required to use '
+                                 'a named cursor, found %r' % dbo)
+            debug('using named cursors on %r', dbo)
+            dbo = _named_cursor_factory(dbo, self.cursorname,
+                                        self._cursorcounter)
+            _iter = _iter_dbapi_mkcurs
+
         # does it quack like a standard DB-API 2.0 connection?
-        if _is_dbapi_connection(self.dbo):
-            debug('assuming %r is standard DB-API 2.0 connection', self.dbo)
+        elif _is_dbapi_connection(dbo):
+            debug('assuming %r is standard DB-API 2.0 connection', dbo)
             _iter = _iter_dbapi_connection
 
         # does it quack like a standard DB-API 2.0 cursor?
-        elif _is_dbapi_cursor(self.dbo):
+        elif _is_dbapi_cursor(dbo):
             debug('assuming %r is standard DB-API 2.0 cursor')
             warning('using a DB-API cursor with fromdb() is not recommended '
                     'and may lead to unexpected results, a DB-API connection '
@@ -143,53 +271,84 @@ class DbView(RowContainer):
             _iter = _iter_dbapi_cursor
 
         # does it quack like an SQLAlchemy engine?
-        elif _is_sqlalchemy_engine(self.dbo):
+        elif _is_sqlalchemy_engine(dbo):
             debug('assuming %r instance of sqlalchemy.engine.base.Engine',
-                  self.dbo)
+                  dbo)
             _iter = _iter_sqlalchemy_engine
 
         # does it quack like an SQLAlchemy session?
-        elif _is_sqlalchemy_session(self.dbo):
+        elif _is_sqlalchemy_session(dbo):
             debug('assuming %r instance of sqlalchemy.orm.session.Session',
-                  self.dbo)
+                  dbo)
             _iter = _iter_sqlalchemy_session
 
         # does it quack like an SQLAlchemy connection?
-        elif _is_sqlalchemy_connection(self.dbo):
+        elif _is_sqlalchemy_connection(dbo):
             debug('assuming %r instance of sqlalchemy.engine.base.Connection',
-                  self.dbo)
+                  dbo)
             _iter = _iter_sqlalchemy_connection
 
-        elif callable(self.dbo):
-            debug('assuming %r is a function returning a cursor', self.dbo)
+        elif callable(dbo):
+            debug('assuming %r is a function returning a cursor', dbo)
             _iter = _iter_dbapi_mkcurs
 
         # some other sort of duck...
         else:
-            raise Exception('unsupported database object type: %r' % self.dbo)
+            raise Exception('unsupported database object type: %r' % dbo)
+
+        return _iter(dbo, self.query, self.arraysize, *self.args,
+                     **self.kwargs)
+
+
+def _named_cursor_factory(connection, name, counter):
+
+    def mkcurs():
+        return connection.cursor('%s_%s' % (name, counter.next()))
+
+    return mkcurs
+
 
-        return _iter(self.dbo, self.query, *self.args, **self.kwargs)
+def _iter_fetchmany(results, arraysize):
+    # iterate over the rows of a cursor or result set, fetching batches of
+    # arraysize rows at a time if arraysize is given
+    if arraysize is None:
+        for row in results:
+            yield row
+        return
+    while True:
+        rows = results.fetchmany(arraysize)
+        if not rows:
+            break
+        for row in rows:
+            yield row
 
 
-def _iter_dbapi_mkcurs(mkcurs, query, *args, **kwargs):
+def _iter_dbapi_mkcurs(mkcurs, query, arraysize, *args, **kwargs):
     cursor = mkcurs()
     try:
-        for row in _iter_dbapi_cursor(cursor, query, *args, **kwargs):
+        for row in _iter_dbapi_cursor(cursor, query, arraysize, *args,
+                                      **kwargs):
             yield row
     finally:
         cursor.close()
 
 
-def _iter_dbapi_connection(connection, query, *args, **kwargs):
+def _iter_dbapi_connection(connection, query, arraysize, *args, **kwargs):
     cursor = connection.cursor()
     try:
-        for row in _iter_dbapi_cursor(cursor, query, *args, **kwargs):
+        for row in _iter_dbapi_cursor(cursor, query, arraysize, *args,
+                                      **kwargs):
             yield row
     finally:
         cursor.close()
 
 
-def _iter_dbapi_cursor(cursor, query, *args, **kwargs):
+def _iter_dbapi_cursor(cursor, query, arraysize, *args, **kwargs):
+    if arraysize is not None:
+        cursor.arraysize = arraysize
+        if hasattr(cursor, 'itersize'):
+            # psycopg2 named cursors fetch itersize rows per round trip
+            cursor.itersize = arraysize
     cursor.execute(query, *args, **kwargs)
     # fetch one row before iterating, to force population of cursor.description
     # which may be postponed if using server-side cursors
@@ -200,33 +359,35 @@ def _iter_dbapi_cursor(cursor, query, *args, **kwargs):
     if first_row is None:
         raise StopIteration
     yield first_row
-    for row in cursor:
+    for row in _iter_fetchmany(cursor, arraysize):
         yield row # don't wrap, return whatever the database engine returns
 
 
-def _iter_sqlalchemy_engine(engine, query, *args, **kwargs):
+def _iter_sqlalchemy_engine(engine, query, arraysize, *args, **kwargs):
     return _iter_sqlalchemy_connection(engine.contextual_connect(), query,
-                                       *args, **kwargs)
+                                       arraysize, *args, **kwargs)
 
 
-def _iter_sqlalchemy_connection(connection, query, *args, **kwargs):
+def _iter_sqlalchemy_connection(connection, query, arraysize, *args,
+                                **kwargs):
     debug('connection: %r', connection)
     results = connection.execute(query, *args, **kwargs)
     fields = results.keys()
     yield tuple(fields)
-    for row in results:
+    for row in _iter_fetchmany(results, arraysize):
         yield row
 
 
-def _iter_sqlalchemy_session(session, query, *args, **kwargs):
+def _iter_sqlalchemy_session(session, query, arraysize, *args, **kwargs):
     results = session.execute(query, *args, **kwargs)
     fields = results.keys()
     yield tuple(fields)
-    for row in results:
+    for row in _iter_fetchmany(results, arraysize):
         yield row
 
 
-def todb(table, dbo, tablename, schema=None, commit=True):
+def todb(table, dbo, tablename, schema=None, commit=True, batchsize=None,
+         multirow=False, commitinterval=None, workers=None):
     """
     Load data into an existing database table via a DB-API 2.0
     connection or cursor. Note that the database table will be truncated,
@@ -280,9 +441,33 @@ def todb(table, dbo, tablename, schema=None, commit=True):
         >>> cursor = connection.cursor()
         >>> todb(table, cursor, 'foobar')
 
+    .. versionchanged:: 0.26
+
+    Rows are inserted in batches of `batchsize` rows (by default
+    `petl.io.db.defaultbatchsize`, i.e., 1000), each via a single call to
+    `executemany()`. If `multirow` is True, each batch is instead inserted
+    via ``INSERT ... VALUES (...), (...), ...`` statements, each with up to
+    `petl.io.db.maxparams` parameters. If `commitinterval` is given, the
+    transaction is committed every time at least that many rows have been
+    inserted since the last commit, rather than only once all rows have been
+    inserted, so a failure part way through leaves the rows before the last
+    commit in the table. Progress is logged at the INFO level whenever a
+    commit is made.
+
+    If `dbo` is a function returning cursors and `workers` is greater than
+    1, rows are loaded via `workers` cursors, each obtained by calling the
+    function from its own thread, so the function should return a cursor on
+    a new connection each time it is called. Each connection commits its own
+    transaction, and if the table is to be truncated this is committed
+    before loading starts, so `commit` must be True. N.B., the truncation
+    therefore can't be rolled back, so if loading fails the table is left
+    empty, but for any rows committed by the other connections.
+
     """
 
-    _todb(table, dbo, tablename, schema=schema, commit=commit, truncate=True)
+    _todb(table, dbo, tablename, schema=schema, commit=commit, truncate=True,
+          batchsize=batchsize, multirow=multirow,
+          commitinterval=commitinterval, workers=workers)
 
 
 def _hasmethod(o, n):
@@ -297,46 +482,60 @@ def _hasprop(o, n):
     return hasattr(o, n) and not callable(getattr(o, n))
 
 
-def _todb(table, dbo, tablename, schema=None, commit=True, truncate=False):
+def _is_mkcurs(dbo):
+    # N.B., some connection objects are also callable
+    return callable(dbo) and not (_is_dbapi_connection(dbo)
+                                  or _is_dbapi_cursor(dbo)
+                                  or _is_sqlalchemy_engine(dbo)
+                                  or _is_sqlalchemy_session(dbo)
+                                  or _is_sqlalchemy_connection(dbo))
+
+
+def _todb(table, dbo, tablename, schema=None, commit=True, truncate=False,
+          workers=None, **kwargs):
 
     # need to deal with polymorphic dbo argument
     # what sort of duck is it?
 
+    if workers is not None and workers > 1 and not _is_mkcurs(dbo):
+        raise ValueError('loading with more than one worker requires a '
+                         'function returning cursors, found %r' % dbo)
+
     # does it quack like a standard DB-API 2.0 connection?
     if _is_dbapi_connection(dbo):
         debug('assuming %r is standard DB-API 2.0 connection', dbo)
         _todb_dbapi_connection(table, dbo, tablename, schema=schema,
-                               commit=commit, truncate=truncate)
+                               commit=commit, truncate=truncate, **kwargs)
 
     # does it quack like a standard DB-API 2.0 cursor?
     elif _is_dbapi_cursor(dbo):
         debug('assuming %r is standard DB-API 2.0 cursor')
         _todb_dbapi_cursor(table, dbo, tablename, schema=schema, commit=commit,
-                           truncate=truncate)
+                           truncate=truncate, **kwargs)
 
     # does it quack like an SQLAlchemy engine?
     elif _is_sqlalchemy_engine(dbo):
         debug('assuming %r instance of sqlalchemy.engine.base.Engine', dbo)
         _todb_sqlalchemy_engine(table, dbo, tablename, schema=schema,
-                                commit=commit, truncate=truncate)
+                                commit=commit, truncate=truncate, **kwargs)
 
     # does it quack like an SQLAlchemy session?
     elif _is_sqlalchemy_session(dbo):
         debug('assuming %r instance of sqlalchemy.orm.session.Session', dbo)
         _todb_sqlalchemy_session(table, dbo, tablename, schema=schema,
-                                 commit=commit, truncate=truncate)
+                                 commit=commit, truncate=truncate, **kwargs)
 
     # does it quack like an SQLAlchemy connection?
     elif _is_sqlalchemy_connection(dbo):
         debug('assuming %r instance of sqlalchemy.engine.base.Connection', dbo)
         _todb_sqlalchemy_connection(table, dbo, tablename, schema=schema,
-                                    commit=commit, truncate=truncate)
+                                    commit=commit, truncate=truncate, **kwargs)
 
     elif callable(dbo):
         debug('assuming %r is a function returning standard DB-API 2.0 cursor '
               'objects', dbo)
         _todb_dbapi_mkcurs(table, dbo, tablename, schema=schema, commit=commit,
-                           truncate=truncate)
+                           truncate=truncate, workers=workers, **kwargs)
 
     # some other sort of duck...
     else:
@@ -344,11 +543,134 @@ def _todb(table, dbo, tablename, schema=None, commit=True, truncate=False):
 
 
 SQL_TRUNCATE_QUERY = u'DELETE FROM %s'
-SQL_INSERT_QUERY = u'INSERT INTO %s (%s) VALUES (%s)'
+SQL_MULTIROW_INSERT_QUERY = u'INSERT INTO %s (%s) VALUES %s'
+
+
+defaultbatchsize = 1000
+# maximum number of parameters in one multi-row insert statement, N.B., the
+# lowest limit of the common databases is SQLite's default of 999
+maxparams = 999
+
+
+def _insertquery(tablename, colnames):
+    # returns a function making an insert query given the VALUES clause
+    insertcolnames = ', '.join(colnames)
+
+    def makequery(values):
+        return SQL_MULTIROW_INSERT_QUERY % (tablename, insertcolnames, values)
+
+    return makequery
+
+
+def _insertbatches(batches, execute, executemany, makequery, ncols,
+                   paramstyle, multirow=False, commitinterval=None,
+                   commitfn=None):
+    # insert batches of rows, committing via commitfn if given every time at
+    # least commitinterval rows have been inserted, returns the number of
+    # rows inserted
+
+    if multirow:
+        rowsperquery = max(1, maxparams // max(1, ncols))
+        queries = dict()  # cache queries by number of rows
+    else:
+        insertquery = makequery('(%s)' % _rowplaceholders(paramstyle, ncols))
+        debug('insert data via query %r' % insertquery)
+
+    n = 0
+    uncommitted = 0
+    for batch in batches:
+        if multirow:
+            for i in xrange(0, len(batch), rowsperquery):
+                rows = batch[i:i+rowsperquery]
+                if len(rows) not in queries:
+                    queries[len(rows)] = makequery(', '.join(
+                        '(%s)' % _rowplaceholders(paramstyle, ncols, j * ncols)
+                        for j in xrange(len(rows))))
+                execute(queries[len(rows)], list(chain.from_iterable(rows)))
+        else:
+            executemany(insertquery, batch)
+        n += len(batch)
+        uncommitted += len(batch)
+        debug('%s rows inserted', n)
+        if (commitfn is not None and commitinterval is not None
+                and uncommitted >= commitinterval):
+            commitfn()
+            uncommitted = 0
+            info('%s rows inserted and committed', n)
+    return n
+
+
+def _insertrows(it, cursor, makequery, ncols, paramstyle, batchsize=None,
+                multirow=False, commitinterval=None, commitfn=None):
+    if batchsize is None:
+        batchsize = defaultbatchsize
+    return _insertbatches(iterbatches(it, batchsize), cursor.execute,
+                          cursor.executemany, makequery, ncols, paramstyle,
+                          multirow=multirow, commitinterval=commitinterval,
+                          commitfn=commitfn)
+
+
+def _insertparallel(it, mkcurs, workers, makequery, ncols, paramstyle,
+                    batchsize=None, multirow=False, commitinterval=None):
+    # load batches of rows via a cursor from mkcurs in each of several
+    # threads, each thread committing its own transaction
+    if batchsize is None:
+        batchsize = defaultbatchsize
+    debug('inserting rows via %s cursors', workers)
+    queue = Queue.Queue(maxsize=workers * 2)
+    errors = []
+
+    def batches():
+        for batch in iter(queue.get, None):
+            # N.B., if any worker has failed, keep taking batches so the main
+            # thread doesn't block, but don't insert them
+            if not errors:
+                yield batch
+
+    def work():
+        it = batches()
+        connection = None
+        try:
+            cursor = mkcurs()
+            connection = cursor.connection
+            _insertbatches(it, cursor.execute, cursor.executemany, makequery,
+                           ncols, paramstyle, multirow=multirow,
+                           commitinterval=commitinterval,
+                           commitfn=connection.commit)
+            cursor.close()
+            connection.commit()
+        except Exception:
+            errors.append(sys.exc_info())
+            if connection is not None:
+                # don't leave a transaction open holding locks
+                try:
+                    connection.rollback()
+                except Exception:
+                    pass
+            for _ in it:
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(workers)]
+    for t in threads:
+        t.daemon = True
+        t.start()
+    try:
+        for batch in iterbatches(it, batchsize):
+            if errors:
+                break
+            queue.put(batch)
+    finally:
+        for _ in threads:
+            queue.put(None)
+        for t in threads:
+            t.join()
+    if errors:
+        exc_type, exc_value, exc_traceback = errors[0]
+        raise exc_type, exc_value, exc_traceback
 
 
 def _todb_dbapi_connection(table, connection, tablename, schema=None,
-                           commit=True, truncate=False):
+                           commit=True, truncate=False, **kwargs):
 
     # sanitise table name
     tablename = _quote(tablename)
@@ -363,9 +685,8 @@ def _todb_dbapi_connection(table, connection, tablename, schema=None,
     colnames = [_quote(n) for n in fieldnames]
     debug('column names: %r', colnames)
 
-    # determine paramstyle and build placeholders string
-    placeholders = _placeholders(connection, colnames)
-    debug('placeholders: %r', placeholders)
+    # determine paramstyle
+    paramstyle = _paramstyle(connection)
 
     # get a cursor
     cursor = connection.cursor()
@@ -380,11 +701,9 @@ def _todb_dbapi_connection(table, connection, tablename, schema=None,
         cursor.close()
         cursor = connection.cursor()
 
-#    insertquery = 'INSERT INTO %s VALUES (%s)' % (tablename, placeholders)
-    insertcolnames = ', '.join(colnames)
-    insertquery = SQL_INSERT_QUERY % (tablename, insertcolnames, placeholders)
-    debug('insert data via query %r' % insertquery)
-    cursor.executemany(insertquery, it)
+    _insertrows(it, cursor, _insertquery(tablename, colnames), len(colnames),
+                paramstyle, commitfn=connection.commit if commit else None,
+                **kwargs)
 
     # finish up
     debug('close the cursor')
@@ -396,7 +715,7 @@ def _todb_dbapi_connection(table, connection, tablename, schema=None,
 
 
 def _todb_dbapi_mkcurs(table, mkcurs, tablename, schema=None, commit=True,
-                       truncate=False):
+                       truncate=False, workers=None, **kwargs):
 
     # sanitise table name
     tablename = _quote(tablename)
@@ -411,6 +730,16 @@ def _todb_dbapi_mkcurs(table, mkcurs, tablename, schema=None, commit=True,
     colnames = [_quote(n) for n in fieldnames]
     debug('column names: %r', colnames)
 
+    parallel = workers is not None and workers > 1
+    if parallel and not commit:
+        raise ValueError('loading with more than one worker requires '
+                         'commit=True')
+
+    if parallel:
+        _todb_dbapi_mkcurs_parallel(it, mkcurs, tablename, colnames, truncate,
+                                    workers, **kwargs)
+        return
+
     debug('obtain cursor and connection')
     cursor = mkcurs()
     # N.B., we depend on this optional DB-API 2.0 attribute being implemented
@@ -418,9 +747,8 @@ def _todb_dbapi_mkcurs(table, mkcurs, tablename, schema=None, commit=True,
         'could not obtain connection via cursor'
     connection = cursor.connection
 
-    # determine paramstyle and build placeholders string
-    placeholders = _placeholders(connection, colnames)
-    debug('placeholders: %r', placeholders)
+    # determine paramstyle
+    paramstyle = _paramstyle(connection)
 
     if truncate:
         # TRUNCATE is not supported in some databases and causing locks with
@@ -432,11 +760,9 @@ def _todb_dbapi_mkcurs(table, mkcurs, tablename, schema=None, commit=True,
         cursor.close()
         cursor = mkcurs()
 
-#    insertquery = 'INSERT INTO %s VALUES (%s)' % (tablename, placeholders)
-    insertcolnames = ', '.join(colnames)
-    insertquery = SQL_INSERT_QUERY % (tablename, insertcolnames, placeholders)
-    debug('insert data via query %r' % insertquery)
-    cursor.executemany(insertquery, it)
+    _insertrows(it, cursor, _insertquery(tablename, colnames), len(colnames),
+                paramstyle, commitfn=connection.commit if commit else None,
+                **kwargs)
     cursor.close()
 
     if commit:
@@ -444,8 +770,37 @@ def _todb_dbapi_mkcurs(table, mkcurs, tablename, schema=None, commit=True,
         connection.commit()
 
 
+def _todb_dbapi_mkcurs_parallel(it, mkcurs, tablename, colnames, truncate,
+                                workers, **kwargs):
+
+    # N.B., the rows are loaded via cursors of their own, so this cursor and
+    # its connection (a new one, see todb) are only needed to determine the
+    # paramstyle and to truncate, and are closed before loading starts
+    debug('obtain cursor and connection')
+    cursor = mkcurs()
+    connection = None
+    try:
+        assert hasattr(cursor, 'connection'), \
+            'could not obtain connection via cursor'
+        connection = cursor.connection
+        paramstyle = _paramstyle(connection)
+        if truncate:
+            truncatequery = SQL_TRUNCATE_QUERY % tablename
+            debug('truncate the table via query %r', truncatequery)
+            cursor.execute(truncatequery)
+            # the truncation must be visible to the other connections
+            connection.commit()
+    finally:
+        cursor.close()
+        if connection is not None:
+            connection.close()
+
+    _insertparallel(it, mkcurs, workers, _insertquery(tablename, colnames),
+                    len(colnames), paramstyle, **kwargs)
+
+
 def _todb_dbapi_cursor(table, cursor, tablename, schema=None, commit=True,
-                       truncate=False):
+                       truncate=False, **kwargs):
 
     # sanitise table name
     tablename = _quote(tablename)
@@ -466,9 +821,8 @@ def _todb_dbapi_cursor(table, cursor, tablename, schema=None, commit=True,
         'could not obtain connection via cursor'
     connection = cursor.connection
 
-    # determine paramstyle and build placeholders string
-    placeholders = _placeholders(connection, colnames)
-    debug('placeholders: %r', placeholders)
+    # determine paramstyle
+    paramstyle = _paramstyle(connection)
 
     if truncate:
         # TRUNCATE is not supported in some databases and causing locks with
@@ -477,11 +831,9 @@ def _todb_dbapi_cursor(table, cursor, tablename, schema=None, commit=True,
         debug('truncate the table via query %r', truncatequery)
         cursor.execute(truncatequery)
 
-#    insertquery = 'INSERT INTO %s VALUES (%s)' % (tablename, placeholders)
-    insertcolnames = ', '.join(colnames)
-    insertquery = SQL_INSERT_QUERY % (tablename, insertcolnames, placeholders)
-    debug('insert data via query %r' % insertquery)
-    cursor.executemany(insertquery, it)
+    _insertrows(it, cursor, _insertquery(tablename, colnames), len(colnames),
+                paramstyle, commitfn=connection.commit if commit else None,
+                **kwargs)
 
     # N.B., don't close the cursor, leave that to the application
 
@@ -491,14 +843,16 @@ def _todb_dbapi_cursor(table, cursor, tablename, schema=None, commit=True,
 
 
 def _todb_sqlalchemy_engine(table, engine, tablename, schema=None, commit=True,
-                            truncate=False):
+                            truncate=False, **kwargs):
 
     _todb_sqlalchemy_connection(table, engine.contextual_connect(), tablename,
-                                schema=schema, commit=commit, truncate=truncate)
+                                schema=schema, commit=commit, truncate=truncate,
+                                **kwargs)
 
 
 def _todb_sqlalchemy_connection(table, connection, tablename, schema=None,
-                                commit=True, truncate=False):
+                                commit=True, truncate=False, batchsize=None,
+                                multirow=False, commitinterval=None):
 
     debug('connection: %r', connection)
 
@@ -520,13 +874,12 @@ def _todb_sqlalchemy_connection(table, connection, tablename, schema=None,
     proxied_raw_connection = connection.connection
     actual_raw_connection = proxied_raw_connection.connection
 
-    # determine paramstyle and build placeholders string
-    placeholders = _placeholders(actual_raw_connection, colnames)
-    debug('placeholders: %r', placeholders)
+    # determine paramstyle
+    paramstyle = _paramstyle(actual_raw_connection)
 
     if commit:
         debug('begin transaction')
-        trans = connection.begin()
+        trans = [connection.begin()]
 
     if truncate:
         # TRUNCATE is not supported in some databases and causing locks with
@@ -535,31 +888,38 @@ def _todb_sqlalchemy_connection(table, connection, tablename, schema=None,
         debug('truncate the table via query %r', truncatequery)
         connection.execute(truncatequery)
 
-#    insertquery = 'INSERT INTO %s VALUES (%s)' % (tablename, placeholders)
-    insertcolnames = ', '.join(colnames)
-    insertquery = SQL_INSERT_QUERY % (tablename, insertcolnames, placeholders)
-    debug('insert data via query %r' % insertquery)
-    for row in it:
-        connection.execute(insertquery, row)
+    def commitfn():
+        trans[0].commit()
+        trans[0] = connection.begin()
+
+    if batchsize is None:
+        batchsize = defaultbatchsize
+    # N.B., SQLAlchemy uses executemany when given a list of parameter tuples
+    _insertbatches(iterbatches(it, batchsize),
+                   lambda q, params: connection.execute(q, tuple(params)),
+                   connection.execute, _insertquery(tablename, colnames),
+                   len(colnames), paramstyle, multirow=multirow, commitinterval=commitinterval,
+                   commitfn=commitfn if commit else None)
 
     # finish up
 
     if commit:
         debug('commit transaction')
-        trans.commit()
+        trans[0].commit()
 
     # N.B., don't close connection, leave that to the application
 
 
 def _todb_sqlalchemy_session(table, session, tablename, schema=None,
-                             commit=True, truncate=False):
+                             commit=True, truncate=False, **kwargs):
 
     _todb_sqlalchemy_connection(table, session.connection(), tablename,
                                 schema=schema, commit=commit,
-                                truncate=truncate)
+                                truncate=truncate, **kwargs)
 
 
-def appenddb(table, dbo, tablename, schema=None, commit=True):
+def appenddb(table, dbo, tablename, schema=None, commit=True, batchsize=None,
+             multirow=False, commitinterval=None, workers=None):
     """
     Load data into an existing database table via a DB-API 2.0
     connection or cursor. Note that the database table will be appended,
@@ -613,9 +973,30 @@ def appenddb(table, dbo, tablename, schema=None, commit=True):
         >>> cursor = connection.cursor()
         >>> appenddb(table, cursor, 'foobar')
 
+    .. versionchanged:: 0.26
+
+    Rows are inserted in batches of `batchsize` rows (by default
+    `petl.io.db.defaultbatchsize`, i.e., 1000), each via a single call to
+    `executemany()`. If `multirow` is True, each batch is instead inserted
+    via ``INSERT ... VALUES (...), (...), ...`` statements, each with up to
+    `petl.io.db.maxparams` parameters. If `commitinterval` is given, the
+    transaction is committed every time at least that many rows have been
+    inserted since the last commit, rather than only once all rows have been
+    inserted, so a failure part way through leaves the rows before the last
+    commit in the table. Progress is logged at the INFO level whenever a
+    commit is made.
+
+    If `dbo` is a function returning cursors and `workers` is greater than
+    1, rows are loaded via `workers` cursors, each obtained by calling the
+    function from its own thread, so the function should return a cursor on
+    a new connection each time it is called. Each connection commits its own
+    transaction, so `commit` must be True.
+
     """
 
-    _todb(table, dbo, tablename, schema=schema, commit=commit, truncate=False)
+    _todb(table, dbo, tablename, schema=schema, commit=commit, truncate=False,
+          batchsize=batchsize, multirow=multirow,
+          commitinterval=commitinterval, workers=workers)
 
 
 # default DB quote char per SQL-92
@@ -628,40 +1009,33 @@ def _quote(s):
     return quotechar + s.replace(quotechar, quotechar+quotechar) + quotechar
 
 
-def _placeholders(connection, names):
+def _paramstyle(connection):
     # discover the paramstyle
     if connection is None:
         # default to using question mark
         debug('connection is None, default to using qmark paramstyle')
-        placeholders = ', '.join(['?'] * len(names))
+        return 'qmark'
+    mod = __import__(connection.__class__.__module__)
+    if not hasattr(mod, 'paramstyle'):
+        debug('module %r from connection %r has no attribute paramstyle, '
+              'defaulting to qmark' , mod, connection)
+        # default to using question mark
+        return 'qmark'
+    elif mod.paramstyle in ('qmark', 'format', 'pyformat', 'numeric'):
+        debug('found paramstyle %s', mod.paramstyle)
+        return mod.paramstyle
     else:
-        mod = __import__(connection.__class__.__module__)
-
-        if not hasattr(mod, 'paramstyle'):
-            debug('module %r from connection %r has no attribute paramstyle, '
-                  'defaulting to qmark' , mod, connection)
-            # default to using question mark
-            placeholders = ', '.join(['?'] * len(names))
-
-        elif mod.paramstyle == 'qmark':
-            debug('found paramstyle qmark')
-            placeholders = ', '.join(['?'] * len(names))
-
-        elif mod.paramstyle in ('format', 'pyformat'):
-            debug('found paramstyle pyformat')
-            placeholders = ', '.join(['%s'] * len(names))
-
-        elif mod.paramstyle == 'numeric':
-            debug('found paramstyle numeric')
-            placeholders = ', '.join([':' + str(i + 1)
-                                      for i in range(len(names))])
-
-        else:
-            debug('found unexpected paramstyle %r, defaulting to qmark',
-                  mod.paramstyle)
-            placeholders = ', '.join(['?'] * len(names))
-
-    return placeholders
-
-
-
+        debug('found unexpected paramstyle %r, defaulting to qmark',
+              mod.paramstyle)
+        return 'qmark'
+
+
+def _rowplaceholders(paramstyle, n, offset=0):
+    # placeholders for n values, the first of which is parameter number
+    # offset (from zero) in the query
+    if paramstyle in ('format', 'pyformat'):
+        return ', '.join(['%s'] * n)
+    elif paramstyle == 'numeric':
+        return ', '.join([':' + str(i + 1) for i in range(offset, offset + n)])
+    else:
+        return ', '.join(['?'] * n)
@@ -6,7 +6,11 @@ __author__ = 'Alistair Miles <alimanfoo@googlemail.com>'
 
 # standard library dependencies
 import json
+import re
+import codecs
+from itertools import islice, chain
 from json.encoder import JSONEncoder
+from json.decoder import JSONDecoder
 
 
 # internal dependencies
@@ -42,16 +46,35 @@ def fromjson(source, *args, **kwargs):
     via :func:`json.load` and select the array to treat as the data, see also
     :func:`fromdicts`.
 
+    If `lines` is True, the file is read as newline-delimited JSON, i.e., one
+    object per line.
+
+    If no `header` is given, the fields are determined from the keys of the
+    first `sample` objects (1000 by default, see
+    `petl.io.json.defaultsample`). If `sample` is `None`, all objects are
+    examined, which requires an extra pass over the file.
+
     Supports transparent reading from URLs, ``.gz`` and ``.bz2`` files.
 
     .. versionadded:: 0.5
 
+    .. versionchanged:: 0.26
+
+    The file is parsed incrementally, with rows returned as each member of
+    the array is decoded, so files larger than memory can be read (except if
+    positional arguments for :func:`json.load` are given). The `lines` and
+    `sample` keyword arguments.
+
     """
 
     source = read_source_from_arg(source)
     return JsonView(source, *args, **kwargs)
 
 
+defaultsample = 1000
+defaultreadsize = 2**16
+
+
 class JsonView(RowContainer):
 
     def __init__(self, source, *args, **kwargs):
@@ -60,23 +83,174 @@ class JsonView(RowContainer):
         self.kwargs = kwargs
         self.missing = kwargs.pop('missing', None)
         self.header = kwargs.pop('header', None)
+        self.lines = kwargs.pop('lines', False)
+        self.sample = kwargs.pop('sample', defaultsample)
 
-    def __iter__(self):
+    def _iterobjects(self):
         with self.source.open_('rb') as f:
-            result = json.load(f, *self.args, **self.kwargs)
-            if self.header is None:
-                # determine fields
-                header = list()
-                for o in result:
-                    if hasattr(o, 'keys'):
-                        header.extend(k for k in o.keys() if k not in header)
+            if self.args:
+                # positional arguments to json.load, can't stream
+                for o in json.load(f, *self.args, **self.kwargs):
+                    yield o
+                return
+            kwargs = dict(self.kwargs)
+            cls = kwargs.pop('cls', None) or JSONDecoder
+            decoder = cls(**kwargs)
+            if self.lines:
+                it = iterjsonlines(f, decoder)
             else:
-                header = self.header
-            yield tuple(header)
-            # output data rows
-            for o in result:
-                row = tuple(o[f] if f in o else None for f in header)
-                yield row
+                it = iterjsonarray(f, decoder,
+                                   encoding=kwargs.get('encoding'))
+            for o in it:
+                yield o
+
+    def __iter__(self):
+        it = self._iterobjects()
+        if self.header is None:
+            # determine fields
+            if self.sample is None:
+                # from all objects, in a separate pass over the source
+                sample = self._iterobjects()
+            else:
+                # from the first few objects only
+                sample = list(islice(it, self.sample))
+                it = chain(sample, it)
+            header = list()
+            for o in sample:
+                if hasattr(o, 'keys'):
+                    header.extend(k for k in o.keys() if k not in header)
+        else:
+            header = self.header
+        yield tuple(header)
+        # output data rows
+        for o in it:
+            row = tuple(o[f] if f in o else None for f in header)
+            yield row
+
+
+def iterjsonlines(f, decoder):
+    """
+    Decode newline-delimited JSON (JSON lines) from the file object `f`,
+    yielding one value per non-blank line.
+
+    .. versionadded:: 0.26
+
+    """
+
+    for line in f:
+        line = line.strip()
+        if line:
+            yield decoder.decode(line)
+
+
+_whitespace = re.compile(r'[ \t\n\r]*')
+_delimiter = re.compile(r'[ \t\n\r]*([,\]])[ \t\n\r]*')
+
+
+class _TextBuffer(object):
+    # incrementally decoded text read from a file object
+
+    def __init__(self, f, encoding, readsize):
+        self.f = f
+        self.decoder = codecs.getincrementaldecoder(encoding)()
+        self.readsize = readsize
+        self.text = u''
+
+    def readmore(self, pos):
+        # read more text, discarding any text before pos, returns the new
+        # position of pos or None if there is nothing more to read
+        chunk = self.f.read(self.readsize)
+        if not chunk:
+            self.text = self.text[pos:] + self.decoder.decode('', final=True)
+            return None
+        self.text = self.text[pos:] + self.decoder.decode(chunk)
+        return 0
+
+    def skipws(self, pos):
+        # skip whitespace, reading more text as needed, returns the position
+        # of the next character or None at the end of the text
+        while True:
+            pos = _whitespace.match(self.text, pos).end()
+            if pos < len(self.text):
+                return pos
+            pos = self.readmore(pos)
+            if pos is None:
+                return None
+
+
+def iterjsonarray(f, decoder, encoding=None, readsize=None):
+    """
+    Decode a JSON array from the file object `f` incrementally, yielding each
+    member of the array as soon as it has been decoded, so only one member
+    (plus one read buffer) needs to be held in memory at a time. If the top
+    level value is not an array, the whole value is decoded and iterated
+    over, as for :func:`json.load`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    if readsize is None:
+        readsize = defaultreadsize
+    buf = _TextBuffer(f, encoding or 'utf-8', readsize)
+
+    pos = buf.skipws(0)
+    if pos is None:
+        raise ValueError('No JSON object could be decoded')
+    if buf.text[pos] != u'[':
+        # not an array, fall back to decoding the whole document
+        while buf.readmore(0) is not None:
+            pass
+        for o in decoder.decode(buf.text):
+            yield o
+        return
+    pos = buf.skipws(pos + 1)
+    if pos is not None and buf.text[pos] == u']':
+        return
+    while True:
+        if pos is None:
+            raise ValueError('unterminated JSON array')
+        # decode the next member, N.B., a value ending at the end of the
+        # text read so far, or a number not followed by a delimiter, may be
+        # truncated (e.g., "1" from "1.5"), so only accept it once there is
+        # nothing more to read
+        while True:
+            try:
+                o, end = decoder.raw_decode(buf.text, pos)
+            except ValueError:
+                pos = buf.readmore(pos)
+                if pos is None:
+                    raise
+                continue
+            if end == len(buf.text) or (
+                    isinstance(o, (int, long, float))
+                    and buf.text[end] not in u' \t\n\r,]'):
+                more = buf.readmore(pos)
+                if more is not None:
+                    pos = more
+                    continue
+                # N.B., text before pos was discarded
+                end -= pos
+            break
+        yield o
+        # fast path, the delimiter and the start of the next member have
+        # already been read
+        m = _delimiter.match(buf.text, end)
+        if m is not None:
+            if m.group(1) == u']':
+                return
+            if m.end() < len(buf.text):
+                pos = m.end()
+                continue
+        pos = buf.skipws(end)
+        if pos is None:
+            raise ValueError('unterminated JSON array')
+        c = buf.text[pos]
+        if c == u']':
+            return
+        elif c != u',':
+            raise ValueError('expected , or ] in JSON array, found %r' % c)
+        pos = buf.skipws(pos + 1)
 
 
 def fromdicts(dicts, header=None):
@@ -0,0 +1,450 @@
+"""
+Rewriting of transformations applied directly to tables extracted from a
+database via :func:`fromdb` or :func:`fromsqlite3` into the SQL query, so the
+work is done by the database rather than by iterating over rows in Python.
+
+Each of the functions below returns a new view with the rewritten query, or
+`None` if the transformation can't be expressed in SQL, in which case the
+caller should fall back to its usual implementation.
+
+Queries are only rewritten if `petl.io.pushdown.enabled` is set to `True`,
+which should only be done where the database:
+
+* accepts the SQL generated, i.e., identifiers quoted with double quotes
+  (e.g., MySQL requires the ANSI_QUOTES SQL mode, otherwise a quoted field
+  name is a string literal) and ``LIMIT`` (e.g., not SQL Server);
+* keeps the order of a query which is nested in another (e.g., MySQL and
+  MariaDB may ignore an ``ORDER BY`` within a derived table, so
+  :func:`head` of a sorted query may return the wrong rows);
+* orders and compares the values concerned as python does (e.g., strings
+  with binary collation, and no columns holding values of mixed types),
+  otherwise the results of sorting, aggregation and comparisons differ, and
+  transformations relying on the order of the rows, such as merge joins of
+  sorted tables, may lose rows.
+
+"""
+
+
+from __future__ import absolute_import, print_function, division
+
+
+__author__ = 'Alistair Miles <alimanfoo@googlemail.com>'
+
+
+# standard library dependencies
+import operator
+import datetime
+
+
+# internal dependencies
+from petl.io.db import DbView, _is_dbapi_connection, _is_dbapi_cursor, \
+    _paramstyle, _quote
+from petl.io.sqlite3 import Sqlite3View
+
+
+import logging
+logger = logging.getLogger(__name__)
+debug = logger.debug
+
+
+# whether to rewrite transformations into queries at all, see above, e.g., the
+# SQL generated isn't accepted by all databases, and for a column with NOCASE
+# collation 'B' sorts before 'a' in python but not in the database
+enabled = False
+
+
+# types of values which can be passed to the database as query parameters
+_valuetypes = (basestring, int, long, float, datetime.date, datetime.time,
+               datetime.timedelta)
+
+
+class SqlQuery(object):
+    """
+    A query selecting `columns` (all if `None`) from the result of the `base`
+    query, filtered by the `where` conditions, each given as a tuple of the
+    SQL condition and its parameters, ordered by the `orderby` fields, each
+    given as a tuple of the field name and whether it is sorted in reverse,
+    and limited to `limit` rows.
+
+    .. versionadded:: 0.26
+
+    """
+
+    def __init__(self, base, params, paramstyle, columns=None, where=(),
+                 orderby=(), limit=None, escaped=None):
+        self.base = base
+        self.params = tuple(params)
+        self.paramstyle = paramstyle
+        self.columns = columns
+        self.where = tuple(where)
+        self.orderby = tuple(orderby)
+        self.limit = limit
+        # N.B., a query passed to the database without any parameters must
+        # not have percent signs escaped for the format paramstyles, but one
+        # with parameters must
+        if escaped is None:
+            escaped = bool(self.params)
+        self.escaped = escaped
+
+    @property
+    def placeholder(self):
+        if self.paramstyle in ('format', 'pyformat'):
+            return '%s'
+        return '?'
+
+    def derive(self, **kwargs):
+        attrs = dict(base=self.base, params=self.params,
+                     paramstyle=self.paramstyle, columns=self.columns,
+                     where=self.where, orderby=self.orderby, limit=self.limit,
+                     escaped=self.escaped)
+        attrs.update(kwargs)
+        return SqlQuery(**attrs)
+
+    def sql(self):
+        """Return the SQL for the query and the tuple of its parameters."""
+
+        params = self.params + tuple(p for _, ps in self.where for p in ps)
+        base = self.base
+        if params and not self.escaped and self.placeholder == '%s':
+            base = base.replace('%', '%%')
+        if self.columns is None:
+            columns = '*'
+        else:
+            columns = ', '.join(_quote(f) for f in self.columns)
+        sql = 'SELECT %s FROM (%s) AS _petl' % (columns, base)
+        if self.where:
+            sql += ' WHERE ' + ' AND '.join(c for c, _ in self.where)
+        if self.orderby:
+            sql += ' ORDER BY ' + ', '.join(_orderby(f, r)
+                                            for f, r in self.orderby)
+        if self.limit is not None:
+            sql += ' LIMIT %d' % self.limit
+        return sql, params
+
+    def nest(self, keeporder=True):
+        """
+        Return a query over the result of this query, which can be filtered,
+        sorted or limited without changing the meaning of this query, or
+        `None` if the order of the rows needs to be kept but can't be.
+
+        """
+
+        if self.limit is not None and not self.orderby:
+            # N.B., which rows are returned by a limited query without an
+            # order isn't defined, and may change when it is nested
+            return None
+        orderby = ()
+        if keeporder and self.orderby:
+            if self.columns is not None and \
+                    any(f not in self.columns for f, _ in self.orderby):
+                return None
+            orderby = self.orderby
+        base, params = self.sql()
+        return SqlQuery(base, params, self.paramstyle, columns=self.columns,
+                        orderby=orderby)
+
+
+def _orderby(field, reverse):
+    # N.B., None sorts before any other value in Python, but where NULL sorts
+    # varies between databases
+    col = _quote(field)
+    if reverse:
+        return 'CASE WHEN %s IS NULL THEN 0 ELSE 1 END DESC, %s DESC' \
+               % (col, col)
+    return 'CASE WHEN %s IS NULL THEN 0 ELSE 1 END, %s' % (col, col)
+
+
+def sqlquery(table):
+    """
+    Return the :class:`SqlQuery` for a table extracted via :func:`fromdb` or
+    :func:`fromsqlite3`, or `None` if transformations of the table can't be
+    rewritten into its query, or rewriting isn't enabled.
+
+    .. versionadded:: 0.26
+
+    """
+
+    if not enabled:
+        return None
+    query = getattr(table, '_sqlquery', None)
+    if query is not None:
+        return query
+    if isinstance(table, Sqlite3View):
+        paramstyle = 'qmark'
+    elif isinstance(table, DbView):
+        dbo = table.dbo
+        if _is_dbapi_connection(dbo):
+            paramstyle = _paramstyle(dbo)
+        elif _is_dbapi_cursor(dbo) and hasattr(dbo, 'connection'):
+            paramstyle = _paramstyle(dbo.connection)
+        else:
+            # can't determine the paramstyle without making a connection
+            return None
+    else:
+        return None
+    if paramstyle not in ('qmark', 'format', 'pyformat'):
+        return None
+    if table.kwargs:
+        return None
+    if not table.args:
+        params = ()
+    elif len(table.args) == 1 and isinstance(table.args[0], (list, tuple)):
+        params = tuple(table.args[0])
+    else:
+        return None  # e.g., named parameters
+    base = table.query.strip().rstrip(';').strip()
+    return SqlQuery(base, params, paramstyle)
+
+
+def _derive(table, query):
+    # a view of the same kind over the same database, running the given query
+    sql, params = query.sql()
+    debug('query pushed down: %r, %r', sql, params)
+    args = (params,) if params else ()
+    if isinstance(table, Sqlite3View):
+        view = Sqlite3View(table.connection, sql, *args)
+    else:
+        view = DbView(table.dbo, sql, *args, arraysize=table.arraysize,
+                      cursorname=table.cursorname)
+    view._sqlquery = query
+    return view
+
+
+def _filter(table, field):
+    # the query to which a condition on field can be added, if any
+    query = sqlquery(table)
+    if query is None or not isinstance(field, basestring):
+        return None
+    if query.limit is not None:
+        # filter the limited rows
+        query = query.nest()
+        if query is None:
+            return None
+    if query.columns is not None and field not in query.columns:
+        return None
+    return query
+
+
+def _where(table, query, cond, params, complement):
+    if complement:
+        cond = 'NOT %s' % cond
+    return _derive(table, query.derive(where=query.where + ((cond, params),)))
+
+
+def _nullsafe(cond, col, nullresult):
+    # make a condition on a column true or false (rather than unknown) when
+    # the column is NULL, as for the corresponding comparison with None in
+    # Python, where None compares less than any other value
+    if nullresult:
+        return '(%s OR %s IS NULL)' % (cond, col)
+    return '(%s AND %s IS NOT NULL)' % (cond, col)
+
+
+# SQL comparison operators, and the result of the Python comparison when the
+# field value is None
+_comparisons = {operator.eq: ('=', False),
+                operator.ne: ('<>', True),
+                operator.lt: ('<', True),
+                operator.le: ('<=', True),
+                operator.gt: ('>', False),
+                operator.ge: ('>=', False)}
+
+
+def sqlselectop(table, field, value, op, complement=False):
+    """
+    Rewrite :func:`selectop` into the query, if possible.
+
+    .. versionadded:: 0.26
+
+    """
+
+    query = _filter(table, field)
+    if query is None:
+        return None
+    col = _quote(field)
+    if value is None:
+        if op in (operator.eq, operator.is_):
+            cond = '(%s IS NULL)' % col
+        elif op in (operator.ne, operator.is_not):
+            cond = '(%s IS NOT NULL)' % col
+        else:
+            return None
+        params = ()
+    elif op in _comparisons and isinstance(value, _valuetypes):
+        sqlop, nullresult = _comparisons[op]
+        cond = _nullsafe('%s %s %s' % (col, sqlop, query.placeholder), col,
+                         nullresult)
+        params = (value,)
+    else:
+        return None
+    return _where(table, query, cond, params, complement)
+
+
+_minops = {operator.lt: '>', operator.le: '>='}
+_maxops = {operator.lt: '<', operator.le: '<='}
+
+
+def sqlselectrange(table, field, minv, maxv, minop, maxop, complement=False):
+    """
+    Rewrite a range selection, i.e., where ``minop(minv, v)`` and
+    ``maxop(v, maxv)``, into the query, if possible.
+
+    .. versionadded:: 0.26
+
+    """
+
+    query = _filter(table, field)
+    if query is None or minop not in _minops or maxop not in _maxops \
+            or not isinstance(minv, _valuetypes) \
+            or not isinstance(maxv, _valuetypes):
+        return None
+    col = _quote(field)
+    cond = '%s %s %s AND %s %s %s' % (col, _minops[minop], query.placeholder,
+                                      col, _maxops[maxop], query.placeholder)
+    # N.B., minv < None is false
+    cond = _nullsafe(cond, col, False)
+    return _where(table, query, cond, (minv, maxv), complement)
+
+
+def sqlselectin(table, field, values, complement=False):
+    """
+    Rewrite :func:`selectin` into the query, if possible.
+
+    .. versionadded:: 0.26
+
+    """
+
+    query = _filter(table, field)
+    if query is None or not isinstance(values, (list, tuple, set, frozenset)):
+        return None
+    values = tuple(values)
+    if not values or not all(isinstance(v, _valuetypes) for v in values):
+        return None
+    col = _quote(field)
+    cond = '%s IN (%s)' % (col, ', '.join([query.placeholder] * len(values)))
+    cond = _nullsafe(cond, col, False)
+    return _where(table, query, cond, values, complement)
+
+
+def sqlcut(table, fields):
+    """
+    Rewrite :func:`cut` into the query, if possible.
+
+    .. versionadded:: 0.26
+
+    """
+
+    query = sqlquery(table)
+    fields = tuple(fields)
+    if query is None or not fields \
+            or not all(isinstance(f, basestring) for f in fields) \
+            or len(set(fields)) < len(fields):
+        return None
+    if query.columns is not None and \
+            any(f not in query.columns for f in fields):
+        return None
+    # N.B., ordering by fields which have been cut away is still possible
+    return _derive(table, query.derive(columns=fields))
+
+
+def sqlsort(table, key, reverse=False):
+    """
+    Rewrite :func:`sort` into the query, if possible.
+
+    .. versionadded:: 0.26
+
+    """
+
+    query = sqlquery(table)
+    if isinstance(key, basestring):
+        key = (key,)
+    if query is None or not isinstance(key, (list, tuple)) or not key \
+            or not all(isinstance(f, basestring) for f in key):
+        return None
+    if query.limit is not None:
+        # sort the limited rows
+        query = query.nest()
+        if query is None:
+            return None
+    if query.columns is not None and any(f not in query.columns for f in key):
+        return None
+    # N.B., sorting is stable, so any existing order breaks ties
+    orderby = tuple((f, reverse) for f in key) + \
+        tuple((f, r) for f, r in query.orderby if f not in key)
+    return _derive(table, query.derive(orderby=orderby))
+
+
+def sqlhead(table, n):
+    """
+    Rewrite :func:`head` into the query, if possible.
+
+    .. versionadded:: 0.26
+
+    """
+
+    query = sqlquery(table)
+    if query is None or not isinstance(n, (int, long)) or n < 0:
+        return None
+    if query.limit is not None:
+        n = min(n, query.limit)
+    return _derive(table, query.derive(limit=n))
+
+
+def _aggregation(name, field):
+    if name == 'count':
+        return 'COUNT(*)'
+    col = _quote(field)
+    if name == 'sum':
+        return 'SUM(%s)' % col
+    elif name == 'max':
+        return 'MAX(%s)' % col
+    elif name == 'min':
+        # N.B., None is the minimum of any values in Python
+        return 'CASE WHEN COUNT(*) > COUNT(%s) THEN NULL ELSE MIN(%s) END' \
+               % (col, col)
+    elif name == 'mean':
+        return 'AVG(%s)' % col
+    return None
+
+
+def sqlgroupby(table, key, specs, header):
+    """
+    Rewrite an aggregation into the query, if possible. The `specs` are a
+    list of (field, aggregation) tuples, where the aggregation is one of
+    'count', 'sum', 'min', 'max' or 'mean', and `header` gives the output
+    fields, i.e., the key fields followed by one field per aggregation. The
+    output is sorted by the key.
+
+    .. versionadded:: 0.26
+
+    """
+
+    query = sqlquery(table)
+    if isinstance(key, basestring):
+        key = (key,)
+    if query is None or not isinstance(key, (list, tuple)) or not key \
+            or not all(isinstance(f, basestring) for f in key) \
+            or len(set(header)) < len(header):
+        return None
+    fields = list(key) + [f for f, name in specs if name != 'count']
+    if not all(isinstance(f, basestring) for f in fields):
+        return None
+    if query.columns is not None and any(f not in query.columns
+                                         for f in fields):
+        return None
+    aggs = [_aggregation(name, f) for f, name in specs]
+    if any(a is None for a in aggs):
+        return None
+    query = query.nest(keeporder=False)
+    if query is None:
+        return None
+    inner, params = query.sql()
+    keycols = ', '.join(_quote(f) for f in key)
+    base = 'SELECT %s, %s FROM (%s) AS _petl GROUP BY %s' % (
+        keycols,
+        ', '.join('%s AS %s' % (a, _quote(h))
+                  for a, h in zip(aggs, header[len(key):])),
+        inner, keycols)
+    grouped = SqlQuery(base, params, query.paramstyle, columns=tuple(header),
+                       orderby=tuple((f, False) for f in key))
+    return _derive(table, grouped)
@@ -0,0 +1,267 @@
+"""
+A simple on-disk row store format supporting random access.
+
+A row store file begins with a magic string, followed by each row (the header
+row first) pickled as a tuple, followed by an index of the byte offset of the
+start of each row plus the offset of the end of the last row, followed by a
+fixed size trailer giving the offset of the index and the number of rows
+(including the header). Files are read via :mod:`mmap`, so only the pages
+actually needed for the rows requested are read from disk.
+
+"""
+
+
+from __future__ import absolute_import, print_function, division
+
+
+__author__ = 'Alistair Miles <alimanfoo@googlemail.com>'
+
+
+# standard library dependencies
+import os
+import mmap
+import struct
+import cPickle as pickle
+from array import array
+from itertools import izip
+from tempfile import NamedTemporaryFile
+
+
+# internal dependencies
+from petl.util import RandomAccessRowContainer, sortorder
+
+
+import logging
+logger = logging.getLogger(__name__)
+warning = logger.warning
+info = logger.info
+debug = logger.debug
+
+
+MAGIC = 'PETLRS\x00\x01'
+_offsetformat = '<Q'
+_offsetsize = struct.calcsize(_offsetformat)
+_trailerformat = '<QQ'
+_trailersize = struct.calcsize(_trailerformat)
+
+
+def _offsetarray():
+    # hold offsets compactly in memory where the platform allows
+    if array('L').itemsize >= 8:
+        return array('L')
+    return list()
+
+
+class RowStoreWriter(object):
+    """
+    Write rows to a file object in the row store format. The file must be
+    opened in binary mode and positioned at the start. Call :meth:`finish`
+    after the last row has been written to write the index; the file is not
+    closed.
+
+    .. versionadded:: 0.26
+
+    """
+
+    def __init__(self, f, protocol=-1):
+        self.f = f
+        self.protocol = protocol
+        self.offsets = _offsetarray()
+        f.write(MAGIC)
+        self.position = len(MAGIC)
+
+    def write(self, row):
+        s = pickle.dumps(tuple(row), self.protocol)
+        self.offsets.append(self.position)
+        self.f.write(s)
+        self.position += len(s)
+
+    def finish(self):
+        f = self.f
+        offsets = self.offsets
+        nrows = len(offsets)
+        offsets.append(self.position)
+        indexoffset = self.position
+        # write the index in batches to avoid building one huge string
+        for i in xrange(0, len(offsets), 8192):
+            batch = offsets[i:i+8192]
+            f.write(struct.pack('<%dQ' % len(batch), *batch))
+        f.write(struct.pack(_trailerformat, indexoffset, nrows))
+        f.flush()
+
+
+def torowstore(table, filename, protocol=-1):
+    """
+    Write the table to a file in the row store format, which can be read back
+    via :func:`fromrowstore`. E.g.::
+
+        >>> from petl import torowstore, fromrowstore, look
+        >>> torowstore(table1, 'test.rows')
+        >>> table2 = fromrowstore('test.rows')
+        >>> len(table2)
+        4
+        >>> table2[-1]
+        ('c', 2)
+
+    The table is written to a temporary file in the same directory which is
+    then renamed, so readers never see a partially written row store.
+
+    .. versionadded:: 0.26
+
+    """
+
+    dirname = os.path.dirname(os.path.abspath(filename))
+    f = NamedTemporaryFile(dir=dirname, delete=False)
+    try:
+        writer = RowStoreWriter(f, protocol=protocol)
+        for row in table:
+            writer.write(row)
+        writer.finish()
+        f.close()
+        os.rename(f.name, filename)
+    except:
+        f.close()
+        os.remove(f.name)
+        raise
+
+
+def fromrowstore(filename):
+    """
+    Return a table providing access to the rows stored in a file written by
+    :func:`torowstore`. The table supports random access, i.e., :func:`len`,
+    indexing, slicing, :func:`nrows`, :func:`data`, :func:`rowslice` and
+    :func:`tail` all read only the rows they need. E.g.::
+
+        >>> from petl import fromrowstore
+        >>> table = fromrowstore('test.rows')
+        >>> table[2]
+        ('b', 2)
+        >>> list(table[1:3])
+        [('a', 1), ('b', 2)]
+
+    .. versionadded:: 0.26
+
+    """
+
+    return RowStoreView(filename)
+
+
+class RowStoreView(RandomAccessRowContainer):
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._stat = None
+        self._mm = None
+
+    def _open(self):
+        # map the file, remapping if the file has been replaced or rewritten
+        # since it was last mapped
+        st = os.stat(self.filename)
+        stat = (st.st_ino, st.st_size, st.st_mtime)
+        if self._mm is None or stat != self._stat:
+            with open(self.filename, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if mm[:len(MAGIC)] != MAGIC:
+                raise ValueError('not a row store file: %r' % self.filename)
+            indexoffset, nrows = struct.unpack_from(_trailerformat, mm,
+                                                    len(mm) - _trailersize)
+            self._mm = mm
+            self._stat = stat
+            self._index = (indexoffset, nrows)
+        return self._mm, self._index
+
+    def _offsets(self, mm, indexoffset, start, stop):
+        # offsets of rows start to stop inclusive, where row 0 is the header
+        return struct.unpack_from('<%dQ' % (stop - start + 1), mm,
+                                  indexoffset + start * _offsetsize)
+
+    def _hasrandomaccess(self):
+        # an empty row store has no header row
+        return self._open()[1][1] > 0
+
+    def _header(self):
+        mm, (indexoffset, _) = self._open()
+        start, stop = self._offsets(mm, indexoffset, 0, 1)
+        return pickle.loads(mm[start:stop])
+
+    def _datalen(self):
+        return self._open()[1][1] - 1
+
+    def _iterdata(self, start, stop, step):
+        mm, (indexoffset, nrows) = self._open()
+        stop = min(stop, nrows - 1)
+        if stop <= start:
+            return
+        # N.B., data row i is stored as row i + 1
+        offsets = self._offsets(mm, indexoffset, start + 1, stop + 1)
+        loads = pickle.loads
+        if step == 1:
+            for begin, end in izip(offsets, offsets[1:]):
+                yield loads(mm[begin:end])
+        else:
+            for i in xrange(0, stop - start, step):
+                yield loads(mm[offsets[i]:offsets[i+1]])
+
+    def __iter__(self):
+        mm, (indexoffset, nrows) = self._open()
+        if nrows:
+            return self._iterrows(0, nrows, 1)
+        return iter([])
+
+
+class RowStoreCacheContainer(RandomAccessRowContainer):
+    """
+    Wrap a table with a cache held in a temporary row store file. The cache is
+    written during the first complete iteration over the table, after which
+    rows are served from the row store. See also :func:`petl.util.cache`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    _transientattrs = ('_file', '_store')
+
+    def __init__(self, inner, tempdir=None):
+        self._inner = inner
+        self._tempdir = tempdir
+        self._file = None
+        self._store = None
+
+    def clearcache(self):
+        self._file = None
+        self._store = None
+
+    def _hasrandomaccess(self):
+        return self._store is not None and self._store._hasrandomaccess()
+
+    def _header(self):
+        return self._store._header()
+
+    def _datalen(self):
+        return self._store._datalen()
+
+    def _iterdata(self, start, stop, step):
+        return self._store._iterdata(start, stop, step)
+
+    def _sortorder(self):
+        return sortorder(self._inner)
+
+    def __iter__(self):
+        if self._store is not None:
+            debug('serving from row store cache %r', self._file.name)
+            return iter(self._store)
+        return self._iterandcache()
+
+    def _iterandcache(self):
+        # N.B., the temporary file is deleted when closed or garbage
+        # collected, so keep a reference to it for as long as the cache is
+        # needed
+        f = NamedTemporaryFile(dir=self._tempdir)
+        writer = RowStoreWriter(f)
+        for row in self._inner:
+            writer.write(row)
+            yield row
+        writer.finish()
+        debug('row store cache is complete: %r', f.name)
+        self._file = f
+        self._store = RowStoreView(f.name)
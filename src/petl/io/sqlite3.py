@@ -10,6 +10,7 @@ import sqlite3
 
 # internal dependencies
 from petl.util import RowContainer
+from petl.io.db import _insertrows, _dbofingerprint, PushdownMixin
 
 
 quotechar = '"'
@@ -63,12 +64,18 @@ def fromsqlite3(source, query, *args, **kwargs):
     Either a database file name or a connection object can be given as the
     first argument.
 
+    .. versionchanged:: 0.26
+
+    Selections, cuts, sorts, heads and aggregations applied directly to the
+    table are rewritten into the SQL query where possible, as described for
+    :func:`fromdb`.
+
     """
 
     return Sqlite3View(source, query, *args, **kwargs)
 
 
-class Sqlite3View(RowContainer):
+class Sqlite3View(RowContainer, PushdownMixin):
 
     def __init__(self, source, query, *args, **kwargs):
         self.source = source
@@ -85,6 +92,10 @@ class Sqlite3View(RowContainer):
             raise Exception('source argument must be filename or connection; '
                             'found %r' % self.source)
 
+    def _fingerprint(self):
+        return (_dbofingerprint(self.connection), self.query, self.args,
+                self.kwargs)
+
     def __iter__(self):
 
         cursor = self.connection.cursor()
@@ -99,7 +110,8 @@ class Sqlite3View(RowContainer):
 
 
 def tosqlite3(table, filename_or_connection, tablename, create=False,
-              commit=True):
+              commit=True, batchsize=None, multirow=False,
+              commitinterval=None):
     """
     Load data into a table in an :mod:`sqlite3` database. Note that if
     the database table exists, it will be truncated, i.e., all
@@ -147,14 +159,20 @@ def tosqlite3(table, filename_or_connection, tablename, create=False,
 
     Default value for ``create`` argument changed to ``False``.
 
+    .. versionchanged:: 0.26
+
+    Rows are inserted in batches, see :func:`todb` for the `batchsize`,
+    `multirow` and `commitinterval` arguments.
+
     """
 
     return _tosqlite3(table, filename_or_connection, tablename, create=create,
-                      commit=commit, truncate=True)
+                      commit=commit, truncate=True, batchsize=batchsize,
+                      multirow=multirow, commitinterval=commitinterval)
 
 
 def _tosqlite3(table, filename_or_connection, tablename, create=False,
-               commit=True, truncate=False):
+               commit=True, truncate=False, **kwargs):
 
     if isinstance(filename_or_connection, basestring):
         conn = sqlite3.connect(filename_or_connection)
@@ -182,9 +200,10 @@ def _tosqlite3(table, filename_or_connection, tablename, create=False,
         cursor.execute(u'DELETE FROM %s' % tablename)
 
     # insert rows
-    placeholders = ', '.join(['?'] * len(colnames))
-    insertquery = u'INSERT INTO %s VALUES (%s);' % (tablename, placeholders)
-    cursor.executemany(insertquery, it)
+    def makequery(values):
+        return u'INSERT INTO %s VALUES %s' % (tablename, values)
+    _insertrows(it, cursor, makequery, len(colnames), 'qmark',
+                commitfn=conn.commit if commit else None, **kwargs)
 
     # tidy up
     cursor.close()
@@ -194,7 +213,8 @@ def _tosqlite3(table, filename_or_connection, tablename, create=False,
     return conn  # in case people want to re-use it or close it
 
 
-def appendsqlite3(table, filename_or_connection, tablename, commit=True):
+def appendsqlite3(table, filename_or_connection, tablename, commit=True,
+                  batchsize=None, multirow=False, commitinterval=None):
     """
     Load data into an existing table in an :mod:`sqlite3`
     database. Note that the database table will be appended, i.e., the
@@ -238,8 +258,14 @@ def appendsqlite3(table, filename_or_connection, tablename, commit=True):
     Either a database file name or a connection object can be given as the
     second argument.
 
+    .. versionchanged:: 0.26
+
+    Rows are inserted in batches, see :func:`todb` for the `batchsize`,
+    `multirow` and `commitinterval` arguments.
+
     """
 
     return _tosqlite3(table, filename_or_connection, tablename, create=False,
-                      commit=commit, truncate=False)
+                      commit=commit, truncate=False, batchsize=batchsize,
+                      multirow=multirow, commitinterval=commitinterval)
 
@@ -8,6 +8,7 @@ __author__ = 'Alistair Miles <alimanfoo@googlemail.com>'
 from xml.etree import ElementTree
 from operator import attrgetter
 import itertools
+import re
 
 
 # internal dependencies
@@ -113,8 +114,18 @@ def fromxml(source, *args, **kwargs):
         | 'c'   | '2'        |
         +-------+------------+
 
-    Note that the implementation is currently *not*
-    streaming, i.e., the whole document is loaded into memory.
+    Note that by default the whole document is loaded into memory. To read
+    large documents, pass ``streaming=True``, in which case the document is
+    parsed incrementally and each row element is discarded once its values
+    have been extracted, so only one row element is held in memory at a
+    time, e.g.::
+
+        >>> table4 = fromxml('example1.xml', 'tr', 'td', streaming=True)
+
+    In streaming mode the row path may only be made up of tag names, ``*``,
+    ``/`` and ``//`` (e.g., ``'tr'``, ``'table/tr'`` or ``'.//tr'``), and if
+    matching row elements are nested, inner rows are returned before outer
+    rows.
 
     Supports transparent reading from URLs, ``.gz`` and ``.bz2`` files.
 
@@ -131,6 +142,10 @@ def fromxml(source, *args, **kwargs):
     or list of paths can be provided, e.g.,
     ``fromxml('example.html', './/tr', ('th', 'td'))``.
 
+    .. versionchanged:: 0.26
+
+    The `streaming` keyword argument.
+
     """
 
     source = read_source_from_arg(source)
@@ -160,6 +175,10 @@ class XmlView(RowContainer):
         else:
             assert False, 'bad parameters'
         self.missing = kwargs.get('missing', None)
+        self.streaming = kwargs.get('streaming', False)
+        if self.streaming:
+            # fail early if the row path can't be matched while streaming
+            _compilerowpath(self.rmatch)
 
     def __iter__(self):
         vmatch = self.vmatch
@@ -167,18 +186,22 @@ class XmlView(RowContainer):
 
         with self.source.open_('rb') as xmlf:
 
-            tree = ElementTree.parse(xmlf)
-            if not hasattr(tree, 'iterfind'):
-                # Python 2.6 compatibility
-                tree.iterfind = tree.findall
+            if self.streaming:
+                rowelms = iterxmlrows(xmlf, self.rmatch)
+            else:
+                tree = ElementTree.parse(xmlf)
+                if not hasattr(tree, 'iterfind'):
+                    # Python 2.6 compatibility
+                    tree.iterfind = tree.findall
+                rowelms = tree.iterfind(self.rmatch)
 
             if vmatch is not None:
                 # simple case, all value paths are the same
-                for rowelm in tree.iterfind(self.rmatch):
-                    if self.attr is None:
-                        getv = attrgetter('text')
-                    else:
-                        getv = lambda e: e.get(self.attr)
+                if self.attr is None:
+                    getv = attrgetter('text')
+                else:
+                    getv = lambda e: e.get(self.attr)
+                for rowelm in rowelms:
                     if isinstance(vmatch, basestring):
                         # match only one path
                         velms = rowelm.findall(vmatch)
@@ -212,11 +235,82 @@ class XmlView(RowContainer):
                         vgetters[f] = attribute_text_getter(attr, self.missing)
 
                 # determine data rows
-                for rowelm in tree.iterfind(self.rmatch):
+                for rowelm in rowelms:
                     yield tuple(vgetters[f](rowelm.findall(vmatches[f]))
                                 for f in fields)
 
 
+def _compilerowpath(path):
+    # compile a simple element path, relative to the root element, into a
+    # regular expression matching the tags of an element's ancestors (below
+    # the root) and the element itself, each followed by a newline
+    tokens = re.findall(r'//|/|\{[^}]*\}[^/]*|[^/]+', path)
+    if tokens and tokens[0] == '.':
+        tokens = tokens[1:]
+        if tokens and tokens[0] == '/':
+            tokens = tokens[1:]
+    if (not tokens and path != '.') or tokens[:1] == ['/'] \
+            or tokens[-1:] in (['/'], ['//']):
+        raise ValueError('path not supported for streaming: %r' % path)
+    pattern = ''
+    for token in tokens:
+        if token == '/':
+            continue
+        elif token == '//':
+            pattern += '(?:[^\n]+\n)*'
+        elif token == '*':
+            pattern += '[^\n]+\n'
+        elif re.search(r'[\[\]@=()]|\.|^$', re.sub(r'^\{[^}]*\}', '', token)):
+            raise ValueError('path not supported for streaming: %r' % path)
+        else:
+            pattern += re.escape(token) + '\n'
+    return re.compile(pattern + r'\Z')
+
+
+def iterxmlrows(xmlf, rmatch):
+    """
+    Parse the XML document in the file object `xmlf` incrementally, yielding
+    each element matching the path `rmatch` (relative to the root element) as
+    soon as it is complete. Once an element has been yielded it is cleared
+    and detached from the tree, along with any other elements that are not
+    inside a matching element, so only one row element needs to be held in
+    memory at a time. Only paths made up of tag names, ``*``, ``/`` and
+    ``//`` are supported. N.B., if matching elements are nested, the inner
+    elements are yielded before the outer element.
+
+    .. versionadded:: 0.26
+
+    """
+
+    rowpath = _compilerowpath(rmatch)
+    paths = []  # tag paths of the open elements, relative to the root
+    elms = []  # open elements, including the root
+    matches = []  # whether each open element matches
+    nmatching = 0
+    for event, elm in ElementTree.iterparse(xmlf, events=('start', 'end')):
+        if event == 'start':
+            if elms:
+                path = paths[-1] + elm.tag + '\n'
+            else:
+                path = ''
+            paths.append(path)
+            elms.append(elm)
+            ismatch = rowpath.match(path) is not None
+            matches.append(ismatch)
+            if ismatch:
+                nmatching += 1
+        else:
+            elms.pop()
+            paths.pop()
+            if matches.pop():
+                nmatching -= 1
+                yield elm
+            if not nmatching and elms:
+                # nothing open needs this element any more
+                elm.clear()
+                del elms[-1][:]
+
+
 def element_text_getter(missing):
     def _get(v):
         if len(v) > 1:
@@ -1,6 +1,10 @@
 """
 A tentative module for pushing data through branching pipelines.
 
+Rows are pushed from the source through the pipeline in batches (lists of
+tuples), so each component handles many rows per call, and a single pass over
+the source can feed any number of branches and outputs.
+
 """
 
 
@@ -8,14 +12,38 @@ from __future__ import absolute_import, print_function, division
 
 
 import csv
-from tempfile import NamedTemporaryFile
+import sys
+import sqlite3
+import threading
+import multiprocessing
 from operator import itemgetter
-from itertools import islice
-from collections import defaultdict
+from itertools import islice, imap
+from collections import defaultdict, deque
+from json.encoder import JSONEncoder
 import cPickle as pickle
 
-from petl.util import asindices, HybridRow, shortlistmergesorted
+from petl.util import asindices, HybridRow, \
+    iterbatches, asdict, header, lookup, RowContainer
+from petl.compat import OrderedDict
 import petl.transform
+from petl.transform import sorts
+from petl.transform.joins import keys_from_args
+from petl.transform.hashjoins import iterhashjoin, iterhashleftjoin
+from petl.transform.reductions import HashAggregation, aggregator, \
+    _getkeyfun, _getvaluefun, _simpleaggregateheader, \
+    _normaliseaggregation, _multiaggregateheader, _multiaggregators
+from petl.io.sources import write_source_from_arg
+from petl.io.db import _quote, _paramstyle, _insertquery, _insertbatches, \
+    _is_dbapi_connection, _is_dbapi_cursor, SQL_TRUNCATE_QUERY
+
+
+import logging
+logger = logging.getLogger(__name__)
+debug = logger.debug
+
+
+defaultbatchsize = 1000
+defaultqueuesize = 10000
 
 
 class PipelineComponent(object):
@@ -48,22 +76,70 @@ class PipelineComponent(object):
             keyed_connections[k] = [r.connect(fields) for r in self.keyed_receivers[k]]
         return default_connections, keyed_connections
             
-    def push(self, source, limit=None):
+    def push(self, source, limit=None, batchsize=None):
+        """
+        Push the rows of `source` (at most `limit` rows, if given) through
+        the pipeline, in batches of `batchsize` rows.
+
+        .. versionchanged:: 0.26
+
+        Rows are pushed in batches, see :meth:`PipelineConnection.accept_batch`.
+
+        """
+
+        if batchsize is None:
+            batchsize = defaultbatchsize
         it = iter(source)
         fields = it.next()
         c = self.connect(fields)
-        for row in islice(it, limit):
-            c.accept(tuple(row))
+        # N.B., rows are converted to tuples once, here, rather than by every
+        # component they pass through
+        try:
+            for batch in iterbatches(imap(tuple, islice(it, limit)),
+                                     batchsize):
+                c.accept_batch(batch)
+        except Exception:
+            # close the connection anyway, so e.g. the threads of buffered
+            # components finish, but raise the original error
+            exc_type, exc_value, exc_traceback = sys.exc_info()
+            try:
+                c.close()
+            except Exception:
+                debug('error closing pipeline after error', exc_info=True)
+            raise exc_type, exc_value, exc_traceback
         c.close()
 
 
 class PipelineConnection(object):
+    """
+    Base class for the connections made by pipeline components. Subclasses
+    override :meth:`accept` to handle one row at a time, or
+    :meth:`accept_batch` to handle a list of rows at a time.
+
+    Rows are tuples, and a batch may be passed to several receivers, so
+    neither rows nor batches should be modified.
+
+    """
 
     def __init__(self, default_connections, keyed_connections, fields):
         self.default_connections = default_connections
         self.keyed_connections = keyed_connections
         self.fields = fields
 
+    def accept(self, row):
+        self.accept_batch([row])
+
+    def accept_batch(self, rows):
+        """
+        Accept a list of rows.
+
+        .. versionadded:: 0.26
+
+        """
+
+        for row in rows:
+            self.accept(row)
+
     def close(self):
         for c in self.default_connections:
             c.close()
@@ -75,13 +151,37 @@ class PipelineConnection(object):
         assert 1 <= len(args) <= 2, 'expected 1 or 2 arguments'
         if len(args) == 1:
             row = args[0]
+            if type(row) is not tuple:
+                row = tuple(row)
             for c in self.default_connections:
-                c.accept(tuple(row))
+                c.accept(row)
         elif len(args) == 2:
             key, row = args
             if key in self.keyed_connections:
+                if type(row) is not tuple:
+                    row = tuple(row)
                 for c in self.keyed_connections[key]:
-                    c.accept(tuple(row))
+                    c.accept(row)
+
+    def broadcast_batch(self, *args):
+        """
+        Pass a list of rows (tuples) to the connections on the default pipe,
+        or on the pipe for the given key if two arguments are given.
+
+        .. versionadded:: 0.26
+
+        """
+
+        assert 1 <= len(args) <= 2, 'expected 1 or 2 arguments'
+        if len(args) == 1:
+            rows = args[0]
+            for c in self.default_connections:
+                c.accept_batch(rows)
+        elif len(args) == 2:
+            key, rows = args
+            if key in self.keyed_connections:
+                for c in self.keyed_connections[key]:
+                    c.accept_batch(rows)
 
 
 def tocsv(filename, dialect=csv.excel, **kwargs):
@@ -132,10 +232,10 @@ class ToCsvConnection(PipelineConnection):
         self.writer = csv.writer(self.file, dialect=dialect, **kwargs)
         self.writer.writerow(fields)
 
-    def accept(self, row):
-        self.writer.writerow(row)
+    def accept_batch(self, rows):
+        self.writer.writerows(rows)
         # forward rows on the default pipe (behave like tee)
-        self.broadcast(row)
+        self.broadcast_batch(rows)
 
     def close(self):
         self.file.flush()
@@ -177,10 +277,11 @@ class ToPickleConnection(PipelineConnection):
         self.protocol = protocol
         pickle.dump(fields, self.file, self.protocol)
 
-    def accept(self, row):
-        pickle.dump(row, self.file, self.protocol)
+    def accept_batch(self, rows):
+        for row in rows:
+            pickle.dump(row, self.file, self.protocol)
         # forward rows on the default pipe (behave like tee)
-        self.broadcast(row)
+        self.broadcast_batch(rows)
 
     def close(self):
         self.file.flush()
@@ -224,18 +325,30 @@ class PartitionConnection(PipelineConnection):
 
     def __init__(self, default_connections, keyed_connections, fields, discriminator):
         super(PartitionConnection, self).__init__(default_connections, keyed_connections, fields)
-        if callable(discriminator):
+        self.hybrid = callable(discriminator)
+        if self.hybrid:
             self.discriminator = discriminator
         else: # assume field or fields
             self.discriminator = itemgetter(*asindices(fields, discriminator))
 
-    def accept(self, row):
-        row = HybridRow(row, self.fields)
-        key = self.discriminator(row)
-        self.broadcast(key, row)
+    def accept_batch(self, rows):
+        discriminator = self.discriminator
+        groups = OrderedDict()
+        for row in rows:
+            if self.hybrid:
+                key = discriminator(HybridRow(row, self.fields))
+            else:
+                key = discriminator(row)
+            try:
+                groups[key].append(row)
+            except KeyError:
+                groups[key] = [row]
+        for key, group in groups.iteritems():
+            self.broadcast_batch(key, group)
 
 
-def sort(key=None, reverse=False, buffersize=None):
+def sort(key=None, reverse=False, buffersize=None, memory=None, tempdir=None,
+         workers=None):
     """
     Sort rows based on some key field or fields. E.g.::
 
@@ -244,85 +357,161 @@ def sort(key=None, reverse=False, buffersize=None):
         >>> p.pipe(tocsv('sorted_by_foo.csv'))
         >>> p.push(sometable)
 
+    .. versionchanged:: 0.26
+
+    Rows are held in memory until their estimated size reaches `memory`
+    bytes (or there are `buffersize` rows, if given), then sorted and written
+    to a temporary file in `tempdir` as a chunk, in the block format used by
+    :func:`petl.sort`. If `memory` is `None`, the value of
+    `petl.transform.sorts.defaultmemory` is used (256 MiB by default). If
+    `workers` is greater than 1, chunks are sorted and written by a pool of
+    `workers` processes while further rows are pushed (see
+    :func:`petl.sort`). When the pipeline is closed the chunks are merged
+    with a heap, rather than by scanning the head of every chunk for each row
+    output, in several passes if there are more than
+    `petl.transform.sorts.defaultmaxfanin` chunks.
+
     """
 
-    return SortComponent(key=key, reverse=reverse, buffersize=buffersize)
+    return SortComponent(key=key, reverse=reverse, buffersize=buffersize,
+                         memory=memory, tempdir=tempdir, workers=workers)
 
 
 class SortComponent(PipelineComponent):
 
-    def __init__(self, key=None, reverse=False, buffersize=None):
+    def __init__(self, key=None, reverse=False, buffersize=None, memory=None,
+                 tempdir=None, workers=None):
         super(SortComponent, self).__init__()
         self.key = key
         self.reverse = reverse
         self.buffersize = buffersize
+        self.memory = memory
+        self.tempdir = tempdir
+        self.workers = workers
 
     def connect(self, fields):
         default_connections, keyed_connections = self._connect_receivers(fields)
         return SortConnection(default_connections, keyed_connections, fields, 
-                              self.key, self.reverse, self.buffersize)
+                              self.key, self.reverse, self.buffersize,
+                              self.memory, self.tempdir, self.workers)
 
 
 class SortConnection(PipelineConnection):
 
-    def __init__(self, default_connections, keyed_connections, fields, key, reverse, buffersize):
+    def __init__(self, default_connections, keyed_connections, fields, key,
+                 reverse, buffersize, memory=None, tempdir=None, workers=None):
         super(SortConnection, self).__init__(default_connections, keyed_connections, fields)
 
-        self.getkey = None
         if key is not None:
             # convert field selection into field indices
-            indices = asindices(fields, key)
-            # now use field indices to construct a _getkey function
-            # N.B., this will probably raise an exception on short rows
-            self.getkey = itemgetter(*indices)
+            self.indices = asindices(fields, key)
+        else:
+            self.indices = range(len(fields))
 
         self.reverse = reverse
-
-        if buffersize is None:
-            self.buffersize = petl.transform.sorts.defaultbuffersize
+        self.buffersize = buffersize
+        if memory is None:
+            self.memory = sorts.defaultmemory
+        else:
+            self.memory = memory
+        self.tempdir = tempdir
+        if workers is None:
+            self.workers = sorts.defaultworkers
         else:
-            self.buffersize = buffersize
+            self.workers = workers
 
         self.cache = list()
+        self.cachesize = 0
         self.chunkfiles = list()
-
-    def accept(self, row):
-        row = tuple(row)
-        if len(self.cache) < self.buffersize:
-            self.cache.append(row)
+        self.chunkkeytypes = list()
+        self.pool = None
+        self.pending = list()
+
+    def accept_batch(self, rows):
+        self.cache.extend(rows)
+        self.cachesize += sorts._estimatesize(rows)
+        if ((self.memory is not None and self.cachesize >= self.memory)
+                or (self.buffersize is not None
+                    and len(self.cache) >= self.buffersize)):
+            self._spill()
+            self.cache = list()
+            self.cachesize = 0
+
+    def _spill(self):
+        # N.B., the temporary file is owned by this process, and is opened by
+        # name to be written by a worker process or read for the merge
+        f = sorts.ChunkFile(self.tempdir)
+        self.chunkfiles.append(f)
+        if self.workers is not None and self.workers > 1:
+            if self.pool is None:
+                debug('sorting chunks with %s worker processes', self.workers)
+                self.pool = multiprocessing.Pool(self.workers)
+            self.pending.append(self.pool.apply_async(
+                sorts._sortchunk,
+                (self.cache, self.indices, self.reverse, f.name,
+                 sorts.defaultblocksize, sorts.defaultcompresslevel)
+            ))
+            # don't let chunks pile up in memory faster than the workers can
+            # deal with them
+            if len(self.pending) >= self.workers:
+                self.chunkkeytypes.append(self._wait(self.pending.pop(0)))
         else:
-            # sort and dump the chunk
-            self.cache.sort(key=self.getkey, reverse=self.reverse)
-            f = NamedTemporaryFile() # TODO need not be named
-            for r in self.cache:
-                pickle.dump(r, f, protocol=-1)
-            f.flush()
-            f.seek(0)
-            self.chunkfiles.append(f)
-            self.cache = [row]
-        
+            getkey, keytypes = sorts._chunkgetkey(self.cache, self.indices)
+            self.cache.sort(key=getkey, reverse=self.reverse)
+            f.write(self.cache)
+            self.chunkkeytypes.append(keytypes)
+        debug('spilled chunk of %s rows to %r', len(self.cache), f.name)
+
+    def _wait(self, result):
+        # N.B., get() re-raises any exception from a worker process
+        try:
+            return result.get()
+        except:
+            self._terminate()
+            raise
+
+    def _terminate(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
     def close(self):
         # sort anything remaining in the cache
-        self.cache.sort(key=self.getkey, reverse=self.reverse)
+        getkey, keytypes = sorts._chunkgetkey(self.cache, self.indices)
+        self.cache.sort(key=getkey, reverse=self.reverse)
         if self.chunkfiles:
-            chunkiters = [iterchunk(f) for f in self.chunkfiles]
+            # wait for all chunks to be written
+            for result in self.pending:
+                self.chunkkeytypes.append(self._wait(result))
+            self.pending = list()
+            if self.pool is not None:
+                self.pool.close()
+                self._terminate()
+            # N.B., leave room in the final merge for the rows in the cache
+            self.chunkfiles, self.chunkkeytypes = sorts.mergechunks(
+                self.chunkfiles, self.chunkkeytypes, self.indices,
+                self.reverse, maxfanin=sorts.defaultmaxfanin - 1,
+                tempdir=self.tempdir
+            )
+            chunkiters = [sorts.iterchunk(f) for f in self.chunkfiles]
             chunkiters.append(self.cache) # make sure any left in cache are included
-            for row in shortlistmergesorted(self.getkey, self.reverse, *chunkiters):
-                self.broadcast(row)
+            chunkkeytypes = self.chunkkeytypes
+            if self.cache:
+                chunkkeytypes = chunkkeytypes + [keytypes]
+            getkey = sorts._mergegetkey(chunkkeytypes, self.indices)
+            rows = sorts._mergesorted(getkey, self.reverse, *chunkiters)
         else:
-            for row in self.cache:
-                self.broadcast(row)
+            rows = self.cache
+        for batch in iterbatches(rows, defaultbatchsize):
+            self.broadcast_batch(batch)
+        self.cache = list()
+        for f in self.chunkfiles:
+            f.close()  # deletes the file
+        self.chunkfiles = list()
         super(SortConnection, self).close()
     
 
-def iterchunk(f):
-    try:
-        while True:
-            yield pickle.load(f)
-    except EOFError:
-        pass
-
-
 def duplicates(key):
     """
     Report rows with duplicate key values. E.g.::
@@ -535,17 +724,725 @@ class DiffComponent(PipelineComponent):
                         except StopIteration:
                             b = None
 
+        for c in default_connections:
+            c.close()
+        for k in keyed_connections:
+            for c in keyed_connections[k]:
+                c.close()
+
+
+class _BatchSource(RowContainer):
+    # a table made of the given header and the current batch of rows, over
+    # which row-local views are evaluated one batch at a time
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self.rows = ()
+
+    def __iter__(self):
+        yield self.fields
+        for row in self.rows:
+            yield row
+
+
+def transform(factory):
+    """
+    Push rows through a row-local transformation, i.e., one which transforms
+    each row independently of every other row. The `factory` is a function
+    which, given a table, returns the transformed table, and is applied to
+    each batch of rows in turn. E.g.::
+
+        >>> from petl import convert
+        >>> from petl.push import transform, tocsv
+        >>> p = transform(lambda t: convert(t, 'bar', int))
+        >>> p.pipe(tocsv('converted.csv'))
+        >>> p.push(sometable)
+
+    N.B., transformations which aren't row-local, e.g., :func:`petl.sort` or
+    :func:`petl.head`, give incorrect results, as they are applied to each
+    batch separately.
+
+    .. versionadded:: 0.26
+
+    """
+
+    return TransformComponent(factory)
+
+
+class TransformComponent(PipelineComponent):
+
+    def __init__(self, factory):
+        super(TransformComponent, self).__init__()
+        self.factory = factory
+
+    def connect(self, fields):
+        source = _BatchSource(fields)
+        # the output header is found by transforming an empty batch
+        outflds = tuple(iter(self.factory(source)).next())
+        default_connections, keyed_connections = self._connect_receivers(outflds)
+        return TransformConnection(default_connections, keyed_connections,
+                                   outflds, self.factory, source)
+
+
+class TransformConnection(PipelineConnection):
+
+    def __init__(self, default_connections, keyed_connections, fields,
+                 factory, source):
+        super(TransformConnection, self).__init__(default_connections, keyed_connections, fields)
+        self.factory = factory
+        self.source = source
+
+    def accept_batch(self, rows):
+        self.source.rows = rows
+        it = iter(self.factory(self.source))
+        it.next()  # header
+        out = [row if type(row) is tuple else tuple(row) for row in it]
+        self.source.rows = ()
+        if out:
+            self.broadcast_batch(out)
+
+
+def cut(*args, **kwargs):
+    """
+    Push rows through :func:`petl.cut`. E.g.::
+
+        >>> from petl.push import cut, tocsv
+        >>> p = cut('foo', 'bar')
+        >>> p.pipe(tocsv('foobar.csv'))
+        >>> p.push(sometable)
+
+    .. versionadded:: 0.26
+
+    """
+
+    return transform(lambda t: petl.transform.cut(t, *args, **kwargs))
+
+
+def cutout(*args, **kwargs):
+    """
+    Push rows through :func:`petl.cutout`, see also :func:`cut`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    return transform(lambda t: petl.transform.cutout(t, *args, **kwargs))
+
+
+def select(*args, **kwargs):
+    """
+    Push rows through :func:`petl.select`. E.g.::
+
+        >>> from petl.push import select, tocsv
+        >>> p = select('foo', lambda v: v > 2)
+        >>> p.pipe(tocsv('selected.csv'))
+        >>> p.push(sometable)
+
+    .. versionadded:: 0.26
+
+    """
+
+    return transform(lambda t: petl.transform.select(t, *args, **kwargs))
+
+
+def convert(*args, **kwargs):
+    """
+    Push rows through :func:`petl.convert`. E.g.::
+
+        >>> from petl.push import convert, tocsv
+        >>> p = convert('bar', int)
+        >>> p.pipe(tocsv('converted.csv'))
+        >>> p.push(sometable)
+
+    .. versionadded:: 0.26
+
+    """
+
+    return transform(lambda t: petl.transform.convert(t, *args, **kwargs))
+
+
+def rename(*args, **kwargs):
+    """
+    Push rows through :func:`petl.rename`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    return transform(lambda t: petl.transform.rename(t, *args, **kwargs))
+
+
+def addfield(*args, **kwargs):
+    """
+    Push rows through :func:`petl.addfield`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    return transform(lambda t: petl.transform.addfield(t, *args, **kwargs))
+
+
+def fieldmap(*args, **kwargs):
+    """
+    Push rows through :func:`petl.fieldmap`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    return transform(lambda t: petl.transform.fieldmap(t, *args, **kwargs))
+
+
+def rowmap(*args, **kwargs):
+    """
+    Push rows through :func:`petl.rowmap`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    return transform(lambda t: petl.transform.rowmap(t, *args, **kwargs))
+
+
+def hashjoin(right, key=None, lkey=None, rkey=None, lprefix=None,
+             rprefix=None):
+    """
+    Join the rows pushed through the pipeline (the left table) with the
+    `right` table, which is held in memory, see :func:`petl.hashjoin`. E.g.::
+
+        >>> from petl.push import hashjoin, tocsv
+        >>> p = hashjoin(countries, 'country_id')
+        >>> p.pipe(tocsv('joined.csv'))
+        >>> p.push(sales)
+
+    .. versionadded:: 0.26
+
+    """
+
+    return HashJoinComponent(right, key=key, lkey=lkey, rkey=rkey,
+                             lprefix=lprefix, rprefix=rprefix)
+
+
+def hashleftjoin(right, key=None, lkey=None, rkey=None, missing=None,
+                 lprefix=None, rprefix=None):
+    """
+    Left join the rows pushed through the pipeline with the `right` table,
+    which is held in memory, see :func:`petl.hashleftjoin` and
+    :func:`hashjoin`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    return HashJoinComponent(right, key=key, lkey=lkey, rkey=rkey,
+                             lprefix=lprefix, rprefix=rprefix,
+                             leftouter=True, missing=missing)
+
+
+class HashJoinComponent(TransformComponent):
+
+    def __init__(self, right, key=None, lkey=None, rkey=None, lprefix=None,
+                 rprefix=None, leftouter=False, missing=None):
+        super(HashJoinComponent, self).__init__(None)
+        self.right = right
+        self.key = key
+        self.lkey = lkey
+        self.rkey = rkey
+        self.lprefix = lprefix
+        self.rprefix = rprefix
+        self.leftouter = leftouter
+        self.missing = missing
+
+    def connect(self, fields):
+        lkey, rkey = keys_from_args([fields], self.right, self.key, self.lkey,
+                                    self.rkey)
+        # the right table is read once, N.B., the join functions only need its
+        # header
+        rlookup = lookup(self.right, rkey)
+        right = [tuple(header(self.right))]
+        if self.leftouter:
+            self.factory = lambda left: iterhashleftjoin(
+                left, right, lkey, rkey, self.missing, rlookup, self.lprefix,
+                self.rprefix
+            )
+        else:
+            self.factory = lambda left: iterhashjoin(
+                left, right, lkey, rkey, rlookup, self.lprefix, self.rprefix
+            )
+        return super(HashJoinComponent, self).connect(fields)
+
+
+def aggregate(key, aggregation=None, value=None, maxkeys=None,
+              tempdir=None):
+    """
+    Group rows under the given key then apply aggregation functions, see
+    :func:`petl.aggregate`. The aggregation is computed incrementally as rows
+    are pushed, by keeping the state of each aggregator for each distinct key
+    (as with ``hashed=True``), and rows are output in key order once the
+    pipeline is closed. E.g.::
+
+        >>> from petl.push import aggregate, tocsv
+        >>> p = aggregate('fruit', {'total': ('sales', sum),
+        ...                         'count': len})
+        >>> p.pipe(tocsv('fruit_totals.csv'))
+        >>> p.push(sometable)
+
+    .. versionadded:: 0.26
+
+    """
+
+    return AggregateComponent(key, aggregation=aggregation, value=value,
+                              maxkeys=maxkeys, tempdir=tempdir)
+
+
+class AggregateComponent(PipelineComponent):
+
+    def __init__(self, key, aggregation=None, value=None, maxkeys=None,
+                 tempdir=None):
+        super(AggregateComponent, self).__init__()
+        self.key = key
+        self.aggregation = aggregation
+        self.value = value
+        self.maxkeys = maxkeys
+        self.tempdir = tempdir
+
+    def connect(self, fields):
+        key = self.key
+        if callable(self.aggregation):
+            outflds = _simpleaggregateheader(key)
+            getvalues = [_getvaluefun(fields, self.value)]
+            aggregators = [aggregator(self.aggregation)]
+            hybrid = self.value is None
+        elif isinstance(self.aggregation, (list, tuple, dict)):
+            if isinstance(self.aggregation, dict):
+                aggregation = self.aggregation
+            else:
+                aggregation = OrderedDict()
+                for t in self.aggregation:
+                    aggregation[t[0]] = t[1:]
+            aggregation = _normaliseaggregation(aggregation)
+            outflds = _multiaggregateheader(key, aggregation)
+            getvalues, aggregators = _multiaggregators(fields, aggregation)
+            hybrid = any(srcfld is None
+                         for srcfld, _ in aggregation.values())
+        else:
+            raise Exception('expected aggregation is callable, list, tuple or '
+                            'dict')
+        # N.B., key and value functions which are given whole rows get hybrid
+        # rows, as with petl.aggregate
+        hybrid = hybrid or callable(key)
+        state = HashAggregation(_getkeyfun(fields, key), getvalues,
+                                aggregators, maxkeys=self.maxkeys,
+                                tempdir=self.tempdir)
+        default_connections, keyed_connections = self._connect_receivers(outflds)
+        return AggregateConnection(default_connections, keyed_connections,
+                                   fields, state, hybrid,
+                                   isinstance(key, (list, tuple)))
+
+
+class AggregateConnection(PipelineConnection):
+
+    def __init__(self, default_connections, keyed_connections, fields, state,
+                 hybrid, compoundkey):
+        super(AggregateConnection, self).__init__(default_connections, keyed_connections, fields)
+        self.state = state
+        self.hybrid = hybrid
+        self.compoundkey = compoundkey
+
+    def accept_batch(self, rows):
+        if self.hybrid:
+            rows = [HybridRow(row, self.fields) for row in rows]
+        self.state.update(rows)
+
+    def close(self):
+        if self.compoundkey:
+            rows = (tuple(k) + tuple(vals) for k, vals in self.state)
+        else:
+            rows = ((k,) + tuple(vals) for k, vals in self.state)
+        for batch in iterbatches(rows, defaultbatchsize):
+            self.broadcast_batch(batch)
+        super(AggregateConnection, self).close()
+
+
+def buffered(component, maxsize=None):
+    """
+    Run the given component, and everything downstream of it, in a separate
+    thread, behind a queue holding at most `maxsize` rows. E.g.::
+
+        >>> from petl.push import buffered, convert, tocsv
+        >>> p = convert('bar', int)
+        >>> p.pipe(buffered(tocsv('/mnt/nfs/example.csv'), maxsize=10000))
+        >>> p.push(sometable)
+
+    Pushing a batch of rows only blocks while the queue is full, so a slow
+    branch, e.g., writing to a network file system or a database, overlaps
+    with reading the source and with the work of other branches. Receivers
+    piped to the returned component are piped to `component`, so also run in
+    the separate thread.
+
+    When the pipeline is closed, any rows still queued are passed on and the
+    component is closed before :meth:`push` returns. An exception raised in
+    the thread is raised again in the pushing thread, by the next push of a
+    batch or by closing.
+
+    .. versionadded:: 0.26
+
+    """
+
+    return BufferedComponent(component, maxsize)
+
+
+class BufferedComponent(PipelineComponent):
+
+    def __init__(self, component, maxsize=None):
+        super(BufferedComponent, self).__init__()
+        self.component = component
+        if maxsize is None:
+            self.maxsize = defaultqueuesize
+        else:
+            self.maxsize = maxsize
+
+    def pipe(self, *args):
+        return self.component.pipe(*args)
+
+    def connect(self, fields):
+        return BufferedConnection(self.component, fields, self.maxsize)
+
+
+class _RowQueue(object):
+    # a queue of batches of rows, bounded by the total number of rows, N.B.,
+    # a batch larger than the bound may be put into an empty queue
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.size = 0
+        self.batches = deque()
+        self.condition = threading.Condition()
+
+    def put(self, batch, n):
+        with self.condition:
+            while self.size and self.size + n > self.maxsize:
+                self.condition.wait()
+            self.batches.append((batch, n))
+            self.size += n
+            self.condition.notify_all()
+
+    def get(self):
+        with self.condition:
+            while not self.batches:
+                self.condition.wait()
+            batch, n = self.batches.popleft()
+            self.size -= n
+            self.condition.notify_all()
+            return batch
+
+
+class BufferedConnection(PipelineConnection):
+
+    def __init__(self, component, fields, maxsize):
+        super(BufferedConnection, self).__init__([], {}, fields)
+        self.queue = _RowQueue(maxsize)
+        self.errors = []
+        self.thread = threading.Thread(target=self._work,
+                                       args=(component, fields))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _work(self, component, fields):
+        # N.B., connect in this thread, as some connections (e.g., to sqlite3
+        # databases) may only be used in the thread which made them
+        batch = ()
+        try:
+            c = component.connect(fields)
+            batch = self.queue.get()
+            while batch is not None:
+                c.accept_batch(batch)
+                batch = self.queue.get()
+            c.close()
+        except Exception:
+            self.errors.append(sys.exc_info())
+            # keep taking batches so the pushing thread doesn't block
+            while batch is not None:
+                batch = self.queue.get()
+
+    def _raise(self):
+        exc_type, exc_value, exc_traceback = self.errors[0]
+        raise exc_type, exc_value, exc_traceback
+
+    def accept_batch(self, rows):
+        if self.errors:
+            self._raise()
+        self.queue.put(rows, len(rows))
+
+    def close(self):
+        self.queue.put(None, 0)
+        self.thread.join()
+        debug('buffered branch closed')
+        if self.errors:
+            self._raise()
+
+
+def tojson(source=None, prefix=None, suffix=None, *args, **kwargs):
+    """
+    Push rows to a JSON file, as JSON objects, see :func:`petl.tojson`.
+    Rows are written as they are pushed, rather than being loaded into memory
+    first. E.g.::
+
+        >>> from petl.push import tojson
+        >>> p = tojson('example.json')
+        >>> p.push(sometable)
+
+    .. versionadded:: 0.26
+
+    """
+
+    return ToJsonComponent(source, prefix, suffix, *args, **kwargs)
+
+
+class ToJsonComponent(PipelineComponent):
+
+    def __init__(self, source, prefix, suffix, *args, **kwargs):
+        super(ToJsonComponent, self).__init__()
+        self.source = source
+        self.prefix = prefix
+        self.suffix = suffix
+        self.args = args
+        self.kwargs = kwargs
+
+    def connect(self, fields):
+        default_connections, keyed_connections = self._connect_receivers(fields)
+        return ToJsonConnection(default_connections, keyed_connections, fields,
+                                self.source, self.prefix, self.suffix,
+                                JSONEncoder(*self.args, **self.kwargs))
+
+
+class ToJsonConnection(PipelineConnection):
+
+    def __init__(self, default_connections, keyed_connections, fields, source,
+                 prefix, suffix, encoder):
+        super(ToJsonConnection, self).__init__(default_connections, keyed_connections, fields)
+        self.encoder = encoder
+        self.suffix = suffix
+        # N.B., sources return either files or context managers giving files
+        self.context = write_source_from_arg(source).open_('wb')
+        self.file = self.context.__enter__()
+        if prefix is not None:
+            self.file.write(prefix)
+        self.file.write('[')
+        self.separator = ''
+
+    def accept_batch(self, rows):
+        encode = self.encoder.encode
+        fields = self.fields
+        chunks = list()
+        for row in rows:
+            chunks.append(self.separator)
+            chunks.append(encode(asdict(fields, row)))
+            self.separator = self.encoder.item_separator
+        self.file.write(''.join(chunks))
+        # forward rows on the default pipe (behave like tee)
+        self.broadcast_batch(rows)
+
+    def close(self):
+        self.file.write(']')
+        if self.suffix is not None:
+            self.file.write(self.suffix)
+        self.context.__exit__(None, None, None)
+        super(ToJsonConnection, self).close()
+
+
+def tosqlite3(filename_or_connection, tablename, create=False, commit=True,
+              multirow=False, commitinterval=None):
+    """
+    Push rows to a table in an :mod:`sqlite3` database, truncating the table
+    first, see :func:`petl.tosqlite3`. E.g.::
+
+        >>> from petl.push import tosqlite3
+        >>> p = tosqlite3('test.db', 'foobar', create=True)
+        >>> p.push(sometable)
+
+    Rows are inserted as each batch is pushed. If `commitinterval` is given,
+    the transaction is committed each time at least that many rows have been
+    inserted, and is committed when the pipeline is closed.
+
+    .. versionadded:: 0.26
+
+    """
+
+    return ToDbComponent(_sqlite3cursor, filename_or_connection, tablename,
+                         create=create, truncate=True, commit=commit,
+                         multirow=multirow, commitinterval=commitinterval)
+
+
+def appendsqlite3(filename_or_connection, tablename, commit=True,
+                  multirow=False, commitinterval=None):
+    """
+    Push rows to an existing table in an :mod:`sqlite3` database, see
+    :func:`petl.appendsqlite3` and :func:`tosqlite3`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    return ToDbComponent(_sqlite3cursor, filename_or_connection, tablename,
+                         commit=commit, multirow=multirow,
+                         commitinterval=commitinterval)
+
+
+def todb(dbo, tablename, schema=None, commit=True, multirow=False,
+         commitinterval=None):
+    """
+    Push rows to an existing database table, truncating the table first, see
+    :func:`petl.todb`. The `dbo` argument may be a DB-API 2.0 connection or
+    cursor, or a function returning cursors. E.g.::
+
+        >>> import sqlite3
+        >>> from petl.push import todb
+        >>> p = todb(sqlite3.connect('test.db'), 'foobar')
+        >>> p.push(sometable)
+
+    See also :func:`tosqlite3` for the `commit`, `multirow` and
+    `commitinterval` arguments. N.B., SQLAlchemy objects are not supported.
+
+    .. versionadded:: 0.26
+
+    """
+
+    return ToDbComponent(_dbcursor, dbo, tablename, schema=schema,
+                         truncate=True, commit=commit, multirow=multirow,
+                         commitinterval=commitinterval)
+
+
+def appenddb(dbo, tablename, schema=None, commit=True, multirow=False,
+             commitinterval=None):
+    """
+    Push rows to an existing database table, see :func:`petl.appenddb` and
+    :func:`todb`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    return ToDbComponent(_dbcursor, dbo, tablename, schema=schema,
+                         commit=commit, multirow=multirow,
+                         commitinterval=commitinterval)
+
+
+def _sqlite3cursor(filename_or_connection):
+    # returns a cursor, its connection, the paramstyle, and whether the
+    # connection was opened here (so should be closed)
+    if isinstance(filename_or_connection, basestring):
+        connection = sqlite3.connect(filename_or_connection)
+        return connection.cursor(), connection, 'qmark', True
+    elif isinstance(filename_or_connection, sqlite3.Connection):
+        connection = filename_or_connection
+        return connection.cursor(), connection, 'qmark', False
+    else:
+        raise Exception('filename_or_connection argument must be filename or '
+                        'connection; found %r' % filename_or_connection)
+
+
+def _dbcursor(dbo):
+    if _is_dbapi_connection(dbo):
+        debug('assuming %r is standard DB-API 2.0 connection', dbo)
+        cursor = dbo.cursor()
+    elif _is_dbapi_cursor(dbo):
+        debug('assuming %r is standard DB-API 2.0 cursor', dbo)
+        cursor = dbo
+    elif callable(dbo) and not hasattr(dbo, 'contextual_connect'):
+        debug('assuming %r is a function returning standard DB-API 2.0 '
+              'cursor objects', dbo)
+        cursor = dbo()
+    else:
+        raise ValueError('unsupported database object type: %r' % dbo)
+    # N.B., we depend on this optional DB-API 2.0 attribute being implemented
+    assert hasattr(cursor, 'connection'), \
+        'could not obtain connection via cursor'
+    connection = cursor.connection
+    return cursor, connection, _paramstyle(connection), False
+
+
+class ToDbComponent(PipelineComponent):
+
+    def __init__(self, getcursor, dbo, tablename, schema=None, create=False,
+                 truncate=False, commit=True, multirow=False,
+                 commitinterval=None):
+        super(ToDbComponent, self).__init__()
+        self.getcursor = getcursor
+        self.dbo = dbo
+        self.tablename = tablename
+        self.schema = schema
+        self.create = create
+        self.truncate = truncate
+        self.commit = commit
+        self.multirow = multirow
+        self.commitinterval = commitinterval
+
+    def connect(self, fields):
+        default_connections, keyed_connections = self._connect_receivers(fields)
+        cursor, connection, paramstyle, owned = self.getcursor(self.dbo)
+        return ToDbConnection(default_connections, keyed_connections, fields,
+                              self, cursor, connection, paramstyle, owned)
+
+
+class ToDbConnection(PipelineConnection):
+
+    def __init__(self, default_connections, keyed_connections, fields,
+                 component, cursor, connection, paramstyle, owned):
+        super(ToDbConnection, self).__init__(default_connections, keyed_connections, fields)
+        self.cursor = cursor
+        self.connection = connection
+        self.paramstyle = paramstyle
+        self.owned = owned
+        self.commit = component.commit
+        self.multirow = component.multirow
+        self.commitinterval = component.commitinterval
+        self.uncommitted = 0
+
+        # sanitise table and field names
+        tablename = _quote(component.tablename)
+        if component.schema is not None:
+            tablename = _quote(component.schema) + '.' + tablename
+        colnames = [_quote(n) for n in map(str, fields)]
+        self.ncols = len(colnames)
+        self.makequery = _insertquery(tablename, colnames)
+
+        if component.create:  # force table creation
+            cursor.execute(u'DROP TABLE IF EXISTS %s' % tablename)
+            cursor.execute(u'CREATE TABLE %s (%s)'
+                           % (tablename, ', '.join(colnames)))
+        if component.truncate:
+            truncatequery = SQL_TRUNCATE_QUERY % tablename
+            debug('truncate the table via query %r', truncatequery)
+            cursor.execute(truncatequery)
+
+    def accept_batch(self, rows):
+        _insertbatches([rows], self.cursor.execute, self.cursor.executemany,
+                       self.makequery, self.ncols, self.paramstyle,
+                       multirow=self.multirow)
+        self.uncommitted += len(rows)
+        if (self.commit and self.commitinterval is not None
+                and self.uncommitted >= self.commitinterval):
+            self.connection.commit()
+            self.uncommitted = 0
+        # forward rows on the default pipe (behave like tee)
+        self.broadcast_batch(rows)
+
+    def close(self):
+        if self.commit:
+            debug('commit transaction')
+            self.connection.commit()
+        if self.owned:
+            self.connection.close()
+        super(ToDbConnection, self).close()
 
 
 # TODO standard components (one in, one out)...
 # totext
-# tosqlite3
-# todb
 # toxml
-# tojson
 # todicts
 # tolist
-# rename
 # setheader
 # extendheader
 # pushheader
@@ -554,44 +1451,6 @@ class DiffComponent(PipelineComponent):
 # rowslice
 # head
 # tail
-# cut
-# cutout
-# select
-# selectop
-# selecteq
-# selectne
-# selectlt
-# selectle
-# selectgt
-# selectge
-# selectrangeopen
-# selectrangeopenleft
-# selectrangeopenright
-# selectrangeclosed
-# selectin
-# selectnotin
-# selectis
-# selectisnot
-# selectre
-# rowselect
-# rowlenselect
-# fieldselect
-# replace
-# replaceall
-# convert
-# convertall
-# fieldconvert
-# convertnumbers
-# resub
-# extend
-# capture
-# split
-# unpack
-# fieldmap
-# rowmap
-# rowmapmany
-# sort
-# aggregate
 # rangeaggregate
 # rangecounts
 # rowreduce
@@ -610,11 +1469,11 @@ class DiffComponent(PipelineComponent):
 
 # TODO special components (many in)...
 # cat (no point?)
-# joins
+# joins other than hashjoin and hashleftjoin
 # complement (default pipe is complement, 'remainder' is the rest)
 # recordcomplement
 # recorddiff
 # intersection
 # mergesort
 # merge
-# 
+#
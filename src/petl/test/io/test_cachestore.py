@@ -0,0 +1,147 @@
+from __future__ import absolute_import, print_function, division
+
+
+__author__ = 'Alistair Miles <alimanfoo@googlemail.com>'
+
+
+import os
+import time
+import shutil
+import sqlite3
+import tempfile
+from itertools import islice
+
+
+from nose.tools import eq_, assert_raises
+
+
+from petl.testutils import ieq
+from petl.util import cache
+from petl.io.csv import fromcsv, tocsv
+from petl.io.db import fromdb
+from petl.io.sources import URLSource
+from petl.io.cachestore import fingerprint, FingerprintError, evict
+from petl.transform.sorts import sort
+from petl.transform.basics import cut
+from petl.transform.selects import select
+from petl.transform.conversions import convert
+
+
+def _entries(store):
+    return sorted(name for name in os.listdir(store))
+
+
+def test_fingerprint():
+
+    table = [['foo', 'bar'], ['a', '1'], ['b', '2']]
+    eq_(fingerprint(cut(table, 'foo')), fingerprint(cut(table, 'foo')))
+    assert fingerprint(cut(table, 'foo')) != fingerprint(cut(table, 'bar'))
+    assert fingerprint(table) != fingerprint(table[:2])
+    # functions are identified by their code and closure
+    eq_(fingerprint(select(table, lambda rec: rec.foo == 'a')),
+        fingerprint(select(table, lambda rec: rec.foo == 'a')))
+    assert fingerprint(select(table, lambda rec: rec.foo == 'a')) \
+        != fingerprint(select(table, lambda rec: rec.foo == 'b'))
+    eq_(fingerprint(convert(table, 'bar', int)),
+        fingerprint(convert(table, 'bar', int)))
+    assert fingerprint(convert(table, 'bar', int)) \
+        != fingerprint(convert(table, 'bar', float))
+    # caches held by views are ignored
+    t = sort(table, 'foo')
+    f = fingerprint(t)
+    list(t)
+    eq_(f, fingerprint(t))
+    # tables which can't be identified
+    assert_raises(FingerprintError, fingerprint,
+                  fromcsv(URLSource('http://example.com/foo.csv')))
+    assert_raises(FingerprintError, fingerprint,
+                  fromdb(sqlite3.connect(':memory:'), 'select 1'))
+
+
+def test_cache_store():
+
+    store = tempfile.mkdtemp()
+    fn = os.path.join(store, 'test.csv')
+    try:
+        table = (('foo', 'bar'), ('b', '2'), ('a', '1'), ('c', '3'))
+        tocsv(table, fn)
+        expect = sort(table, 'foo')
+        d = os.path.join(store, 'cache')
+
+        t1 = cache(sort(fromcsv(fn), 'foo'), store=d)
+        ieq(expect, t1)
+        eq_(1, len(_entries(d)))
+        eq_(4, len(t1))
+        eq_(('c', '3'), t1[-1])
+
+        # an identical table in a later run is served from the store
+        t2 = cache(sort(fromcsv(fn), 'foo'), store=d)
+        it = iter(t2)
+        it.next()
+        assert t2._store is not None
+        ieq(expect, t2)
+
+        # but not a different transformation, or a changed file
+        ieq(cut(expect, 'bar'), cache(cut(sort(fromcsv(fn), 'foo'), 'bar'),
+                                      store=d))
+        eq_(2, len(_entries(d)))
+        table = table + (('d', '4'),)
+        tocsv(table, fn)
+        t3 = cache(sort(fromcsv(fn), 'foo'), store=d)
+        ieq(sort(table, 'foo'), t3)
+        eq_(3, len(_entries(d)))
+
+        # an incomplete iteration leaves no entry behind
+        t4 = cache(sort(fromcsv(fn), 'bar'), store=d)
+        list(islice(t4, 2))
+        del t4
+        eq_(3, len(_entries(d)))
+
+    finally:
+        shutil.rmtree(store)
+
+
+def test_cache_store_key():
+
+    store = tempfile.mkdtemp()
+    try:
+        connection = sqlite3.connect(':memory:')
+        connection.execute('create table foobar (foo, bar)')
+        connection.execute("insert into foobar values ('a', 1)")
+        table = fromdb(connection, 'select * from foobar')
+        assert_raises(FingerprintError, list, cache(table, store=store))
+        t = cache(table, store=store, key=('foobar', 1))
+        ieq((('foo', 'bar'), ('a', 1)), t)
+        connection.execute("insert into foobar values ('b', 2)")
+        # served from the store, as the key is the same
+        ieq((('foo', 'bar'), ('a', 1)), cache(table, store=store,
+                                              key=('foobar', 1)))
+        ieq((('foo', 'bar'), ('a', 1), ('b', 2)),
+            cache(table, store=store, key=('foobar', 2)))
+    finally:
+        shutil.rmtree(store)
+
+
+def test_evict():
+
+    store = tempfile.mkdtemp()
+    try:
+        table = [('foo',)] + [(i,) for i in range(100)]
+        for i in range(3):
+            list(cache(table[:i+50], store=store))
+        names = _entries(store)
+        eq_(3, len(names))
+        # make the first entry the least recently used
+        for i, name in enumerate(names):
+            t = time.time() - 100 + i
+            os.utime(os.path.join(store, name), (t, t))
+        size = sum(os.path.getsize(os.path.join(store, name))
+                   for name in names)
+        evict(store, size - 1)
+        eq_(names[1:], _entries(store))
+        # the newest entry is kept even if larger than the store size
+        list(cache(table, store=store, storesize=1))
+        eq_(1, len(_entries(store)))
+        ieq(table, cache(table, store=store))
+    finally:
+        shutil.rmtree(store)
@@ -8,10 +8,12 @@ from tempfile import NamedTemporaryFile
 import csv
 import gzip
 import os
+from nose.tools import eq_
 
 
 from petl.testutils import ieq
-from petl.io.csv import fromcsv, fromtsv, tocsv, appendcsv, totsv, appendtsv
+from petl.io.csv import fromcsv, fromtsv, tocsv, appendcsv, totsv, appendtsv, \
+    iterrecordblocks, convertcolumns
 
 
 def test_fromcsv():
@@ -237,3 +239,105 @@ def test_tocsv_appendcsv_gz():
         ieq(expect, actual)
     finally:
         o.close()
+
+
+def test_fromcsv_types():
+
+    f = NamedTemporaryFile(delete=False)
+    writer = csv.writer(f)
+    table = (('foo', 'bar', 'baz'),
+             ('a', 1, 2.5),
+             ('b', 2, ''),
+             ('c', 'x', 3))
+    for row in table:
+        writer.writerow(row)
+    f.close()
+
+    actual = fromcsv(f.name, types={'bar': int, 2: float})
+    expect = (('foo', 'bar', 'baz'),
+              ('a', 1, 2.5),
+              ('b', 2, ''),
+              ('c', 'x', 3.))
+    ieq(expect, actual)
+    ieq(expect, actual)
+
+    # inferred from the first block
+    actual = fromcsv(f.name, types=True)
+    expect = (('foo', 'bar', 'baz'),
+              ('a', '1', 2.5),
+              ('b', '2', ''),
+              ('c', 'x', 3.))
+    ieq(expect, actual)
+
+
+def test_fromcsv_workers():
+
+    table = [('foo', 'bar', 'baz')]
+    for i in range(1000):
+        table.append(('a "quoted"\nvalue %s' % i, i, i / 2))
+    table.append(('short',))
+    for fn in 'tmp/test_fromcsv_workers.csv', 'tmp/test_fromcsv_workers.csv.gz':
+        tocsv(table, fn)
+        expect = [tuple(str(v) for v in row) for row in table]
+        actual = fromcsv(fn, workers=2, blocksize=256)
+        ieq(expect, actual)
+        ieq(expect, actual)
+        actual = fromcsv(fn, workers=2, blocksize=100, types=True)
+        expect = [table[0]] + table[1:-1] + [('short',)]
+        ieq(expect, actual)
+
+
+def test_fromcsv_workers_readahead():
+
+    from StringIO import StringIO
+    from contextlib import contextmanager
+
+    class CountingSource(object):
+
+        def __init__(self, data):
+            self.data = data
+            self.nread = 0
+
+        @contextmanager
+        def open_(self, mode='r'):
+            source = self
+
+            class CountingFile(StringIO):
+                def read(self, n=-1):
+                    data = StringIO.read(self, n)
+                    source.nread += len(data)
+                    return data
+
+            yield CountingFile(self.data)
+
+    lines = ['foo,bar\n'] + ['a%06d,%06d\n' % (i, i) for i in range(100000)]
+    source = CountingSource(''.join(lines))
+    it = iter(fromcsv(source, workers=2, blocksize=1000))
+    eq_(('foo', 'bar'), it.next())
+    eq_(('a000000', '000000'), it.next())
+    eq_(('a000001', '000001'), it.next())
+    # the first block, plus no more than twice as many blocks as workers, plus
+    # the block being yielded
+    assert source.nread <= 6 * 1000, source.nread
+    it.close()
+
+
+def test_iterrecordblocks():
+
+    from StringIO import StringIO
+    data = 'a,b\n"x\n""y""\nz",1\n"p",2\nq,3'
+    blocks = list(iterrecordblocks(StringIO(data), 6, '"'))
+    assert ''.join(blocks) == data
+    for block in blocks:
+        rows = list(csv.reader(StringIO(block)))
+        assert all(len(row) == 2 for row in rows), rows
+
+
+def test_convertcolumns():
+
+    rows = [('1', '2.5', 'a'), ('x', '3', 'b')]
+    eq = lambda a, b: list(map(tuple, a)) == list(map(tuple, b))
+    assert eq([(1, 2.5, 'a'), ('x', 3., 'b')],
+              convertcolumns(rows, [int, float, None]))
+    rows = [('1', '2.5'), ('2',)]
+    assert eq([(1, 2.5), (2,)], convertcolumns(rows, [int, float]))
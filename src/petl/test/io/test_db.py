@@ -12,11 +12,12 @@ __author__ = 'Alistair Miles <alimanfoo@googlemail.com>'
 
 import sqlite3
 from tempfile import NamedTemporaryFile
-from nose.tools import eq_
+from nose.tools import eq_, assert_raises
 
 
 from petl.testutils import ieq
-from petl.io.db import fromdb, todb, appenddb
+from petl.io.db import fromdb, todb, appenddb, _rowplaceholders
+import petl.io.db
 
 
 def test_fromdb():
@@ -85,6 +86,82 @@ def test_fromdb_mkcursor():
     eq_(('b', 2), i1.next())
 
 
+class RecordingCursor(object):
+    # wraps a cursor, recording calls to fetchmany
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.fetchmanycalls = []
+        self.arraysize = None
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    def fetchmany(self, size):
+        self.fetchmanycalls.append(size)
+        return self.cursor.fetchmany(size)
+
+
+def test_fromdb_arraysize():
+
+    connection = sqlite3.connect(':memory:')
+    connection.execute('create table foobar (foo, bar)')
+    data = [(str(i), i) for i in range(10)]
+    connection.executemany('insert into foobar values (?, ?)', data)
+    connection.commit()
+
+    cursors = []
+
+    def mkcursor():
+        cursor = RecordingCursor(connection.cursor())
+        cursors.append(cursor)
+        return cursor
+
+    actual = fromdb(mkcursor, 'select * from foobar', arraysize=4)
+    expect = [('foo', 'bar')] + data
+    ieq(expect, actual)
+    # N.B., the first row is fetched via fetchone
+    eq_([4, 4, 4, 4], cursors[0].fetchmanycalls)
+    eq_(4, cursors[0].arraysize)
+    ieq(expect, fromdb(connection, 'select * from foobar', arraysize=3))
+
+
+class NamedCursorConnection(object):
+    # a connection recording the names of cursors requested
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.names = []
+
+    def cursor(self, name=None):
+        self.names.append(name)
+        return self.connection.cursor()
+
+
+def test_fromdb_cursorname():
+
+    connection = sqlite3.connect(':memory:')
+    connection.execute('create table foobar (foo, bar)')
+    data = [(str(i), i) for i in range(10)]
+    connection.executemany('insert into foobar values (?, ?)', data)
+    connection.commit()
+
+    named = NamedCursorConnection(connection)
+    actual = fromdb(named, 'select * from foobar', cursorname='test',
+                    arraysize=3)
+    expect = [('foo', 'bar')] + data
+    ieq(expect, actual)
+    ieq(expect, actual)
+    eq_(['test_0', 'test_1'], named.names)
+
+    assert_raises(ValueError, iter,
+                  fromdb(lambda: connection.cursor(), 'select * from foobar',
+                         cursorname='test'))
+
+
 def test_fromdb_withargs():
 
     # initial data
@@ -189,3 +266,94 @@ def test_todb_appenddb_cursor():
               ('e', 9),
               ('f', 1))
     ieq(expect, actual)
+
+
+def test_todb_batched():
+
+    table = [('foo', 'bar')] + [(str(i), i) for i in range(10)]
+    expect = table[1:]
+    f = NamedTemporaryFile(delete=False)
+    conn = sqlite3.connect(f.name)
+    conn.execute('create table foobar (foo, bar)')
+    conn.commit()
+
+    for multirow in False, True:
+        todb(table, conn, 'foobar', batchsize=3, multirow=multirow,
+             commitinterval=5)
+        ieq(expect, conn.execute('select * from foobar'))
+        appenddb(table, conn.cursor(), 'foobar', batchsize=3,
+                 multirow=multirow)
+        ieq(expect + expect, conn.execute('select * from foobar'))
+
+    # multi-row inserts split by number of parameters
+    maxparams = petl.io.db.maxparams
+    petl.io.db.maxparams = 5
+    try:
+        todb(table, conn, 'foobar', multirow=True)
+        ieq(expect, conn.execute('select * from foobar'))
+    finally:
+        petl.io.db.maxparams = maxparams
+
+
+def test_todb_commitinterval():
+
+    f = NamedTemporaryFile(delete=False)
+    conn = sqlite3.connect(f.name)
+    conn.execute('create table foobar (foo not null, bar)')
+    conn.commit()
+
+    # the third batch fails, the first two have already been committed
+    table = (('foo', 'bar'),
+             ('a', 1),
+             ('b', 2),
+             ('c', 3),
+             ('d', 4),
+             (None, 5))
+    assert_raises(sqlite3.IntegrityError, appenddb, table, conn, 'foobar',
+                  batchsize=2, commitinterval=2)
+    conn.rollback()
+    ieq(table[1:5], conn.execute('select * from foobar'))
+
+
+def test_todb_workers():
+
+    f = NamedTemporaryFile(delete=False)
+    conn = sqlite3.connect(f.name)
+    conn.execute('create table foobar (foo not null, bar)')
+    conn.execute('insert into foobar values (?, ?)', ('x', 0))
+    conn.commit()
+
+    def mkcurs():
+        return sqlite3.connect(f.name, timeout=30,
+                               check_same_thread=False).cursor()
+
+    table = [('foo', 'bar')] + [(str(i), i) for i in range(100)]
+    todb(table, mkcurs, 'foobar', batchsize=7, commitinterval=14, workers=3)
+    actual = conn.execute('select * from foobar order by bar')
+    ieq(table[1:], actual)
+
+    # the first cursor, only used to inspect the connection, is closed
+    cursors = []
+
+    def mkcurs2():
+        cursors.append(mkcurs())
+        return cursors[-1]
+
+    appenddb(table[:1], mkcurs2, 'foobar', workers=2)
+    eq_(3, len(cursors))
+    assert_raises(sqlite3.ProgrammingError, cursors[0].execute, 'select 1')
+
+    # errors in workers are raised
+    table = table + [(None, 101)]
+    assert_raises(sqlite3.IntegrityError, appenddb, table, mkcurs, 'foobar',
+                  batchsize=7, workers=3)
+
+    # other database objects can't be used by several workers
+    assert_raises(ValueError, todb, table, conn, 'foobar', workers=2)
+
+
+def test_rowplaceholders():
+
+    eq_('?, ?', _rowplaceholders('qmark', 2))
+    eq_('%s, %s', _rowplaceholders('format', 2, 2))
+    eq_(':3, :4', _rowplaceholders('numeric', 2, 2))
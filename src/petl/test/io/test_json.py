@@ -5,11 +5,15 @@ __author__ = 'Alistair Miles <alimanfoo@googlemail.com>'
 
 
 from tempfile import NamedTemporaryFile
+from StringIO import StringIO
+from json.decoder import JSONDecoder
 import json
+from nose.tools import eq_, assert_raises
 
 
 from petl.testutils import ieq
-from petl.io.json import fromjson, fromdicts, tojson, tojsonarrays
+from petl.io.json import fromjson, fromdicts, tojson, tojsonarrays, \
+    iterjsonarray
 
 
 def test_fromjson_1():
@@ -144,3 +148,74 @@ def test_tojsonarrays():
     assert result[1][1] == 2
     assert result[2][0] == 'c'
     assert result[2][1] == 2
+
+
+def test_fromjson_lines():
+
+    f = NamedTemporaryFile(delete=False)
+    data = '{"foo": "a", "bar": 1}\n' \
+           '\n' \
+           '{"foo": "b"}\n' \
+           '{"foo": "c", "bar": 2, "baz": true}\n'
+    f.write(data)
+    f.close()
+
+    actual = fromjson(f.name, lines=True)
+    expect = (('foo', 'bar', 'baz'),
+              ('a', 1, None),
+              ('b', None, None),
+              ('c', 2, True))
+    ieq(expect, actual)
+    ieq(expect, actual)  # verify can iterate twice
+
+
+def test_fromjson_sample():
+
+    f = NamedTemporaryFile(delete=False)
+    data = '[{"foo": "a", "bar": 1}, ' \
+           '{"foo": "b"}, ' \
+           '{"foo": "c", "bar": 2, "baz": true}]'
+    f.write(data)
+    f.close()
+
+    actual = fromjson(f.name, sample=2)
+    expect = (('foo', 'bar'),
+              ('a', 1),
+              ('b', None),
+              ('c', 2))
+    ieq(expect, actual)
+
+    actual = fromjson(f.name, sample=None)
+    expect = (('foo', 'bar', 'baz'),
+              ('a', 1, None),
+              ('b', None, None),
+              ('c', 2, True))
+    ieq(expect, actual)
+
+
+def test_iterjsonarray():
+
+    values = [{u'foo': u'a\xe9' * 10, u'bar': [1, 2.5, None]},
+              12345678,
+              u'xyz',
+              [],
+              {},
+              True,
+              None,
+              -1.5e10]
+    data = ' [ ' + ' ,\n'.join(json.dumps(v, ensure_ascii=False).encode('utf-8')
+                               for v in values) + ' ] '
+    # read with buffers of different sizes, so values and multi-byte
+    # characters are split across reads
+    for readsize in 1, 2, 3, 7, 1000:
+        actual = list(iterjsonarray(StringIO(data), JSONDecoder(),
+                                    readsize=readsize))
+        eq_(values, actual)
+
+    eq_([], list(iterjsonarray(StringIO(' [ ] '), JSONDecoder())))
+    # not an array
+    eq_([u'foo'], list(iterjsonarray(StringIO('{"foo": 1}'), JSONDecoder())))
+    for data in '', '[', '[1,', '[1 2]', '[{"foo": 1]':
+        assert_raises(ValueError, list,
+                      iterjsonarray(StringIO(data), JSONDecoder(),
+                                    readsize=2))
@@ -0,0 +1,251 @@
+from __future__ import absolute_import, print_function, division
+
+
+__author__ = 'Alistair Miles <alimanfoo@googlemail.com>'
+
+
+import sqlite3
+
+
+from nose.tools import eq_
+
+
+from petl.testutils import ieq
+from petl.util import header
+from petl.io.db import fromdb
+from petl.io.sqlite3 import fromsqlite3
+from petl.transform.basics import cut, head
+from petl.transform.selects import selecteq, selectne, selectlt, selectgt, \
+    selectrangeopen, selectin, selectnotin, select, selectnone
+from petl.transform.sorts import sort
+from petl.transform.reductions import aggregate
+from petl.transform.joins import join
+import petl.io.pushdown
+
+
+data = [('a', 1, 2.5),
+        ('b', None, 1.0),
+        ('c', 3, None),
+        ('a', 2, 4.0),
+        ('d', 1, 7.5),
+        ('b', 5, 2.0)]
+
+
+def _connection():
+    connection = sqlite3.connect(':memory:')
+    connection.execute('create table foobar (foo, bar, baz)')
+    connection.executemany('insert into foobar values (?, ?, ?)', data)
+    connection.commit()
+    return connection
+
+
+def _tables():
+    connection = _connection()
+    expect = [('foo', 'bar', 'baz')] + data
+    return (expect,
+            fromdb(connection, 'select * from foobar'),
+            fromsqlite3(connection, 'select * from foobar;'))
+
+
+def _enabled(test):
+    # run a test with rewriting of queries enabled
+    def wrapper():
+        petl.io.pushdown.enabled = True
+        try:
+            test()
+        finally:
+            petl.io.pushdown.enabled = False
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+
+def _pushed(expect, actual):
+    assert getattr(actual, '_sqlquery', None) is not None
+    ieq(expect, actual, cast=tuple)
+    ieq(expect, actual, cast=tuple)  # verify can iterate twice
+
+
+@_enabled
+def test_select_pushdown():
+
+    expect, t1, t2 = _tables()
+    for table in t1, t2:
+        _pushed(selecteq(expect, 'foo', 'a'), selecteq(table, 'foo', 'a'))
+        _pushed(selectne(expect, 'foo', 'a'), selectne(table, 'foo', 'a'))
+        # comparisons with None follow python semantics
+        _pushed(selectlt(expect, 'bar', 3), selectlt(table, 'bar', 3))
+        _pushed(selectgt(expect, 'bar', 1), selectgt(table, 'bar', 1))
+        _pushed(selectne(expect, 'bar', 1), selectne(table, 'bar', 1))
+        _pushed(selectnone(expect, 'baz'), selecteq(table, 'baz', None))
+        _pushed(selectrangeopen(expect, 'bar', 1, 3),
+                selectrangeopen(table, 'bar', 1, 3))
+        _pushed(selectin(expect, 'foo', ['a', 'c']),
+                selectin(table, 'foo', ['a', 'c']))
+        _pushed(selectnotin(expect, 'foo', ['a', 'c']),
+                selectnotin(table, 'foo', ['a', 'c']))
+        _pushed(selectlt(expect, 'bar', 3, complement=True),
+                selectlt(table, 'bar', 3, complement=True))
+        # conditions accumulate
+        _pushed(selectgt(selecteq(expect, 'foo', 'a'), 'bar', 1),
+                selectgt(selecteq(table, 'foo', 'a'), 'bar', 1))
+
+
+@_enabled
+def test_select_fallback():
+
+    expect, t1, t2 = _tables()
+    for table in t1, t2:
+        # arbitrary functions can't be pushed down
+        actual = select(table, 'bar', lambda v: v == 1)
+        assert not hasattr(actual, '_sqlquery')
+        ieq(select(expect, 'bar', lambda v: v == 1), actual, cast=tuple)
+        # nor can values which aren't simple types
+        actual = selecteq(table, 'foo', ('a',))
+        assert not hasattr(actual, '_sqlquery')
+        ieq([expect[0]], actual, cast=tuple)
+        # nor can fields which aren't selected
+        actual = selecteq(cut(table, 'bar'), 'foo', 'a')
+        assert not hasattr(actual, '_sqlquery')
+
+
+@_enabled
+def test_cut_sort_head_pushdown():
+
+    expect, t1, t2 = _tables()
+    for table in t1, t2:
+        _pushed(cut(expect, 'baz', 'foo'), cut(table, 'baz', 'foo'))
+        _pushed(sort(expect, 'bar'), sort(table, 'bar'))
+        _pushed(sort(expect, 'baz', reverse=True),
+                sort(table, 'baz', reverse=True))
+        _pushed(sort(expect, ('foo', 'bar')), sort(table, ('foo', 'bar')))
+        # sorting is stable
+        _pushed(sort(sort(expect, 'baz'), 'foo'),
+                sort(sort(table, 'baz'), 'foo'))
+        _pushed(head(expect, 3), head(table, 3))
+        _pushed(head(expect, 0), head(table, 0))
+        _pushed(head(sort(expect, 'bar'), 2), head(sort(table, 'bar'), 2))
+        # transformations of limited rows
+        _pushed(sort(head(sort(expect, 'baz'), 3), 'foo'),
+                sort(head(sort(table, 'baz'), 3), 'foo'))
+        _pushed(selecteq(head(sort(expect, 'foo'), 3), 'foo', 'b'),
+                selecteq(head(sort(table, 'foo'), 3), 'foo', 'b'))
+        # order by fields which have been cut away
+        _pushed(cut(sort(expect, 'baz'), 'foo'),
+                cut(sort(table, 'baz'), 'foo'))
+
+
+def test_sort_fallback():
+
+    expect, t1, t2 = _tables()
+    for table in t1, t2:
+        # sorting by whole rows can't be pushed down
+        actual = sort(table)
+        assert not hasattr(actual, '_sqlquery')
+        ieq(sort(expect), actual, cast=tuple)
+        # nor can sorting rows limited in no particular order
+        actual = sort(head(table, 3), 'foo')
+        assert not hasattr(actual, '_sqlquery')
+
+
+@_enabled
+def test_aggregate_pushdown():
+
+    expect, t1, t2 = _tables()
+    for table in t1, t2:
+        _pushed(aggregate(expect, 'foo', len), aggregate(table, 'foo', len))
+        _pushed(aggregate(expect, 'foo', max, 'baz'),
+                aggregate(table, 'foo', max, 'baz'))
+        # N.B., None is the minimum in python
+        _pushed(aggregate(expect, 'foo', min, 'bar'),
+                aggregate(table, 'foo', min, 'bar'))
+        aggregation = [('count', len), ('maxbaz', 'baz', max)]
+        _pushed(aggregate(expect, 'foo', aggregation),
+                aggregate(table, 'foo', aggregation))
+        # aggregate selected rows
+        _pushed(aggregate(selectne(expect, 'foo', 'c'), 'foo', sum, 'baz'),
+                aggregate(selectne(table, 'foo', 'c'), 'foo', sum, 'baz'))
+        # arbitrary functions can't be pushed down
+        actual = aggregate(table, 'foo', lambda vals: len(list(vals)))
+        assert not hasattr(actual, '_sqlquery')
+        ieq(aggregate(expect, 'foo', len), actual, cast=tuple)
+
+
+@_enabled
+def test_pushdown_params():
+
+    connection = _connection()
+    table = fromdb(connection, 'select * from foobar where foo <> ?', ['d'])
+    expect = [('foo', 'bar', 'baz')] + [row for row in data if row[0] != 'd']
+    _pushed(selecteq(expect, 'foo', 'b'), selecteq(table, 'foo', 'b'))
+    _pushed(head(sort(expect, 'bar'), 2), head(sort(table, 'bar'), 2))
+    eq_(('foo', 'value'), header(aggregate(table, 'foo', len)))
+
+
+class _RecordingConnection(object):
+    # records the queries executed via the cursors of a connection
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.queries = []
+
+    def cursor(self):
+        return _RecordingCursor(self, self.connection.cursor())
+
+
+class _RecordingCursor(object):
+
+    def __init__(self, recorder, cursor):
+        self.recorder = recorder
+        self.cursor = cursor
+
+    def execute(self, query, *args):
+        self.recorder.queries.append(query)
+        return self.cursor.execute(query, *args)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    def __getattr__(self, attr):
+        return getattr(self.cursor, attr)
+
+
+def test_not_pushed_by_default():
+
+    expect = [('foo', 'bar', 'baz')] + data
+    connection = _RecordingConnection(_connection())
+    query = 'select * from foobar'
+    table = fromdb(connection, query)
+    for actual, e in ((cut(table, 'foo'), cut(expect, 'foo')),
+                      (head(table, 2), head(expect, 2)),
+                      (selecteq(table, 'baz', None),
+                       selectnone(expect, 'baz')),
+                      (selecteq(table, 'foo', 'a'),
+                       selecteq(expect, 'foo', 'a')),
+                      (sort(table, 'bar'), sort(expect, 'bar')),
+                      (aggregate(table, 'foo', len),
+                       aggregate(expect, 'foo', len))):
+        assert not hasattr(actual, '_sqlquery')
+        ieq(e, actual, cast=tuple)
+    # the query is run as given
+    assert connection.queries
+    assert all(q == query for q in connection.queries), connection.queries
+    t = fromsqlite3(_connection(), query)
+    assert not hasattr(cut(t, 'foo'), '_sqlquery')
+    assert not hasattr(head(t, 2), '_sqlquery')
+
+
+def test_nocase_collation():
+
+    connection = sqlite3.connect(':memory:')
+    connection.execute('create table foobar (k text collate nocase, v)')
+    connection.executemany('insert into foobar values (?, ?)',
+                           [('a', 1), ('B', 2), ('c', 3)])
+    connection.commit()
+    table = fromdb(connection, 'select * from foobar')
+    other = [('k', 'w'), ('a', True), ('B', True), ('c', True)]
+    expect = [('k', 'v', 'w'), ('B', 2, True), ('a', 1, True),
+              ('c', 3, True)]
+    # the database's order differs from python's, so a merge join of the
+    # sorted tables must not rely on it
+    ieq(expect, join(sort(table, 'k'), sort(other, 'k'), 'k'), cast=tuple)
+    ieq([('k', 'v'), ('B', 2)], selecteq(table, 'k', 'B'), cast=tuple)
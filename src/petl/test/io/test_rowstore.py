@@ -0,0 +1,106 @@
+from __future__ import absolute_import, print_function, division
+
+
+__author__ = 'Alistair Miles <alimanfoo@googlemail.com>'
+
+
+from tempfile import NamedTemporaryFile
+
+
+from nose.tools import eq_, assert_raises
+
+
+from petl.testutils import ieq
+from petl.util import nrows, data, dataslice, cache
+from petl.transform.basics import rowslice, tail
+from petl.io.rowstore import torowstore, fromrowstore
+
+
+def _tempname():
+    f = NamedTemporaryFile(delete=False)
+    f.close()
+    return f.name
+
+
+def test_torowstore_fromrowstore():
+
+    table = (('foo', 'bar'),
+             ('a', 1),
+             ('b', 2),
+             ('c', 2.5),
+             ('d', None))
+    fn = _tempname()
+    torowstore(table, fn)
+    actual = fromrowstore(fn)
+    ieq(table, actual)
+    ieq(table, actual) # verify can iterate twice
+
+
+def test_rowstore_randomaccess():
+
+    table = [('foo', 'bar')] + [(i, str(i)) for i in range(100)]
+    fn = _tempname()
+    torowstore(table, fn)
+    actual = fromrowstore(fn)
+
+    eq_(101, len(actual))
+    eq_(100, nrows(actual))
+    eq_(('foo', 'bar'), actual[0])
+    eq_((0, '0'), actual[1])
+    eq_((99, '99'), actual[-1])
+    eq_((98, '98'), actual[-2])
+    assert_raises(IndexError, lambda: actual[101])
+    assert_raises(IndexError, lambda: actual[-102])
+    ieq(table[:3], actual[:3])
+    ieq(table[10:20:3], actual[10:20:3])
+    ieq(table[95:200], actual[95:200])
+    ieq(table[::-1], actual[::-1])
+    ieq(table[1:4], data(actual, 3))
+    ieq(table[11:21:2], data(actual, 10, 20, 2))
+    ieq(table[11:21:2], dataslice(actual, 10, 20, 2))
+    ieq(table[:1] + table[6:9], rowslice(actual, 5, 8))
+    ieq(table[:1] + table[-3:], tail(actual, 3))
+    ieq(table, tail(actual, 1000))
+    ieq(range(100), actual['foo'])
+
+
+def test_rowstore_empty():
+
+    fn = _tempname()
+    torowstore([], fn)
+    actual = fromrowstore(fn)
+    ieq([], actual)
+    eq_(0, len(actual))
+
+    torowstore([('foo', 'bar')], fn)
+    actual = fromrowstore(fn)
+    ieq([('foo', 'bar')], actual)
+    eq_(1, len(actual))
+    eq_(0, nrows(actual))
+    ieq([('foo', 'bar')], tail(actual, 3))
+
+
+def test_rowstore_rewritten():
+
+    fn = _tempname()
+    torowstore([('foo',), (1,)], fn)
+    actual = fromrowstore(fn)
+    eq_(2, len(actual))
+    torowstore([('foo',), (1,), (2,)], fn)
+    eq_(3, len(actual))
+    eq_((2,), actual[-1])
+
+
+def test_cache_rowstore():
+
+    table = [('foo', 'bar'), ('a', 1), ('b', 2), ('c', 3)]
+    cached = cache(table, rowstore=True)
+    ieq(table, cached)
+    # change the underlying table, the cache should not change
+    table.append(('d', 4))
+    ieq(table[:-1], cached)
+    eq_(4, len(cached))
+    eq_(('c', 3), cached[-1])
+    ieq(table[:1] + table[2:4], tail(cached, 2))
+    cached.clearcache()
+    ieq(table, cached)
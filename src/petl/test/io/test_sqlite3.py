@@ -187,3 +187,15 @@ def test_tosqlite3_identifiers():
 
 
 # TODO test uneven rows
+
+
+def test_tosqlite3_batched():
+
+    table = [('foo', 'bar')] + [(str(i), i) for i in range(10)]
+    f = NamedTemporaryFile(delete=False)
+    for multirow in False, True:
+        conn = tosqlite3(table, f.name, 'foobar', create=True, batchsize=3,
+                         multirow=multirow, commitinterval=4)
+        ieq(table[1:], conn.execute('select * from foobar'))
+        appendsqlite3(table, conn, 'foobar', batchsize=4, multirow=multirow)
+        ieq(table[1:] + table[1:], conn.execute('select * from foobar'))
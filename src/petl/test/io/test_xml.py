@@ -5,11 +5,13 @@ __author__ = 'Alistair Miles <alimanfoo@googlemail.com>'
 
 
 from tempfile import NamedTemporaryFile
+from StringIO import StringIO
+from nose.tools import eq_, assert_raises
 
 
 from petl.testutils import ieq
 from petl.util import nrows, look
-from petl.io.xml import fromxml
+from petl.io.xml import fromxml, iterxmlrows
 
 
 def test_fromxml():
@@ -191,6 +193,71 @@ def test_fromxml_6():
     ieq(expect, actual)  # verify can iterate twice
 
 
+def test_fromxml_streaming():
+
+    data = """<table>
+    <meta><tr><td>x</td></tr></meta>
+    <tbody>
+        <tr><td v='foo'>foo</td><td v='bar'>bar</td></tr>
+        <tr><td v='a'>a</td><td v='1'>1</td></tr>
+        <tr><td v='b'>b</td><td v='2'>2</td></tr>
+    </tbody>
+</table>"""
+    f = NamedTemporaryFile(delete=False)
+    f.write(data)
+    f.close()
+
+    expect = (('foo', 'bar'),
+              ('a', '1'),
+              ('b', '2'))
+    actual = fromxml(f.name, 'tbody/tr', 'td', streaming=True)
+    ieq(expect, actual)
+    ieq(expect, actual)  # verify can iterate twice
+
+    # compare with non-streaming
+    for rmatch in 'tbody/tr', './tbody/tr', '*/tr', 'tbody/*', './/tr', \
+            'tbody//tr':
+        for args in (('td',), ('td', 'v'), (('th', 'td'),)):
+            ieq(fromxml(f.name, rmatch, *args),
+                fromxml(f.name, rmatch, *args, streaming=True))
+    vdict = {'foo': 'td', 'bar': ('td', 'v')}
+    ieq(fromxml(f.name, './/tr', vdict),
+        fromxml(f.name, './/tr', vdict, streaming=True))
+
+    # unsupported paths
+    for rmatch in './/td/..', "tr[@class='x']", '/table/tr':
+        assert_raises(ValueError, fromxml, f.name, rmatch, 'td',
+                      streaming=True)
+
+
+def test_fromxml_streaming_namespaces():
+
+    data = """<t:table xmlns:t='http://example.com/t'>
+    <t:tr><t:td>foo</t:td><t:td>bar</t:td></t:tr>
+    <t:tr><t:td>a</t:td><t:td>1</t:td></t:tr>
+</t:table>"""
+    f = NamedTemporaryFile(delete=False)
+    f.write(data)
+    f.close()
+
+    expect = (('foo', 'bar'),
+              ('a', '1'))
+    actual = fromxml(f.name, '{http://example.com/t}tr',
+                     '{http://example.com/t}td', streaming=True)
+    ieq(expect, actual)
+
+
+def test_iterxmlrows_clears():
+
+    data = '<table>' + '<tr><td>a</td></tr>' * 100 + '</table>'
+    rows = list()
+    for rowelm in iterxmlrows(StringIO(data), 'tr'):
+        # previously returned rows have been detached and emptied
+        eq_(1, len(rowelm))
+        rows.append(rowelm)
+    eq_(100, len(rows))
+    eq_(0, sum(len(e) for e in rows[:-1]))
+
 
 def test_fromxml_url():
 
@@ -0,0 +1,196 @@
+"""
+Tests for the columnar module.
+
+"""
+
+
+from __future__ import absolute_import, print_function, division
+
+
+from nose.plugins.skip import SkipTest
+try:
+    import numpy as np
+except ImportError:
+    raise SkipTest('numpy is not available')
+from nose.tools import eq_
+
+
+from petl.testutils import ieq
+from petl.util import stats, columns
+from petl.columnar import columnar, ColumnarTable, vectorised
+from petl.transform.selects import selectgt, selecteq, selectrangeopenleft, \
+    selectrangeclosed, selectin
+from petl.transform.conversions import convert
+from petl.transform.basics import cut, tail
+from petl.transform.sorts import sort
+from petl.transform.reductions import aggregate, MeanAggregator
+from petl.compat import OrderedDict
+
+
+table1 = (('foo', 'bar', 'baz'),
+          ('C', 2, 7.8),
+          ('A', 9, 2.7),
+          ('B', 2, 3.4),
+          ('A', 1, 0.5),
+          ('D', 4, 9.0))
+
+
+def test_columnar():
+
+    t = columnar(table1)
+    assert isinstance(t, ColumnarTable)
+    eq_(np.int64, t.column('bar').dtype)
+    eq_(np.float64, t.column('baz').dtype)
+    eq_(object, t.column('foo').dtype)
+    ieq(table1, t)
+    ieq(table1, t)
+
+    # mixed types and short rows
+    table = (('foo', 'bar'), (1, 'a'), (2.5, None), (3,))
+    t = columnar(table)
+    eq_(object, t.column('foo').dtype)
+    ieq((('foo', 'bar'), (1, 'a'), (2.5, None), (3, None)), t)
+
+    # dtypes
+    table = (('foo', 'bar'), ('A', '1'), ('B', '2'))
+    t = columnar(table, dtypes={'bar': int})
+    ieq((('foo', 'bar'), ('A', 1), ('B', 2)), t)
+
+    # from columns
+    cols = columns(table1)
+    t = ColumnarTable(['foo', 'bar'], [cols['foo'], cols['bar']])
+    ieq(cut(table1, 'foo', 'bar'), t)
+
+
+def test_columnar_select():
+
+    t = columnar(table1)
+    for actual, expect in (
+            (selectgt(t, 'bar', 2), selectgt(table1, 'bar', 2)),
+            (selecteq(t, 'foo', 'A'), selecteq(table1, 'foo', 'A')),
+            (selectgt(t, 'baz', 3, complement=True),
+             selectgt(table1, 'baz', 3, complement=True)),
+            (selectrangeopenleft(t, 'bar', 2, 4),
+             selectrangeopenleft(table1, 'bar', 2, 4)),
+            (selectrangeclosed(t, 'baz', 0.5, 9.0),
+             selectrangeclosed(table1, 'baz', 0.5, 9.0))):
+        assert isinstance(actual, ColumnarTable)
+        ieq(expect, actual)
+
+    # fall back to iterating over rows
+    actual = selectin(t, 'bar', [1, 4])
+    assert not isinstance(actual, ColumnarTable)
+    ieq(selectin(table1, 'bar', [1, 4]), actual)
+    actual = selectgt(t, 'bar', 'x')
+    assert not isinstance(actual, ColumnarTable)
+    ieq(selectgt(table1, 'bar', 'x'), actual)
+
+
+def test_columnar_convert():
+
+    t = columnar(table1)
+    actual = convert(t, 'bar', vectorised(lambda v: v * 2))
+    assert isinstance(actual, ColumnarTable)
+    ieq(convert(table1, 'bar', lambda v: v * 2), actual)
+    actual = convert(t, {'bar': float, 'baz': np.floor})
+    assert isinstance(actual, ColumnarTable)
+    ieq(convert(table1, {'bar': float, 'baz': np.floor}), actual)
+
+    # fall back to iterating over rows
+    actual = convert(t, 'foo', 'lower')
+    assert not isinstance(actual, ColumnarTable)
+    ieq(convert(table1, 'foo', 'lower'), actual)
+    actual = convert(t, 'bar', vectorised(lambda v: v * 2),
+                     where=lambda r: r.foo == 'A')
+    ieq(convert(table1, 'bar', lambda v: v * 2, where=lambda r: r.foo == 'A'),
+        actual)
+
+
+def test_columnar_cut():
+
+    t = columnar(table1)
+    actual = cut(t, 'baz', 'foo')
+    assert isinstance(actual, ColumnarTable)
+    ieq(cut(table1, 'baz', 'foo'), actual)
+
+
+def test_columnar_sort():
+
+    t = columnar(table1)
+    for key in ('foo', 'bar', ('bar', 'foo'), None):
+        for reverse in (False, True):
+            actual = sort(t, key, reverse=reverse)
+            assert isinstance(actual, ColumnarTable)
+            ieq(sort(table1, key, reverse=reverse), actual)
+
+    # stable
+    table = (('foo', 'bar'), ('a', 2), ('b', 1), ('c', 2), ('d', 1))
+    ieq(sort(table, 'bar'), sort(columnar(table), 'bar'))
+    ieq(sort(table, 'bar', reverse=True),
+        sort(columnar(table), 'bar', reverse=True))
+
+    # mixed types fall back to petl's sort
+    table = (('foo', 'bar'), ('a', 2), (None, 1), (3, 2))
+    actual = sort(columnar(table), 'foo')
+    assert not isinstance(actual, ColumnarTable)
+    ieq(sort(table, 'foo'), actual)
+
+
+def test_columnar_aggregate():
+
+    t = columnar(table1)
+
+    actual = aggregate(t, 'foo', sum, 'bar')
+    assert isinstance(actual, ColumnarTable)
+    ieq(aggregate(table1, 'foo', sum, 'bar'), actual)
+
+    aggregation = OrderedDict()
+    aggregation['count'] = len
+    aggregation['minbar'] = 'bar', min
+    aggregation['maxbar'] = 'bar', max
+    aggregation['meanbaz'] = 'baz', MeanAggregator()
+    for key in ('foo', ('bar', 'foo')):
+        actual = aggregate(t, key, aggregation)
+        assert isinstance(actual, ColumnarTable)
+        ieq(aggregate(table1, key, aggregation), actual)
+
+    # fall back to iterating over rows
+    actual = aggregate(t, 'bar', list, 'foo')
+    assert not isinstance(actual, ColumnarTable)
+    ieq(aggregate(table1, 'bar', list, 'foo'), actual)
+
+    # empty
+    table = (('foo', 'bar'),)
+    actual = aggregate(columnar(table, dtypes={'bar': int}), 'foo', sum, 'bar')
+    ieq((('foo', 'value'),), actual)
+
+
+def test_columnar_stats():
+
+    t = columnar(table1)
+    eq_(stats(table1, 'bar'), stats(t, 'bar'))
+    eq_(stats(table1, 'foo'), stats(t, 'foo'))
+
+
+def test_columnar_randomaccess():
+
+    t = columnar(table1)
+    table = list(table1)
+    eq_(len(table), len(t))
+    eq_(tuple(table[-1]), t[-1])
+    ieq(table[1:3], t[1:3])
+    ieq([table[0]] + table[-2:], tail(t, 2))
+
+
+def test_numpy_not_imported():
+
+    # numpy is only imported when a columnar table is used
+    import os
+    import subprocess
+    import sys
+    import petl
+    code = 'import sys, petl; print("numpy" in sys.modules)'
+    out = subprocess.check_output([sys.executable, '-c', code],
+                                  cwd=os.path.dirname(os.path.dirname(
+                                      os.path.abspath(petl.__file__))))
+    eq_('False', out.strip())
@@ -0,0 +1,152 @@
+"""
+Tests for the fusion module.
+
+"""
+
+
+from __future__ import absolute_import, print_function, division
+
+
+from nose.tools import eq_, assert_raises
+
+
+import petl.fusion
+from petl.testutils import ieq
+from petl.util import FieldSelectionError
+from petl.fusion import fusiblechain
+from petl.transform.basics import cut, cutout, addfield
+from petl.transform.selects import select, selectgt, selecteq
+from petl.transform.conversions import convert
+from petl.transform.headers import rename
+from petl.transform.sorts import sort
+
+
+table1 = (('foo', 'bar', 'baz'),
+          ('A', '1', 2.7),
+          ('B', '2', 3.4),
+          ('C', '3', 7.8),
+          ('D', 'x', 1.1))
+
+
+def _unfused(table):
+    petl.fusion.fuseviews = False
+    try:
+        return [tuple(row) for row in table]
+    finally:
+        petl.fusion.fuseviews = True
+
+
+def _checkfused(table):
+    assert len(fusiblechain(table)) > 1
+    ieq(_unfused(table), table)
+    ieq(_unfused(table), table)  # verify can iterate twice
+
+
+def test_fused_pipeline():
+
+    t = convert(table1, 'bar', int)
+    t = rename(t, 'bar', 'qux')
+    t = selectgt(t, 'qux', 1)
+    t = addfield(t, 'quux', lambda rec: rec['qux'] * rec.baz)
+    t = cut(t, 'quux', 'foo')
+    expect = (('quux', 'foo'),
+              (2 * 3.4, 'B'),
+              (3 * 7.8, 'C'))
+    ieq(expect, t)
+    _checkfused(t)
+
+
+def test_fused_views():
+
+    _checkfused(cut(convert(table1, 'baz', str), 2, 'foo'))
+    _checkfused(cutout(convert(table1, 'baz', str), 'bar'))
+    _checkfused(select(convert(table1, 'baz', int), "{baz} > 2"))
+    _checkfused(convert(select(table1, lambda rec: rec.bar == '1',
+                               complement=True), 'foo', 'lower'))
+    _checkfused(selecteq(rename(table1, {'foo': 'x', 1: 'y'}), 'y', '2'))
+    _checkfused(select(cut(table1, 'foo', 'bar'), ('foo', 'bar'),
+                       lambda v: v == ('B', '2')))
+    _checkfused(addfield(convert(table1, 'bar', float, errorvalue=-1), 'n',
+                         42, index=0))
+    _checkfused(convert(convert(table1, 'baz', int), 'baz', lambda v: v * 2))
+    _checkfused(cut(convert(table1, {'foo': {'A': 'a'}, 'bar': ('zfill', 3)}),
+                    'bar', 'foo'))
+
+
+def test_fused_pushdown():
+
+    calls = list()
+
+    def conv(v):
+        calls.append(v)
+        return v.lower()
+
+    # conversions are deferred until after selections on other fields
+    t = selectgt(convert(table1, 'foo', conv), 'baz', 3)
+    ieq((('foo', 'bar', 'baz'),
+         ('b', '2', 3.4),
+         ('c', '3', 7.8)), t)
+    eq_(['B', 'C'], calls)
+
+    # conversions of fields which are cut away are not made
+    del calls[:]
+    t = cut(convert(table1, 'foo', conv), 'bar')
+    ieq((('bar',), ('1',), ('2',), ('3',), ('x',)), t)
+    eq_([], calls)
+
+
+def test_fused_errors():
+
+    t = selectgt(convert(table1, 'bar', int, errorvalue='err'), 'baz', 1)
+    ieq(_unfused(t), t)
+    eq_('err', list(t)[-1][1])
+    t = cut(convert(table1, 'bar', int, failonerror=True), 'bar')
+    assert_raises(ValueError, list, t)
+    t = cut(rename(table1, 'foo', 'x'), 'foo')
+    assert_raises(FieldSelectionError, list, t)
+
+
+def test_fused_irregular_rows():
+
+    table = (('foo', 'bar'),
+             ('a', 1),
+             ('b',),
+             ('c', 3, True),
+             ('d', 4))
+    t = cut(convert(table, 'foo', 'upper'), 'bar', 'foo')
+    ieq((('bar', 'foo'),
+         (1, 'A'),
+         (None, 'B'),
+         (3, 'C'),
+         (4, 'D')), t)
+    _checkfused(t)
+    _checkfused(addfield(convert(table, 'foo', 'upper'), 'baz', 0))
+
+
+def test_fused_duplicate_fields():
+
+    table = (('foo', 'foo', 'bar'),
+             ('a', 'b', 1),
+             ('c', 'd', 2))
+    _checkfused(addfield(convert(table, 'bar', str), 'baz', 0))
+    _checkfused(cut(convert(table, 1, 'upper'), 1, 2))
+
+
+def test_unfusible():
+
+    # a view over a view which isn't row-local isn't fused with it
+    t = cut(sort(convert(table1, 'bar', 'zfill', 2), 'baz'), 'bar')
+    eq_(1, len(fusiblechain(t)))
+    ieq((('bar',), ('0x',), ('01',), ('02',), ('03',)), t)
+    # nor are conversions with a where condition
+    t = cut(convert(table1, 'bar', int, where=lambda r: r.foo != 'D'), 'bar')
+    eq_(1, len(fusiblechain(t)))
+    ieq((('bar',), (1,), (2,), (3,), ('x',)), t)
+
+
+def test_empty():
+
+    t = cut(convert([], 'foo', int), 'foo')
+    ieq([], t)
+    t = cut(convert([('foo', 'bar')], 'foo', int), 'foo')
+    ieq([('foo',)], t)
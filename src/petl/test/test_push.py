@@ -6,13 +6,23 @@ Tests for the push module.
 from __future__ import absolute_import, print_function, division
 
 
+import os
+import sqlite3
+import threading
 from tempfile import NamedTemporaryFile
 
-from petl.io import fromcsv, fromtsv, frompickle
+from nose.tools import eq_, assert_raises
+
+import petl
+from petl.io import fromcsv, fromtsv, frompickle, fromjson, fromdb
 from petl.testutils import ieq
+from petl.util import FieldSelectionError
 
 from petl.push import tocsv, totsv, topickle, partition, sort, duplicates, \
-    unique, diff
+    unique, diff, transform, cut, cutout, select, convert, rename, addfield, \
+    fieldmap, rowmap, hashjoin, hashleftjoin, aggregate, tojson, tosqlite3, \
+    appendsqlite3, todb, appenddb, buffered, PipelineComponent, \
+    PipelineConnection
 
 
 def test_topickle():
@@ -356,3 +366,285 @@ def test_diff():
     ieq(bminusa, added)
     ieq(aminusb, subtracted)
     ieq(both, common)
+
+
+class _Collect(PipelineComponent):
+    # collects the batches it is given
+
+    def __init__(self):
+        super(_Collect, self).__init__()
+        self.fields = None
+        self.batches = list()
+        self.threads = set()
+        self.fail = None
+
+    def connect(self, fields):
+        self.fields = tuple(fields)
+        return _CollectConnection(self)
+
+    def rows(self):
+        return [self.fields] + [row for batch in self.batches for row in batch]
+
+
+class _CollectConnection(PipelineConnection):
+
+    def __init__(self, component):
+        super(_CollectConnection, self).__init__([], {}, component.fields)
+        self.component = component
+
+    def accept_batch(self, rows):
+        self.component.threads.add(threading.current_thread())
+        if self.component.fail:
+            raise self.component.fail
+        self.component.batches.append(rows)
+
+
+table1 = [('fruit', 'city', 'sales'),
+          ('orange', 'London', 12),
+          ('banana', 'London', 42),
+          ('orange', 'Paris', 31),
+          ('banana', 'Amsterdam', 74),
+          ('kiwi', 'Berlin', 55)]
+
+
+def test_batches():
+
+    c = _Collect()
+    p = tocsv(NamedTemporaryFile(delete=False).name)
+    p.pipe(c)
+    p.push(table1, batchsize=2)
+    eq_([2, 2, 1], [len(b) for b in c.batches])
+    assert all(type(row) is tuple for b in c.batches for row in b)
+    ieq(table1, c.rows())
+
+    c = _Collect()
+    p = sort('fruit', buffersize=3)
+    p.pipe(c)
+    p.push(table1, batchsize=2, limit=4)
+    ieq(petl.sort(petl.head(table1, 4), 'fruit'), c.rows())
+
+
+def test_fanout():
+
+    # one pass over the source feeds several branches
+    passes = []
+
+    class Source(object):
+        def __iter__(self):
+            passes.append(1)
+            return iter(table1)
+
+    c1, c2, c3 = _Collect(), _Collect(), _Collect()
+    p = convert('sales', lambda v: v * 2)
+    p.pipe(c1)
+    p.pipe(select('sales', lambda v: v > 100)).pipe(cut('city'))\
+        .pipe(c2)
+    p.pipe(aggregate('fruit', sum, 'sales')).pipe(c3)
+    p.push(Source())
+    eq_(1, len(passes))
+    t = petl.convert(table1, 'sales', lambda v: v * 2)
+    ieq(t, c1.rows())
+    ieq(petl.cut(petl.select(t, 'sales', lambda v: v > 100), 'city'),
+        c2.rows())
+    ieq(petl.aggregate(t, 'fruit', sum, 'sales'), c3.rows())
+
+
+def test_transforms():
+
+    components = [
+        (cut('city', 'fruit'), petl.cut(table1, 'city', 'fruit')),
+        (cutout('city'), petl.cutout(table1, 'city')),
+        (select("{sales} > 30"), petl.select(table1, "{sales} > 30")),
+        (convert({'fruit': 'upper', 'sales': float}),
+         petl.convert(table1, {'fruit': 'upper', 'sales': float})),
+        (rename('sales', 'amount'), petl.rename(table1, 'sales', 'amount')),
+        (addfield('double', lambda rec: rec.sales * 2),
+         petl.addfield(table1, 'double', lambda rec: rec.sales * 2)),
+        (fieldmap({'x': 'fruit', 'y': ('sales', lambda v: v + 1)}),
+         petl.fieldmap(table1, {'x': 'fruit', 'y': ('sales',
+                                                    lambda v: v + 1)})),
+        (rowmap(lambda row: [row[1], row[2] - 1], fields=['a', 'b']),
+         petl.rowmap(table1, lambda row: [row[1], row[2] - 1],
+                     fields=['a', 'b'])),
+        (transform(lambda t: petl.selecteq(t, 'city', 'London')),
+         petl.selecteq(table1, 'city', 'London'))
+    ]
+    for component, expect in components:
+        c = _Collect()
+        component.pipe(c)
+        component.push(table1, batchsize=2)
+        ieq(expect, c.rows())
+
+
+def test_aggregate():
+
+    for aggregation in ({'total': ('sales', sum), 'n': len},
+                        [('total', 'sales', sum), ('cities', 'city', list)]):
+        expect = petl.aggregate(table1, 'fruit', aggregation)
+        c = _Collect()
+        p = aggregate('fruit', aggregation)
+        p.pipe(c)
+        p.push(table1, batchsize=2)
+        ieq(expect, c.rows())
+
+    expect = petl.aggregate(table1, ('fruit', 'city'), len)
+    c = _Collect()
+    p = aggregate(('fruit', 'city'), len, maxkeys=2)
+    p.pipe(c)
+    p.push(table1, batchsize=2)
+    ieq(expect, c.rows())
+
+    expect = petl.aggregate(table1, lambda rec: rec.sales > 40, len,
+                            hashed=True)
+    c = _Collect()
+    p = aggregate(lambda rec: rec.sales > 40, len)
+    p.pipe(c)
+    p.push(table1)
+    ieq(expect, c.rows())
+
+
+def test_hashjoin():
+
+    right = [('city', 'country'),
+             ('London', 'UK'),
+             ('Paris', 'France'),
+             ('Amsterdam', 'Netherlands')]
+    for component, expect in (
+            (hashjoin(right), petl.hashjoin(table1, right)),
+            (hashjoin(right, lkey='city', rkey='city', rprefix='r_'),
+             petl.hashjoin(table1, right, 'city', rprefix='r_')),
+            (hashleftjoin(right, 'city', missing='?'),
+             petl.hashleftjoin(table1, right, 'city', missing='?'))):
+        c = _Collect()
+        component.pipe(c)
+        component.push(table1, batchsize=2)
+        ieq(expect, c.rows())
+
+
+def test_tojson():
+
+    f = NamedTemporaryFile(delete=False)
+    f.close()
+    p = tojson(f.name)
+    c = _Collect()
+    p.pipe(c)
+    p.push(table1, batchsize=2)
+    ieq(table1, c.rows())
+    ieq(table1, fromjson(f.name, header=['fruit', 'city', 'sales']))
+    g = NamedTemporaryFile(delete=False)
+    g.close()
+    petl.tojson(table1, g.name)
+    eq_(open(g.name).read(), open(f.name).read())
+
+    # empty table
+    tojson(f.name).push([('foo', 'bar')])
+    eq_('[]', open(f.name).read())
+
+
+def _fromfile(filename):
+    return fromdb(sqlite3.connect(filename), 'select * from fruit')
+
+
+def test_tosqlite3():
+
+    f = NamedTemporaryFile(delete=False)
+    f.close()
+    try:
+        p = tosqlite3(f.name, 'fruit', create=True, commitinterval=2)
+        c = _Collect()
+        p.pipe(c)
+        p.push(table1, batchsize=2)
+        ieq(table1, c.rows())
+        ieq(table1, _fromfile(f.name))
+
+        appendsqlite3(f.name, 'fruit', multirow=True).push(table1)
+        ieq(table1 + table1[1:], _fromfile(f.name))
+
+        # truncates existing rows
+        connection = sqlite3.connect(f.name)
+        tosqlite3(connection, 'fruit').push(table1)
+        ieq(table1, _fromfile(f.name))
+        connection.close()
+    finally:
+        os.remove(f.name)
+
+
+def test_todb():
+
+    connection = sqlite3.connect(':memory:')
+    connection.execute('create table fruit (fruit, city, sales)')
+    p = todb(connection, 'fruit')
+    p.push(table1)
+    ieq(table1, fromdb(connection, 'select * from fruit'))
+
+    appenddb(connection.cursor(), 'fruit').push(table1[:2])
+    ieq(table1 + table1[1:2], fromdb(connection,
+                                          'select * from fruit'))
+    appenddb(connection.cursor, 'fruit', multirow=True).push(table1[:2])
+    ieq(table1 + table1[1:2] * 2, fromdb(connection,
+                                              'select * from fruit'))
+
+    assert_raises(ValueError, todb(object(), 'fruit').push, table1)
+
+
+def test_buffered():
+
+    f = NamedTemporaryFile(delete=False)
+    f.close()
+    try:
+        c1, c2 = _Collect(), _Collect()
+        p = convert('sales', str)
+        b = buffered(tocsv(f.name), maxsize=3)
+        p.pipe(b).pipe(c1)
+        p.pipe(buffered(tosqlite3(f.name + '.db', 'fruit', create=True)))\
+            .pipe(c2)
+        p.push(table1, batchsize=2)
+        t = petl.convert(table1, 'sales', str)
+        ieq(t, fromcsv(f.name))
+        ieq(t, _fromfile(f.name + '.db'))
+        ieq(t, c1.rows())
+        ieq(t, c2.rows())
+        assert threading.current_thread() not in c1.threads
+    finally:
+        os.remove(f.name)
+        os.remove(f.name + '.db')
+
+
+def test_buffered_errors():
+
+    c = _Collect()
+    c.fail = ValueError('foo')
+    p = buffered(c, maxsize=2)
+    assert_raises(ValueError, p.push, table1, batchsize=1)
+    # an error connecting
+    p = buffered(cut('quux'))
+    assert_raises(FieldSelectionError, p.push, table1)
+    # an error in another branch, in the pushing thread, still closes the
+    # buffered branch so its thread finishes
+    c1, c2 = _Collect(), _Collect()
+    c2.fail = ValueError('bar')
+    p = cut('fruit', 'sales')
+    p.pipe(buffered(c1))
+    p.pipe(c2)
+    assert_raises(ValueError, p.push, table1, batchsize=1)
+    eq_(1, len(c1.threads))
+    assert not any(t.is_alive() for t in c1.threads)
+
+
+def test_sort_spill():
+
+    table = [('foo', 'bar')] + [(i % 7, i) for i in range(100)] \
+        + [(None, 100), ('x', 101)]
+    for kwargs in (dict(memory=1000), dict(buffersize=10),
+                   dict(memory=1000, workers=2)):
+        for reverse in (False, True):
+            c = _Collect()
+            p = sort('foo', reverse=reverse, **kwargs)
+            p.pipe(c)
+            p.push(table, batchsize=3)
+            ieq(petl.sort(table, 'foo', reverse=reverse), c.rows())
+            c = _Collect()
+            p = sort(reverse=reverse, **kwargs)
+            p.pipe(c)
+            p.push(table, batchsize=3)
+            ieq(petl.sort(table, reverse=reverse), c.rows())
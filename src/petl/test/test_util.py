@@ -11,7 +11,8 @@ from petl import header, fieldnames, data, records, rowcount, look, see, \
     DuplicateKeyError, rowlengths, stats, typecounts, parsecounts, typeset, \
     valuecount, parsenumber, stringpatterns, diffheaders, diffvalues, \
     datetimeparser, values, columns, facetcolumns, isordered, \
-    rowgroupby, lookstr, namedtuples, dicts, recordlookup, recordlookupone
+    rowgroupby, lookstr, namedtuples, dicts, recordlookup, recordlookupone, \
+    cache, nrows, heapqmergesorted, shortlistmergesorted
 from petl.testutils import ieq
 
 
@@ -885,3 +886,64 @@ def test_rowgroupby():
     eq_(True, vals[0])
     eq_(None, vals[1]) # gets padded
     
+
+
+def test_cache_randomaccess():
+
+    table = [('foo', 'bar'), ('a', 1), ('b', 2), ('c', 3)]
+    cached = cache(table)
+    ieq(table, cached)
+    eq_(4, len(cached))
+    eq_(('b', 2), cached[2])
+    eq_(('c', 3), cached[-1])
+    ieq(table[1:3], cached[1:3])
+    ieq(table[1:3], data(cached, 2))
+    eq_(3, nrows(cached))
+
+
+def test_heapqmergesorted():
+
+    from operator import itemgetter
+    runs = [[(3, 'a'), (2, 'b'), (1, 'c')],
+            [],
+            [(3, 'd'), (1, 'e')],
+            [(4, 'f'), (2, 'g'), (2, 'h'), (0, 'i')]]
+    getkey = itemgetter(0)
+    expect = sorted(sum(runs, []), key=getkey, reverse=True)
+    eq_(expect, list(heapqmergesorted(getkey, *runs, reverse=True)))
+    eq_(expect, list(shortlistmergesorted(getkey, True, *runs)))
+    runs = [list(reversed(r)) for r in runs]
+    expect = sorted(sum(runs, []), key=getkey)
+    eq_(expect, list(heapqmergesorted(getkey, *runs)))
+    runs = [[1, 4, 9], [2, 3], [], [0, 4, 10]]
+    eq_(sorted(sum(runs, [])), list(heapqmergesorted(None, *runs)))
+    eq_(sorted(sum(runs, []), reverse=True),
+        list(heapqmergesorted(None, *[list(reversed(r)) for r in runs],
+                              reverse=True)))
+    eq_([], list(heapqmergesorted(getkey, [], [], reverse=True)))
+    eq_([], list(heapqmergesorted(getkey)))
+
+
+def test_iterparallel():
+
+    from petl.util import iterparallel
+    consumed = [0]
+
+    def rows():
+        for i in xrange(100000):
+            consumed[0] += 1
+            yield i
+
+    f = lambda batch: [v * 2 for v in batch]
+    it = iterparallel(f, rows(), 2, chunksize=10)
+    eq_(0, it.next())
+    # no more than twice as many batches as workers are read ahead, plus the
+    # batch being yielded
+    assert consumed[0] <= 50, consumed[0]
+    eq_(range(2, 2000, 2), [it.next() for _ in range(999)])
+    assert consumed[0] <= 1050, consumed[0]
+    it.close()
+    eq_(range(0, 200, 2), list(iterparallel(f, range(100), 3, chunksize=7)))
+    eq_(range(0, 200, 2), sorted(iterparallel(f, range(100), 3, chunksize=7,
+                                              ordered=False)))
+    eq_([], list(iterparallel(f, [], 2)))
@@ -337,3 +337,23 @@ def test_replace_unhashable():
     actual = replace(table1, 'bar', None, [])
     ieq(expect, actual)
 
+
+
+def test_convert_workers():
+
+    table1 = [('foo', 'bar')] + [(str(i), i) for i in range(100)]
+    expect = [('foo', 'bar')] + [(i, i * 2) for i in range(100)]
+    table2 = convert(table1, {'foo': int, 'bar': lambda v: v * 2}, workers=2,
+                     chunksize=7)
+    ieq(expect, table2)
+    ieq(expect, table2)
+    table3 = convert(table1, {'foo': int, 'bar': lambda v: v * 2}, workers=2,
+                     chunksize=7, ordered=False)
+    ieq(expect, [expect[0]] + sorted(list(table3)[1:]))
+
+    # with where and errors
+    table4 = convert(table1, 'foo', lambda v: 1 / int(v), where='{bar} < 4',
+                     workers=2, chunksize=3)
+    expect4 = ([('foo', 'bar'), (None, 0)]
+               + [(1 / i, i) for i in range(1, 4)] + table1[5:])
+    ieq(expect4, table4)
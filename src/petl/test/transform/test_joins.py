@@ -4,10 +4,19 @@ from __future__ import absolute_import, print_function, division
 __author__ = 'Alistair Miles'
 
 
+from functools import partial
+
+
+from nose.tools import eq_
+
+
 from petl.testutils import ieq
+from petl import sort
 from petl import join, leftjoin, rightjoin, outerjoin, crossjoin, antijoin, \
     lookupjoin, hashjoin, hashleftjoin, hashrightjoin, hashantijoin, \
-    hashlookupjoin, unjoin
+    hashlookupjoin, unjoin, bloomfilter
+from petl.transform.joins import BloomFilter
+import petl.transform.hashjoins
 
 
 def _test_join_basic(join_impl):
@@ -919,6 +928,120 @@ def test_hashlookupjoin():
     _test_lookupjoin(hashlookupjoin)
 
 
+def _test_hashjoin_partitioned(join_impl, **kwargs):
+
+    left = [('id', 'colour')] + [(i % 7, 'c%s' % i) for i in range(20)]
+    right = [('id', 'shape')] + [(i % 5, 's%s' % i) for i in range(12)] \
+        + [(None, 'x')]
+
+    # partitioned join should give the same rows as the in-memory join,
+    # although not necessarily in the same order
+    expect = sort(join_impl(left, right, key='id', **kwargs))
+    for workers in None, 2:
+        actual = join_impl(left, right, key='id', buffersize=3, partitions=3,
+                           workers=workers, **kwargs)
+        ieq(expect, sort(actual))
+        ieq(expect, sort(actual))  # check twice
+
+    # everything in one partition
+    actual = join_impl(left, right, key='id', buffersize=3, partitions=1,
+                       **kwargs)
+    ieq(expect, sort(actual))
+
+    # empty tables
+    for l, r in (left[:1], right), (left, right[:1]):
+        expect = join_impl(l, r, key='id', **kwargs)
+        actual = join_impl(l, r, key='id', buffersize=0, partitions=3,
+                           **kwargs)
+        ieq(sort(expect), sort(actual))
+
+
+def test_hashjoin_partitioned():
+    _test_hashjoin_partitioned(hashjoin)
+    _test_hashjoin_partitioned(hashjoin, lprefix='l_', rprefix='r_')
+
+
+def test_hashleftjoin_partitioned():
+    _test_hashjoin_partitioned(hashleftjoin)
+    _test_hashjoin_partitioned(hashleftjoin, missing='NA')
+
+
+def test_hashrightjoin_partitioned():
+    _test_hashjoin_partitioned(hashrightjoin)
+
+
+def test_hashantijoin_partitioned():
+    _test_hashjoin_partitioned(hashantijoin)
+
+
+def test_hashjoin_partitioned_depth():
+
+    # partitions which are still too large are partitioned again, up to a
+    # limit, as rows with the same key can't be split
+    left = [('id', 'colour')] + [(i % 10, 'c%s' % i) for i in range(50)]
+    right = [('id', 'shape')] + [(i % 10, 's%s' % i) for i in range(40)]
+    for join_impl in hashjoin, hashleftjoin, hashrightjoin, hashantijoin:
+        expect = sort(join_impl(left, right, key='id'))
+        for depth in 0, 2:
+            petl.transform.hashjoins.maxpartitiondepth = depth
+            try:
+                for workers in None, 2:
+                    actual = join_impl(left, right, key='id', buffersize=5,
+                                       partitions=2, workers=workers)
+                    ieq(expect, sort(actual))
+            finally:
+                petl.transform.hashjoins.maxpartitiondepth = 2
+
+
+def test_bloomfilter():
+
+    bf = BloomFilter(1000, errorrate=0.01)
+    for i in range(1000):
+        bf.add(i)
+    # no false negatives
+    for i in range(1000):
+        assert i in bf
+    # false positives at around the expected rate
+    fp = sum(1 for i in range(1000, 11000) if i in bf)
+    assert fp < 300, fp
+
+    table = (('foo', 'bar'), ('a', 1), ('b', 2), ('b', 3))
+    bf = bloomfilter(table, ('foo', 'bar'))
+    assert ('a', 1) in bf
+    assert ('b', 3) in bf
+    bf = bloomfilter(table[:1], 'foo')
+    eq_(False, 'a' in bf)
+
+
+def test_join_bloom():
+    _test_join(partial(join, bloom=True))
+    _test_rightjoin(partial(rightjoin, bloom=True))
+
+
+def test_antijoin_lookupjoin_bloom():
+
+    left = [('id', 'colour')] + [(i % 7, 'c%s' % i) for i in range(20)]
+    right = [('id', 'shape')] + [(i % 5, 's%s' % i) for i in range(12)]
+    # rows without a match are output last, so compare sorted
+    for join_impl in antijoin, lookupjoin:
+        expect = join_impl(left, right, key='id')
+        actual = join_impl(left, right, key='id', bloom=True, errorrate=0.1)
+        ieq(sort(expect), sort(actual))
+        ieq(sort(expect), sort(actual))  # check twice
+    _test_antijoin(lambda *args, **kwargs: sort(antijoin(*args, bloom=True,
+                                                         **kwargs)))
+    _test_lookupjoin(partial(lookupjoin, bloom=True))
+    actual = lookupjoin(left, right, key='id', missing='NA', bloom=True)
+    ieq(sort(lookupjoin(left, right, key='id', missing='NA')), sort(actual))
+
+
+def test_hashjoin_partitioned_bloom():
+    _test_hashjoin_partitioned(hashjoin, bloom=True)
+    _test_hashjoin_partitioned(hashleftjoin, bloom=True, errorrate=0.1)
+    _test_hashjoin_partitioned(hashleftjoin, missing='NA', bloom=True)
+    _test_hashjoin_partitioned(hashantijoin, bloom=True)
+
+
 def test_unjoin_implicit_key():
 
     # test the case where the join key needs to be reconstructed
@@ -260,3 +260,21 @@ def test_recordmapmany():
               (4, 'age_months', 21*12))
     ieq(expect, actual)
     ieq(expect, actual)  # can iteratate twice?
+
+
+def test_rowmap_workers():
+
+    table = [('id', 'x')] + [(i, i * 10) for i in range(50)]
+
+    def rowmapper(row):
+        if row.id % 10 == 0:
+            raise ValueError('skip')
+        return [row.id, row['x'] + 1]
+
+    expect = [('id', 'y')] + [(i, i * 10 + 1) for i in range(50) if i % 10]
+    actual = rowmap(table, rowmapper, ['id', 'y'], workers=2, chunksize=4)
+    ieq(expect, actual)
+    ieq(expect, actual)
+    actual = rowmap(table, rowmapper, ['id', 'y'], workers=2, chunksize=4,
+                    ordered=False)
+    ieq(expect, [expect[0]] + sorted(list(actual)[1:]))
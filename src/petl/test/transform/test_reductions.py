@@ -12,7 +12,9 @@ from petl.testutils import ieq
 from petl.util import strjoin
 from petl.transform.reductions import rowreduce, rangerowreduce, aggregate, \
     rangeaggregate, rangecounts, mergeduplicates, Conflict, \
-    multirangeaggregate, fold
+    multirangeaggregate, fold, MeanAggregator, SetAggregator, \
+    VarianceAggregator, FirstAggregator, LastAggregator, \
+    CountDistinctAggregator
 
 
 def test_rowreduce():
@@ -735,3 +737,233 @@ def test_fold():
     expect = (('key', 'value'), (1, 8), (2, 12))
     ieq(expect, t2)
     ieq(expect, t2)
+
+
+def test_aggregate_hashed():
+
+    table1 = (('foo', 'bar'),
+              ('c', 4),
+              ('b', 2),
+              ('a', 3),
+              ('b', 1),
+              ('a', 7),
+              ('b', 9))
+
+    table2 = aggregate(table1, 'foo', sum, 'bar', hashed=True)
+    expect2 = (('foo', 'value'),
+               ('a', 10),
+               ('b', 12),
+               ('c', 4))
+    ieq(expect2, table2)
+    ieq(expect2, table2)
+
+    aggregators = OrderedDict()
+    aggregators['count'] = len
+    aggregators['minbar'] = 'bar', min
+    aggregators['maxbar'] = 'bar', max
+    aggregators['meanbar'] = 'bar', MeanAggregator()
+    aggregators['listbar'] = 'bar', list
+    aggregators['setbar'] = 'bar', SetAggregator()
+    expect3 = (('foo', 'count', 'minbar', 'maxbar', 'meanbar', 'listbar',
+                'setbar'),
+               ('a', 2, 3, 7, 5., [3, 7], set([3, 7])),
+               ('b', 3, 1, 9, 4., [2, 1, 9], set([1, 2, 9])),
+               ('c', 1, 4, 4, 4., [4], set([4])))
+    table3 = aggregate(table1, 'foo', aggregators, hashed=True)
+    ieq(expect3, table3)
+    ieq(expect3, table3)
+
+    # force the partial aggregates to be spilled to disk
+    table4 = aggregate(table1, 'foo', aggregators, hashed=True, maxkeys=1)
+    ieq(expect3, table4)
+    ieq(expect3, table4)
+
+
+def test_aggregate_hashed_empty():
+
+    table = (('foo', 'bar'),)
+    actual = aggregate(table, 'foo', sum, 'bar', hashed=True)
+    expect = (('foo', 'value'),)
+    ieq(expect, actual)
+
+
+def test_rowreduce_hashed():
+
+    table1 = (('foo', 'bar'),
+              ('b', 2),
+              ('a', 3),
+              ('c', 4),
+              ('b', 1),
+              ('a', 7),
+              ('b', 9))
+
+    def sumbar(key, records):
+        return [key, sum(rec['bar'] for rec in records)]
+
+    expect2 = (('foo', 'barsum'),
+               ('a', 10),
+               ('b', 12),
+               ('c', 4))
+    table2 = rowreduce(table1, key='foo', reducer=sumbar,
+                       fields=['foo', 'barsum'], hashed=True)
+    ieq(expect2, table2)
+    table3 = rowreduce(table1, key='foo', reducer=sumbar,
+                       fields=['foo', 'barsum'], hashed=True, maxkeys=1)
+    ieq(expect2, table3)
+    ieq(expect2, table3)
+
+
+def test_mergeduplicates_hashed():
+
+    table = (('foo', 'bar', 'baz'),
+             ('A', 1, 2),
+             ('B', '2', None),
+             ('D', 'xyz', 9.4),
+             ('B', None, u'7.8', True),
+             ('E', None, 42.),
+             ('D', 'xyz', 12.3),
+             ('A', 2, None))
+    expectation = (('foo', 'bar', 'baz'),
+                   ('A', Conflict([1, 2]), 2),
+                   ('B', '2', u'7.8'),
+                   ('D', 'xyz', Conflict([9.4, 12.3])),
+                   ('E', None, 42.))
+    ieq(expectation, mergeduplicates(table, 'foo', hashed=True))
+    ieq(expectation, mergeduplicates(table, 'foo', hashed=True, maxkeys=2))
+
+    table = [['foo', 'bar', 'baz'],
+             ['c', 3, True],
+             ['a', 1, True],
+             ['a', 2, False],
+             ['c', 3, False],
+             ['a', 1, True],
+             ['a', 2, None]]
+    expect = [('foo', 'bar', 'baz'),
+              ('a', 1, True),
+              ('a', 2, False),
+              ('c', 3, Conflict([True, False]))]
+    ieq(expect, mergeduplicates(table, key=('foo', 'bar'), hashed=True,
+                                maxkeys=1))
+
+
+def test_fold_hashed():
+
+    t1 = (('id', 'count'), (2, 4), (1, 3), (2, 8), (1, 5))
+    expect = (('key', 'value'), (1, 8), (2, 12))
+    t2 = fold(t1, 'id', operator.add, 'count', hashed=True)
+    ieq(expect, t2)
+    ieq(expect, t2)
+    t3 = fold(t1, 'id', operator.add, 'count', hashed=True, maxkeys=1)
+    ieq(expect, t3)
+
+
+def test_aggregate_streaming():
+
+    table1 = (('foo', 'bar'),
+              ('a', 3),
+              ('a', 7),
+              ('b', 2),
+              ('b', 1),
+              ('b', 9),
+              ('b', 2),
+              ('c', 4))
+
+    aggregators = OrderedDict()
+    aggregators['first'] = 'bar', FirstAggregator()
+    aggregators['last'] = 'bar', LastAggregator()
+    aggregators['ndistinct'] = 'bar', CountDistinctAggregator()
+    aggregators['mean'] = 'bar', MeanAggregator()
+    aggregators['var'] = 'bar', VarianceAggregator()
+    expect = (('foo', 'first', 'last', 'ndistinct', 'mean', 'var'),
+              ('a', 3, 7, 2, 5., 8.),
+              ('b', 2, 2, 3, 3.5, 41 / 3),
+              ('c', 4, 4, 1, 4., None))
+    ieq(expect, aggregate(table1, 'foo', aggregators))
+    ieq(expect, aggregate(table1, 'foo', aggregators, hashed=True))
+    ieq(expect, aggregate(table1, 'foo', aggregators, hashed=True,
+                          maxkeys=1))
+
+    # check a large group is aggregated without materialising it
+    def rows():
+        yield ('foo', 'bar')
+        for i in xrange(100000):
+            yield ('a', i)
+    aggregators = OrderedDict()
+    aggregators['count'] = len
+    aggregators['sum'] = 'bar', sum
+    aggregators['max'] = 'bar', max
+    table2 = aggregate(rows(), 'foo', aggregators, presorted=True)
+    expect2 = (('foo', 'count', 'sum', 'max'),
+               ('a', 100000, 4999950000, 99999))
+    ieq(expect2, table2)
+
+
+def test_varianceaggregator_merge():
+
+    a = VarianceAggregator()
+    values = [2, 4, 4, 4, 5, 5, 7, 9]
+    expect = a(values)
+    s1 = a.init()
+    for v in values[:3]:
+        s1 = a.update(s1, v)
+    s2 = a.init()
+    for v in values[3:]:
+        s2 = a.update(s2, v)
+    assert abs(expect - a.finalize(a.merge(s1, s2))) < 1e-9
+    assert abs(expect - 32 / 7) < 1e-9
+    assert a.finalize(a.merge(a.init(), s1)) == a.finalize(s1)
+
+
+def test_rangeaggregate_streaming():
+
+    table1 = (('foo', 'bar'),
+              ('a', 3),
+              ('a', 7),
+              ('b', 2),
+              ('b', 1),
+              ('b', 9),
+              ('c', 4),
+              ('d', 3))
+
+    aggregation = OrderedDict()
+    aggregation['foocount'] = len
+    aggregation['foofirst'] = 'foo', FirstAggregator()
+    aggregation['barmean'] = 'bar', MeanAggregator()
+    table2 = rangeaggregate(table1, 'bar', 2, aggregation)
+    expect2 = (('bar', 'foocount', 'foofirst', 'barmean'),
+               ((1, 3), 2, 'b', 1.5),
+               ((3, 5), 3, 'a', 10 / 3),
+               ((5, 7), 0, None, None),
+               ((7, 9), 1, 'a', 7.),
+               ((9, 11), 1, 'b', 9.))
+    ieq(expect2, table2)
+    ieq(expect2, table2)
+
+    table3 = rangeaggregate(table1, 'bar', 2, MeanAggregator(), 'bar')
+    expect3 = (('bar', 'value'),
+               ((1, 3), 1.5),
+               ((3, 5), 10 / 3),
+               ((5, 7), None),
+               ((7, 9), 7.),
+               ((9, 11), 9.))
+    ieq(expect3, table3)
+
+
+def test_multirangeaggregate_streaming():
+
+    t1 = (('x', 'y', 'z'),
+          (1, 3, 9),
+          (2, 3, 12),
+          (4, 2, 17),
+          (2, 7, 3),
+          (1, 6, 1))
+
+    t2 = multirangeaggregate(t1, keys=('x', 'y'), widths=(2, 2),
+                             aggregation=MeanAggregator(), value='z',
+                             mins=(0, 0), maxs=(4, 4))
+    e2 = (('key', 'value'),
+          (((0, 2), (0, 2)), None),
+          (((0, 2), (2, 4)), 9.),
+          (((2, 4), (0, 2)), None),
+          (((2, 4), (2, 4)), 14.5))
+    ieq(e2, t2)
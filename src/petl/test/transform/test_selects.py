@@ -324,3 +324,20 @@ def test_rangefacet():
                  ('a', 7),
                  ('b', 9))
     ieq(expect_79, rf[(7, 9)])
+
+
+def test_select_workers():
+
+    table = [('foo', 'bar')] + [(i % 3, i) for i in range(60)]
+    expect = [('foo', 'bar')] + [(0, i) for i in range(0, 60, 3)]
+    actual = select(table, lambda rec: rec.foo == 0, workers=2, chunksize=8)
+    ieq(expect, actual)
+    ieq(expect, actual)
+    actual = select(table, 'foo', lambda v: v == 0, workers=2, chunksize=8)
+    ieq(expect, actual)
+    actual = select(table, 'foo', lambda v: v == 0, workers=2, chunksize=8,
+                    ordered=False)
+    ieq(expect, [table[0]] + sorted(list(actual)[1:]))
+    actual = select(table, 'foo', lambda v: v == 0, complement=True,
+                    workers=2, chunksize=8)
+    ieq(select(table, 'foo', lambda v: v == 0, complement=True), actual)
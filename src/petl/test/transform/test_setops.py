@@ -8,8 +8,11 @@ from datetime import datetime
 
 
 from petl.testutils import ieq
+from petl.transform.sorts import sort
 from petl.transform.setops import complement, intersection, diff, \
-    recordcomplement, recorddiff, hashcomplement, hashintersection
+    recordcomplement, recorddiff, hashcomplement, hashintersection, \
+    hashrecordcomplement, hashdiff, hashrecorddiff
+import petl.transform.hashjoins
 
 
 def _test_complement_1(complement_impl):
@@ -418,3 +421,58 @@ def test_hashcomplement():
 
 def test_hashintersection():
     _test_intersection(hashintersection)
+
+
+def test_hash_partitioned():
+
+    a = [('foo', 'bar')] + [(i % 7, 'x%s' % (i % 3)) for i in range(40)]
+    b = [('foo', 'bar')] + [(i % 5, 'x%s' % (i % 4)) for i in range(30)]
+
+    # partitioned operations should give the same rows as in memory,
+    # although not necessarily in the same order
+    for setop in hashcomplement, hashintersection:
+        expect = sort(setop(a, b))
+        for partitions in 1, 3:
+            actual = setop(a, b, buffersize=4, partitions=partitions)
+            ieq(expect, sort(actual))
+            ieq(expect, sort(actual))  # check twice
+        # empty tables
+        for ta, tb in (a[:1], b), (a, b[:1]), (a[:1], b[:1]):
+            ieq(sort(setop(ta, tb)), sort(setop(ta, tb, buffersize=0)))
+
+
+def test_hash_partitioned_depth():
+
+    # partitions which are still too large are partitioned again, up to a
+    # limit, as duplicate rows can't be split
+    a = [('foo',)] + [(i % 10,) for i in range(100)]
+    b = [('foo',)] + [(i % 4,) for i in range(100)]
+    expect = sort(hashcomplement(a, b))
+    for depth in 0, 2:
+        petl.transform.hashjoins.maxpartitiondepth = depth
+        try:
+            actual = hashcomplement(a, b, buffersize=5, partitions=2)
+            ieq(expect, sort(actual))
+        finally:
+            petl.transform.hashjoins.maxpartitiondepth = 2
+
+
+def test_hashrecorddiff():
+
+    a = (('foo', 'bar', 'baz'),
+         ('A', 1, True),
+         ('C', 7, False),
+         ('B', 2, False),
+         ('C', 9, True))
+    b = (('bar', 'foo', 'baz'),
+         (2, 'B', False),
+         (9, 'A', False),
+         (3, 'B', True),
+         (9, 'C', True))
+    added, subtracted = hashrecorddiff(a, b, buffersize=1, partitions=2)
+    ieq(sort(recordcomplement(b, a)), sort(added))
+    ieq(sort(recordcomplement(a, b)), sort(subtracted))
+    ieq(sort(recordcomplement(a, b)), sort(hashrecordcomplement(a, b)))
+    added, subtracted = hashdiff(a, a[:2])
+    ieq(a[:1], added)
+    ieq(diff(a, a[:2])[1], sort(subtracted))
@@ -4,14 +4,25 @@ from __future__ import absolute_import, print_function, division
 __author__ = 'Alistair Miles <alimanfoo@googlemail.com>'
 
 
+import os
+import tempfile
 from datetime import datetime
+from tempfile import NamedTemporaryFile
 from nose.tools import eq_
 
 
 from petl.testutils import ieq
-from petl.util import nrows
-from petl.transform.basics import cat
-from petl.transform.sorts import sort, mergesort
+from petl.util import nrows, sortorder
+from petl.transform.basics import cat, tail, cut, cutout, addfield, head
+from petl.transform.sorts import sort, mergesort, writechunk, iterchunk
+from petl.transform.selects import selectgt
+from petl.transform.conversions import convert
+from petl.transform.headers import rename
+from petl.transform.joins import join, antijoin
+from petl.transform.reductions import aggregate
+from petl.transform.dedup import unique, duplicates, distinct
+from petl.transform.setops import complement
+import petl.transform.sorts
 
 
 def test_sort_1():
@@ -244,6 +255,82 @@ def test_sort_buffered_independent():
     eq_(expectation[2], it1.next())
 
 
+def test_sort_buffered_workers():
+
+    table = (('foo', 'bar'),
+             ('C', 2),
+             ('A', 9),
+             ('A', 6),
+             ('F', 1),
+             ('D', 10),
+             ('B', 3),
+             ('E', 7))
+
+    # parallel chunk sorting should give the same result as serial
+    for key in 'bar', ('foo', 'bar'), None:
+        for reverse in False, True:
+            expectation = sort(table, key=key, reverse=reverse)
+            result = sort(table, key=key, reverse=reverse, buffersize=2,
+                          workers=2)
+            ieq(expectation, result)
+            ieq(expectation, result)  # check file cache
+
+    # workers not used if everything fits in memory
+    result = sort(table, 'bar', workers=2)
+    ieq(sort(table, 'bar'), result)
+
+
+def test_writechunk_iterchunk():
+
+    rows = [('A', i, None, datetime(2012, 1, 1)) for i in range(2500)]
+
+    for compresslevel in None, 1, 9:
+        f = NamedTemporaryFile()
+        writechunk(f, rows, blocksize=1000, compresslevel=compresslevel)
+        f.flush()
+        ieq(rows, iterchunk(f))
+        # iterators are independent
+        it1 = iterchunk(f)
+        it2 = iterchunk(f)
+        eq_(rows[0], it1.next())
+        eq_(rows[0], it2.next())
+        eq_(rows[1], it1.next())
+
+    # empty chunk
+    f = NamedTemporaryFile()
+    writechunk(f, [])
+    f.flush()
+    ieq([], iterchunk(f))
+
+
+def test_sort_buffered_compressed():
+
+    table = (('foo', 'bar'),
+             ('C', 2),
+             ('A', 9),
+             ('A', 6),
+             ('F', 1),
+             ('D', 10))
+    expectation = (('foo', 'bar'),
+                   ('F', 1),
+                   ('C', 2),
+                   ('A', 6),
+                   ('A', 9),
+                   ('D', 10))
+
+    blocksize = petl.transform.sorts.defaultblocksize
+    compresslevel = petl.transform.sorts.defaultcompresslevel
+    petl.transform.sorts.defaultblocksize = 1
+    petl.transform.sorts.defaultcompresslevel = 6
+    try:
+        result = sort(table, 'bar', buffersize=2)
+        ieq(expectation, result)
+        ieq(expectation, result)
+    finally:
+        petl.transform.sorts.defaultblocksize = blocksize
+        petl.transform.sorts.defaultcompresslevel = compresslevel
+
+
 def test_sort_empty():
     table = (('foo', 'bar'),)
     expect = (('foo', 'bar'),)
@@ -288,6 +375,116 @@ def test_sort_none():
     ieq(expectation, result)
 
 
+def test_sort_buffered_stable():
+
+    table = (('foo', 'bar'),
+             ('C', 2),
+             ('A', 9),
+             ('B', 6),
+             ('A', 1),
+             ('C', 10),
+             ('A', 3),
+             ('B', 7))
+
+    # rows with equal keys should come out in input order, whether or not the
+    # table is sorted in chunks
+    expectation = (('foo', 'bar'),
+                   ('A', 9),
+                   ('A', 1),
+                   ('A', 3),
+                   ('B', 6),
+                   ('B', 7),
+                   ('C', 2),
+                   ('C', 10))
+    ieq(expectation, sort(table, 'foo'))
+    ieq(expectation, sort(table, 'foo', buffersize=2))
+    ieq(expectation, sort(table, 'foo', buffersize=3, workers=2))
+
+
+def test_sort_buffered_mixed_chunks():
+
+    dt = datetime(2012, 1, 1).replace
+
+    # some chunks have only datetimes under the key, others also have None,
+    # so the chunks can't all be merged on raw values
+    table = (('foo', 'bar'),
+             ('A', dt(hour=5)),
+             ('B', dt(hour=1)),
+             ('C', None),
+             ('D', dt(hour=9)),
+             ('E', dt(hour=17)),
+             ('F', dt(hour=3)),
+             ('G', None))
+    expectation = (('foo', 'bar'),
+                   ('C', None),
+                   ('G', None),
+                   ('B', dt(hour=1)),
+                   ('F', dt(hour=3)),
+                   ('A', dt(hour=5)),
+                   ('D', dt(hour=9)),
+                   ('E', dt(hour=17)))
+    ieq(expectation, sort(table, 'bar'))
+    ieq(expectation, sort(table, 'bar', buffersize=2))
+    ieq(expectation, sort(table, 'bar', buffersize=2, workers=2))
+    expectation = (('foo', 'bar'),
+                   ('E', dt(hour=17)),
+                   ('D', dt(hour=9)),
+                   ('A', dt(hour=5)),
+                   ('F', dt(hour=3)),
+                   ('B', dt(hour=1)),
+                   ('C', None),
+                   ('G', None))
+    ieq(expectation, sort(table, 'bar', reverse=True))
+    ieq(expectation, sort(table, 'bar', buffersize=2, reverse=True))
+
+
+def test_sort_multipass():
+
+    table = [('foo', 'bar')] + [(i % 13, i) for i in range(200)] \
+        + [(None, 200), (5, None)]
+    maxfanin = petl.transform.sorts.defaultmaxfanin
+    petl.transform.sorts.defaultmaxfanin = 3
+    try:
+        # rows with equal keys still come out in input order
+        for key in 'foo', None:
+            for reverse in False, True:
+                expectation = sorted(table[1:], reverse=reverse,
+                                     key=lambda row: row[0] if key else row)
+                result = sort(table, key, reverse=reverse, buffersize=7)
+                ieq([table[0]] + expectation, result)
+                eq_(3, len(result._filecache))  # merged from 29 chunks
+                ieq([table[0]] + expectation, result)  # check file cache
+        result = sort(table, 'foo', buffersize=7, workers=2)
+        ieq(sort(table, 'foo'), result)
+        eq_(3, len(result._filecache))
+        # chunk files merged into larger chunks are removed
+        tempdir = tempfile.mkdtemp()
+        result = sort(table, 'foo', buffersize=7, tempdir=tempdir)
+        nrows(result)
+        eq_(3, len(os.listdir(tempdir)))
+        del result
+        eq_([], os.listdir(tempdir))
+        os.rmdir(tempdir)
+    finally:
+        petl.transform.sorts.defaultmaxfanin = maxfanin
+
+
+def test_sort_memory():
+
+    table = [('foo', 'bar')] + [(i % 13, 'x' * 100) for i in range(5000)]
+    result = sort(table, 'foo', memory=2**16)
+    ieq(sort(table, 'foo', buffersize=None), result)
+    assert result._filecache is not None
+    assert len(result._filecache) > 1
+    # the row limit doesn't apply if only the memory budget is given
+    result = sort(table, 'foo', memory=2**24)
+    ieq(sort(table, 'foo', buffersize=None), result)
+    assert result._memcache is not None
+    result = sort(table, 'foo', buffersize=100, memory=2**24)
+    nrows(result)
+    eq_(50, len(result._filecache))
+
+
 def test_mergesort_1():
 
     table1 = (('foo', 'bar'),
@@ -406,3 +603,133 @@ def test_mergesort_empty():
     actual = mergesort(table1, table2, key='foo')
     ieq(expect, actual)
     ieq(expect, actual)
+
+
+def test_sort_rowstore():
+
+    table = [('foo', 'bar')] + [(i % 7, i) for i in range(20)]
+    expectation = [table[0]] + sorted(table[1:])
+
+    # cached in memory
+    result = sort(table)
+    ieq(expectation, result)
+    eq_(21, len(result))
+    eq_(expectation[-1], result[-1])
+    ieq(expectation[:1] + expectation[-3:], tail(result, 3))
+
+    # cached in a row store
+    result = sort(table, buffersize=3, cache='rowstore')
+    ieq(expectation, result)
+    assert result._rowstore is not None
+    assert result._filecache is None
+    ieq(expectation, result)
+    eq_(21, len(result))
+    eq_(expectation[5], result[5])
+    ieq(expectation[2:9:2], result[2:9:2])
+    ieq(expectation[:1] + expectation[-3:], tail(result, 3))
+
+    # reverse
+    result = sort(table, buffersize=3, cache='rowstore', reverse=True)
+    expectation = [table[0]] + sorted(table[1:], reverse=True)
+    ieq(expectation, result)
+    ieq(expectation, result)
+    eq_(expectation[-1], result[-1])
+
+
+def test_sort_elision():
+
+    table = (('foo', 'bar', 'baz'),
+             ('C', 2, 'x'),
+             ('A', 9, 'y'),
+             ('A', 6, 'z'),
+             ('B', 1, 'x'))
+
+    t1 = sort(table, ('foo', 'bar'))
+    eq_((('foo', 'bar'), False), sortorder(t1))
+    # sorted by the same key or a prefix of it
+    assert sort(t1, ('foo', 'bar')) is t1
+    assert sort(t1, 'foo') is t1
+    assert sort(t1, 'bar') is not t1
+    assert sort(t1, 'foo', reverse=True) is not t1
+    assert sort(t1) is not t1
+
+    # order preserving transformations
+    t2 = rename(cut(selectgt(t1, 'bar', 1), 'baz', 'foo'), 'foo', 'qux')
+    eq_((('qux',), False), sortorder(t2))
+    assert sort(t2, 'qux') is t2
+    ieq(sort(list(t2), 'qux'), t2)
+    t3 = cutout(convert(t1, 'baz', 'upper'), 'baz')
+    eq_((('foo', 'bar'), False), sortorder(t3))
+    eq_(None, sortorder(convert(t1, 'foo', 'lower')))
+    eq_((('foo',), False), sortorder(convert(t1, 'bar', str)))
+    eq_(None, sortorder(convert(t1, 0, 'lower')))
+    eq_(None, sortorder(rename(t1, 0, 'x')))
+    eq_((('foo', 'bar'), False), sortorder(addfield(t1, 'n', 1)))
+    eq_(None, sortorder(cut(t1, 1, 2)))
+    t4 = sort(table, 1, reverse=True)
+    eq_((1,), sortorder(cut(t4, 2, 1))[0])
+    eq_(None, sortorder(addfield(t4, 'n', 1, index=0)))
+    t5 = sort(table)
+    eq_((None, False), sortorder(head(rename(t5, 'foo', 'x'), 2)))
+    eq_(None, sortorder(cut(t5, 'foo')))
+    eq_(None, sortorder(table))
+
+
+def test_sort_elision_keyed():
+
+    left = (('id', 'x'), (3, 'c'), (1, 'a'), (2, 'b'), (1, 'd'))
+    right = (('id', 'y'), (2, True), (1, False), (3, None))
+    l = sort(left, 'id')
+    r = sort(right, 'id')
+
+    # joins and aggregations don't sort again
+    j = join(l, r, key='id')
+    assert j.left is l and j.right is r
+    eq_((('id',), False), sortorder(j))
+    a = aggregate(j, 'id', len)
+    assert a.table is j
+    eq_((('id',), False), sortorder(a))
+    ieq((('id', 'value'), (1, 2), (2, 1), (3, 1)), a)
+    assert antijoin(a, r, key='id').left is a
+    u = unique(l, 'id')
+    assert u.source is l
+    d = duplicates(cut(l, 'id', 'x'), 'id')
+    ieq((('id', 'x'), (1, 'a'), (1, 'd')), d)
+
+    # set operations sort by whole rows
+    t = sort(left)
+    c = complement(t, sort(right))
+    assert c.a is t
+    eq_((None, False), sortorder(c))
+    assert sort(c) is c
+
+
+def test_sort_elision_presorted():
+
+    # tables claimed to be presorted aren't known to be sorted in python's
+    # order, so the output isn't either
+    table = (('foo', 'bar'), ('c', 1), ('b', 2), ('a', 3))
+    a = aggregate(table, 'foo', len, presorted=True)
+    eq_(None, sortorder(a))
+    ieq((('foo', 'value'), ('a', 1), ('b', 1), ('c', 1)), sort(a, 'foo'))
+    eq_(None, sortorder(aggregate(table, 'foo', presorted=True,
+                                  aggregation=[('n', len)])))
+    eq_(None, sortorder(join(table, table, key='foo', presorted=True)))
+    eq_(None, sortorder(antijoin(table, table, key='foo', presorted=True)))
+    eq_(None, sortorder(unique(table, 'foo', presorted=True)))
+    eq_(None, sortorder(duplicates(table, 'foo', presorted=True)))
+    eq_(None, sortorder(distinct(table, presorted=True)))
+    eq_(None, sortorder(complement(table, table, presorted=True)))
+    m = mergesort((('foo',), ('c',), ('a',)), (('foo',), ('b',)), key='foo',
+                  presorted=True)
+    eq_(None, sortorder(m))
+    ieq((('foo',), ('a',), ('b',), ('c',)), sort(m, 'foo'))
+    # unless the table is known to be sorted anyway
+    t = sort(table, 'foo')
+    eq_((('foo',), False), sortorder(unique(t, 'foo', presorted=True)))
+    eq_((('foo',), False), sortorder(join(t, t, key='foo', presorted=True)))
+    eq_((('foo',), False), sortorder(mergesort(t, t, key='foo',
+                                               presorted=True)))
+    eq_((('foo',), True), sortorder(mergesort(table, table, key='foo',
+                                              reverse=True)))
+    eq_((None, False), sortorder(distinct(table)))
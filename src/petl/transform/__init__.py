@@ -25,7 +25,7 @@ from petl.transform.selects import select, selectop, selectcontains, selecteq, \
     recordselect, rowselect, rowlenselect, fieldselect, facet, rangefacet
 
 from petl.transform.joins import join, leftjoin, rightjoin, outerjoin, \
-    crossjoin, antijoin, lookupjoin, unjoin
+    crossjoin, antijoin, lookupjoin, unjoin, bloomfilter
 
 from petl.transform.hashjoins import hashjoin, hashleftjoin, hashrightjoin, \
     hashantijoin, hashlookupjoin
@@ -33,7 +33,11 @@ from petl.transform.hashjoins import hashjoin, hashleftjoin, hashrightjoin, \
 from petl.transform.reductions import rowreduce, recordreduce, mergeduplicates,\
     aggregate, rangeaggregate, rangecounts, rangerecordreduce, rangerowreduce, \
     groupcountdistinctvalues, groupselectfirst, groupselectmax, groupselectmin,\
-    mergereduce, merge, multirangeaggregate, fold
+    mergereduce, merge, multirangeaggregate, fold, Aggregator, \
+    CountAggregator, SumAggregator, MinAggregator, MaxAggregator, \
+    MeanAggregator, ListAggregator, SetAggregator, ReduceAggregator, \
+    CollectAggregator, MergeValuesAggregator, VarianceAggregator, \
+    FirstAggregator, LastAggregator, CountDistinctAggregator
 
 from petl.transform.fills import filldown, fillright, fillleft
 
@@ -50,4 +54,5 @@ from petl.transform.unpacks import unpack, unpackdict
 from petl.transform.dedup import duplicates, unique, distinct, conflicts
 
 from petl.transform.setops import complement, intersection, \
-    recordcomplement, diff, recorddiff, hashintersection, hashcomplement
\ No newline at end of file
+    recordcomplement, diff, recorddiff, hashintersection, hashcomplement, \
+    hashrecordcomplement, hashdiff, hashrecorddiff
\ No newline at end of file
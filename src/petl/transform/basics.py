@@ -11,7 +11,9 @@ from collections import deque
 
 
 from petl.util import asindices, rowgetter, valueset, limits, itervalues, \
-    hybridrows, OrderedDict, RowContainer, count
+    hybridrows, OrderedDict, RowContainer, count, iterslice, \
+    _israndomaccess, sortorder, _mapsortorder, _dispatch
+from petl.fusion import FusibleView
 
 
 from petl.transform.selects import selecteq, selectrangeopenleft, \
@@ -117,24 +119,47 @@ def cut(table, *args, **kwargs):
     
     See also :func:`cutout`.
     
+    .. versionchanged:: 0.26
+
+    If `table` is a :class:`ColumnarTable`, a columnar table is returned,
+    sharing the arrays for the selected fields.
+
     """
 
     # support passing a single list or tuple of fields
     if len(args) == 1 and isinstance(args[0], (list, tuple)):
         args = args[0]
             
+    result = _dispatch(table, 'cut', args)
+    if result is not None:
+        return result
     return CutView(table, args, **kwargs)
 
 
-class CutView(RowContainer):
+class CutView(FusibleView):
     
     def __init__(self, source, spec, missing=None):
         self.source = source
         self.spec = spec
         self.missing = missing
         
-    def __iter__(self):
-        return itercut(self.source, self.spec, self.missing)
+    def _iterfrom(self, source):
+        return itercut(source, self.spec, self.missing)
+
+    def _sortorder(self):
+        spec = tuple(self.spec)
+        def mapkey(k):
+            if k not in spec:
+                return None
+            elif isinstance(k, basestring):
+                return k
+            return spec.index(k)
+        return _mapsortorder(sortorder(self.source), mapkey)
+
+    def _fuse(self, plan):
+        indices = asindices(plan.flds, tuple(self.spec))
+        plan.flds = rowgetter(*indices)(plan.flds)
+        plan.cols = [plan.cols[i] for i in indices]
     
         
 def itercut(source, spec, missing=None):
@@ -206,15 +231,31 @@ def cutout(table, *args, **kwargs):
     return CutOutView(table, args, **kwargs)
 
 
-class CutOutView(RowContainer):
+class CutOutView(FusibleView):
     
     def __init__(self, source, spec, missing=None):
         self.source = source
         self.spec = spec
         self.missing = missing
         
-    def __iter__(self):
-        return itercutout(self.source, self.spec, self.missing)
+    def _iterfrom(self, source):
+        return itercutout(source, self.spec, self.missing)
+
+    def _sortorder(self):
+        spec = tuple(self.spec)
+        byname = all(isinstance(f, basestring) for f in spec)
+        def mapkey(k):
+            # N.B., fields after any cut out may have moved
+            if isinstance(k, basestring) and byname and k not in spec:
+                return k
+            return None
+        return _mapsortorder(sortorder(self.source), mapkey)
+
+    def _fuse(self, plan):
+        indicesout = asindices(plan.flds, tuple(self.spec))
+        indices = [i for i in range(len(plan.flds)) if i not in indicesout]
+        plan.flds = rowgetter(*indices)(plan.flds)
+        plan.cols = [plan.cols[i] for i in indices]
     
         
 def itercutout(source, spec, missing=None):
@@ -501,17 +542,45 @@ def addfield(table, field, value=None, index=None, missing=None):
                         missing=missing)
 
 
-class AddFieldView(RowContainer):
+class AddFieldView(FusibleView):
     
     def __init__(self, source, field, value=None, index=None, missing=None):
-        # ensure rows are all the same length
-        self.source = cat(source, missing=missing)
+        self.source = source
         self.field = field
         self.value = value
         self.index = index
+        self.missing = missing
         
-    def __iter__(self):
-        return iteraddfield(self.source, self.field, self.value, self.index)
+    def _iterfrom(self, source):
+        # ensure rows are all the same length
+        return iteraddfield(cat(source, missing=self.missing), self.field,
+                            self.value, self.index)
+
+    def _sortorder(self):
+        def mapkey(k):
+            if isinstance(k, basestring):
+                return None if k == self.field else k
+            # N.B., fields after an inserted field move along
+            return k if self.index is None else None
+        return _mapsortorder(sortorder(self.source), mapkey)
+
+    def _fuse(self, plan):
+        # as cat, N.B., rows are the same length as the header here
+        flds = list()
+        for f in plan.flds:
+            if f not in flds:
+                flds.append(f)
+        plan.cols = [plan.cols[plan.flds.index(f)] for f in flds]
+        plan.flds = tuple(flds)
+        if callable(self.value):
+            value = plan.assign('%s(%s)' % (plan.constant(self.value),
+                                            plan.hybridrow()))
+        else:
+            value = plan.constant(self.value)
+        index = len(flds) if self.index is None else self.index
+        flds.insert(index, self.field)
+        plan.cols.insert(index, value)
+        plan.flds = tuple(flds)
     
 
 def iteraddfield(source, field, value, index):
@@ -617,11 +686,14 @@ class RowSliceView(RowContainer):
     def __iter__(self):
         return iterrowslice(self.source, self.sliceargs)
 
+    def _sortorder(self):
+        return sortorder(self.source)
+
 
 def iterrowslice(source, sliceargs):    
-    it = iter(source)
-    yield tuple(it.next()) # fields
-    for row in islice(it, *sliceargs):
+    flds, it = iterslice(source, *sliceargs)
+    yield tuple(flds)
+    for row in it:
         yield tuple(row)
 
 
@@ -664,9 +736,18 @@ def head(table, n=5):
         +-------+-------+
 
     Syntactic sugar, equivalent to ``rowslice(table, n)``.
+
+    .. versionchanged:: 0.26
+
+    If `table` was extracted via :func:`fromdb` or :func:`fromsqlite3` and
+    rewriting queries is enabled, a ``LIMIT`` clause is added to the SQL
+    query instead, see :func:`fromdb`.
     
     """
 
+    limited = _dispatch(table, 'head', n)
+    if limited is not None:
+        return limited
     return rowslice(table, n)
 
         
@@ -732,8 +813,18 @@ class TailView(RowContainer):
     def __iter__(self):
         return itertail(self.source, self.n)
 
+    def _sortorder(self):
+        return sortorder(self.source)
+
 
 def itertail(source, n):
+    if _israndomaccess(source):
+        # seek straight to the last n rows
+        flds, it = iterslice(source, max(source._datalen() - n, 0), None)
+        yield tuple(flds)
+        for row in it:
+            yield tuple(row)
+        return
     it = iter(source)
     yield tuple(it.next()) # fields
     cache = deque()
@@ -792,6 +883,9 @@ class SkipCommentsView(RowContainer):
     def __iter__(self):
         return iterskipcomments(self.source, self.prefix)   
 
+    def _sortorder(self):
+        return sortorder(self.source)
+
 
 def iterskipcomments(source, prefix):
     return (row for row in source if len(row) > 0 and not(isinstance(row[0], basestring) and row[0].startswith(prefix)))
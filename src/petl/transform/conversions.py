@@ -2,7 +2,8 @@ from __future__ import absolute_import, print_function, division
 
 
 from petl.util import numparser, RowContainer, FieldSelectionError, hybridrows,\
-    expr, header
+    expr, header, iterparallel, sortorder, _mapsortorder, _dispatch
+from petl.fusion import FusibleView
 
 
 def convert(table, *args, **kwargs):
@@ -187,6 +188,23 @@ def convert(table, *args, **kwargs):
     arguments to the conversion function (so, i.e., the conversion function
     should accept two arguments).
 
+    .. versionchanged:: 0.26
+
+    If `table` is a :class:`ColumnarTable`, conversions are applied to whole
+    arrays where the conversion function is a NumPy ufunc, a function wrapped
+    via :func:`vectorised`, or one of :func:`int`, :func:`float` or
+    :func:`bool` applied to a numeric field. A columnar table is returned
+    in that case.
+
+    If the ``workers`` keyword argument is greater than 1, rows are converted
+    in batches of ``chunksize`` rows by a pool of ``workers`` processes, see
+    :func:`petl.util.iterparallel`. Rows are output in the order of the input
+    unless ``ordered=False`` is given, e.g.::
+
+        >>> from petl import datetimeparser
+        >>> table5 = convert(table1, 'foo', datetimeparser('%Y-%m-%d'),
+        ...                  workers=4, chunksize=10000)
+
     """
 
     if len(args) == 0:
@@ -207,6 +225,11 @@ def convert(table, *args, **kwargs):
                 converters[f] = conv
         else:
             converters[field] = conv
+    if (isinstance(converters, dict)
+            and not kwargs.get('where') and not kwargs.get('pass_row')):
+        converted = _dispatch(table, 'convert', converters)
+        if converted is not None:
+            return converted
     return FieldConvertView(table, converters, **kwargs)
 
 
@@ -320,10 +343,11 @@ def fieldconvert(table, converters=None, failonerror=False, errorvalue=None, **k
     return FieldConvertView(table, converters, failonerror, errorvalue, **kwargs)
 
 
-class FieldConvertView(RowContainer):
+class FieldConvertView(FusibleView):
 
     def __init__(self, source, converters=None, failonerror=False,
-                 errorvalue=None, where=None, pass_row=False):
+                 errorvalue=None, where=None, pass_row=False, workers=None,
+                 chunksize=None, ordered=True):
         self.source = source
         if converters is None:
             self.converters = dict()
@@ -337,24 +361,50 @@ class FieldConvertView(RowContainer):
         self.errorvalue = errorvalue
         self.where = where
         self.pass_row = pass_row
-
-    def __iter__(self):
-        return iterfieldconvert(self.source, self.converters, self.failonerror,
-                                self.errorvalue, self.where, self.pass_row)
+        self.workers = workers
+        self.chunksize = chunksize
+        self.ordered = ordered
+
+    def _iterfrom(self, source):
+        return iterfieldconvert(source, self.converters, self.failonerror,
+                                self.errorvalue, self.where, self.pass_row,
+                                self.workers, self.chunksize, self.ordered)
+
+    def _fusible(self):
+        return (self.where is None and not self.pass_row
+                and (self.workers is None or self.workers <= 1))
+
+    def _sortorder(self):
+        if not self.ordered and self.workers is not None and self.workers > 1:
+            return None
+        order = sortorder(self.source)
+        converted = [k for k, c in self.converters.items() if c is not None]
+        if order is not None and order[0] is None:
+            # sorted by whole rows
+            return None if converted else order
+        def mapkey(k):
+            # N.B., conversions by index may apply to fields given by name and
+            # vice versa
+            if any(type(c) is not type(k) or c == k for c in converted):
+                return None
+            return k
+        return _mapsortorder(order, mapkey)
+
+    def _fuse(self, plan):
+        # N.B., conversions are deferred until the values are needed
+        functions, _ = _converterfunctions(plan.flds, self.converters, False)
+        for i, f in functions.items():
+            if 0 <= i < len(plan.cols):
+                plan.cols[i] = plan.convert(plan.cols[i], f, self.failonerror,
+                                            self.errorvalue)
 
     def __setitem__(self, key, value):
         self.converters[key] = value
 
 
-def iterfieldconvert(source, converters, failonerror, errorvalue, where,
-                     pass_row):
-
-    # grab the fields in the source table
-    it = iter(source)
-    flds = it.next()
-    yield tuple(flds)  # these are not modified
-
-    # build converter functions
+def _converterfunctions(flds, converters, pass_row):
+    # resolve converters to functions keyed by field index, and the set of
+    # indices of functions which are also passed the row
     converter_functions = dict()
     with_row = set()
     for k, c in converters.items():
@@ -393,6 +443,21 @@ def iterfieldconvert(source, converters, failonerror, errorvalue, where,
         else:
             raise Exception('unexpected converter specification on field %r: %r' % (k, c))
 
+    return converter_functions, with_row
+
+
+def iterfieldconvert(source, converters, failonerror, errorvalue, where,
+                     pass_row, workers=None, chunksize=None, ordered=True):
+
+    # grab the fields in the source table
+    it = iter(source)
+    flds = it.next()
+    yield tuple(flds)  # these are not modified
+
+    # build converter functions
+    converter_functions, with_row = _converterfunctions(flds, converters,
+                                                        pass_row)
+
     # define a function to transform a value
     def transform_value(i, v, r):
         if i not in converter_functions:
@@ -410,20 +475,32 @@ def iterfieldconvert(source, converters, failonerror, errorvalue, where,
                 else:
                     return errorvalue
 
-    # construct the data rows
+    # define a function to transform the data rows
     if where is None:
-        for row in hybridrows(flds, it):
-            yield tuple(transform_value(i, v, row) for i, v in enumerate(row))
+        def transform_rows(rows):
+            for row in hybridrows(flds, rows):
+                yield tuple(transform_value(i, v, row) for i, v in enumerate(row))
     else:
         if isinstance(where, basestring):
             where = expr(where)
         else:
             assert callable(where), 'expected callable for "where" argument, found %r' % where
-        for row in hybridrows(flds, it):
-            if where(row):
-                yield tuple(transform_value(i, v, row) for i, v in enumerate(row))
-            else:
-                yield row
+        def transform_rows(rows):
+            for row in hybridrows(flds, rows):
+                if where(row):
+                    yield tuple(transform_value(i, v, row) for i, v in enumerate(row))
+                else:
+                    yield row
+
+    # construct the data rows
+    if workers is not None and workers > 1:
+        transform_batch = lambda rows: [tuple(row) for row in transform_rows(rows)]
+        for row in iterparallel(transform_batch, it, workers, chunksize,
+                                ordered):
+            yield row
+    else:
+        for row in transform_rows(it):
+            yield row
 
 
 def methodcaller(nm, *args):
@@ -4,7 +4,7 @@ from __future__ import absolute_import, print_function, division
 import operator
 
 
-from petl.util import RowContainer, asindices
+from petl.util import RowContainer, asindices, sortorder
 from petl.transform.sorts import sort
 
 
@@ -90,6 +90,11 @@ class DuplicatesView(RowContainer):
     def __iter__(self):
         return iterduplicates(self.source, self.key)
 
+    def _sortorder(self):
+        # N.B., rows are output in the order of the source, which is only
+        # known to be sorted by key if it was sorted here
+        return sortorder(self.source)
+
 
 def iterduplicates(source, key):
     # assume source is sorted
@@ -201,6 +206,11 @@ class UniqueView(RowContainer):
     def __iter__(self):
         return iterunique(self.source, self.key)
 
+    def _sortorder(self):
+        # N.B., rows are output in the order of the source, which is only
+        # known to be sorted by key if it was sorted here
+        return sortorder(self.source)
+
 
 def iterunique(source, key):
     # assume source is sorted
@@ -323,6 +333,11 @@ class ConflictsView(RowContainer):
     def __iter__(self):
         return iterconflicts(self.source, self.key, self.missing, self.exclude, 
                              self.include)
+
+    def _sortorder(self):
+        # N.B., rows are output in the order of the source, which is only
+        # known to be sorted by key if it was sorted here
+        return sortorder(self.source)
     
     
 def iterconflicts(source, key, missing, exclude, include):
@@ -409,6 +424,10 @@ class DistinctView(RowContainer):
             self.table = sort(table, buffersize=buffersize, tempdir=tempdir,
                               cache=cache)
         self.count = count
+
+    def _sortorder(self):
+        # N.B., a count appended to each row doesn't change the order
+        return sortorder(self.table)
         
     def __iter__(self):
         it = iter(self.table)
@@ -2,14 +2,262 @@ from __future__ import absolute_import, print_function, division
 
 
 import operator
+import itertools
+import multiprocessing
+from tempfile import NamedTemporaryFile
 
 
 from petl.util import RowContainer, lookup, asindices, rowgetter, iterpeek
-from petl.transform.joins import natural_key, keys_from_args
+from petl.transform.joins import natural_key, keys_from_args, bloomfilter
+import petl.transform.sorts
+from petl.transform.sorts import writechunk, readchunk, iterchunk
+
+
+import logging
+logger = logging.getLogger(__name__)
+warning = logger.warning
+info = logger.info
+debug = logger.debug
+
+
+defaultbuffersize = None
+defaultpartitions = 16
+defaultworkers = None
+
+
+def spillpartitions(rows, getkey, partitions, tempdir=None):
+    """
+    Hash-partition `rows` on the value returned by `getkey`, writing each
+    partition to its own temporary file. Returns the list of files.
+
+    """
+
+    files = [NamedTemporaryFile(dir=tempdir) for _ in range(partitions)]
+    buffers = [list() for _ in range(partitions)]
+    blocksize = petl.transform.sorts.defaultblocksize
+    for row in rows:
+        i = hash(getkey(row)) % partitions
+        buf = buffers[i]
+        buf.append(row)
+        if len(buf) >= blocksize:
+            writechunk(files[i], buf)
+            del buf[:]
+    for f, buf in zip(files, buffers):
+        writechunk(f, buf)
+        f.flush()
+    return files
+
+
+class PartitionView(RowContainer):
+    """
+    A table whose data rows are read from a file written by
+    :func:`spillpartitions`. N.B., only holds on to the name of the file, so
+    can be pickled and sent to a worker process.
+
+    """
+
+    def __init__(self, flds, filename):
+        self.flds = flds
+        self.filename = filename
+
+    def __iter__(self):
+        yield tuple(self.flds)
+        with open(self.filename, 'rb',
+                  petl.transform.sorts.defaultreadbuffersize) as f:
+            for row in readchunk(f):
+                yield row
+
+
+def fitsinmemory(table, buffersize):
+    """
+    Return `True` if `table` has no more than `buffersize` data rows, or if
+    `buffersize` is `None`.
+
+    """
+
+    if buffersize is None:
+        return True
+    n = sum(1 for _ in itertools.islice(table, buffersize + 2))
+    return n <= buffersize + 1
+
+
+maxpartitiondepth = 2
+
+
+def iterpartitionpairs(aflds, arows, bflds, brows, agetkey, bgetkey,
+                       partitions, tempdir=None, split=None, spilled=None,
+                       depth=0):
+    """
+    Hash-partition the data rows `arows` and `brows` of two tables with fields
+    `aflds` and `bflds` on the values returned by `agetkey` and `bgetkey`,
+    yielding each pair of partitions in turn as a pair of
+    :class:`PartitionView`. A pair for which ``split(apartition,
+    bpartition)`` returns True, i.e., which is still too large to process in
+    memory, is itself partitioned with a different hash, up to
+    `maxpartitiondepth` times (N.B., rows with the same key can't be split).
+
+    The temporary files are appended to the list `spilled` if given, to keep
+    them until the partitions have been used, otherwise they are deleted once
+    the generator moves on from them.
+
+    """
+
+    def agethash(row):
+        # vary the hash with the depth, so rows are spread over partitions
+        # differently each time a partition is itself partitioned
+        return agetkey(row), depth
+
+    def bgethash(row):
+        return bgetkey(row), depth
+
+    debug('spilling %s partitions at depth %s', partitions, depth)
+    afiles = spillpartitions(arows, agethash, partitions, tempdir)
+    bfiles = spillpartitions(brows, bgethash, partitions, tempdir)
+    if spilled is not None:
+        spilled.extend(afiles + bfiles)
+    for af, bf in zip(afiles, bfiles):
+        apart = PartitionView(aflds, af.name)
+        bpart = PartitionView(bflds, bf.name)
+        if split is not None and depth < maxpartitiondepth \
+                and split(apart, bpart):
+            pairs = iterpartitionpairs(aflds, itertools.islice(apart, 1, None),
+                                       bflds, itertools.islice(bpart, 1, None),
+                                       agetkey, bgetkey, partitions, tempdir,
+                                       split, spilled, depth + 1)
+            for pair in pairs:
+                yield pair
+        else:
+            yield apart, bpart
+
+
+def _joinpartitiontofile(task):
+    # N.B., executed in a worker process
+    joinfun, left, right, lkey, rkey, args, filename = task
+    it = joinfun(left, right, lkey, rkey, *args)
+    flds = it.next()
+    with open(filename, 'wb') as f:
+        writechunk(f, it)
+    return flds
+
+
+def _splitmisses(rows, getkey, bf, f):
+    # yield rows whose key may be in the Bloom filter, spilling the others to
+    # the file f (if not None)
+    buf = list()
+    blocksize = petl.transform.sorts.defaultblocksize
+    for row in rows:
+        if getkey(row) in bf:
+            yield row
+        elif f is not None:
+            buf.append(row)
+            if len(buf) >= blocksize:
+                writechunk(f, buf)
+                del buf[:]
+    if f is not None:
+        writechunk(f, buf)
+        f.flush()
+
+
+def iterpartitionedjoin(left, right, lkey, rkey, joinfun, args, partitions,
+                        tempdir, workers, bloom=False, errorrate=None,
+                        keepmisses=False, missing=None, split=None):
+    """
+    Execute a join in the style of a grace hash join, by hash-partitioning
+    both tables on their keys into temporary files, then calling
+    ``joinfun(leftpartition, rightpartition, lkey, rkey, *args)`` on each pair
+    of partitions in turn, which should return an iterator over the joined
+    rows (header first). If `workers` is greater than 1, partitions are joined
+    in a pool of worker processes. Pairs of partitions for which
+    ``split(leftpartition, rightpartition)`` returns True are partitioned
+    again, see :func:`iterpartitionpairs`.
+
+    If `bloom` is True, a Bloom filter is first built from the keys of the
+    right table, and rows of the left table whose key definitely doesn't occur
+    in the right table aren't partitioned. If `keepmisses` is False they are
+    dropped, otherwise they are spilled to a file of their own and output
+    after the joined partitions, padded with `missing` to the width of the
+    output.
+
+    """
+
+    lit = iter(left)
+    rit = iter(right)
+    lflds = lit.next()
+    rflds = rit.next()
+    lgetk = operator.itemgetter(*asindices(lflds, lkey))
+    rgetk = operator.itemgetter(*asindices(rflds, rkey))
+
+    missfile = None
+    if bloom:
+        debug('building bloom filter on key %r', rkey)
+        bf = bloomfilter(right, rkey, errorrate)
+        if keepmisses:
+            missfile = NamedTemporaryFile(dir=tempdir)
+        lit = _splitmisses(lit, lgetk, bf, missfile)
+
+    if workers is not None and workers > 1:
+
+        # N.B., all pairs of partitions are spilled before they are joined, so
+        # keep the files until then
+        spilled = list()
+        pairs = list(iterpartitionpairs(lflds, lit, rflds, rit, lgetk, rgetk,
+                                        partitions, tempdir, split, spilled))
+        debug('joining partitions with %s worker processes', workers)
+        outfiles = [NamedTemporaryFile(dir=tempdir) for _ in pairs]
+        tasks = [(joinfun, lpart, rpart, lkey, rkey, args, outfile.name)
+                 for (lpart, rpart), outfile in zip(pairs, outfiles)]
+        pool = multiprocessing.Pool(workers)
+        try:
+            for i, flds in enumerate(pool.imap(_joinpartitiontofile,
+                                               tasks)):
+                if i == 0:
+                    outflds = tuple(flds)
+                    yield outflds
+                for row in iterchunk(outfiles[i]):
+                    yield row
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    else:
+
+        pairs = iterpartitionpairs(lflds, lit, rflds, rit, lgetk, rgetk,
+                                   partitions, tempdir, split)
+        for i, (lpart, rpart) in enumerate(pairs):
+            it = joinfun(lpart, rpart, lkey, rkey, *args)
+            flds = it.next()
+            if i == 0:
+                outflds = flds
+                yield outflds
+            for row in it:
+                yield row
+
+    if missfile is not None:
+        pad = (missing,) * (len(outflds) - len(lflds))
+        for row in iterchunk(missfile):
+            yield tuple(row) + pad
+
+
+def _hashjoinpartition(left, right, lkey, rkey, lprefix, rprefix):
+    return iterhashjoin(left, right, lkey, rkey, lookup(right, rkey), lprefix,
+                        rprefix)
+
+
+def _hashleftjoinpartition(left, right, lkey, rkey, missing, lprefix, rprefix):
+    return iterhashleftjoin(left, right, lkey, rkey, missing,
+                            lookup(right, rkey), lprefix, rprefix)
+
+
+def _hashrightjoinpartition(left, right, lkey, rkey, missing, lprefix,
+                            rprefix):
+    return iterhashrightjoin(left, right, lkey, rkey, missing,
+                             lookup(left, lkey), lprefix, rprefix)
 
 
 def hashjoin(left, right, key=None, lkey=None, rkey=None, cache=True,
-             lprefix=None, rprefix=None):
+             lprefix=None, rprefix=None, buffersize=None, partitions=None,
+             tempdir=None, workers=None, bloom=False, errorrate=None):
     """
     Alternative implementation of :func:`join`, where the join is executed
     by constructing an in-memory lookup for the right hand table, then iterating over rows 
@@ -30,17 +278,98 @@ def hashjoin(left, right, key=None, lkey=None, rkey=None, cache=True,
     Added support for left and right tables with different key fields via the
     `lkey` and `rkey` arguments.
 
+    .. versionchanged:: 0.26
+
+    The `buffersize` argument limits the number of rows from the right table
+    held in memory. If the right table has more than `buffersize` data rows,
+    both tables are hash-partitioned on the key into `partitions` temporary
+    files each (in `tempdir`), and each pair of partitions is then joined in
+    memory in turn, so tables larger than the available memory can be joined.
+    A pair of partitions which is still too large is partitioned again, up to
+    `petl.transform.hashjoins.maxpartitiondepth` (2) times. If `workers` is
+    greater than 1, partitions are joined in a pool of that many worker
+    processes. N.B., when tables are partitioned, output rows are grouped by
+    partition rather than following the order of the left table.
+
+    N.B., `buffersize` is a number of rows rather than a number of bytes, so
+    should be chosen with the size of the rows in mind, and by default there
+    is no limit, i.e., tables are only partitioned if `buffersize` is given
+    or `petl.transform.hashjoins.defaultbuffersize` is set.
+
+    If any of these arguments is `None`, the value of
+    `petl.transform.hashjoins.defaultbuffersize` (`None`, i.e., no limit),
+    `petl.transform.hashjoins.defaultpartitions` (16) or
+    `petl.transform.hashjoins.defaultworkers` (`None`) is used instead.
+
+    If `bloom` is True and the tables are partitioned, a Bloom filter is built
+    from the key values of the right table (see :func:`bloomfilter`,
+    `errorrate` is the rate of false positives), and rows of the left table
+    whose key definitely doesn't occur in the right table are dropped rather
+    than being written to a partition. This may be much faster where the left
+    table is large and most of its keys don't match. (When the right table
+    fits in memory, each left row is checked against the lookup directly,
+    which is no slower than checking a Bloom filter, so `bloom` has no
+    effect.)
+
     """
     
     lkey, rkey = keys_from_args(left, right, key, lkey, rkey)
     return HashJoinView(left, right, lkey=lkey, rkey=rkey, cache=cache,
-                        lprefix=lprefix, rprefix=rprefix)
+                        lprefix=lprefix, rprefix=rprefix,
+                        buffersize=buffersize, partitions=partitions,
+                        tempdir=tempdir, workers=workers, bloom=bloom,
+                        errorrate=errorrate)
+
+
+class PartitionedJoinMixin(object):
+
+    def _initpartitions(self, buffersize, partitions, tempdir, workers,
+                        bloom=False, errorrate=None):
+        if buffersize is None:
+            self.buffersize = defaultbuffersize
+        else:
+            self.buffersize = buffersize
+        if partitions is None:
+            self.partitions = defaultpartitions
+        else:
+            self.partitions = partitions
+        self.tempdir = tempdir
+        if workers is None:
+            self.workers = defaultworkers
+        else:
+            self.workers = workers
+        self.bloom = bloom
+        self.errorrate = errorrate
 
+    # whether left rows without a match are output, see iterpartitionedjoin
+    _keepmisses = False
 
-class HashJoinView(RowContainer):
+    # whether the left rather than the right table is held in memory
+    _lookupleft = False
+
+    def _split(self, lpart, rpart):
+        # whether a pair of partitions is too large to join in memory
+        part = lpart if self._lookupleft else rpart
+        return not fitsinmemory(part, self.buffersize)
+
+    def _iterpartitioned(self, joinfun, *args):
+        return iterpartitionedjoin(self.left, self.right, self.lkey, self.rkey,
+                                   joinfun, args, self.partitions,
+                                   self.tempdir, self.workers,
+                                   bloom=self.bloom,
+                                   errorrate=self.errorrate,
+                                   keepmisses=self._keepmisses,
+                                   missing=getattr(self, 'missing', None),
+                                   split=self._split)
+
+
+class HashJoinView(RowContainer, PartitionedJoinMixin):
+
+    _transientattrs = ('rlookup',)
     
     def __init__(self, left, right, lkey, rkey, cache=True, lprefix=None,
-                 rprefix=None):
+                 rprefix=None, buffersize=None, partitions=None, tempdir=None,
+                 workers=None, bloom=False, errorrate=None):
         self.left = left
         self.right = right
         self.lkey = lkey
@@ -49,8 +378,14 @@ class HashJoinView(RowContainer):
         self.rlookup = None
         self.lprefix = lprefix
         self.rprefix = rprefix
+        self._initpartitions(buffersize, partitions, tempdir, workers, bloom,
+                             errorrate)
         
     def __iter__(self):
+        if self.rlookup is None and not fitsinmemory(self.right,
+                                                     self.buffersize):
+            return self._iterpartitioned(_hashjoinpartition, self.lprefix,
+                                         self.rprefix)
         if not self.cache or self.rlookup is None:
             self.rlookup = lookup(self.right, self.rkey)
         return iterhashjoin(self.left, self.right, self.lkey, self.rkey,
@@ -107,7 +442,9 @@ def iterhashjoin(left, right, lkey, rkey, rlookup, lprefix, rprefix):
         
         
 def hashleftjoin(left, right, key=None, lkey=None, rkey=None, missing=None,
-                 cache=True, lprefix=None, rprefix=None):
+                 cache=True, lprefix=None, rprefix=None, buffersize=None,
+                 partitions=None, tempdir=None, workers=None, bloom=False,
+                 errorrate=None):
     """
     Alternative implementation of :func:`leftjoin`, where the join is executed
     by constructing an in-memory lookup for the right hand table, then iterating over rows 
@@ -128,17 +465,35 @@ def hashleftjoin(left, right, key=None, lkey=None, rkey=None, missing=None,
     Added support for left and right tables with different key fields via the
     `lkey` and `rkey` arguments.
 
+    .. versionchanged:: 0.26
+
+    Added the `buffersize`, `partitions`, `tempdir` and `workers` arguments
+    for joining a right table too large to hold in memory by partitioning
+    both tables, see :func:`hashjoin`.
+
+    Added the `bloom` and `errorrate` arguments, see :func:`hashjoin`. Here
+    rows of the left table whose key definitely doesn't occur in the right
+    table are output after the joined partitions rather than being
+    partitioned.
+
     """
 
     lkey, rkey = keys_from_args(left, right, key, lkey, rkey)
     return HashLeftJoinView(left, right, lkey, rkey, missing=missing, cache=cache,
-                            lprefix=lprefix, rprefix=rprefix)
+                            lprefix=lprefix, rprefix=rprefix,
+                            buffersize=buffersize, partitions=partitions,
+                            tempdir=tempdir, workers=workers, bloom=bloom,
+                            errorrate=errorrate)
 
 
-class HashLeftJoinView(RowContainer):
+class HashLeftJoinView(RowContainer, PartitionedJoinMixin):
+
+    _keepmisses = True
+    _transientattrs = ('rlookup',)
     
     def __init__(self, left, right, lkey, rkey, missing=None, cache=True, lprefix=None,
-                 rprefix=None):
+                 rprefix=None, buffersize=None, partitions=None, tempdir=None,
+                 workers=None, bloom=False, errorrate=None):
         self.left = left
         self.right = right
         self.lkey = lkey
@@ -148,8 +503,14 @@ class HashLeftJoinView(RowContainer):
         self.rlookup = None
         self.lprefix = lprefix
         self.rprefix = rprefix
+        self._initpartitions(buffersize, partitions, tempdir, workers, bloom,
+                             errorrate)
 
     def __iter__(self):
+        if self.rlookup is None and not fitsinmemory(self.right,
+                                                     self.buffersize):
+            return self._iterpartitioned(_hashleftjoinpartition, self.missing,
+                                         self.lprefix, self.rprefix)
         if not self.cache or self.rlookup is None:
             self.rlookup = lookup(self.right, self.rkey)
         return iterhashleftjoin(self.left, self.right, self.lkey, self.rkey,
@@ -213,7 +574,8 @@ def iterhashleftjoin(left, right, lkey, rkey, missing, rlookup, lprefix,
         
         
 def hashrightjoin(left, right, key=None, lkey=None, rkey=None, missing=None,
-                  cache=True, lprefix=None, rprefix=None):
+                  cache=True, lprefix=None, rprefix=None, buffersize=None,
+                  partitions=None, tempdir=None, workers=None):
     """
     Alternative implementation of :func:`rightjoin`, where the join is executed
     by constructing an in-memory lookup for the left hand table, then iterating over rows 
@@ -234,17 +596,29 @@ def hashrightjoin(left, right, key=None, lkey=None, rkey=None, missing=None,
     Added support for left and right tables with different key fields via the
     `lkey` and `rkey` arguments.
 
+    .. versionchanged:: 0.26
+
+    Added the `buffersize`, `partitions`, `tempdir` and `workers` arguments,
+    see :func:`hashjoin`. N.B., here `buffersize` limits the number of rows
+    from the left table held in memory.
+
     """
 
     lkey, rkey = keys_from_args(left, right, key, lkey, rkey)
     return HashRightJoinView(left, right, lkey, rkey, missing=missing,
-                             cache=cache, lprefix=lprefix, rprefix=rprefix)
+                             cache=cache, lprefix=lprefix, rprefix=rprefix,
+                             buffersize=buffersize, partitions=partitions,
+                             tempdir=tempdir, workers=workers)
+
 
+class HashRightJoinView(RowContainer, PartitionedJoinMixin):
 
-class HashRightJoinView(RowContainer):
+    _transientattrs = ('llookup',)
+    _lookupleft = True
     
     def __init__(self, left, right, lkey, rkey, missing=None, cache=True,
-                 lprefix=None, rprefix=None):
+                 lprefix=None, rprefix=None, buffersize=None, partitions=None,
+                 tempdir=None, workers=None):
         self.left = left
         self.right = right
         self.lkey = lkey
@@ -254,8 +628,14 @@ class HashRightJoinView(RowContainer):
         self.llookup = None
         self.lprefix = lprefix
         self.rprefix = rprefix
+        self._initpartitions(buffersize, partitions, tempdir, workers)
 
     def __iter__(self):
+        if self.llookup is None and not fitsinmemory(self.left,
+                                                     self.buffersize):
+            return self._iterpartitioned(_hashrightjoinpartition,
+                                         self.missing, self.lprefix,
+                                         self.rprefix)
         if not self.cache or self.llookup is None:
             self.llookup = lookup(self.left, self.lkey)
         return iterhashrightjoin(self.left, self.right, self.lkey, self.rkey,
@@ -322,7 +702,9 @@ def iterhashrightjoin(left, right, lkey, rkey, missing, llookup, lprefix,
             yield tuple(outrow)
         
         
-def hashantijoin(left, right, key=None, lkey=None, rkey=None):
+def hashantijoin(left, right, key=None, lkey=None, rkey=None, buffersize=None,
+                 partitions=None, tempdir=None, workers=None, bloom=False,
+                 errorrate=None):
     """
     Alternative implementation of :func:`antijoin`, where the join is executed
     by constructing an in-memory set for all keys found in the right hand table, then 
@@ -338,21 +720,42 @@ def hashantijoin(left, right, key=None, lkey=None, rkey=None):
     Added support for left and right tables with different key fields via the
     `lkey` and `rkey` arguments.
 
+    .. versionchanged:: 0.26
+
+    Added the `buffersize`, `partitions`, `tempdir` and `workers` arguments,
+    see :func:`hashjoin`. N.B., here `buffersize` limits the number of rows
+    from the right table whose keys are held in memory.
+
+    Added the `bloom` and `errorrate` arguments, see :func:`hashjoin`. Here
+    rows of the left table whose key definitely doesn't occur in the right
+    table are output after the rows from the partitions rather than being
+    partitioned.
+
     """
     
     lkey, rkey = keys_from_args(left, right, key, lkey, rkey)
-    return HashAntiJoinView(left, right, lkey, rkey)
+    return HashAntiJoinView(left, right, lkey, rkey, buffersize=buffersize,
+                            partitions=partitions, tempdir=tempdir,
+                            workers=workers, bloom=bloom, errorrate=errorrate)
+
 
+class HashAntiJoinView(RowContainer, PartitionedJoinMixin):
 
-class HashAntiJoinView(RowContainer):
+    _keepmisses = True
     
-    def __init__(self, left, right, lkey, rkey):
+    def __init__(self, left, right, lkey, rkey, buffersize=None,
+                 partitions=None, tempdir=None, workers=None, bloom=False,
+                 errorrate=None):
         self.left = left
         self.right = right
         self.lkey = lkey
         self.rkey = rkey
+        self._initpartitions(buffersize, partitions, tempdir, workers, bloom,
+                             errorrate)
 
     def __iter__(self):
+        if not fitsinmemory(self.right, self.buffersize):
+            return self._iterpartitioned(iterhashantijoin)
         return iterhashantijoin(self.left, self.right, self.lkey, self.rkey)
     
     
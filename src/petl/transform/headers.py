@@ -4,7 +4,8 @@ from __future__ import absolute_import, print_function, division
 import itertools
 
 
-from petl.util import RowContainer
+from petl.util import RowContainer, sortorder, _mapsortorder
+from petl.fusion import FusibleView
 
 
 def rename(table, *args):
@@ -78,7 +79,7 @@ def rename(table, *args):
     return RenameView(table, *args)
 
 
-class RenameView(RowContainer):
+class RenameView(FusibleView):
 
     def __init__(self, table, *args):
         self.source = table
@@ -89,22 +90,47 @@ class RenameView(RowContainer):
         elif len(args) == 2:
             self.spec = {args[0]: args[1]}
 
-    def __iter__(self):
-        return iterrename(self.source, self.spec)
+    def _iterfrom(self, source):
+        return iterrename(source, self.spec)
+
+    def _fuse(self, plan):
+        plan.flds = _renamed(plan.flds, self.spec)
+
+    def _sortorder(self):
+        order = sortorder(self.source)
+        if order is not None and order[0] is None:
+            # sorted by whole rows, which are unchanged
+            return order
+        spec = self.spec
+        byname = all(isinstance(f, basestring) for f in spec)
+        def mapkey(k):
+            if not isinstance(k, basestring):
+                return k
+            elif k in spec:
+                return spec[k]
+            elif byname and k not in spec.values():
+                return k
+            # N.B., the field may be renamed by index, or another field
+            # renamed to the same name
+            return None
+        return _mapsortorder(order, mapkey)
 
     def __setitem__(self, key, value):
         self.spec[key] = value
 
 
+def _renamed(flds, spec):
+    return tuple(spec[f] if f in spec
+                 else spec[i] if i in spec
+                 else f
+                 for i, f in enumerate(flds))
+
+
 def iterrename(source, spec):
     it = iter(source)
     spec = spec.copy()  # make sure nobody can change this midstream
     sourceflds = it.next()
-    newflds = [spec[f] if f in spec
-               else spec[i] if i in spec
-               else f
-               for i, f in enumerate(sourceflds)]
-    yield tuple(newflds)
+    yield _renamed(sourceflds, spec)
     for row in it:
         yield tuple(row)
 
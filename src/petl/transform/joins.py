@@ -3,15 +3,21 @@ from __future__ import absolute_import, print_function, division
 
 import itertools
 import operator
+import math
 
 
 from petl.util import RowContainer, asindices, rowgetter, rowgroupby, header,\
-    data
+    data, sortorder, _ordered, _mapsortorder, _knownsorted
 from petl.transform.sorts import sort
 from petl.transform.basics import cut, cutout
 from petl.transform.dedup import distinct
 
 
+import logging
+logger = logging.getLogger(__name__)
+debug = logger.debug
+
+
 def natural_key(left, right):
     # determine key field or fields
     lflds = header(left)
@@ -42,8 +48,169 @@ def keys_from_args(left, right, key, lkey, rkey):
     return lkey, rkey
 
 
+defaultbloomerrorrate = 0.01
+
+
+class BloomFilter(object):
+    """
+    A Bloom filter, i.e., a compact set of values which can only be added to
+    and tested for membership, where a test may give a false positive (with
+    probability around `errorrate` once `capacity` values have been added)
+    but never a false negative. Values must be hashable. E.g.::
+
+        >>> from petl.transform.joins import BloomFilter
+        >>> bf = BloomFilter(1000)
+        >>> bf.add('apples')
+        >>> 'apples' in bf
+        True
+        >>> 'oranges' in bf
+        False
+
+    .. versionadded:: 0.26
+
+    """
+
+    def __init__(self, capacity, errorrate=None):
+        if errorrate is None:
+            errorrate = defaultbloomerrorrate
+        assert 0 < errorrate < 1, 'errorrate must be between 0 and 1'
+        capacity = max(capacity, 1)
+        # optimal number of bits and of hash functions for the given capacity
+        # and false positive rate
+        nbits = int(math.ceil(-capacity * math.log(errorrate)
+                              / math.log(2) ** 2))
+        self.nbits = max(nbits, 64)
+        self.nhashes = max(int(round(self.nbits / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.nbits + 7) // 8)
+
+    def _indices(self, value):
+        # derive the hash functions from two hashes of the value
+        h1 = hash(value)
+        h2 = hash((value, 'bloom')) | 1
+        nbits = self.nbits
+        return [(h1 + i * h2) % nbits for i in xrange(self.nhashes)]
+
+    def add(self, value):
+        bits = self.bits
+        for i in self._indices(value):
+            bits[i >> 3] |= 1 << (i & 7)
+
+    def __contains__(self, value):
+        bits = self.bits
+        h1 = hash(value)
+        h2 = hash((value, 'bloom')) | 1
+        nbits = self.nbits
+        for i in xrange(self.nhashes):
+            j = (h1 + i * h2) % nbits
+            if not bits[j >> 3] & (1 << (j & 7)):
+                return False
+        return True
+
+
+def bloomfilter(table, key, errorrate=None):
+    """
+    Construct a :class:`BloomFilter` holding the values of the given key in
+    the given table, sized for the number of rows in the table (which is
+    therefore iterated over twice). E.g.::
+
+        >>> from petl import bloomfilter
+        >>> table = [['foo', 'bar'], ['a', 1], ['b', 2]]
+        >>> bf = bloomfilter(table, 'foo')
+        >>> 'a' in bf
+        True
+        >>> 'c' in bf
+        False
+
+    .. versionadded:: 0.26
+
+    """
+
+    capacity = sum(1 for _ in data(table))
+    bf = BloomFilter(capacity, errorrate)
+    it = iter(table)
+    flds = it.next()
+    getkey = operator.itemgetter(*asindices(flds, key))
+    for row in it:
+        bf.add(getkey(row))
+    return bf
+
+
+class _BloomSource(object):
+    # builds the Bloom filter for a table's key when first needed, holding on
+    # to it if cache is true
+
+    _transientattrs = ('bf',)
+
+    def __init__(self, table, key, errorrate=None, cache=True):
+        self.table = table
+        self.key = key
+        self.errorrate = errorrate
+        self.cache = cache
+        self.bf = None
+
+    def __call__(self):
+        if self.bf is None or not self.cache:
+            debug('building bloom filter on key %r', self.key)
+            self.bf = bloomfilter(self.table, self.key, self.errorrate)
+        return self.bf
+
+
+class BloomSelectView(RowContainer):
+    """
+    Select rows of `table` whose value for `key` may occur in the Bloom
+    filter returned by `bloom`, or if `complement` is true, whose value
+    definitely doesn't.
+
+    """
+
+    def __init__(self, table, key, bloom, complement=False):
+        self.table = table
+        self.key = key
+        self.bloom = bloom
+        self.complement = complement
+
+    def __iter__(self):
+        it = iter(self.table)
+        flds = it.next()
+        yield tuple(flds)
+        getkey = operator.itemgetter(*asindices(flds, self.key))
+        bf = self.bloom()
+        if self.complement:
+            for row in it:
+                if getkey(row) not in bf:
+                    yield tuple(row)
+        else:
+            for row in it:
+                if getkey(row) in bf:
+                    yield tuple(row)
+
+    def _sortorder(self):
+        return sortorder(self.table)
+
+
+def iterbloommisses(joined, misses, missing=None):
+    """
+    Yield the rows of `joined`, then the rows of `misses` (rows of the left
+    table whose key definitely doesn't occur in the right table) padded with
+    `missing` to the width of the output.
+
+    """
+
+    it = iter(joined)
+    outflds = it.next()
+    yield tuple(outflds)
+    for row in it:
+        yield row
+    mit = iter(misses)
+    lflds = mit.next()
+    pad = (missing,) * (len(outflds) - len(lflds))
+    for row in mit:
+        yield tuple(row) + pad
+
+
 def join(left, right, key=None, lkey=None, rkey=None, presorted=False,
-         buffersize=None, tempdir=None, cache=True, lprefix=None, rprefix=None):
+         buffersize=None, tempdir=None, cache=True, lprefix=None, rprefix=None,
+         bloom=False, errorrate=None):
     """
     Perform an equi-join on the given tables. E.g.::
 
@@ -175,12 +342,22 @@ def join(left, right, key=None, lkey=None, rkey=None, presorted=False,
     Added support for left and right tables with different key fields via the
     `lkey` and `rkey` arguments.
 
+    .. versionchanged:: 0.26
+
+    If `bloom` is True, a Bloom filter is built from the key values of the
+    right table (see :func:`bloomfilter`, `errorrate` is the rate of false
+    positives), and rows of the left table whose key definitely doesn't occur
+    in the right table are dropped before the left table is sorted. This may
+    be much faster where the left table is large and most of its keys don't
+    match. The right table is iterated over twice more to build the filter.
+
     """
 
     lkey, rkey = keys_from_args(left, right, key, lkey, rkey)
     return JoinView(left, right, lkey=lkey, rkey=rkey,
                     presorted=presorted, buffersize=buffersize, tempdir=tempdir,
-                    cache=cache, lprefix=lprefix, rprefix=rprefix)
+                    cache=cache, lprefix=lprefix, rprefix=rprefix,
+                    bloom=bloom, errorrate=errorrate)
 
 
 class JoinView(RowContainer):
@@ -188,9 +365,13 @@ class JoinView(RowContainer):
     def __init__(self, left, right, lkey, rkey,
                  presorted=False, leftouter=False, rightouter=False,
                  missing=None, buffersize=None, tempdir=None, cache=True,
-                 lprefix=None, rprefix=None):
+                 lprefix=None, rprefix=None, bloom=False, errorrate=None):
         self.lkey = lkey
         self.rkey = rkey
+        if bloom and not leftouter:
+            # drop left rows which can't match before sorting
+            left = BloomSelectView(left, lkey,
+                                   _BloomSource(right, rkey, errorrate, cache))
         if presorted:
             self.left = left
             self.right = right
@@ -211,6 +392,17 @@ class JoinView(RowContainer):
                         missing=self.missing, lprefix=self.lprefix,
                         rprefix=self.rprefix)
 
+    def _sortorder(self):
+        # N.B., the output is sorted by the key fields of the left table, if
+        # the left table is (which is not known if presorted)
+        if not _knownsorted(self.left, self.lkey):
+            return None
+        order = _ordered(self.lkey)
+        if self.lprefix is None:
+            return order
+        return _mapsortorder(order, lambda k: str(self.lprefix) + str(k)
+                             if isinstance(k, basestring) else k)
+
 
 def leftjoin(left, right, key=None, lkey=None, rkey=None, missing=None,
              presorted=False, buffersize=None, tempdir=None, cache=True,
@@ -276,7 +468,7 @@ def leftjoin(left, right, key=None, lkey=None, rkey=None, missing=None,
 
 def rightjoin(left, right, key=None, lkey=None, rkey=None, missing=None,
               presorted=False, buffersize=None, tempdir=None, cache=True,
-              lprefix=None, rprefix=None):
+              lprefix=None, rprefix=None, bloom=False, errorrate=None):
     """
     Perform a right outer join on the given tables. E.g.::
 
@@ -327,6 +519,10 @@ def rightjoin(left, right, key=None, lkey=None, rkey=None, missing=None,
     Added support for left and right tables with different key fields via the
     `lkey` and `rkey` arguments.
 
+    .. versionchanged:: 0.26
+
+    Added the `bloom` and `errorrate` arguments, see :func:`join`.
+
     """
 
     lkey, rkey = keys_from_args(left, right, key, lkey, rkey)
@@ -334,7 +530,7 @@ def rightjoin(left, right, key=None, lkey=None, rkey=None, missing=None,
                     presorted=presorted, leftouter=False, rightouter=True,
                     missing=missing, buffersize=buffersize,
                     tempdir=tempdir, cache=cache, lprefix=lprefix,
-                    rprefix=rprefix)
+                    rprefix=rprefix, bloom=bloom, errorrate=errorrate)
 
 
 def outerjoin(left, right, key=None, lkey=None, rkey=None, missing=None,
@@ -596,7 +792,8 @@ def itercrossjoin(sources, prefix):
 
 
 def antijoin(left, right, key=None, lkey=None, rkey=None, presorted=False,
-             buffersize=None, tempdir=None, cache=True):
+             buffersize=None, tempdir=None, cache=True, bloom=False,
+             errorrate=None):
     """
     Return rows from the `left` table where the key value does not occur in the
     `right` table. E.g.::
@@ -650,16 +847,33 @@ def antijoin(left, right, key=None, lkey=None, rkey=None, presorted=False,
     Added support for left and right tables with different key fields via the
     `lkey` and `rkey` arguments.
 
+    .. versionchanged:: 0.26
+
+    If `bloom` is True, a Bloom filter is built from the key values of the
+    right table (see :func:`join`), and rows of the left table whose key
+    definitely doesn't occur in the right table are not sorted but output
+    after all other rows, in their original order. Only the remaining rows are
+    sorted and compared with the right table, so the output as a whole is not
+    sorted by the key.
+
     """
 
     lkey, rkey = keys_from_args(left, right, key, lkey, rkey)
-    return AntiJoinView(left, right, lkey, rkey, presorted, buffersize)
+    return AntiJoinView(left, right, lkey, rkey, presorted, buffersize,
+                        tempdir=tempdir, cache=cache, bloom=bloom,
+                        errorrate=errorrate)
 
 
 class AntiJoinView(RowContainer):
 
     def __init__(self, left, right, lkey, rkey, presorted=False,
-                 buffersize=None, tempdir=None, cache=True):
+                 buffersize=None, tempdir=None, cache=True, bloom=False,
+                 errorrate=None):
+        self.misses = None
+        if bloom:
+            bf = _BloomSource(right, rkey, errorrate, cache)
+            self.misses = BloomSelectView(left, lkey, bf, complement=True)
+            left = BloomSelectView(left, lkey, bf)
         if presorted:
             self.left = left
             self.right = right
@@ -672,7 +886,16 @@ class AntiJoinView(RowContainer):
         self.rkey = rkey
 
     def __iter__(self):
-        return iterantijoin(self.left, self.right, self.lkey, self.rkey)
+        it = iterantijoin(self.left, self.right, self.lkey, self.rkey)
+        if self.misses is None:
+            return it
+        return iterbloommisses(it, self.misses)
+
+    def _sortorder(self):
+        if self.misses is not None \
+                or not _knownsorted(self.left, self.lkey):
+            return None
+        return _ordered(self.lkey)
 
 
 def iterantijoin(left, right, lkey, rkey):
@@ -733,7 +956,7 @@ def iterantijoin(left, right, lkey, rkey):
 
 def lookupjoin(left, right, key=None, lkey=None, rkey=None, missing=None,
                presorted=False, buffersize=None, tempdir=None, cache=True,
-               lprefix=None, rprefix=None):
+               lprefix=None, rprefix=None, bloom=False, errorrate=None):
     """
     Perform a left join, but where the key is not unique in the right-hand
     table, arbitrarily choose the first row and ignore others. E.g.::
@@ -788,20 +1011,32 @@ def lookupjoin(left, right, key=None, lkey=None, rkey=None, missing=None,
     Added support for left and right tables with different key fields via the
     `lkey` and `rkey` arguments.
 
+    .. versionchanged:: 0.26
+
+    Added the `bloom` and `errorrate` arguments, see :func:`antijoin`. Rows of
+    the left table whose key definitely doesn't occur in the right table are
+    output last, padded with `missing`.
+
     """
 
     lkey, rkey = keys_from_args(left, right, key, lkey, rkey)
     return LookupJoinView(left, right, lkey, rkey, presorted=presorted,
                           missing=missing, buffersize=buffersize,
                           tempdir=tempdir, cache=cache,
-                          lprefix=lprefix, rprefix=rprefix)
+                          lprefix=lprefix, rprefix=rprefix,
+                          bloom=bloom, errorrate=errorrate)
 
 
 class LookupJoinView(RowContainer):
 
     def __init__(self, left, right, lkey, rkey, presorted=False, missing=None,
                  buffersize=None, tempdir=None, cache=True,
-                 lprefix=None, rprefix=None):
+                 lprefix=None, rprefix=None, bloom=False, errorrate=None):
+        self.misses = None
+        if bloom:
+            bf = _BloomSource(right, rkey, errorrate, cache)
+            self.misses = BloomSelectView(left, lkey, bf, complement=True)
+            left = BloomSelectView(left, lkey, bf)
         if presorted:
             self.left = left
             self.right = right
@@ -817,9 +1052,12 @@ class LookupJoinView(RowContainer):
         self.rprefix = rprefix
 
     def __iter__(self):
-        return iterlookupjoin(self.left, self.right, self.lkey, self.rkey,
-                              missing=self.missing, lprefix=self.lprefix,
-                              rprefix=self.rprefix)
+        it = iterlookupjoin(self.left, self.right, self.lkey, self.rkey,
+                            missing=self.missing, lprefix=self.lprefix,
+                            rprefix=self.rprefix)
+        if self.misses is None:
+            return it
+        return iterbloommisses(it, self.misses, self.missing)
 
 
 def iterlookupjoin(left, right, lkey, rkey, missing=None, lprefix=None,
@@ -5,7 +5,7 @@ import operator
 
 
 from petl.compat import OrderedDict
-from petl.util import RowContainer, hybridrows, expr, rowgroupby
+from petl.util import RowContainer, hybridrows, expr, rowgroupby, iterparallel
 from petl.transform.sorts import sort
 
 
@@ -169,7 +169,8 @@ def composedict(d, srcfld):
     return g
 
 
-def rowmap(table, rowmapper, fields, failonerror=False, missing=None):
+def rowmap(table, rowmapper, fields, failonerror=False, missing=None,
+           workers=None, chunksize=None, ordered=True):
     """
     Transform rows via an arbitrary function. E.g.::
 
@@ -219,37 +220,61 @@ def rowmap(table, rowmapper, fields, failonerror=False, missing=None):
     Hybrid row objects supporting data value access by either position or by
     field name are now passed to the `rowmapper` function.
 
+    .. versionchanged:: 0.26
+
+    If `workers` is greater than 1, rows are mapped in batches of `chunksize`
+    rows by a pool of `workers` processes, see
+    :func:`petl.util.iterparallel`. Rows are output in the order of the input
+    unless `ordered` is False.
+
     """
 
     return RowMapView(table, rowmapper, fields, failonerror=failonerror,
-                      missing=missing)
+                      missing=missing, workers=workers, chunksize=chunksize,
+                      ordered=ordered)
 
 
 class RowMapView(RowContainer):
 
-    def __init__(self, source, rowmapper, fields, failonerror=False, missing=None):
+    def __init__(self, source, rowmapper, fields, failonerror=False, missing=None,
+                 workers=None, chunksize=None, ordered=True):
         self.source = source
         self.rowmapper = rowmapper
         self.fields = fields
         self.failonerror = failonerror
         self.missing = missing
+        self.workers = workers
+        self.chunksize = chunksize
+        self.ordered = ordered
 
     def __iter__(self):
         return iterrowmap(self.source, self.rowmapper, self.fields, self.failonerror,
-                          self.missing)
+                          self.missing, self.workers, self.chunksize,
+                          self.ordered)
 
 
-def iterrowmap(source, rowmapper, fields, failonerror, missing):
+def iterrowmap(source, rowmapper, fields, failonerror, missing, workers=None,
+               chunksize=None, ordered=True):
     it = iter(source)
     srcflds = it.next()
     yield tuple(fields)
-    for row in hybridrows(srcflds, it, missing):
-        try:
-            outrow = rowmapper(row)
-            yield tuple(outrow)
-        except:
-            if failonerror:
-                raise
+
+    def maprows(rows):
+        for row in hybridrows(srcflds, rows, missing):
+            try:
+                outrow = rowmapper(row)
+                yield tuple(outrow)
+            except:
+                if failonerror:
+                    raise
+
+    if workers is not None and workers > 1:
+        for row in iterparallel(lambda rows: list(maprows(rows)), it, workers,
+                                chunksize, ordered):
+            yield row
+    else:
+        for row in maprows(it):
+            yield row
 
 
 def recordmap(table, recmapper, fields, failonerror=False):
@@ -4,18 +4,468 @@ from __future__ import absolute_import, print_function, division
 import itertools
 import operator
 import math
+from tempfile import NamedTemporaryFile
 
 
 from petl.compat import OrderedDict
 from petl.util import RowContainer, iterpeek, rowgroupby, rowgroupbybin, \
-    asindices, hybridrows, rowitemgetter, count
-from petl.transform.sorts import sort, mergesort
+    rowfoldbybin, asindices, hybridrows, rowitemgetter, count, sortable_itemgetter, \
+    heapqmergesorted, _ordered, _knownsorted, _dispatch
+from petl.transform.sorts import sort, mergesort, writechunk, iterchunk
 from petl.transform.basics import cut
 from petl.transform.dedup import distinct
 
 
+import logging
+logger = logging.getLogger(__name__)
+warning = logger.warning
+info = logger.info
+debug = logger.debug
+
+
+class Aggregator(object):
+    """
+    Base class for aggregators which compute their result incrementally. The
+    state of the aggregation is created by :meth:`init`, then updated with one
+    value at a time by :meth:`update`. Two partial states can be combined by
+    :meth:`merge`, and :meth:`finalize` turns a state into the result. States
+    should be picklable, as they may be written to temporary files.
+
+    Aggregator instances are also callable with an iterable of values, so can
+    be used anywhere an aggregation function is expected.
+
+    .. versionadded:: 0.26
+
+    """
+
+    def init(self):
+        raise NotImplementedError
+
+    def update(self, state, value):
+        raise NotImplementedError
+
+    def merge(self, state, other):
+        raise NotImplementedError
+
+    def finalize(self, state):
+        return state
+
+    def __call__(self, values):
+        state = self.init()
+        for v in values:
+            state = self.update(state, v)
+        return self.finalize(state)
+
+
+class _Nothing(object):
+    # state of an aggregator that hasn't seen any values yet, N.B., check with
+    # isinstance rather than identity so that it survives pickling
+    pass
+
+
+class CountAggregator(Aggregator):
+
+    def init(self):
+        return 0
+
+    def update(self, state, value):
+        return state + 1
+
+    def merge(self, state, other):
+        return state + other
+
+
+class SumAggregator(Aggregator):
+
+    def init(self):
+        return 0
+
+    def update(self, state, value):
+        return state + value
+
+    def merge(self, state, other):
+        return state + other
+
+
+class ReduceAggregator(Aggregator):
+    """
+    Aggregate values via a binary function `f`, as for the Python standard
+    :func:`reduce` function. N.B., if partial states need to be merged, `f` is
+    also applied to them, so should be associative.
+
+    """
+
+    def __init__(self, f):
+        self.f = f
+
+    def init(self):
+        return _Nothing()
+
+    def update(self, state, value):
+        if isinstance(state, _Nothing):
+            return value
+        return self.f(state, value)
+
+    def merge(self, state, other):
+        if isinstance(state, _Nothing):
+            return other
+        if isinstance(other, _Nothing):
+            return state
+        return self.f(state, other)
+
+    def finalize(self, state):
+        if isinstance(state, _Nothing):
+            raise TypeError('reduce of empty sequence with no initial value')
+        return state
+
+
+class MinAggregator(ReduceAggregator):
+
+    def __init__(self):
+        super(MinAggregator, self).__init__(min)
+
+    def finalize(self, state):
+        if isinstance(state, _Nothing):
+            raise ValueError('min() arg is an empty sequence')
+        return state
+
+
+class MaxAggregator(ReduceAggregator):
+
+    def __init__(self):
+        super(MaxAggregator, self).__init__(max)
+
+    def finalize(self, state):
+        if isinstance(state, _Nothing):
+            raise ValueError('max() arg is an empty sequence')
+        return state
+
+
+class MeanAggregator(Aggregator):
+
+    def init(self):
+        return 0, 0
+
+    def update(self, state, value):
+        return state[0] + 1, state[1] + value
+
+    def merge(self, state, other):
+        return state[0] + other[0], state[1] + other[1]
+
+    def finalize(self, state):
+        n, total = state
+        if n == 0:
+            return None
+        return total / n
+
+
+class VarianceAggregator(Aggregator):
+    """
+    Compute the sample variance of the values in a single pass, using
+    Welford's algorithm to avoid loss of precision. The result is None if
+    there are fewer than two values.
+
+    """
+
+    def init(self):
+        return 0, 0., 0.  # count, mean, sum of squared differences
+
+    def update(self, state, value):
+        n, mean, m2 = state
+        n += 1
+        delta = value - mean
+        mean += delta / n
+        m2 += delta * (value - mean)
+        return n, mean, m2
+
+    def merge(self, state, other):
+        n1, mean1, m21 = state
+        n2, mean2, m22 = other
+        if n1 == 0:
+            return other
+        if n2 == 0:
+            return state
+        n = n1 + n2
+        delta = mean2 - mean1
+        mean = mean1 + delta * n2 / n
+        m2 = m21 + m22 + delta * delta * n1 * n2 / n
+        return n, mean, m2
+
+    def finalize(self, state):
+        n, _, m2 = state
+        if n < 2:
+            return None
+        return m2 / (n - 1)
+
+
+class FirstAggregator(Aggregator):
+
+    def init(self):
+        return _Nothing()
+
+    def update(self, state, value):
+        if isinstance(state, _Nothing):
+            return value
+        return state
+
+    def merge(self, state, other):
+        if isinstance(state, _Nothing):
+            return other
+        return state
+
+    def finalize(self, state):
+        if isinstance(state, _Nothing):
+            return None
+        return state
+
+
+class LastAggregator(Aggregator):
+
+    def init(self):
+        return _Nothing()
+
+    def update(self, state, value):
+        return value
+
+    def merge(self, state, other):
+        if isinstance(other, _Nothing):
+            return state
+        return other
+
+    def finalize(self, state):
+        if isinstance(state, _Nothing):
+            return None
+        return state
+
+
+class ListAggregator(Aggregator):
+
+    def init(self):
+        return list()
+
+    def update(self, state, value):
+        state.append(value)
+        return state
+
+    def merge(self, state, other):
+        state.extend(other)
+        return state
+
+
+class SetAggregator(Aggregator):
+
+    def init(self):
+        return set()
+
+    def update(self, state, value):
+        state.add(value)
+        return state
+
+    def merge(self, state, other):
+        state.update(other)
+        return state
+
+
+class CountDistinctAggregator(SetAggregator):
+
+    def finalize(self, state):
+        return len(state)
+
+
+class CollectAggregator(ListAggregator):
+    """
+    Collect all values into a list then apply an arbitrary aggregation
+    function `f` to the list, so memory use grows with the number of values.
+
+    """
+
+    def __init__(self, f):
+        self.f = f
+
+    def finalize(self, state):
+        return self.f(state)
+
+
+_aggregators = {len: CountAggregator,
+                sum: SumAggregator,
+                min: MinAggregator,
+                max: MaxAggregator,
+                list: ListAggregator,
+                set: SetAggregator}
+
+
+def aggregator(f):
+    """
+    Return an :class:`Aggregator` for the aggregation function `f`, which may
+    be an aggregator already or one of the built-in functions :func:`len`,
+    :func:`sum`, :func:`min`, :func:`max`, :func:`list` or :func:`set`, any
+    other function is applied to a list of all values in the group.
+
+    .. versionadded:: 0.26
+
+    """
+
+    if isinstance(f, Aggregator):
+        return f
+    try:
+        return _aggregators[f]()
+    except (KeyError, TypeError):  # TypeError if f is unhashable
+        return CollectAggregator(f)
+
+
+defaultmaxkeys = 100000
+
+
+def _spillstates(states, tempdir):
+    f = NamedTemporaryFile(dir=tempdir)
+    writechunk(f, sorted(states.iteritems(), key=_getsortkey))
+    f.flush()
+    return f
+
+
+_getsortkey = sortable_itemgetter(0)
+
+
+class HashAggregation(object):
+    """
+    Incremental form of :func:`iterhashaggregate`, for use where rows arrive
+    in batches rather than from an iterator, e.g., in :mod:`petl.push`. Rows
+    are added via :meth:`update`, and iterating over the aggregation yields
+    ``(key, results)`` pairs, in key order.
+
+    .. versionadded:: 0.26
+
+    """
+
+    def __init__(self, getkey, getvalues, aggregators, maxkeys=None,
+                 tempdir=None):
+        if maxkeys is None:
+            maxkeys = defaultmaxkeys
+        self.getkey = getkey
+        self.aggregators = aggregators
+        self.pairs = zip(aggregators, getvalues)
+        self.maxkeys = maxkeys
+        self.tempdir = tempdir
+        self.states = dict()
+        self.spilled = list()
+
+    def update(self, rows):
+        getkey = self.getkey
+        aggregators = self.aggregators
+        pairs = self.pairs
+        states = self.states
+        for row in rows:
+            k = getkey(row)
+            try:
+                state = states[k]
+            except KeyError:
+                if len(states) >= self.maxkeys:
+                    debug('spilling %s partial aggregates', len(states))
+                    self.spilled.append(_spillstates(states, self.tempdir))
+                    states = self.states = dict()
+                state = states[k] = [a.init() for a in aggregators]
+            for i, (a, getvalue) in enumerate(pairs):
+                state[i] = a.update(state[i], getvalue(row))
+
+    def __iter__(self):
+        aggregators = self.aggregators
+        items = sorted(self.states.iteritems(), key=_getsortkey)
+        self.states = dict()
+        if self.spilled:
+            # N.B., merge spilled states in the order they were spilled, so
+            # e.g. lists of values are kept in the order of the input rows
+            runs = [iterchunk(f) for f in self.spilled] + [items]
+            items = _mergestates(heapqmergesorted(_getsortkey, *runs),
+                                 aggregators)
+        for k, state in items:
+            yield k, [a.finalize(v) for a, v in zip(aggregators, state)]
+
+
+def iterhashaggregate(rows, getkey, getvalues, aggregators, maxkeys=None,
+                      tempdir=None):
+    """
+    Aggregate `rows` in a single pass, by keeping the state of each of the
+    `aggregators` for each distinct value returned by `getkey`. The value
+    passed to the i-th aggregator is ``getvalues[i](row)``. If there are more
+    than `maxkeys` distinct keys, the states are written to a temporary file
+    and aggregation starts afresh, with the partial states merged by key at
+    the end. Yields ``(key, results)`` pairs, in key order.
+
+    .. versionadded:: 0.26
+
+    """
+
+    aggregation = HashAggregation(getkey, getvalues, aggregators,
+                                  maxkeys=maxkeys, tempdir=tempdir)
+    aggregation.update(rows)
+    for item in aggregation:
+        yield item
+
+
+def aggregaterows(rows, getvalues, aggregators):
+    """
+    Aggregate `rows` in a single pass, where the value passed to the i-th of
+    the `aggregators` is ``getvalues[i](row)``. Returns a list of results, one
+    for each aggregator. Only the state of each aggregator is held in memory,
+    not the rows themselves.
+
+    .. versionadded:: 0.26
+
+    """
+
+    pairs = zip(aggregators, getvalues)
+    states = [a.init() for a in aggregators]
+    for row in rows:
+        for i, (a, getvalue) in enumerate(pairs):
+            states[i] = a.update(states[i], getvalue(row))
+    return [a.finalize(v) for a, v in zip(aggregators, states)]
+
+
+def _mergestates(items, aggregators):
+    # combine the states of adjacent items with equal keys
+    items = iter(items)
+    try:
+        prevk, prevstate = items.next()
+    except StopIteration:
+        return
+    for k, state in items:
+        if k == prevk:
+            prevstate = [a.merge(v, w)
+                         for a, v, w in zip(aggregators, prevstate, state)]
+        else:
+            yield prevk, prevstate
+            prevk, prevstate = k, state
+    yield prevk, prevstate
+
+
+def _getkeyfun(fields, key):
+    if callable(key):
+        return key
+    return operator.itemgetter(*asindices(fields, key))
+
+
+def _getvaluefun(fields, value):
+    if value is None:
+        return lambda row: row  # whole row
+    return _getkeyfun(fields, value)
+
+
+def _iterhashgroups(table, key, getvalues, aggregators, maxkeys, tempdir):
+    # common set up for hash aggregation of a table, where getvalues is a list
+    # of functions which, given the source header, return the value functions
+    # for each aggregator
+    it = iter(table)
+    fields = it.next()
+    it = hybridrows(fields, it)
+    getkey = _getkeyfun(fields, key)
+    getvalues = [g(fields) for g in getvalues]
+    return iterhashaggregate(it, getkey, getvalues, aggregators,
+                             maxkeys=maxkeys, tempdir=tempdir)
+
+
 def rowreduce(table, key, reducer, fields=None, missing=None, presorted=False, 
-              buffersize=None, tempdir=None, cache=True):
+              buffersize=None, tempdir=None, cache=True, hashed=False,
+              maxkeys=None):
     """
     Group rows under the given key then apply `reducer` to produce a single 
     output row for each input group of rows. E.g.::
@@ -64,27 +514,41 @@ def rowreduce(table, key, reducer, fields=None, missing=None, presorted=False,
     
     Was previously deprecated, now resurrected as it is a useful function in it's
     own right.
+
+    .. versionchanged:: 0.26
+
+    Added the `hashed` and `maxkeys` arguments, see :func:`aggregate`. N.B.,
+    with ``hashed=True`` the rows for each key are still all held in memory
+    (or spilled to disk) before being passed to `reducer`.
     
     """
 
     return RowReduceView(table, key, reducer, fields=fields,
                          presorted=presorted, 
-                         buffersize=buffersize, tempdir=tempdir, cache=cache)
+                         buffersize=buffersize, tempdir=tempdir, cache=cache,
+                         hashed=hashed, maxkeys=maxkeys)
 
 
 class RowReduceView(RowContainer):
     
     def __init__(self, source, key, reducer, fields=None, 
-                 presorted=False, buffersize=None, tempdir=None, cache=True):
-        if presorted:
+                 presorted=False, buffersize=None, tempdir=None, cache=True,
+                 hashed=False, maxkeys=None):
+        if presorted or hashed:
             self.source = source
         else:
             self.source = sort(source, key, buffersize=buffersize, tempdir=tempdir, cache=cache)
         self.key = key
         self.fields = fields
         self.reducer = reducer
+        self.hashed = hashed
+        self.maxkeys = maxkeys
+        self.tempdir = tempdir
 
     def __iter__(self):
+        if self.hashed:
+            return iterhashrowreduce(self.source, self.key, self.reducer,
+                                     self.fields, self.maxkeys, self.tempdir)
         return iterrowreduce(self.source, self.key, self.reducer, self.fields)
 
     
@@ -95,6 +559,17 @@ def iterrowreduce(source, key, reducer, fields):
     yield tuple(fields)
     for key, rows in rowgroupby(source, key):
         yield tuple(reducer(key, rows))
+
+
+def iterhashrowreduce(source, key, reducer, fields, maxkeys, tempdir):
+    if fields is None:
+        # output fields from source
+        fields, source = iterpeek(source)
+    yield tuple(fields)
+    groups = _iterhashgroups(source, key, [lambda flds: lambda row: row],
+                             [ListAggregator()], maxkeys, tempdir)
+    for key, (rows,) in groups:
+        yield tuple(reducer(key, iter(rows)))
         
 
 def recordreduce(table, key, reducer, fields=None, presorted=False, buffersize=None, tempdir=None, cache=True):
@@ -110,7 +585,8 @@ def recordreduce(table, key, reducer, fields=None, presorted=False, buffersize=N
 
 
 def aggregate(table, key, aggregation=None, value=None, presorted=False,
-              buffersize=None, tempdir=None, cache=True):
+              buffersize=None, tempdir=None, cache=True, hashed=False,
+              maxkeys=None):
     """
     Group rows under the given key then apply aggregation functions. E.g.::
 
@@ -245,35 +721,179 @@ def aggregate(table, key, aggregation=None, value=None, presorted=False,
 
     The provided key field is used in the output header instead of 'key'. Also
     compound keys are output as separate columns.
+
+    .. versionchanged:: 0.26
+
+    If `hashed` is True, the table is not sorted, instead the aggregation is
+    done in a single pass over the table, keeping a running result of each
+    aggregation for each distinct key in a dictionary. This is much faster
+    than sorting when there are relatively few distinct keys. If there are
+    more than `maxkeys` distinct keys (by default the value of
+    `petl.transform.reductions.defaultmaxkeys`, 100000), partial results are
+    written to temporary files in `tempdir` and merged at the end. Output rows
+    are in key order, as when the table is sorted.
+
+    Running results are kept via instances of :class:`Aggregator`. The
+    built-in functions :func:`len`, :func:`sum`, :func:`min`, :func:`max`,
+    :func:`list` and :func:`set` are recognised and mapped to
+    :class:`CountAggregator`, :class:`SumAggregator` etc. Instances of
+    :class:`Aggregator` subclasses such as :class:`MeanAggregator` or
+    :class:`ReduceAggregator` can also be given directly as aggregation
+    functions. Any other aggregation function is applied to a list of all of
+    the values for the key, e.g.::
+
+        >>> from petl import MeanAggregator
+        >>> table8 = aggregate(table1, 'foo', hashed=True)
+        >>> table8['count'] = len
+        >>> table8['meanbar'] = 'bar', MeanAggregator()
+        >>> table8['bars'] = 'bar', strjoin(', ')
+
+    When several aggregations are given, all of them are now computed in a
+    single pass over the rows for each key, whether or not `hashed` is True.
+    Rows are no longer collected into a list for each key, so memory use does
+    not grow with the size of a group unless one of the aggregations needs all
+    of the values, like :func:`list` or an arbitrary function. Further
+    aggregators which need constant memory are :class:`VarianceAggregator`,
+    :class:`FirstAggregator`, :class:`LastAggregator` and
+    :class:`CountDistinctAggregator` (which holds the distinct values).
+
+    If `table` is a :class:`ColumnarTable` and the aggregations are all
+    :func:`len`, :func:`sum`, :func:`min`, :func:`max` (or the corresponding
+    aggregators) or :class:`MeanAggregator` on numeric fields, the
+    aggregation is vectorised and a columnar table is returned. Likewise if
+    `table` was extracted via :func:`fromdb` or :func:`fromsqlite3`, such
+    aggregations may be added to the SQL query as a ``GROUP BY``, see
+    :func:`fromdb`.
     
     """
 
+    aggregated = _groupby(table, key, aggregation, value)
+    if aggregated is not None:
+        return aggregated
     if callable(aggregation):
         return SimpleAggregateView(table, key, aggregation=aggregation, value=value, 
-                                   presorted=presorted, buffersize=buffersize, tempdir=tempdir, cache=cache)
+                                   presorted=presorted, buffersize=buffersize, tempdir=tempdir, cache=cache,
+                                   hashed=hashed, maxkeys=maxkeys)
     elif aggregation is None or isinstance(aggregation, (list, tuple, dict)):
         # ignore value arg
         return MultiAggregateView(table, key, aggregation=aggregation,  
-                                  presorted=presorted, buffersize=buffersize, tempdir=tempdir, cache=cache)
+                                  presorted=presorted, buffersize=buffersize, tempdir=tempdir, cache=cache,
+                                  hashed=hashed, maxkeys=maxkeys)
     else:
         raise Exception('expected aggregation is callable, list, tuple, dict or None')
 
 
+_columnaraggregations = {len: 'count',
+                         sum: 'sum',
+                         min: 'min',
+                         max: 'max'}
+
+
+_columnaraggregators = {CountAggregator: 'count',
+                        SumAggregator: 'sum',
+                        MinAggregator: 'min',
+                        MaxAggregator: 'max',
+                        MeanAggregator: 'mean'}
+
+
+def _columnaraggregation(srcfld, aggfun):
+    # name of the vectorised equivalent of an aggregation, if any
+    if isinstance(aggfun, Aggregator):
+        name = _columnaraggregators.get(type(aggfun))
+    else:
+        try:
+            name = _columnaraggregations.get(aggfun)
+        except TypeError:  # unhashable
+            name = None
+    if name is None or name == 'count':
+        return name
+    if srcfld is None or isinstance(srcfld, (list, tuple)):
+        return None  # need a single field of values
+    return name
+
+
+def _aggregationspecs(key, aggregation, value):
+    # the output header and a list of (field, name) tuples naming the
+    # vectorised equivalent of each aggregation, or None if there isn't one
+    if callable(key) or aggregation is None:
+        return None
+    if callable(aggregation):
+        header = _simpleaggregateheader(key)
+        aggregation = OrderedDict([('value', (value, aggregation))])
+    else:
+        if isinstance(aggregation, (list, tuple)):
+            aggregation = OrderedDict((t[0], t[1:]) for t in aggregation)
+        aggregation = _normaliseaggregation(aggregation)
+        header = _multiaggregateheader(key, aggregation)
+    specs = list()
+    for srcfld, aggfun in aggregation.values():
+        name = _columnaraggregation(srcfld, aggfun)
+        if name is None:
+            return None
+        specs.append((srcfld, name))
+    return header, specs
+
+
+def _groupby(table, key, aggregation, value):
+    # the table's own implementation of the aggregation (e.g., vectorised for
+    # a columnar table), if it has one and the aggregation can be done that
+    # way, see petl.util._dispatch
+    if getattr(table, '_transform_groupby', None) is None:
+        return None
+    result = _aggregationspecs(key, aggregation, value)
+    if result is None:
+        return None
+    header, specs = result
+    return _dispatch(table, 'groupby', key, specs, header)
+
+
 class SimpleAggregateView(RowContainer):
     
     def __init__(self, table, key, aggregation=list, value=None, presorted=False,
-                 buffersize=None, tempdir=None, cache=True):
-        if presorted:
+                 buffersize=None, tempdir=None, cache=True, hashed=False,
+                 maxkeys=None):
+        if presorted or hashed:
             self.table = table
         else:
             self.table = sort(table, key, buffersize=buffersize, tempdir=tempdir, cache=cache)    
         self.key = key
         self.aggregation = aggregation
         self.value = value
+        self.hashed = hashed
+        self.maxkeys = maxkeys
+        self.tempdir = tempdir
         
     def __iter__(self):
+        if self.hashed:
+            return iterhashsimpleaggregate(self.table, self.key,
+                                           self.aggregation, self.value,
+                                           self.maxkeys, self.tempdir)
         return itersimpleaggregate(self.table, self.key, self.aggregation, self.value)
 
+    def _sortorder(self):
+        return _aggregatesortorder(self.table, self.key, self.hashed)
+
+
+def _aggregatesortorder(source, key, hashed):
+    # N.B., the key fields come first in the output, and groups are output in
+    # order of key unless hashed or the source is not known to be sorted by key
+    # (e.g., if presorted)
+    order = _ordered(key)
+    if hashed or order is None or order[0] is None \
+            or not _knownsorted(source, key):
+        return None
+    return tuple(k if isinstance(k, basestring) else i
+                 for i, k in enumerate(order[0])), False
+
+
+def _simpleaggregateheader(key):
+    if isinstance(key, (list, tuple)):
+        return tuple(key) + ('value',)
+    elif callable(key):
+        return ('key', 'value')
+    else:
+        return (key, 'value')
+
 
 def itersimpleaggregate(table, key, aggregation, value):
 
@@ -282,13 +902,7 @@ def itersimpleaggregate(table, key, aggregation, value):
         aggregation = lambda g: sum(1 for _ in g)  # count length of iterable
 
     # determine output header
-    if isinstance(key, (list, tuple)):
-        outfields = tuple(key) + ('value',)
-    elif callable(key):
-        outfields = ('key', 'value')
-    else:
-        outfields = (key, 'value')
-    yield outfields
+    yield _simpleaggregateheader(key)
 
     # generate data
     if isinstance(key, (list, tuple)):
@@ -299,15 +913,32 @@ def itersimpleaggregate(table, key, aggregation, value):
             yield k, aggregation(grp)
 
 
+def iterhashsimpleaggregate(table, key, aggregation, value, maxkeys, tempdir):
+    yield _simpleaggregateheader(key)
+    groups = _iterhashgroups(table, key,
+                             [lambda fields: _getvaluefun(fields, value)],
+                             [aggregator(aggregation)], maxkeys, tempdir)
+    if isinstance(key, (list, tuple)):
+        for k, (aggval,) in groups:
+            yield tuple(k) + (aggval,)
+    else:
+        for k, (aggval,) in groups:
+            yield k, aggval
+
+
 class MultiAggregateView(RowContainer):
     
     def __init__(self, source, key, aggregation=None, presorted=False, 
-                 buffersize=None, tempdir=None, cache=True):
-        if presorted:
+                 buffersize=None, tempdir=None, cache=True, hashed=False,
+                 maxkeys=None):
+        if presorted or hashed:
             self.source = source
         else:
             self.source = sort(source, key, buffersize=buffersize, tempdir=tempdir, cache=cache)
         self.key = key
+        self.hashed = hashed
+        self.maxkeys = maxkeys
+        self.tempdir = tempdir
         if aggregation is None:
             self.aggregation = OrderedDict()
         elif isinstance(aggregation, (list, tuple)):
@@ -320,19 +951,21 @@ class MultiAggregateView(RowContainer):
             raise Exception('expected aggregation is None, list, tuple or dict')
 
     def __iter__(self):
+        if self.hashed:
+            return iterhashmultiaggregate(self.source, self.key,
+                                          self.aggregation, self.maxkeys,
+                                          self.tempdir)
         return itermultiaggregate(self.source, self.key, self.aggregation)
+
+    def _sortorder(self):
+        return _aggregatesortorder(self.source, self.key, self.hashed)
     
     def __setitem__(self, key, value):
         self.aggregation[key] = value
 
-    
-def itermultiaggregate(source, key, aggregation):
-    aggregation = OrderedDict(aggregation.items()) # take a copy
-    it = iter(source)
-    srcflds = it.next()
-    it = itertools.chain([srcflds], it)  # push back header to ensure we iterate only once
 
-    # normalise aggregators
+def _normaliseaggregation(aggregation):
+    aggregation = OrderedDict(aggregation.items()) # take a copy
     for outfld in aggregation:
         agg = aggregation[outfld]
         if callable(agg):
@@ -347,8 +980,10 @@ def itermultiaggregate(source, key, aggregation):
             pass # no need to normalise
         else:
             raise Exception('invalid aggregation: %r, %r' % (outfld, agg))
+    return aggregation
 
-    # determine output header
+
+def _multiaggregateheader(key, aggregation):
     if isinstance(key, (list, tuple)):
         outflds = list(key)
     elif callable(key):
@@ -357,33 +992,65 @@ def itermultiaggregate(source, key, aggregation):
         outflds = [key]
     for outfld in aggregation:
         outflds.append(outfld)
-    yield tuple(outflds)
+    return tuple(outflds)
+
     
-    # generate data
+def _multiaggregators(srcflds, aggregation):
+    # value functions and aggregators for a normalised aggregation
+    getvalues = list()
+    aggregators = list()
+    for srcfld, aggfun in aggregation.values():
+        getvalues.append(_getvaluefun(srcflds, srcfld))
+        aggregators.append(aggregator(aggfun))
+    return getvalues, aggregators
+
+
+def itermultiaggregate(source, key, aggregation):
+    it = iter(source)
+    srcflds = it.next()
+    it = itertools.chain([srcflds], it)  # push back header to ensure we iterate only once
+
+    # normalise aggregators
+    aggregation = _normaliseaggregation(aggregation)
+    getvalues, aggregators = _multiaggregators(srcflds, aggregation)
+
+    # determine output header
+    yield _multiaggregateheader(key, aggregation)
+    
+    # generate data, computing all aggregations in a single pass over the rows
+    # in each group
     for k, rows in rowgroupby(it, key):
-        rows = list(rows) # may need to iterate over these more than once
         # handle compound key
         if isinstance(key, (list, tuple)):
             outrow = list(k)
         else:
             outrow = [k]
-        for outfld in aggregation:
-            srcfld, aggfun = aggregation[outfld]
-            if srcfld is None:
-                aggval = aggfun(rows)
-                outrow.append(aggval)
-            elif isinstance(srcfld, (list, tuple)):
-                idxs = [srcflds.index(f) for f in srcfld]
-                valgetter = operator.itemgetter(*idxs)
-                vals = (valgetter(row) for row in rows)
-                aggval = aggfun(vals)
-                outrow.append(aggval)
-            else:
-                idx = srcflds.index(srcfld)
-                # try using generator comprehension
-                vals = (row[idx] for row in rows)
-                aggval = aggfun(vals)
-                outrow.append(aggval)
+        outrow.extend(aggregaterows(rows, getvalues, aggregators))
+        yield tuple(outrow)
+
+
+def iterhashmultiaggregate(source, key, aggregation, maxkeys, tempdir):
+    aggregation = _normaliseaggregation(aggregation)
+    yield _multiaggregateheader(key, aggregation)
+
+    getvalues = list()
+    aggregators = list()
+    for srcfld, aggfun in aggregation.values():
+        # N.B., bind srcfld now, value functions are created once the source
+        # header is known
+        getvalues.append(lambda fields, srcfld=srcfld:
+                         _getvaluefun(fields, srcfld))
+        aggregators.append(aggregator(aggfun))
+
+    groups = _iterhashgroups(source, key, getvalues, aggregators, maxkeys,
+                             tempdir)
+    for k, aggvals in groups:
+        # handle compound key
+        if isinstance(key, (list, tuple)):
+            outrow = list(k)
+        else:
+            outrow = [k]
+        outrow.extend(aggvals)
         yield tuple(outrow)
             
 
@@ -641,6 +1308,11 @@ def rangeaggregate(table, key, width, aggregation=None, value=None, minv=None,
 
     The provided key is used in the output header instead of 'key'.
 
+    .. versionchanged:: 0.26
+
+    Aggregations are computed in a single pass over the rows in each bin, via
+    instances of :class:`Aggregator`, see :func:`aggregate`.
+
     """
 
     if callable(aggregation):
@@ -678,12 +1350,31 @@ class SimpleRangeAggregateView(RowContainer):
                                         self.maxv)
 
 
+def _binfolder(getvalues, aggregators):
+    # init and update functions to pass to rowfoldbybin
+    pairs = zip(aggregators, getvalues)
+
+    def init():
+        return [a.init() for a in aggregators]
+
+    def update(states, row):
+        for i, (a, getvalue) in enumerate(pairs):
+            states[i] = a.update(states[i], getvalue(row))
+        return states
+
+    return init, update
+
+
 def itersimplerangeaggregate(table, key, width, aggregation, value, minv, maxv):
-    if aggregation == len:
-        aggregation = lambda grp: sum(1 for _ in grp) # count length of iterable
+    it = iter(table)
+    fields = it.next()
+    it = itertools.chain([fields], it)
+    a = aggregator(aggregation)
+    init, update = _binfolder([_getvaluefun(fields, value)], [a])
     yield (key, 'value')
-    for k, grp in rowgroupbybin(table, key, width, value=value, minv=minv, maxv=maxv):
-        yield k, aggregation(grp)
+    for k, (state,) in rowfoldbybin(it, key, width, init, update, minv=minv,
+                                    maxv=maxv):
+        yield k, a.finalize(state)
 
 
 class MultiRangeAggregateView(RowContainer):
@@ -717,46 +1408,26 @@ class MultiRangeAggregateView(RowContainer):
 
     
 def itermultirangeaggregate(source, key, width, aggregation, minv, maxv):
-    aggregation = OrderedDict(aggregation.items()) # take a copy
     it = iter(source)
     srcflds = it.next()
     # push back header to ensure we iterate only once
     it = itertools.chain([srcflds], it)
 
     # normalise aggregators
-    for outfld in aggregation:
-        agg = aggregation[outfld]
-        if callable(agg):
-            aggregation[outfld] = None, agg
-        elif isinstance(agg, basestring):
-            aggregation[outfld] = agg, list # list is default
-        elif len(agg) == 1 and isinstance(agg[0], basestring):
-            aggregation[outfld] = agg[0], list # list is default 
-        elif len(agg) == 1 and callable(agg[0]):
-            aggregation[outfld] = None, agg[0] # aggregate whole rows
-        elif len(agg) == 2:
-            pass # no need to normalise
-        else:
-            raise Exception('invalid aggregation: %r, %r' % (outfld, agg))
+    aggregation = _normaliseaggregation(aggregation)
+    getvalues, aggregators = _multiaggregators(srcflds, aggregation)
         
     outflds = [key]
     for outfld in aggregation:
         outflds.append(outfld)
     yield tuple(outflds)
     
-    for k, rows in rowgroupbybin(it, key, width, minv=minv, maxv=maxv):
+    # compute all aggregations in a single pass over the rows in each bin
+    init, update = _binfolder(getvalues, aggregators)
+    for k, states in rowfoldbybin(it, key, width, init, update, minv=minv,
+                                  maxv=maxv):
         outrow = [k]
-        for outfld in aggregation:
-            srcfld, aggfun = aggregation[outfld]
-            if srcfld is None:
-                aggval = aggfun(rows)
-                outrow.append(aggval)
-            else:
-                idx = srcflds.index(srcfld)
-                # try using generator comprehension
-                vals = (row[idx] for row in rows)
-                aggval = aggfun(vals)
-                outrow.append(aggval)
+        outrow.extend(a.finalize(v) for a, v in zip(aggregators, states))
         yield tuple(outrow)
             
     
@@ -814,7 +1485,7 @@ def groupselectmax(table, key, value):
     
 
 def mergeduplicates(table, key, missing=None, presorted=False, buffersize=None,
-                    tempdir=None, cache=True):
+                    tempdir=None, cache=True, hashed=False, maxkeys=None):
     """
     Merge duplicate rows under the given key. E.g.::
 
@@ -870,31 +1541,39 @@ def mergeduplicates(table, key, missing=None, presorted=False, buffersize=None,
     Renamed from 'mergereduce' to 'mergeduplicates'. Conflicts now reported as
     instance of Conflict.
 
+    .. versionchanged:: 0.26
+
+    Added the `hashed` and `maxkeys` arguments, see :func:`aggregate`.
+
     """
 
     return MergeDuplicatesView(table, key, missing=missing, presorted=presorted,
-                               buffersize=buffersize, tempdir=tempdir, cache=cache)
+                               buffersize=buffersize, tempdir=tempdir, cache=cache,
+                               hashed=hashed, maxkeys=maxkeys)
 
 
 class MergeDuplicatesView(RowContainer):
 
-    def __init__(self, table, key, missing=None, presorted=False, buffersize=None, tempdir=None, cache=True):
-        if presorted:
+    def __init__(self, table, key, missing=None, presorted=False, buffersize=None, tempdir=None, cache=True,
+                 hashed=False, maxkeys=None):
+        if presorted or hashed:
             self.table = table
         else:
             self.table = sort(table, key, buffersize=buffersize, tempdir=tempdir, cache=cache)
         self.key = key
         self.missing = missing
+        self.hashed = hashed
+        self.maxkeys = maxkeys
+        self.tempdir = tempdir
 
     def __iter__(self):
+        if self.hashed:
+            return iterhashmergeduplicates(self.table, self.key, self.missing,
+                                           self.maxkeys, self.tempdir)
         return itermergeduplicates(self.table, self.key, self.missing)
 
 
-def itermergeduplicates(table, key, missing):
-    it = iter(table)
-    fields, it = iterpeek(it)
-
-    # determine output fields
+def _mergeduplicatesfields(fields, key):
     if isinstance(key, basestring):
         outflds = [key]
         keyflds = set([key])
@@ -904,6 +1583,15 @@ def itermergeduplicates(table, key, missing):
     valflds = [f for f in fields if f not in keyflds]
     valfldidxs = [fields.index(f) for f in valflds]
     outflds.extend(valflds)
+    return outflds, valfldidxs
+
+
+def itermergeduplicates(table, key, missing):
+    it = iter(table)
+    fields, it = iterpeek(it)
+
+    # determine output fields
+    outflds, valfldidxs = _mergeduplicatesfields(fields, key)
     yield tuple(outflds)
 
     # do the work
@@ -924,6 +1612,64 @@ def itermergeduplicates(table, key, missing):
         yield tuple(outrow)
 
 
+class MergeValuesAggregator(Aggregator):
+    """
+    Collect the distinct non-missing values, returning a single value, or
+    `missing` if there are none, or a :class:`Conflict` if there are several.
+
+    .. versionadded:: 0.26
+
+    """
+
+    def __init__(self, missing=None):
+        self.missing = missing
+
+    def init(self):
+        return set()
+
+    def update(self, state, value):
+        if value != self.missing:
+            state.add(value)
+        return state
+
+    def merge(self, state, other):
+        state.update(other)
+        return state
+
+    def finalize(self, state):
+        if len(state) == 1:
+            return iter(state).next()
+        elif len(state) == 0:
+            return self.missing
+        else:
+            return Conflict(state)
+
+
+def _getvalueormissing(i, missing):
+    # handle short rows
+    return lambda row: row[i] if len(row) > i else missing
+
+
+def iterhashmergeduplicates(table, key, missing, maxkeys, tempdir):
+    it = iter(table)
+    fields, it = iterpeek(it)
+    outflds, valfldidxs = _mergeduplicatesfields(fields, key)
+    yield tuple(outflds)
+
+    getvalues = [lambda flds, i=i: _getvalueormissing(i, missing)
+                 for i in valfldidxs]
+    aggregators = [MergeValuesAggregator(missing) for _ in valfldidxs]
+    groups = _iterhashgroups(it, key, getvalues, aggregators, maxkeys,
+                             tempdir)
+    for k, vals in groups:
+        if isinstance(key, basestring):
+            outrow = [k]
+        else:
+            outrow = list(k)
+        outrow.extend(vals)
+        yield tuple(outrow)
+
+
 mergereduce = mergeduplicates # for backwards compatibility
 
 
@@ -1033,6 +1779,11 @@ def multirangeaggregate(table, keys, widths, aggregation, value=None,
 
     .. versionadded:: 0.12
 
+    .. versionchanged:: 0.26
+
+    The aggregation is computed in a single pass over the rows in each bin,
+    via an instance of :class:`Aggregator`, see :func:`aggregate`.
+
     """
 
     assert callable(aggregation), 'aggregation argument must be callable'
@@ -1069,15 +1820,26 @@ class SimpleMultiRangeAggregateView(RowContainer):
                                              self.mins, self.maxs)
 
 
-def _recursive_bin(outerbin, level, bindef, fields, keys, widths, getval, mins, maxs):
+def _recursive_bin(outerbin, level, bindef, fields, keys, widths, init, update, mins, maxs):
 
     # TODO this is almost impossible to comprehend, needs to be tidied up!
 
     bindef = list(bindef) # take a copy
 
     if level == len(keys): # bottom out
-        vals = (getval(row) for row in outerbin)
-        yield tuple(bindef), vals
+        state = init()
+        for row in outerbin:
+            state = update(state, row)
+        yield tuple(bindef), state
+
+    elif level == len(keys) - 1: # innermost level, fold rows into bins
+        tbl = itertools.chain([fields], outerbin)  # reconstitute table with header
+        tbl_sorted = sort(tbl, keys[level])
+        for binrange, state in rowfoldbybin(tbl_sorted, keys[level],
+                                            widths[level], init, update,
+                                            minv=mins[level],
+                                            maxv=maxs[level]):
+            yield tuple(bindef) + (binrange,), state
 
     else: # go deeper
 
@@ -1119,7 +1881,7 @@ def _recursive_bin(outerbin, level, bindef, fields, keys, widths, getval, mins,
                         keyv = getkey(row)
                 except StopIteration:
                     pass
-                for r in _recursive_bin(binnedrows, level+1, thisbindef, fields, keys, widths, getval, mins, maxs):
+                for r in _recursive_bin(binnedrows, level+1, thisbindef, fields, keys, widths, init, update, mins, maxs):
                     yield r
 
         else:
@@ -1160,7 +1922,7 @@ def _recursive_bin(outerbin, level, bindef, fields, keys, widths, getval, mins,
                             row = it.next()
                             keyv = getkey(row)
 
-                        for r in _recursive_bin(binnedrows, level+1, thisbindef, fields, keys, widths, getval, mins, maxs):
+                        for r in _recursive_bin(binnedrows, level+1, thisbindef, fields, keys, widths, init, update, mins, maxs):
                             yield r
 
                         # possible floating point precision bug here?
@@ -1169,16 +1931,15 @@ def _recursive_bin(outerbin, level, bindef, fields, keys, widths, getval, mins,
                 except StopIteration:
                     # don't forget to handle the last bin
                     for r in _recursive_bin(binnedrows, level+1, thisbindef,
-                                            fields, keys, widths, getval, mins,
-                                            maxs):
+                                            fields, keys, widths, init,
+                                            update, mins, maxs):
                         yield r
 
 
 def itersimplemultirangeaggregate(table, keys, widths, aggregation, value,
                                       mins, maxs):
 
-    if aggregation == len:
-        aggregation = lambda grp: sum(1 for _ in grp) # count length of iterable
+    a = aggregator(aggregation)
     yield ('key', 'value')
 
     # we want a recursive grouping algorithm so we could cope with any number of
@@ -1200,13 +1961,15 @@ def itersimplemultirangeaggregate(table, keys, widths, aggregation, value,
             vindices = asindices(fields, value)
             getval = operator.itemgetter(*vindices)
 
-    for bindef, vals in _recursive_bin(it, 0, [], fields, keys, widths, getval,
-                                       mins, maxs):
-        yield bindef, aggregation(vals)
+    # fold values into the state of the aggregator as rows are binned
+    init, update = _binfolder([getval], [a])
+    for bindef, (state,) in _recursive_bin(it, 0, [], fields, keys, widths,
+                                           init, update, mins, maxs):
+        yield bindef, a.finalize(state)
 
 
 def fold(table, key, f, value=None, presorted=False, buffersize=None,
-         tempdir=None, cache=True):
+         tempdir=None, cache=True, hashed=False, maxkeys=None):
     """
     Reduce rows recursively via the Python standard :func:`reduce` function. E.g.::
 
@@ -1239,17 +2002,25 @@ def fold(table, key, f, value=None, presorted=False, buffersize=None,
 
     .. versionadded:: 0.10
 
+    .. versionchanged:: 0.26
+
+    Added the `hashed` and `maxkeys` arguments, see :func:`aggregate`. N.B.,
+    if partial results are spilled to disk they are also combined via `f`, so
+    `f` should be associative.
+
     """
 
     return FoldView(table, key, f, value=value, presorted=presorted,
-                    buffersize=buffersize, tempdir=tempdir, cache=cache)
+                    buffersize=buffersize, tempdir=tempdir, cache=cache,
+                    hashed=hashed, maxkeys=maxkeys)
 
 
 class FoldView(RowContainer):
 
     def __init__(self, table, key, f, value=None, presorted=False,
-                 buffersize=None, tempdir=None, cache=True):
-        if presorted:
+                 buffersize=None, tempdir=None, cache=True, hashed=False,
+                 maxkeys=None):
+        if presorted or hashed:
             self.table = table
         else:
             self.table = sort(table, key, buffersize=buffersize,
@@ -1257,8 +2028,14 @@ class FoldView(RowContainer):
         self.key = key
         self.f = f
         self.value = value
+        self.hashed = hashed
+        self.maxkeys = maxkeys
+        self.tempdir = tempdir
 
     def __iter__(self):
+        if self.hashed:
+            return iterhashfold(self.table, self.key, self.f, self.value,
+                                self.maxkeys, self.tempdir)
         return iterfold(self.table, self.key, self.f, self.value)
 
 
@@ -1268,4 +2045,13 @@ def iterfold(table, key, f, value):
         yield k, reduce(f, grp)
 
 
+def iterhashfold(table, key, f, value, maxkeys, tempdir):
+    yield ('key', 'value')
+    groups = _iterhashgroups(table, key,
+                             [lambda fields: _getvaluefun(fields, value)],
+                             [ReduceAggregator(f)], maxkeys, tempdir)
+    for k, (v,) in groups:
+        yield k, v
+
+
 
@@ -7,7 +7,8 @@ import re
 
 from petl.compat import OrderedDict
 from petl.util import asindices, expr, RowContainer, hybridrows, values, \
-    itervalues, limits
+    itervalues, limits, iterparallel, sortorder, _dispatch
+from petl.fusion import FusibleView
 
 
 def select(table, *args, **kwargs):
@@ -69,10 +70,20 @@ def select(table, *args, **kwargs):
     The complement of the selection can be returned (i.e., the query can be
     inverted) by providing `complement=True` as a keyword argument.
 
+    .. versionchanged:: 0.26
+
+    If the `workers` keyword argument is greater than 1, the condition is
+    evaluated on batches of `chunksize` rows by a pool of `workers`
+    processes, see :func:`petl.util.iterparallel`. Rows are output in the
+    order of the input unless `ordered=False` is given.
+
     """
 
     missing = kwargs.get('missing', None)
     complement = kwargs.get('complement', False)
+    parallel = dict(workers=kwargs.get('workers', None),
+                    chunksize=kwargs.get('chunksize', None),
+                    ordered=kwargs.get('ordered', True))
 
     if len(args) == 0:
         raise Exception('missing positional argument')
@@ -82,12 +93,14 @@ def select(table, *args, **kwargs):
             where = expr(where)
         else:
             assert callable(where), 'second argument must be string or callable'
-        return RowSelectView(table, where, missing=missing, complement=complement)
+        return RowSelectView(table, where, missing=missing, complement=complement,
+                             **parallel)
     else:
         field = args[0]
         where = args[1]
         assert callable(where), 'third argument must be callable'
-        return FieldSelectView(table, field, where, complement=complement)
+        return FieldSelectView(table, field, where, complement=complement,
+                               **parallel)
 
 
 def recordselect(table, where, missing=None, complement=False):
@@ -120,25 +133,59 @@ def rowselect(table, where, complement=False):
     return RowSelectView(table, where, complement=complement)
 
 
-class RowSelectView(RowContainer):
+class RowSelectView(FusibleView):
 
-    def __init__(self, source, where, missing=None, complement=False):
+    def __init__(self, source, where, missing=None, complement=False,
+                 workers=None, chunksize=None, ordered=True):
         self.source = source
         self.where = where
         self.missing = missing
         self.complement = complement
+        self.workers = workers
+        self.chunksize = chunksize
+        self.ordered = ordered
 
-    def __iter__(self):
-        return iterrowselect(self.source, self.where, self.missing, self.complement)
+    def _iterfrom(self, source):
+        return iterrowselect(source, self.where, self.missing, self.complement,
+                             self.workers, self.chunksize, self.ordered)
+
+    def _fusible(self):
+        return self.workers is None or self.workers <= 1
+
+    def _sortorder(self):
+        if self.ordered or self._fusible():
+            return sortorder(self.source)
+        return None
+
+    def _fuse(self, plan):
+        # N.B., the where function is given the whole row
+        plan.where('%s(%s) != %s' % (plan.constant(self.where),
+                                     plan.hybridrow(self.missing),
+                                     plan.constant(self.complement)))
 
 
-def iterrowselect(source, where, missing, complement):
+def iterrowselect(source, where, missing, complement, workers=None,
+                  chunksize=None, ordered=True):
     it = iter(source)
     flds = it.next()
     yield tuple(flds)
-    for row in hybridrows(flds, it, missing): # convert to hybrid row/record
-        if where(row) != complement: # XOR
-            yield tuple(row) # need to convert back to tuple?
+
+    def selectrows(rows):
+        for row in hybridrows(flds, rows, missing): # convert to hybrid row/record
+            if where(row) != complement: # XOR
+                yield tuple(row) # need to convert back to tuple?
+
+    for row in _iterselected(selectrows, it, workers, chunksize, ordered):
+        yield row
+
+
+def _iterselected(selectrows, it, workers, chunksize, ordered):
+    # apply selectrows to the rows in a pool of processes if requested
+    if workers is not None and workers > 1:
+        return iterparallel(lambda rows: list(selectrows(rows)), it, workers,
+                            chunksize, ordered)
+    else:
+        return selectrows(it)
 
 
 def rowlenselect(table, n, complement=False):
@@ -170,28 +217,58 @@ def fieldselect(table, field, where, complement=False):
     return FieldSelectView(table, field, where, complement=complement)
 
 
-class FieldSelectView(RowContainer):
+class FieldSelectView(FusibleView):
 
-    def __init__(self, source, field, where, complement=False):
+    def __init__(self, source, field, where, complement=False, workers=None,
+                 chunksize=None, ordered=True):
         self.source = source
         self.field = field
         self.where = where
         self.complement = complement
-
-    def __iter__(self):
-        return iterfieldselect(self.source, self.field, self.where, self.complement)
+        self.workers = workers
+        self.chunksize = chunksize
+        self.ordered = ordered
+
+    def _iterfrom(self, source):
+        return iterfieldselect(source, self.field, self.where, self.complement,
+                               self.workers, self.chunksize, self.ordered)
+
+    def _fusible(self):
+        return self.workers is None or self.workers <= 1
+
+    def _sortorder(self):
+        if self.ordered or self._fusible():
+            return sortorder(self.source)
+        return None
+
+    def _fuse(self, plan):
+        # N.B., only the values of the given field(s) are needed, so any
+        # conversions of other fields are deferred until after the selection
+        indices = asindices(plan.flds, self.field)
+        if len(indices) == 1:
+            value = plan.ref(plan.cols[indices[0]])
+        else:
+            value = plan.rowcode([plan.cols[i] for i in indices])
+        plan.where('%s(%s) != %s' % (plan.constant(self.where), value,
+                                     plan.constant(self.complement)))
 
 
-def iterfieldselect(source, field, where, complement):
+def iterfieldselect(source, field, where, complement, workers=None,
+                    chunksize=None, ordered=True):
     it = iter(source)
     flds = it.next()
     yield tuple(flds)
     indices = asindices(flds, field)
     getv = operator.itemgetter(*indices)
-    for row in it:
-        v = getv(row)
-        if where(v) != complement: # XOR
-            yield tuple(row)
+
+    def selectrows(rows):
+        for row in rows:
+            v = getv(row)
+            if where(v) != complement: # XOR
+                yield tuple(row)
+
+    for row in _iterselected(selectrows, it, workers, chunksize, ordered):
+        yield row
 
 
 def selectop(table, field, value, op, complement=False):
@@ -204,8 +281,22 @@ def selectop(table, field, value, op, complement=False):
     The complement of the selection can be returned (i.e., the query can be
     inverted) by providing `complement=True` as a keyword argument.
 
+    .. versionchanged:: 0.26
+
+    Comparisons are vectorised if `table` is a :class:`ColumnarTable`.
+
+    .. versionchanged:: 0.26
+
+    If `table` was extracted via :func:`fromdb` or :func:`fromsqlite3` (or
+    is the result of other transformations pushed down into the query) and
+    `op` is a comparison operator, the selection may be added to the SQL query
+    instead, see :func:`fromdb`.
+
     """
 
+    selected = _dispatch(table, 'selectop', field, value, op, complement)
+    if selected is not None:
+        return selected
     return fieldselect(table, field, lambda v: op(v, value), complement=complement)
 
 
@@ -315,6 +406,9 @@ def selectin(table, field, value, complement=False):
 
     """
 
+    selected = _dispatch(table, 'selectin', field, value, complement)
+    if selected is not None:
+        return selected
     return fieldselect(table, field, lambda v: v in value, complement=complement)
 
 
@@ -329,6 +423,9 @@ def selectnotin(table, field, value, complement=False):
 
     """
 
+    selected = _dispatch(table, 'selectin', field, value, not complement)
+    if selected is not None:
+        return selected
     return fieldselect(table, field, lambda v: v not in value, complement=complement)
 
 
@@ -374,6 +471,17 @@ def selectisinstance(table, field, value, complement=False):
     return selectop(table, field, value, isinstance, complement=complement)
 
 
+def _selectrange(table, field, minv, maxv, minop, maxop, complement):
+    # select rows where minop(minv, v) and maxop(v, maxv)
+    selected = _dispatch(table, 'selectrange', field, minv, maxv, minop,
+                         maxop, complement)
+    if selected is not None:
+        return selected
+    return fieldselect(table, field,
+                       lambda v: minop(minv, v) and maxop(v, maxv),
+                       complement=complement)
+
+
 def selectrangeopenleft(table, field, minv, maxv, complement=False):
     """
     Select rows where the given field is greater than or equal to `minv` and
@@ -386,7 +494,8 @@ def selectrangeopenleft(table, field, minv, maxv, complement=False):
 
     """
 
-    return fieldselect(table, field, lambda v: minv <= v < maxv, complement=complement)
+    return _selectrange(table, field, minv, maxv, operator.le, operator.lt,
+                        complement)
 
 
 def selectrangeopenright(table, field, minv, maxv, complement=False):
@@ -401,7 +510,8 @@ def selectrangeopenright(table, field, minv, maxv, complement=False):
 
     """
 
-    return fieldselect(table, field, lambda v: minv < v <= maxv, complement=complement)
+    return _selectrange(table, field, minv, maxv, operator.lt, operator.le,
+                        complement)
 
 
 def selectrangeopen(table, field, minv, maxv, complement=False):
@@ -416,7 +526,8 @@ def selectrangeopen(table, field, minv, maxv, complement=False):
 
     """
 
-    return fieldselect(table, field, lambda v: minv <= v <= maxv, complement=complement)
+    return _selectrange(table, field, minv, maxv, operator.le, operator.le,
+                        complement)
 
 
 def selectrangeclosed(table, field, minv, maxv, complement=False):
@@ -431,7 +542,8 @@ def selectrangeclosed(table, field, minv, maxv, complement=False):
 
     """
 
-    return fieldselect(table, field, lambda v: minv < v < maxv, complement=complement)
+    return _selectrange(table, field, minv, maxv, operator.lt, operator.lt,
+                        complement)
 
 
 def selectre(table, field, pattern, flags=0, complement=False):
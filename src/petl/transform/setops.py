@@ -2,9 +2,11 @@ from __future__ import absolute_import, print_function, division
 
 
 from petl.compat import Counter
-from petl.util import header, RowContainer, SortableItem
+from petl.util import header, RowContainer, SortableItem, sortorder
 from petl.transform.sorts import sort
 from petl.transform.basics import cut
+import petl.transform.hashjoins
+from petl.transform.hashjoins import iterpartitionpairs, fitsinmemory
 
 
 import logging
@@ -91,6 +93,9 @@ class ComplementView(RowContainer):
     def __iter__(self):
         return itercomplement(self.a, self.b)
 
+    def _sortorder(self):
+        return sortorder(self.a)
+
 
 def itercomplement(ta, tb):
     # coerce rows to tuples to ensure hashable and comparable
@@ -411,6 +416,9 @@ class IntersectionView(RowContainer):
     def __iter__(self):
         return iterintersection(self.a, self.b)
 
+    def _sortorder(self):
+        return sortorder(self.a)
+
 
 def iterintersection(a, b):
     ita = iter(a)
@@ -434,7 +442,7 @@ def iterintersection(a, b):
         pass
 
 
-def hashcomplement(a, b):
+def hashcomplement(a, b, buffersize=None, partitions=None, tempdir=None):
     """
     Alternative implementation of :func:`complement`, where the complement is executed
     by constructing an in-memory set for all rows found in the right hand table, then
@@ -445,19 +453,87 @@ def hashcomplement(a, b):
 
     .. versionadded:: 0.5
 
+    .. versionchanged:: 0.26
+
+    The `buffersize` argument limits the number of rows from the right table
+    held in memory. If the right table has more than `buffersize` data rows,
+    both tables are hash-partitioned on the whole row into `partitions`
+    temporary files each (in `tempdir`), and each pair of partitions is then
+    processed in memory in turn. A pair of partitions which is still too large
+    is partitioned again, up to `petl.transform.hashjoins.maxpartitiondepth`
+    (2) times. N.B., when tables are partitioned, output rows are grouped by
+    partition rather than following the order of the left table.
+
+    If `buffersize` or `partitions` is `None`, the value of
+    `petl.transform.hashjoins.defaultbuffersize` (`None`, i.e., no limit) or
+    `petl.transform.hashjoins.defaultpartitions` (16) is used instead, see
+    also :func:`hashjoin`.
+
+    """
+
+    return HashComplementView(a, b, buffersize=buffersize,
+                              partitions=partitions, tempdir=tempdir)
+
+
+class PartitionedSetOpMixin(object):
+
+    def _initpartitions(self, buffersize, partitions, tempdir):
+        if buffersize is None:
+            self.buffersize = petl.transform.hashjoins.defaultbuffersize
+        else:
+            self.buffersize = buffersize
+        if partitions is None:
+            self.partitions = petl.transform.hashjoins.defaultpartitions
+        else:
+            self.partitions = partitions
+        self.tempdir = tempdir
+
+    def _iterhash(self, setop):
+        if fitsinmemory(self.b, self.buffersize):
+            return setop(self.a, self.b)
+        return iterpartitionedsetop(self.a, self.b, setop, self.buffersize,
+                                    self.partitions, self.tempdir)
+
+
+def iterpartitionedsetop(a, b, setop, buffersize, partitions, tempdir):
     """
+    Execute a set operation in the style of a grace hash join, by
+    hash-partitioning both tables on whole rows into temporary files, then
+    calling ``setop(apartition, bpartition)`` on each pair of partitions in
+    turn, which should return an iterator over the resulting rows (header
+    first). Pairs of partitions where the partition of `b` has more than
+    `buffersize` rows are themselves partitioned, see
+    :func:`petl.transform.hashjoins.iterpartitionpairs`.
 
-    return HashComplementView(a, b)
+    """
 
+    ita = iter(a)
+    itb = iter(b)
+    aflds = ita.next()
+    bflds = itb.next()
+    yield tuple(aflds)
 
-class HashComplementView(RowContainer):
+    def split(apart, bpart):
+        return not fitsinmemory(bpart, buffersize)
 
-    def __init__(self, a, b):
+    pairs = iterpartitionpairs(aflds, ita, bflds, itb, tuple, tuple,
+                               partitions, tempdir, split)
+    for apart, bpart in pairs:
+        it = setop(apart, bpart)
+        it.next()  # header
+        for row in it:
+            yield row
+
+
+class HashComplementView(RowContainer, PartitionedSetOpMixin):
+
+    def __init__(self, a, b, buffersize=None, partitions=None, tempdir=None):
         self.a = a
         self.b = b
+        self._initpartitions(buffersize, partitions, tempdir)
 
     def __iter__(self):
-        return iterhashcomplement(self.a, self.b)
+        return self._iterhash(iterhashcomplement)
 
 
 def iterhashcomplement(a, b):
@@ -477,7 +553,7 @@ def iterhashcomplement(a, b):
             yield t
 
 
-def hashintersection(a, b):
+def hashintersection(a, b, buffersize=None, partitions=None, tempdir=None):
     """
     Alternative implementation of :func:`intersection`, where the intersection is executed
     by constructing an in-memory set for all rows found in the right hand table, then
@@ -488,19 +564,26 @@ def hashintersection(a, b):
 
     .. versionadded:: 0.5
 
+    .. versionchanged:: 0.26
+
+    Added the `buffersize`, `partitions` and `tempdir` arguments for tables
+    too large to hold in memory, see :func:`hashcomplement`.
+
     """
 
-    return HashIntersectionView(a, b)
+    return HashIntersectionView(a, b, buffersize=buffersize,
+                                partitions=partitions, tempdir=tempdir)
 
 
-class HashIntersectionView(RowContainer):
+class HashIntersectionView(RowContainer, PartitionedSetOpMixin):
 
-    def __init__(self, a, b):
+    def __init__(self, a, b, buffersize=None, partitions=None, tempdir=None):
         self.a = a
         self.b = b
+        self._initpartitions(buffersize, partitions, tempdir)
 
     def __iter__(self):
-        return iterhashintersection(self.a, self.b)
+        return self._iterhash(iterhashintersection)
 
 
 def iterhashintersection(a, b):
@@ -519,3 +602,56 @@ def iterhashintersection(a, b):
             bcnt[t] -= 1
 
 
+def hashrecordcomplement(a, b, buffersize=None, partitions=None,
+                         tempdir=None):
+    """
+    Alternative implementation of :func:`recordcomplement` using
+    :func:`hashcomplement`, see also the discussion of the `buffersize`,
+    `partitions` and `tempdir` arguments there.
+
+    .. versionadded:: 0.26
+
+    """
+
+    ha = header(a)
+    hb = header(b)
+    assert set(ha) == set(hb), 'both tables must have the same set of fields'
+    # make sure fields are in the same order
+    bv = cut(b, *ha)
+    return hashcomplement(a, bv, buffersize=buffersize, partitions=partitions,
+                          tempdir=tempdir)
+
+
+def hashdiff(a, b, buffersize=None, partitions=None, tempdir=None):
+    """
+    Alternative implementation of :func:`diff` using :func:`hashcomplement`,
+    i.e., convenient shorthand for ``(hashcomplement(b, a),
+    hashcomplement(a, b))``. See also the discussion of the `buffersize`,
+    `partitions` and `tempdir` arguments under :func:`hashcomplement`.
+
+    .. versionadded:: 0.26
+
+    """
+
+    added = hashcomplement(b, a, buffersize=buffersize, partitions=partitions,
+                           tempdir=tempdir)
+    subtracted = hashcomplement(a, b, buffersize=buffersize,
+                                partitions=partitions, tempdir=tempdir)
+    return added, subtracted
+
+
+def hashrecorddiff(a, b, buffersize=None, partitions=None, tempdir=None):
+    """
+    Alternative implementation of :func:`recorddiff` using
+    :func:`hashrecordcomplement`, i.e., convenient shorthand for
+    ``(hashrecordcomplement(b, a), hashrecordcomplement(a, b))``.
+
+    .. versionadded:: 0.26
+
+    """
+
+    added = hashrecordcomplement(b, a, buffersize=buffersize,
+                                 partitions=partitions, tempdir=tempdir)
+    subtracted = hashrecordcomplement(a, b, buffersize=buffersize,
+                                      partitions=partitions, tempdir=tempdir)
+    return added, subtracted
@@ -1,14 +1,20 @@
 from __future__ import absolute_import, print_function, division
 
 
+import os
+import sys
 import cPickle as pickle
-from tempfile import NamedTemporaryFile
+from tempfile import NamedTemporaryFile, mkstemp
 import operator
 import itertools
+import multiprocessing
+import struct
+import zlib
 
 
-from petl.util import RowContainer, asindices, shortlistmergesorted, \
-    heapqmergesorted, sortable_itemgetter
+from petl.util import RowContainer, RandomAccessRowContainer, asindices, \
+    heapqmergesorted, sortable_itemgetter, \
+    _knownsorted, _ordered, _dispatch
 
 
 import logging
@@ -19,7 +25,7 @@ debug = logger.debug
 
 
 def sort(table, key=None, reverse=False, buffersize=None, tempdir=None,
-         cache=True):
+         cache=True, workers=None, memory=None):
     """
     Sort the table. Field names or indices (from zero) can be used to specify
     the key. E.g.::
@@ -104,7 +110,8 @@ def sort(table, key=None, reverse=False, buffersize=None, tempdir=None,
         >>> petl.transform.sorts.defaultbuffersize = 500000
 
     If `petl.transform.sorts.defaultbuffersize` is set to `None`, this forces all
-    sorting to be done entirely in memory.
+    sorting to be done entirely in memory (but see the `memory` argument
+    below).
 
     .. versionchanged:: 0.16
 
@@ -112,66 +119,371 @@ def sort(table, key=None, reverse=False, buffersize=None, tempdir=None,
     the sorted table will yield rows from the cache and will not repeat the
     sort operation. To turn off caching, set the `cache` argument to `False`.
 
+    .. versionchanged:: 0.26
+
+    The `workers` argument should be an `int` or `None`. If the table is too
+    large to be sorted in memory and `workers` is greater than 1, each chunk
+    of `buffersize` rows is handed off to a pool of `workers` processes, which
+    sort the chunk and write it to a temporary file, while the main process
+    carries on reading the next chunk. The final merge of the chunk files is
+    still performed lazily as rows are requested. If `workers` is `None`, the
+    value of `petl.transform.sorts.defaultworkers` will be used, which is
+    `None` by default, i.e., all chunks are sorted in the main process, e.g.::
+
+        >>> import petl.transform.sorts
+        >>> petl.transform.sorts.defaultworkers = 4
+
+    .. versionchanged:: 0.26
+
+    Chunks are written to temporary files in blocks of rows rather than one
+    row at a time. The number of rows per block is given by
+    `petl.transform.sorts.defaultblocksize` (1000 by default). Blocks can
+    also be compressed with zlib, which trades some CPU time for less disk
+    I/O, by setting `petl.transform.sorts.defaultcompresslevel` to an
+    integer from 1 to 9, e.g.::
+
+        >>> petl.transform.sorts.defaultcompresslevel = 1
+
+    .. versionchanged:: 0.26
+
+    If `table` is a :class:`ColumnarTable` and the key is given as field
+    names or indices, the table is sorted in memory with NumPy and a columnar
+    table is returned. Fields of Python objects are only sorted this way if
+    all values are of the same type.
+
+    .. versionchanged:: 0.26
+
+    Once the sort has been cached in memory, :func:`len`, indexing, slicing
+    and :func:`tail` are served directly from the cache. If `cache` is
+    ``'rowstore'`` and the table is too large to be sorted in memory, the
+    merged output is also written to a temporary row store file (see
+    :func:`fromrowstore`) in `tempdir` during the first complete pass over
+    the sorted table, and subsequent passes are served from the row store
+    rather than by merging the chunk files again.
+
+    .. versionchanged:: 0.26
+
+    If `table` is already known to be sorted by `key` (see
+    :func:`petl.util.sortorder`), e.g., because it is the output of a sort
+    by the same key (or a longer key beginning with the same fields) passed
+    through transformations which preserve the order, `table` is returned
+    unchanged. Transformations which sort their input, such as :func:`join`
+    or :func:`aggregate`, therefore don't sort it again.
+
+    .. versionchanged:: 0.26
+
+    The `memory` argument should be an `int` or `None`, and gives a budget
+    in bytes for the rows held in memory, based on an estimate of the size of
+    the rows read so far. A chunk is ended as soon as it reaches `memory`
+    bytes or `buffersize` rows, whichever comes first. If only one of
+    `buffersize` and `memory` is given, the other does not apply. If neither
+    is given, `petl.transform.sorts.defaultbuffersize` and
+    `petl.transform.sorts.defaultmemory` (256 MiB by default) both apply, so
+    setting both to `None` forces all sorting to be done in memory.
+
+    .. versionchanged:: 0.26
+
+    Chunk files are closed once written, and if there are more than
+    `petl.transform.sorts.defaultmaxfanin` (100 by default) chunk files,
+    they are merged in one or more passes into fewer, larger chunk files
+    before the final merge, so no more than that many files are read at
+    once. E.g., a sort of 10 million rows in chunks of 10,000 rows merges the
+    1,000 chunk files into 100 then merges those as rows are requested.
+
     """
 
+    if _knownsorted(table, key, reverse):
+        debug('table is already sorted by %r, not sorting', key)
+        return table
+    sortedtable = _dispatch(table, 'sort', key, reverse)
+    if sortedtable is not None:
+        return sortedtable
     return SortView(table, key=key, reverse=reverse, buffersize=buffersize,
-                    tempdir=tempdir, cache=cache)
+                    tempdir=tempdir, cache=cache, workers=workers,
+                    memory=memory)
+
+
+defaultblocksize = 1000
+defaultcompresslevel = None
+defaultreadbuffersize = 2**16
+
+
+# each block is a flag saying whether the payload is compressed and the length
+# of the payload, followed by the payload, a pickled list of rows
+_blockheader = struct.Struct('<cI')
+_PLAIN = b'P'
+_ZLIB = b'Z'
+
+
+def writechunk(f, rows, blocksize=None, compresslevel=None):
+    if blocksize is None:
+        blocksize = defaultblocksize
+    if compresslevel is None:
+        compresslevel = defaultcompresslevel
+    it = iter(rows)
+    while True:
+        block = list(itertools.islice(it, 0, blocksize))
+        if not block:
+            break
+        data = pickle.dumps(block, protocol=-1)
+        if compresslevel:
+            data = zlib.compress(data, compresslevel)
+            flag = _ZLIB
+        else:
+            flag = _PLAIN
+        f.write(_blockheader.pack(flag, len(data)))
+        f.write(data)
+
+
+def readchunk(f):
+    headersize = _blockheader.size
+    while True:
+        header = f.read(headersize)
+        if len(header) < headersize:
+            break
+        flag, size = _blockheader.unpack(header)
+        data = f.read(size)
+        if flag == _ZLIB:
+            data = zlib.decompress(data)
+        for row in pickle.loads(data):
+            yield row
 
 
 def iterchunk(f):
     # reopen so iterators from file cache are independent
-    with open(f.name, 'rb') as f:
-        try:
-            while True:
-                yield pickle.load(f)
-        except EOFError:
-            pass
+    with open(f.name, 'rb', defaultreadbuffersize) as f:
+        for row in readchunk(f):
+            yield row
+
+class ChunkFile(object):
+    """
+    A temporary file holding a sorted chunk of rows. Unlike a
+    :class:`tempfile.NamedTemporaryFile`, the file isn't held open, so the
+    number of open file handles doesn't grow with the number of chunks. The
+    file is removed by :meth:`close`, or when the object is garbage
+    collected.
+
+    .. versionadded:: 0.26
+
+    """
+
+    def __init__(self, tempdir=None):
+        fd, self.name = mkstemp(dir=tempdir, suffix='.chunk')
+        os.close(fd)
+
+    def write(self, rows, blocksize=None, compresslevel=None):
+        with open(self.name, 'wb', defaultreadbuffersize) as f:
+            writechunk(f, rows, blocksize, compresslevel)
+
+    def close(self):
+        if self.name is not None:
+            try:
+                os.remove(self.name)
+            except OSError:
+                pass
+            self.name = None
+
+    def __del__(self):
+        self.close()
+
 
 # non-independent version of iteration from file cache which doesn't depend
 # on named temporary files
 #def iterchunk(f):
 #    debug('seek(0): %r', f)
 #    f.seek(0)
-#    try:
-#        while True:
-#            yield pickle.load(f)
-#    except EOFError:
-#        pass
+#    for row in readchunk(f):
+#        yield row
 
 
 def _mergesorted(key=None, reverse=False, *iterables):
+    return heapqmergesorted(key, *iterables, reverse=reverse)
+
+
+# types for which a value's own comparison methods can't be trusted to give
+# the same order as SortableItem, because of the values nested inside them
+_NESTED_TYPES = set([tuple, list])
+
+
+def _keytypes(rows, indices):
+    # find out whether each key field holds values of one single type and no
+    # None, in which case comparing raw values gives the same order as
+    # comparing SortableItem wrappers, and returns the tuple of those types,
+    # otherwise returns None
+    keytypes = []
+    for i in indices:
+        types = set(itertools.imap(type, itertools.imap(operator.itemgetter(i),
+                                                        rows)))
+        if len(types) != 1:
+            return None
+        t = types.pop()
+        if t is type(None) or t in _NESTED_TYPES:
+            return None
+        keytypes.append(t)
+    return tuple(keytypes)
+
+
+def _chunkgetkey(rows, indices):
+    # use a plain itemgetter for the key where it is safe to do so, which
+    # avoids wrapping every key value in a SortableItem and lets sort compare
+    # keys at C speed
+    keytypes = _keytypes(rows, indices)
+    if keytypes is None:
+        getkey = sortable_itemgetter(*indices)
+    else:
+        getkey = operator.itemgetter(*indices)
+    return getkey, keytypes
 
-    # N.B., I've used heapq for normal merge sort and shortlist merge sort for reverse
-    # merge sort because I've assumed that heapq.merge is faster and so is preferable
-    # but it doesn't support reverse sorting so the shortlist merge sort has to
-    # be used for reverse sorting. Some casual profiling suggests there isn't much
-    # between the two in terms of speed, but might be worth profiling more carefully
 
-    if reverse:
-        return shortlistmergesorted(key, True, *iterables)
+def _mergegetkey(chunkkeytypes, indices):
+    # a plain itemgetter can only be used to merge the chunks if every chunk
+    # had the same single type under each key field
+    first = chunkkeytypes[0]
+    if first is not None and all(k == first for k in chunkkeytypes):
+        return operator.itemgetter(*indices)
     else:
-        return heapqmergesorted(key, *iterables)
+        return sortable_itemgetter(*indices)
 
 
 defaultbuffersize = 100000
+defaultworkers = None
+# memory budget in bytes for rows held in memory by a sort
+defaultmemory = 2**28
+# maximum number of chunk files merged at once
+defaultmaxfanin = 100
+defaultreadsize = 1000
+
+
+def _nextrun(it, buffersize, memory):
+    # take the rows of the next run to be sorted in memory, i.e., until there
+    # are buffersize rows or their estimated size reaches memory bytes (either
+    # may be None, i.e., no limit), returns the rows and whether the iterator
+    # is exhausted
+    if memory is None:
+        rows = list(itertools.islice(it, 0, buffersize))
+        return rows, buffersize is None or len(rows) < buffersize
+    rows = list()
+    size = 0
+    while size < memory:
+        n = defaultreadsize
+        if buffersize is not None:
+            n = min(n, buffersize - len(rows))
+            if n <= 0:
+                return rows, False
+        batch = list(itertools.islice(it, 0, n))
+        rows.extend(batch)
+        if len(batch) < n:
+            return rows, True
+        size += _estimatesize(batch)
+    return rows, False
+
+
+def _mergekeytypes(chunkkeytypes):
+    # key types of a chunk made by merging chunks with the given key types
+    first = chunkkeytypes[0]
+    if all(k == first for k in chunkkeytypes):
+        return first
+    return None
+
+
+def mergechunks(chunkfiles, chunkkeytypes, indices, reverse=False,
+                maxfanin=None, tempdir=None):
+    """
+    Merge sorted chunk files (see :class:`ChunkFile`) into fewer, larger
+    chunk files until there are no more than `maxfanin`, so the final merge
+    reads from a bounded number of files at once. Consecutive chunks are
+    merged, so the sort remains stable, and only as many chunks are merged as
+    are needed. Returns the chunk files and their key types.
 
+    .. versionadded:: 0.26
+
+    """
 
-class SortView(RowContainer):
+    if maxfanin is None:
+        maxfanin = defaultmaxfanin
+    maxfanin = max(2, maxfanin)
+    chunks = zip(chunkfiles, chunkkeytypes)
+    npass = 0
+    while len(chunks) > maxfanin:
+        npass += 1
+        debug('merge pass %s over %s chunk files', npass, len(chunks))
+        merged = list()
+        i = 0
+        while i < len(chunks):
+            remaining = len(chunks) - i + len(merged)
+            if remaining <= maxfanin:
+                merged.extend(chunks[i:])
+                break
+            group = chunks[i:i + min(maxfanin, remaining - maxfanin + 1)]
+            i += len(group)
+            keytypes = [k for _, k in group]
+            getkey = _mergegetkey(keytypes, indices)
+            f = ChunkFile(tempdir)
+            f.write(_mergesorted(getkey, reverse,
+                                 *[iterchunk(g) for g, _ in group]))
+            for g, _ in group:
+                g.close()
+            merged.append((f, _mergekeytypes(keytypes)))
+        chunks = merged
+    return [f for f, _ in chunks], [k for _, k in chunks]
+
+
+def _estimatesize(rows, samplesize=10):
+    # estimate the memory taken by a list of rows (tuples), from the size of a
+    # sample of rows and their values, N.B., values shared between rows (e.g.,
+    # small integers) are counted in full, so this errs on the high side
+    n = len(rows)
+    if not n:
+        return 0
+    step = max(1, n // samplesize)
+    sample = rows[::step]
+    getsizeof = sys.getsizeof
+    size = sum(getsizeof(row) + sum(itertools.imap(getsizeof, row))
+               for row in sample)
+    # add the list's pointer to each row
+    return n * (size // len(sample) + 8)
+
+
+def _sortchunk(rows, indices, reverse, filename, blocksize, compresslevel):
+    # N.B., executed in a worker process, so the key function is rebuilt here
+    # from the field indices rather than passed in (closures can't be pickled)
+    getkey, keytypes = _chunkgetkey(rows, indices)
+    rows.sort(key=getkey, reverse=reverse)
+    with open(filename, 'wb') as f:
+        writechunk(f, rows, blocksize, compresslevel)
+    return keytypes
+
+
+class SortView(RandomAccessRowContainer):
+
+    # caches, ignored by petl.io.cachestore.fingerprint
+    _transientattrs = ('_fldcache', '_memcache', '_filecache', '_rowstore',
+                       '_rowstorefile', '_getkey')
 
     def __init__(self, source, key=None, reverse=False, buffersize=None,
-                 tempdir=None, cache=True):
+                 tempdir=None, cache=True, workers=None, memory=None):
         self.source = source
         self.key = key
         self.reverse = reverse
-        if buffersize is None:
+        if buffersize is None and memory is None:
             self.buffersize = defaultbuffersize
+            self.memory = defaultmemory
         else:
+            # N.B., if only one of buffersize and memory is given, the other
+            # is not limited
             self.buffersize = buffersize
+            self.memory = memory
+        if workers is None:
+            self.workers = defaultworkers
+        else:
+            self.workers = workers
         self.tempdir = tempdir
         self.cache = cache
         self._fldcache = None
         self._memcache = None
         self._filecache = None
+        self._rowstore = None
+        self._rowstorefile = None
         self._getkey = None
 
     def clearcache(self):
@@ -181,19 +493,76 @@ class SortView(RowContainer):
         self._fldcache = None
         self._memcache = None
         self._filecache = None
+        self._rowstore = None
+        self._rowstorefile = None
         self._getkey = None
 
+    def _hasrandomaccess(self):
+        return bool(self.cache) and (self._memcache is not None
+                                     or self._rowstore is not None)
+
+    def _sortorder(self):
+        return _ordered(self.key, self.reverse)
+
+    def _header(self):
+        return self._fldcache
+
+    def _datalen(self):
+        if self._memcache is not None:
+            return len(self._memcache)
+        return self._rowstore._datalen()
+
+    def _iterdata(self, start, stop, step):
+        if self._memcache is not None:
+            rows = self._memcache
+            return (tuple(rows[i]) for i in xrange(start, stop, step))
+        return self._rowstore._iterdata(start, stop, step)
+
     def __iter__(self):
         source = self.source
         key = self.key
         reverse = self.reverse
         if self.cache and self._memcache is not None:
             return self._iterfrommemcache()
+        elif self.cache and self._rowstore is not None:
+            return self._iterfromrowstore()
         elif self.cache and self._filecache is not None:
             return self._iterfromfilecache()
         else:
             return self._iternocache(source, key, reverse)
 
+    def _iterfromrowstore(self):
+        debug('iterate from row store cache: %r', self._rowstore.filename)
+        yield tuple(self._fldcache)
+        for row in self._rowstore._iterdata(0, self._rowstore._datalen(), 1):
+            yield row
+
+    def _itermerged(self, flds, chunkfiles, getkey):
+        # merge the chunk files, and also write the merged rows to a row store
+        # if requested and this is the first complete pass over them
+        chunkiters = [iterchunk(f) for f in chunkfiles]
+        merged = _mergesorted(getkey, self.reverse, *chunkiters)
+        if self.cache != 'rowstore':
+            for row in merged:
+                yield tuple(row)
+            return
+        from petl.io.rowstore import RowStoreWriter, RowStoreView
+        f = NamedTemporaryFile(dir=self.tempdir)
+        writer = RowStoreWriter(f)
+        writer.write(flds)
+        for row in merged:
+            row = tuple(row)
+            writer.write(row)
+            yield row
+        writer.finish()
+        debug('row store cache is complete: %r', f.name)
+        if self._filecache is chunkfiles:
+            # N.B., keep a reference to the temporary file, which is deleted
+            # when garbage collected, and let the chunk files go
+            self._rowstorefile = f
+            self._rowstore = RowStoreView(f.name)
+            self._filecache = None
+
     def _iterfrommemcache(self):
         debug('iterate from mem cache')
         yield tuple(self._fldcache)
@@ -203,9 +572,9 @@ class SortView(RowContainer):
     def _iterfromfilecache(self):
         debug('iterate from file cache: %r', [f for f in self._filecache])
         yield tuple(self._fldcache)
-        chunkiters = [iterchunk(f) for f in self._filecache]
-        for row in _mergesorted(self._getkey, self.reverse, *chunkiters):
-            yield tuple(row)
+        for row in self._itermerged(self._fldcache, self._filecache,
+                                    self._getkey):
+            yield row
 
     def _iternocache(self, source, key, reverse):
         debug('iterate without cache')
@@ -220,16 +589,17 @@ class SortView(RowContainer):
             indices = asindices(flds, key)
         else:
             indices = range(len(flds))
-        # now use field indices to construct a _getkey function
-        # N.B., this will probably raise an exception on short rows
-        getkey = sortable_itemgetter(*indices)
 
         # initialise the first chunk
-        rows = list(itertools.islice(it, 0, self.buffersize))
-        rows.sort(key=getkey, reverse=reverse)
+        rows, exhausted = _nextrun(it, self.buffersize, self.memory)
 
         # have we exhausted the source iterator?
-        if self.buffersize is None or len(rows) < self.buffersize:
+        if exhausted:
+
+            # now use field indices to construct a _getkey function
+            # N.B., this will probably raise an exception on short rows
+            getkey, _ = _chunkgetkey(rows, indices)
+            rows.sort(key=getkey, reverse=reverse)
 
             if self.cache:
                 debug('caching mem')
@@ -242,37 +612,88 @@ class SortView(RowContainer):
 
         else:
 
-            chunkfiles = []
+            if self.workers is not None and self.workers > 1:
+                chunkfiles, chunkkeytypes = \
+                    self._writechunksparallel(it, rows, indices, reverse)
+            else:
+                chunkfiles, chunkkeytypes = \
+                    self._writechunks(it, rows, indices, reverse)
+            chunkfiles, chunkkeytypes = mergechunks(
+                chunkfiles, chunkkeytypes, indices, reverse,
+                tempdir=self.tempdir
+            )
+            getkey = _mergegetkey(chunkkeytypes, indices)
+
+            if self.cache:
+                debug('caching files %r', chunkfiles)
+                self._fldcache = flds
+                self._filecache = chunkfiles
+                self._getkey = getkey
+
+            for row in self._itermerged(flds, chunkfiles, getkey):
+                yield row
+
+    def _writechunks(self, it, rows, indices, reverse):
+        chunkfiles = []
+        chunkkeytypes = []
+
+        while rows:
+
+            # sort and dump the chunk
+            getkey, keytypes = _chunkgetkey(rows, indices)
+            chunkkeytypes.append(keytypes)
+            rows.sort(key=getkey, reverse=reverse)
+            f = ChunkFile(self.tempdir)
+            f.write(rows)
+            # N.B., the file is removed when there are no more references to
+            # it, and we might want to keep it around if it can be cached
+            chunkfiles.append(f)
+
+            # grab the next chunk
+            rows, _ = _nextrun(it, self.buffersize, self.memory)
+
+        return chunkfiles, chunkkeytypes
+
+    def _writechunksparallel(self, it, rows, indices, reverse):
+        debug('sorting chunks with %s worker processes', self.workers)
+        chunkfiles = []
+        chunkkeytypes = []
+        pending = []
+        pool = multiprocessing.Pool(self.workers)
+        try:
 
             while rows:
 
-                # dump the chunk
-                f = NamedTemporaryFile(dir=self.tempdir)
-                for row in rows:
-                    pickle.dump(row, f, protocol=-1)
-                f.flush()
-                # N.B., do not close the file! Closing will delete
-                # the file, and we might want to keep it around
-                # if it can be cached. We'll let garbage collection
-                # deal with this, i.e., when no references to the
-                # chunk files exist any more, garbage collection
-                # should be an implicit close, which will cause file
-                # deletion.
+                # the temporary file is created (and owned) by this process, so
+                # it gets cleaned up in exactly the same way as for a serial
+                # sort, the worker process only opens it by name to write the
+                # sorted chunk
+                f = ChunkFile(self.tempdir)
                 chunkfiles.append(f)
+                pending.append(pool.apply_async(_sortchunk,
+                                                (rows, indices, reverse,
+                                                 f.name, defaultblocksize,
+                                                 defaultcompresslevel)))
+
+                # don't let chunks pile up in memory faster than the workers
+                # can deal with them
+                if len(pending) >= self.workers:
+                    chunkkeytypes.append(pending.pop(0).get())
 
                 # grab the next chunk
-                rows = list(itertools.islice(it, 0, self.buffersize))
-                rows.sort(key=getkey, reverse=reverse)
+                rows, _ = _nextrun(it, self.buffersize, self.memory)
 
-            if self.cache:
-                debug('caching files %r', chunkfiles)
-                self._fldcache = flds
-                self._filecache = chunkfiles
-                self._getkey = getkey
+            # wait for all chunks to be written, N.B., get() re-raises any
+            # exception from a worker process
+            for result in pending:
+                chunkkeytypes.append(result.get())
+            pool.close()
 
-            chunkiters = [iterchunk(f) for f in chunkfiles]
-            for row in _mergesorted(getkey, reverse, *chunkiters):
-                yield tuple(row)
+        finally:
+            pool.terminate()
+            pool.join()
+
+        return chunkfiles, chunkkeytypes
 
 
 def mergesort(*tables, **kwargs):
@@ -347,6 +768,7 @@ def mergesort(*tables, **kwargs):
         - `missing` - value to fill with when input tables have different fields (defaults to `None`)
         - `header` - specify a fixed header for the output table
         - `buffersize` - limit the number of rows in memory per input table when inputs are not presorted
+        - `workers` - number of worker processes to sort chunks with per input table when inputs are not presorted
 
     .. versionadded:: 0.9
 
@@ -358,12 +780,14 @@ def mergesort(*tables, **kwargs):
 class MergeSortView(RowContainer):
 
     def __init__(self, tables, key=None, reverse=False, presorted=False,
-                 missing=None, header=None, buffersize=None, tempdir=None, cache=True):
+                 missing=None, header=None, buffersize=None, tempdir=None, cache=True,
+                 workers=None):
         self.key = key
         if presorted:
             self.tables = tables
         else:
-            self.tables = [sort(t, key=key, reverse=reverse, buffersize=buffersize, tempdir=tempdir, cache=cache) for t in tables]
+            self.tables = [sort(t, key=key, reverse=reverse, buffersize=buffersize, tempdir=tempdir, cache=cache,
+                                workers=workers) for t in tables]
         self.missing = missing
         self.header = header
         self.reverse = reverse
@@ -371,6 +795,14 @@ class MergeSortView(RowContainer):
     def __iter__(self):
         return itermergesort(self.tables, self.key, self.header, self.missing, self.reverse)
 
+    def _sortorder(self):
+        # N.B., the output is only sorted if every input is known to be, which
+        # is not the case if presorted
+        if not all(_knownsorted(t, self.key, self.reverse)
+                   for t in self.tables):
+            return None
+        return _ordered(self.key, self.reverse)
+
 
 def itermergesort(sources, key, header, missing, reverse):
 
@@ -422,7 +854,7 @@ def itermergesort(sources, key, header, missing, reverse):
         getkey = operator.itemgetter(*indices)
 
     # OK, do the merge sort
-    for row in shortlistmergesorted(getkey, reverse, *sits):
+    for row in heapqmergesorted(getkey, *sits, reverse=reverse):
         yield row
 
 
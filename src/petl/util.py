@@ -8,7 +8,7 @@ from __future__ import absolute_import, print_function, division
 
 
 from itertools import islice, groupby, chain, count
-from collections import defaultdict, namedtuple
+from collections import defaultdict, namedtuple, deque
 from operator import itemgetter
 import re
 from string import maketrans
@@ -21,6 +21,7 @@ import heapq
 import sys
 import operator
 from math import ceil
+import multiprocessing
 import logging
 logger = logging.getLogger(__name__)
 warning = logger.warning
@@ -51,6 +52,193 @@ class RowContainer(IterContainer):
             return super(RowContainer, self).__getitem__(item)
 
 
+class RandomAccessRowContainer(RowContainer):
+    """
+    Base class for row containers which can count and fetch data rows without
+    iterating over the table from the beginning, so that :func:`len`,
+    indexing, slicing, :func:`nrows`, :func:`data`, :func:`look`,
+    :func:`rowslice` and :func:`tail` don't need to read the whole table.
+    Subclasses implement :meth:`_header`, :meth:`_datalen` and
+    :meth:`_iterdata`, and may override :meth:`_hasrandomaccess` if random
+    access is only available some of the time, e.g., once a cache is full.
+
+    .. versionadded:: 0.26
+
+    """
+
+    def _hasrandomaccess(self):
+        return True
+
+    def _header(self):
+        raise NotImplementedError
+
+    def _datalen(self):
+        raise NotImplementedError
+
+    def _iterdata(self, start, stop, step):
+        # data rows from start to stop by step, as for xrange, where the first
+        # data row has index 0
+        raise NotImplementedError
+
+    def __len__(self):
+        if self._hasrandomaccess():
+            return self._datalen() + 1  # include header
+        return super(RandomAccessRowContainer, self).__len__()
+
+    def __getitem__(self, item):
+        if isinstance(item, basestring) or not self._hasrandomaccess():
+            return super(RandomAccessRowContainer, self).__getitem__(item)
+        n = self._datalen() + 1
+        if isinstance(item, (int, long)):
+            if item < 0:
+                item += n
+            if not 0 <= item < n:
+                raise IndexError('index out of range')
+            if item == 0:
+                return tuple(self._header())
+            return iter(self._iterdata(item - 1, item, 1)).next()
+        elif isinstance(item, slice):
+            start, stop, step = item.indices(n)
+            if step > 0:
+                return self._iterrows(start, stop, step)
+            # fetch rows one at a time in reverse order
+            return (self[i] for i in xrange(start, stop, step))
+        return super(RandomAccessRowContainer, self).__getitem__(item)
+
+    def _iterrows(self, start, stop, step):
+        # as for _iterdata but where the header row has index 0
+        if start == 0 and stop > 0:
+            yield tuple(self._header())
+            start += step
+        for row in self._iterdata(max(start - 1, 0), max(stop - 1, 0), step):
+            yield row
+
+
+def _israndomaccess(table):
+    return (isinstance(table, RandomAccessRowContainer)
+            and table._hasrandomaccess())
+
+
+def sortorder(table):
+    """
+    Return the order in which the data rows of `table` are known to be
+    sorted, without iterating over the table, as a tuple of the sort key and
+    whether the rows are sorted in reverse, or `None` if the order is not
+    known. The key is a tuple of field names and/or indices, or `None` if the
+    rows are sorted by whole rows. E.g.::
+
+        >>> from petl import sort, cut, sortorder
+        >>> table2 = sort(table1, ('foo', 'bar'))
+        >>> sortorder(table2)
+        (('foo', 'bar'), False)
+        >>> sortorder(cut(table2, 'foo', 'baz'))
+        (('foo',), False)
+        >>> print sortorder(table1)
+        None
+
+    The order is established by :func:`sort` and by transformations which
+    output rows sorted by a key (e.g., :func:`join` or :func:`aggregate`),
+    and is preserved by transformations which don't change the order of the
+    rows or the values of the key fields (e.g., :func:`select`,
+    :func:`cut`, :func:`rename` or :func:`convert` on other fields).
+    :func:`sort` and therefore all transformations which sort their input
+    first return a table unchanged if it is already known to be sorted by
+    the requested key.
+
+    .. versionadded:: 0.26
+
+    """
+
+    f = getattr(table, '_sortorder', None)
+    if f is None:
+        return None
+    return f()
+
+
+def _dispatch(table, name, *args):
+    # the result of the table's own implementation of the named
+    # transformation, via its method _transform_<name> (e.g., vectorised for
+    # a columnar table), or None if it has no such method or the
+    # transformation can't be done that way, in which case the caller should
+    # fall back to its usual implementation
+    f = getattr(table, '_transform_' + name, None)
+    if f is None:
+        return None
+    return f(*args)
+
+
+def _sortkey(key):
+    # normalise a sort key to a tuple of field names and/or indices, None for
+    # whole rows, or False if the key can't be compared with another
+    if key is None:
+        return None
+    if isinstance(key, (basestring, int)):
+        return (key,)
+    if isinstance(key, (list, tuple)) and key \
+            and all(isinstance(k, (basestring, int)) for k in key):
+        return tuple(key)
+    return False
+
+
+def _ordered(key, reverse=False):
+    # the sort order of rows sorted by key, or None if it can't be described
+    key = _sortkey(key)
+    if key is False:
+        return None
+    return key, bool(reverse)
+
+
+def _knownsorted(table, key=None, reverse=False):
+    # whether table is known to be sorted by key, i.e., whether sorting the
+    # table by key would leave the rows in the same order
+    order = sortorder(table)
+    key = _sortkey(key)
+    if order is None or key is False or order[1] != bool(reverse):
+        return False
+    if key is None or order[0] is None:
+        return key == order[0]
+    # N.B., rows sorted by a key are also sorted by any prefix of the key
+    return order[0][:len(key)] == key
+
+
+def _mapsortorder(order, mapkey):
+    # the sort order after a transformation of the fields, where mapkey maps
+    # each field of the sort key to the corresponding field of the output, or
+    # None if the order is not preserved from that field on
+    if order is None or order[0] is None:
+        return None
+    key = list()
+    for k in order[0]:
+        k = mapkey(k)
+        if k is None:
+            break
+        key.append(k)
+    if not key:
+        return None
+    return tuple(key), order[1]
+
+
+def iterslice(table, *sliceargs):
+    """
+    Return the header row for the given table and an iterator over a slice
+    of the data rows, as for :func:`itertools.islice`, without iterating over
+    the preceding rows if the table supports random access.
+
+    .. versionadded:: 0.26
+
+    """
+
+    if _israndomaccess(table):
+        start, stop, step = slice(*(sliceargs or (None,))).indices(
+            table._datalen())
+        return tuple(table._header()), table._iterdata(start, stop, step)
+    it = iter(table)
+    flds = it.next()
+    if sliceargs:
+        it = islice(it, *sliceargs)
+    return flds, it
+
+
 def header(table):
     """
     Return the header row for the given table. E.g.::
@@ -129,6 +317,8 @@ def iterdata(table, *sliceargs):
     
     """
 
+    if _israndomaccess(table):
+        return iterslice(table, *sliceargs)[1]
     it = islice(table, 1, None) # skip header row
     if sliceargs:
         it = islice(it, *sliceargs)
@@ -168,7 +358,7 @@ def dataslice(table, *args):
     
     """
     
-    return islice(data(table), *args)
+    return iterdata(table, *args)
 
     
 def iterdicts(table, *sliceargs, **kwargs):
@@ -348,6 +538,8 @@ def nrows(table):
     
     """
     
+    if _israndomaccess(table):
+        return table._datalen()
     return sum(1 for _ in iterdata(table))
     
     
@@ -525,14 +717,13 @@ look.default_style = 'grid'
     
     
 def format_table_grid(table, vrepr, sliceargs):
-    it = iter(table)
-    
+    flds, it = iterslice(table, *sliceargs)
+
     # fields representation
-    flds = it.next()
     fldsrepr = [vrepr(f) for f in flds]
     
     # rows representations
-    rows = list(islice(it, *sliceargs))
+    rows = list(it)
     rowsrepr = [[vrepr(v) for v in row] for row in rows]
     
     # find maximum row length - may be uneven
@@ -606,14 +797,13 @@ def format_table_grid(table, vrepr, sliceargs):
 
 
 def format_table_simple(table, vrepr, sliceargs):
-    it = iter(table)
-    
+    flds, it = iterslice(table, *sliceargs)
+
     # fields representation
-    flds = it.next()
     fldsrepr = [vrepr(f) for f in flds]
     
     # rows representations
-    rows = list(islice(it, *sliceargs))
+    rows = list(it)
     rowsrepr = [[vrepr(v) for v in row] for row in rows]
     
     # find maximum row length - may be uneven
@@ -672,14 +862,13 @@ def format_table_simple(table, vrepr, sliceargs):
         
         
 def format_table_minimal(table, vrepr, sliceargs):
-    it = iter(table)
-    
+    flds, it = iterslice(table, *sliceargs)
+
     # fields representation
-    flds = it.next()
     fldsrepr = [vrepr(f) for f in flds]
     
     # rows representations
-    rows = list(islice(it, *sliceargs))
+    rows = list(it)
     rowsrepr = [[vrepr(v) for v in row] for row in rows]
     
     # find maximum row length - may be uneven
@@ -789,10 +978,9 @@ class See(object):
             self.sliceargs = sliceargs
         
     def __repr__(self):    
-        it = iter(self.table)
-        flds = it.next()
+        flds, it = iterslice(self.table, *self.sliceargs)
         cols = defaultdict(list)
-        for row in islice(it, *self.sliceargs):
+        for row in it:
             for i, f in enumerate(flds):
                 try:
                     cols[str(i)].append(repr(row[i]))
@@ -2227,8 +2415,17 @@ def stats(table, field):
         
     The `field` argument can be a field name or index (starting from zero).    
 
+    .. versionchanged:: 0.26
+
+    If `table` is a :class:`ColumnarTable` and the field is numeric, the
+    statistics are computed by NumPy.
+
     """
     
+    output = _dispatch(table, 'stats', field)
+    if output is not None:
+        return output
+
     output = {'min': None, 
               'max': None,
               'sum': None, 
@@ -2683,28 +2880,118 @@ def diffvalues(t1, t2, f):
     return t2v - t1v, t1v - t2v
 
 
-Keyed = namedtuple('Keyed', ['key', 'obj'])
-    
-    
-def heapqmergesorted(key=None, *iterables):            
+def heapqmergesorted(key=None, *iterables, **kwargs):
     """
     Return a single iterator over the given iterables, sorted by the given `key`
     function, assuming the input iterables are already sorted by the same function. 
-    (I.e., the merge part of a general merge sort.) Uses :func:`heapq.merge` for
-    the underlying implementation. See also :func:`shortlistmergesorted`.
+    (I.e., the merge part of a general merge sort.) Uses a heap, like
+    :func:`heapq.merge`, for the underlying implementation. See also
+    :func:`shortlistmergesorted`.
     
     .. versionadded:: 0.9
+
+    .. versionchanged:: 0.26
+
+    Supports a `reverse` keyword argument, for merging iterables which are
+    sorted in descending order. Unlike :func:`shortlistmergesorted`, which
+    scans the head of every iterable for each item output, the cost of each
+    item is logarithmic in the number of iterables. As with the built-in
+    :func:`sorted`, items with equal keys are output in the order of the
+    iterables, i.e., the merge is stable.
         
     """
-    
+
+    reverse = kwargs.pop('reverse', False)
+    assert not kwargs, 'unexpected keyword arguments: %r' % kwargs.keys()
+    if reverse and len(iterables) <= shortlistmaxiterables:
+        # N.B., scanning a short list is quicker than maintaining the heap
+        # of reversed keys, which are compared by a method written in Python
+        return shortlistmergesorted(key, True, *iterables)
+    return _heapmerge(key, reverse, iterables)
+
+
+# the greatest number of iterables for which heapqmergesorted uses
+# shortlistmergesorted for a reverse merge
+shortlistmaxiterables = 16
+
+
+def _heapmerge(key, reverse, iterables):
     if key is None:
-        keyed_iterables = iterables
-        for element in heapq.merge(*keyed_iterables):
-            yield element
+        key = _identity
+
+    # N.B., each heap entry holds the key, the index of the iterable, the item
+    # and the iterator, and entries are ordered by key then index, so that
+    # items with equal keys are never compared and come out in the order of
+    # the iterables; entries for forward merges are lists, so are compared
+    # without calling any Python code
+    heap = list()
+    for i, iterable in enumerate(iterables):
+        it = iter(iterable)
+        for obj in it:
+            if reverse:
+                heap.append(_ReverseMergeEntry(key(obj), i, obj, it))
+            else:
+                heap.append([key(obj), i, obj, it])
+            break
+    heapq.heapify(heap)
+
+    heapreplace = heapq.heapreplace
+    heappop = heapq.heappop
+    if reverse:
+        while len(heap) > 1:
+            e = heap[0]
+            yield e.obj
+            try:
+                obj = e.it.next()
+            except StopIteration:
+                heappop(heap)
+            else:
+                e.key = key(obj)
+                e.obj = obj
+                heapreplace(heap, e)
+        if heap:
+            # only one iterable left, no need for the heap
+            e = heap[0]
+            yield e.obj
+            for obj in e.it:
+                yield obj
     else:
-        keyed_iterables = [(Keyed(key(obj), obj) for obj in iterable) for iterable in iterables]
-        for element in heapq.merge(*keyed_iterables):
-            yield element.obj
+        while len(heap) > 1:
+            e = heap[0]
+            yield e[2]
+            try:
+                obj = e[3].next()
+            except StopIteration:
+                heappop(heap)
+            else:
+                e[0] = key(obj)
+                e[2] = obj
+                heapreplace(heap, e)
+        if heap:
+            e = heap[0]
+            yield e[2]
+            for obj in e[3]:
+                yield obj
+
+
+def _identity(obj):
+    return obj
+
+
+class _ReverseMergeEntry(object):
+
+    __slots__ = ('key', 'index', 'obj', 'it')
+
+    def __init__(self, key, index, obj, it):
+        self.key = key
+        self.index = index
+        self.obj = obj
+        self.it = it
+
+    def __lt__(self, other):
+        if self.key == other.key:
+            return self.index < other.index
+        return other.key < self.key
 
 
 def shortlistmergesorted(key=None, reverse=False, *iterables):
@@ -2716,6 +3003,11 @@ def shortlistmergesorted(key=None, reverse=False, *iterables):
     :func:`heapqmergesorted`.
     
     .. versionadded:: 0.9
+
+    .. versionchanged:: 0.26
+
+    N.B., :func:`heapqmergesorted` now supports reverse order too, and is
+    faster where there are more than a few iterables.
         
     """
     
@@ -2760,6 +3052,9 @@ class Record(tuple):
     def __init__(self, row, flds, missing=None):
         self.flds = flds
         self.missing = missing
+
+    def __reduce__(self):
+        return Record, (tuple(self), self.flds, self.missing)
         
     def __getitem__(self, f):
         if isinstance(f, int):
@@ -3100,6 +3395,42 @@ def rowgroupbybin(table, key, width, value=None, minv=None, maxv=None):
     it = iter(table)
     fields = it.next()
     
+    # determine value function
+    if value is None:
+        getval = lambda v: v # identity function - i.e., whole row
+    else:
+        if callable(value):
+            getval = value
+        else:
+            vindices = asindices(fields, value)
+            getval = itemgetter(*vindices)
+
+    def update(binnedvals, row):
+        binnedvals.append(getval(row))
+        return binnedvals
+
+    for k, binnedvals in rowfoldbybin(chain([fields], it), key, width, list,
+                                      update, minv=minv, maxv=maxv):
+        yield k, binnedvals
+
+
+def rowfoldbybin(table, key, width, init, update, minv=None, maxv=None):
+    """
+    Fold rows into bins of a given width. The state of each bin is created by
+    calling `init` with no arguments, then each row falling within the bin is
+    passed in turn to ``update(state, row)``, which should return the new
+    state. Yields ``((binminv, binmaxv), state)`` pairs, so only the state of
+    one bin is held in memory at a time.
+
+    N.B., assumes the input table is already sorted by the given key.
+
+    .. versionadded:: 0.26
+
+    """
+
+    it = iter(table)
+    fields = it.next()
+    
     # wrap rows 
     it = hybridrows(fields, it)
 
@@ -3110,16 +3441,6 @@ def rowgroupbybin(table, key, width, value=None, minv=None, maxv=None):
         kindices = asindices(fields, key)
         getkey = itemgetter(*kindices)
     
-    # determine value function
-    if value is None:
-        getval = lambda v: v # identity function - i.e., whole row
-    else:
-        if callable(value):
-            getval = value
-        else:
-            vindices = asindices(fields, value)
-            getval = itemgetter(*vindices)
-            
     # use a different algorithm if minv and maxv are specified - fixed bins
     if minv is not None and maxv is not None:
         numbins = int(ceil((maxv - minv) / width))
@@ -3129,22 +3450,22 @@ def rowgroupbybin(table, key, width, value=None, minv=None, maxv=None):
             binmaxv = binminv + width
             if binmaxv >= maxv: # final bin
                 binmaxv = maxv # truncate final bin to specified maximum
-            binnedvals = []
+            state = init()
             try:
                 while keyv < binminv: # advance until we're within the bin's range
                     row = it.next()
                     keyv = getkey(row)
                 while binminv <= keyv < binmaxv: # within the bin
-                    binnedvals.append(getval(row))
+                    state = update(state, row)
                     row = it.next()
                     keyv = getkey(row)
                 while keyv == binmaxv == maxv: # possible floating point precision bug here?
-                    binnedvals.append(getval(row)) # last bin is open if maxv is specified
+                    state = update(state, row) # last bin is open if maxv is specified
                     row = it.next()
                     keyv = getkey(row)
             except StopIteration:
                 pass
-            yield (binminv, binmaxv), binnedvals
+            yield (binminv, binmaxv), state
 
     else:
         
@@ -3167,24 +3488,24 @@ def rowgroupbybin(table, key, width, value=None, minv=None, maxv=None):
                     binmaxv = binminv + width
                     if maxv is not None and binmaxv >= maxv: # final bin
                         binmaxv = maxv # truncate final bin to specified maximum
-                    binnedvals = []
+                    state = init()
                     while keyv < binminv: # advance until we're within the bin's range
                         row = it.next()
                         keyv = getkey(row)
                     while binminv <= keyv < binmaxv: # within the bin
-                        binnedvals.append(getval(row))
+                        state = update(state, row)
                         row = it.next()
                         keyv = getkey(row)
                     while maxv is not None and keyv == binmaxv == maxv: # possible floating point precision bug here?
-                        binnedvals.append(getval(row)) # last bin is open if maxv is specified
+                        state = update(state, row) # last bin is open if maxv is specified
                         row = it.next()
                         keyv = getkey(row)
-                    yield (binminv, binmaxv), binnedvals
+                    yield (binminv, binmaxv), state
                     if maxv is not None and binmaxv == maxv: # possible floating point precision bug here?
                         break
             except StopIteration:
                 # don't forget to handle the last bin
-                yield (binminv, binmaxv), binnedvals
+                yield (binminv, binmaxv), state
         
 
         
@@ -3303,19 +3624,55 @@ def tupleoflists(tbl):
 tol = tupleoflists
 
 
-def cache(table, n=10000):
+def cache(table, n=10000, rowstore=False, tempdir=None, store=None,
+          storesize=None, key=None):
     """
     Wrap the table with a cache that caches up to `n` rows as they are initially
     requested via iteration.
+
+    If `rowstore` is True, the whole table is instead cached in a temporary
+    row store file (see :func:`fromrowstore`) in `tempdir`, written during the
+    first complete iteration over the table. Once the cache is complete,
+    :func:`len`, indexing, slicing and :func:`tail` are served from the cache
+    without iterating over the table.
+
+    If `store` is given, the whole table is instead cached persistently in
+    the directory `store`, so the cache outlives the process, e.g.::
+
+        >>> from petl import cache, sort, fromcsv
+        >>> table = cache(sort(fromcsv('big.csv'), 'foo'), store='/var/cache/petl')
+
+    Entries in the store are row store files named after a fingerprint of the
+    table (see :func:`fingerprint`), which takes into account the chain of
+    transformations and the path, modification time and size of any files
+    read, or if `key` is given, named after `key` instead. N.B., tables read
+    from a database are identified by the query (and, for :mod:`sqlite3`
+    database files, the database file) but not the contents of the database,
+    and tables which can't be identified raise :class:`FingerprintError` when
+    iterated over unless `key` is given. Least recently used entries are
+    removed once the store holds more than `storesize` bytes (by default
+    `petl.io.cachestore.defaultstoresize`, 1GB).
     
     .. versionadded:: 0.16
+
+    .. versionchanged:: 0.26
+
+    The `rowstore`, `tempdir`, `store`, `storesize` and `key` arguments.
     
     """
     
+    if store is not None:
+        from petl.io.cachestore import CacheStoreContainer
+        return CacheStoreContainer(table, store, storesize=storesize, key=key)
+    if rowstore:
+        from petl.io.rowstore import RowStoreCacheContainer
+        return RowStoreCacheContainer(table, tempdir=tempdir)
     return CacheContainer(table, n=n)
 
 
-class CacheContainer(RowContainer):
+class CacheContainer(RandomAccessRowContainer):
+
+    _transientattrs = ('_cache', '_cachecomplete')
     
     def __init__(self, inner, n=10000):
         self._inner = inner
@@ -3326,6 +3683,23 @@ class CacheContainer(RowContainer):
     def clearcache(self):
         self._cache = list()
         self._cachecomplete = False
+
+    def _hasrandomaccess(self):
+        # N.B., the first item in the cache is the header row
+        return self._cachecomplete and len(self._cache) > 0
+
+    def _header(self):
+        return self._cache[0]
+
+    def _datalen(self):
+        return len(self._cache) - 1
+
+    def _iterdata(self, start, stop, step):
+        cache = self._cache
+        return (cache[i] for i in xrange(start + 1, stop + 1, step))
+
+    def _sortorder(self):
+        return sortorder(self._inner)
         
     def __iter__(self):
         debug('serving from cache, cache size %s', len(self._cache))
@@ -3391,3 +3765,97 @@ def coalesce(*fields, **kwargs):
         return default
 
     return _coalesce
+
+
+defaultchunksize = 1000
+
+
+# the function applied to each batch of rows in a worker process, see
+# iterparallel
+_batchfunction = None
+
+
+def _initbatchworker(f):
+    global _batchfunction
+    _batchfunction = f
+
+
+def _applybatchfunction(batch):
+    return _batchfunction(batch)
+
+
+def iterbatches(it, size):
+    it = iter(it)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            break
+        yield batch
+
+
+def iterparallel(f, rows, workers, chunksize=None, ordered=True,
+                 maxpending=None):
+    """
+    Apply the function `f` to batches of `chunksize` rows in a pool of
+    `workers` processes, yielding the items of each list returned by `f`. If
+    `ordered` is True, results are yielded in the order of the input rows,
+    otherwise each batch is yielded as soon as it is done. If `chunksize` is
+    None, the value of `petl.util.defaultchunksize` is used (1000 by
+    default).
+
+    No more than `maxpending` batches (twice the number of workers by
+    default) are read ahead of the results being yielded, so the input is
+    consumed no faster than the output.
+
+    N.B., `f` is handed to the worker processes as they are forked, so it
+    need not be picklable (e.g., it can be a lambda), but the rows and the
+    items returned by `f` are pickled to pass them between processes. Where
+    processes are not forked (i.e., on Windows), `f` must be picklable, i.e.,
+    a function defined at the top level of a module, so the callers of this
+    function which pass a lambda are only supported on POSIX platforms.
+
+    .. versionadded:: 0.26
+
+    """
+
+    if chunksize is None:
+        chunksize = defaultchunksize
+    if maxpending is None:
+        maxpending = 2 * workers
+    pool = multiprocessing.Pool(workers, _initbatchworker, (f,))
+    try:
+        batches = iterbatches(rows, chunksize)
+        pending = deque()
+
+        def submit():
+            for batch in islice(batches, maxpending - len(pending)):
+                pending.append(pool.apply_async(_applybatchfunction,
+                                                (batch,)))
+
+        submit()
+        while pending:
+            if ordered:
+                result = pending.popleft()
+            else:
+                result = _nextready(pending)
+            items = result.get()
+            # keep the workers busy while the results are consumed
+            submit()
+            for item in items:
+                yield item
+        pool.close()
+        pool.join()
+    finally:
+        # N.B., also stops the workers if iteration is abandoned early
+        pool.terminate()
+
+
+def _nextready(pending, interval=0.01):
+    # remove and return the first of the pending results which is done,
+    # waiting for one if none is
+    while True:
+        for i, result in enumerate(pending):
+            if result.ready():
+                del pending[i]
+                return result
+        pending[0].wait(interval)